@@ -0,0 +1,86 @@
+"""pending thumbnails
+
+Queue the objects missing survey thumbnails in a table filled by a trigger on
+objs, so the thumbnail queue claims them instead of scanning all objects for
+missing thumbnails. Objects currently missing thumbnails are queued.
+
+Revision ID: 3b8f6c2d9e14
+Revises: 7d2e9a51c3f0
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3b8f6c2d9e14"
+down_revision = "7d2e9a51c3f0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "pending_thumbnails",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("modified", sa.DateTime(), nullable=False),
+        sa.Column("obj_id", sa.String(), nullable=False),
+        sa.Column("claimed_at", sa.DateTime(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["obj_id"], ["objs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("obj_id"),
+    )
+    op.create_index(
+        op.f("ix_pending_thumbnails_created_at"),
+        "pending_thumbnails",
+        ["created_at"],
+        unique=False,
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION queue_obj_thumbnails() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO pending_thumbnails (obj_id, attempts, created_at, modified)
+            VALUES (NEW.id, 0, NEW.created_at, NEW.created_at)
+            ON CONFLICT (obj_id) DO NOTHING;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER objs_queue_thumbnails
+        AFTER INSERT ON objs
+        FOR EACH ROW EXECUTE FUNCTION queue_obj_thumbnails()
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO pending_thumbnails (obj_id, attempts, created_at, modified)
+        SELECT objs.id, 0, objs.created_at, objs.created_at
+        FROM objs
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM thumbnails
+            WHERE thumbnails.obj_id = objs.id
+            AND thumbnails.type IN ('sdss', 'ls', 'ps1')
+            GROUP BY thumbnails.obj_id
+            HAVING count(DISTINCT thumbnails.type) = 3
+        )
+        ON CONFLICT (obj_id) DO NOTHING
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS objs_queue_thumbnails ON objs")
+    op.execute("DROP FUNCTION IF EXISTS queue_obj_thumbnails()")
+    op.drop_index(
+        op.f("ix_pending_thumbnails_created_at"), table_name="pending_thumbnails"
+    )
+    op.drop_table("pending_thumbnails")
@@ -0,0 +1,98 @@
+"""binary spectrum arrays
+
+Store the wavelengths, fluxes and errors of spectra as the raw bytes of their
+little-endian float64 values (bytea), instead of double precision arrays, so
+they are loaded with np.frombuffer rather than element by element.
+
+The conversion runs in the database: each value is encoded with float8send,
+which gives its big-endian bytes, reversed into little-endian order. The
+downgrade decodes the values in Python, in batches.
+
+Revision ID: 5a7c1e3f8b20
+Revises: 3b8f6c2d9e14
+Create Date: 2026-10-18
+
+"""
+
+import numpy as np
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5a7c1e3f8b20"
+down_revision = "3b8f6c2d9e14"
+branch_labels = None
+depends_on = None
+
+COLUMNS = ["wavelengths", "fluxes", "errors"]
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    little_endian = " || ".join(f"substring(b from {i} for 1)" for i in range(8, 0, -1))
+    op.execute(
+        f"""
+        CREATE FUNCTION float8_array_to_bytea(values_ float8[]) RETURNS bytea AS $$
+            SELECT coalesce(string_agg({little_endian}, ''::bytea ORDER BY i), ''::bytea)
+            FROM (
+                SELECT float8send(x) AS b, i
+                FROM unnest(values_) WITH ORDINALITY AS t(x, i)
+            ) AS v
+        $$ LANGUAGE sql IMMUTABLE STRICT
+        """
+    )
+    for column in COLUMNS:
+        op.alter_column(
+            "spectra",
+            column,
+            type_=sa.LargeBinary(),
+            postgresql_using=f"float8_array_to_bytea({column})",
+        )
+    op.execute("DROP FUNCTION float8_array_to_bytea(float8[])")
+
+
+def downgrade():
+    connection = op.get_bind()
+    for column in COLUMNS:
+        op.add_column(
+            "spectra",
+            sa.Column(f"{column}_array", postgresql.ARRAY(sa.Float()), nullable=True),
+        )
+
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                f"SELECT id, {', '.join(COLUMNS)} FROM spectra "
+                "WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            values = {
+                f"{column}_array": (
+                    None
+                    if value is None
+                    else np.frombuffer(value, dtype="<f8").tolist()
+                )
+                for column, value in zip(COLUMNS, row[1:])
+            }
+            connection.execute(
+                sa.text(
+                    "UPDATE spectra SET "
+                    + ", ".join(f"{name} = :{name}" for name in values)
+                    + " WHERE id = :id"
+                ),
+                {"id": row.id, **values},
+            )
+        last_id = rows[-1].id
+
+    for column in COLUMNS:
+        op.drop_column("spectra", column)
+        op.alter_column("spectra", f"{column}_array", new_column_name=column)
+    op.alter_column("spectra", "wavelengths", nullable=False)
+    op.alter_column("spectra", "fluxes", nullable=False)
@@ -0,0 +1,89 @@
+"""notification deliveries
+
+Persist the notification queue: each notification to send on a channel is a
+row that the notification queue workers claim, retry and mark as sent, so
+pending notifications survive restarts.
+
+Revision ID: 7d2e9a51c3f0
+Revises: c4f31ba6389b
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7d2e9a51c3f0"
+down_revision = "c4f31ba6389b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "notification_deliveries",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("modified", sa.DateTime(), nullable=False),
+        sa.Column("notification_id", sa.Integer(), nullable=False),
+        sa.Column("channel", sa.String(), nullable=False),
+        sa.Column("destination", sa.String(), nullable=False),
+        sa.Column("content", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("claimed_at", sa.DateTime(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["notification_id"], ["usernotifications.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_notification_deliveries_created_at"),
+        "notification_deliveries",
+        ["created_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_notification_deliveries_notification_id"),
+        "notification_deliveries",
+        ["notification_id"],
+        unique=False,
+    )
+    op.create_index(
+        "notification_deliveries_pending_index",
+        "notification_deliveries",
+        ["channel", "next_attempt_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index(
+        "notification_deliveries_sending_index",
+        "notification_deliveries",
+        ["claimed_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'sending'"),
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "notification_deliveries_sending_index", table_name="notification_deliveries"
+    )
+    op.drop_index(
+        "notification_deliveries_pending_index", table_name="notification_deliveries"
+    )
+    op.drop_index(
+        op.f("ix_notification_deliveries_notification_id"),
+        table_name="notification_deliveries",
+    )
+    op.drop_index(
+        op.f("ix_notification_deliveries_created_at"),
+        table_name="notification_deliveries",
+    )
+    op.drop_table("notification_deliveries")
@@ -0,0 +1,39 @@
+"""localization credible thresholds
+
+Store, per localization, the minimum tile probability density of the
+standard credible regions, so crossmatch and localization queries don't
+re-run the cumulative-probability window over every tile. Existing
+localizations are left empty and fall back to computing thresholds on
+demand.
+
+Revision ID: c4f31ba6389b
+Revises: 52b02a40ac4d
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4f31ba6389b"
+down_revision = "52b02a40ac4d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "localizations",
+        sa.Column(
+            "credible_thresholds",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column("localizations", "credible_thresholds")
@@ -1,14 +1,26 @@
 """In-core broker ingestion service.
 
 Runs each active `Broker` whose provider implements `run_ingestion` (a
-long-running consumer: Kafka/REST -> shared save transform). One asyncio task
-per broker in a single event loop; the providers offload blocking I/O (e.g.
-Kafka poll) via `asyncio.to_thread` so brokers don't starve each other.
+long-running consumer: Kafka/REST -> shared save transform). By default, one
+asyncio task per broker in a single event loop; the providers offload blocking
+I/O (e.g. Kafka poll) via `asyncio.to_thread` so brokers don't starve each other.
+
+Providers with `parallel_ingestion` (Kafka consumer groups) can instead run as a
+pool of worker processes, so Avro decoding and photometry building for a busy
+broker spread over several cores. Set `workers` (fixed) or `min_workers` /
+`max_workers` (autoscaled on consumer lag) in the broker's `altdata['kafka']`.
+All workers share the consumer group, so Kafka splits the partitions between
+them. The rescan loop below supervises the pools: it restarts dead workers,
+scales pools up and down, and logs each worker's health and lag.
 
 Enable with `brokers.ingest_enabled: true` in the config.
 """
 
 import asyncio
+import multiprocessing
+import os
+import queue
+import time
 
 import sqlalchemy as sa
 
@@ -16,6 +28,8 @@ from baselayer.app import models as baselayer_models
 from baselayer.app.env import load_env
 from baselayer.app.models import init_db
 from baselayer.log import make_log
+from skyportal.broker_apis._kafka import kafka_worker_bounds, scale_workers
+from skyportal.broker_apis._refdata import REFERENCE_DATA
 from skyportal.models import Broker
 
 env, cfg = load_env()
@@ -25,6 +39,14 @@ init_db(**cfg["database"])
 
 # How often to re-scan the DB for newly-added / activated brokers.
 RESCAN_INTERVAL = 60  # seconds
+# A worker that hasn't reported for this long is flagged (and restarted).
+WORKER_STALE_AFTER = 10 * RESCAN_INTERVAL  # seconds
+# Grace period for a worker to finish its batch when the pool scales down.
+WORKER_STOP_TIMEOUT = 30  # seconds
+
+# Spawn rather than fork: a forked child would inherit the parent's DB engine
+# and event loop.
+_mp = multiprocessing.get_context("spawn")
 
 
 async def _run_broker(broker):
@@ -51,8 +73,141 @@ async def _active_ingestion_brokers(session):
     return wanted
 
 
+def _worker_bounds(broker):
+    """(min, max) worker processes for ``broker``, or None to run it as an
+    in-process task (the default, and the only mode for non-Kafka providers)."""
+    if not getattr(broker.broker_class, "parallel_ingestion", False):
+        return None
+    kafka = (broker.altdata or {}).get("kafka") or {}
+    bounds = kafka_worker_bounds(kafka)
+    return None if bounds == (1, 1) else bounds
+
+
+async def _run_worker(broker_id, index, stop, status):
+    async with baselayer_models.async_plain_session_factory() as session:
+        broker = await session.scalar(sa.select(Broker).where(Broker.id == broker_id))
+        session.expunge(broker)
+
+    def report(stats):
+        status.put(
+            {
+                "broker_id": broker_id,
+                "worker": index,
+                "pid": os.getpid(),
+                "time": time.time(),
+                "refdata_hit_rate": REFERENCE_DATA.stats()["hit_rate"],
+                **stats,
+            }
+        )
+
+    await broker.broker_class.run_ingestion(broker, stop=stop, report=report)
+
+
+def _worker_main(broker_id, index, stop, status):
+    """Entry point of a worker process: one consumer of the broker's group."""
+    try:
+        asyncio.run(_run_worker(broker_id, index, stop, status))
+    except Exception as e:
+        log(f"broker {broker_id} worker {index} crashed: {e}")
+
+
+class _WorkerPool:
+    """The worker processes consuming one broker's stream."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.workers = {}  # index -> (process, stop event, started at)
+        self.status = {}  # index -> last report
+
+    def _start(self, index, status_queue):
+        stop = _mp.Event()
+        process = _mp.Process(
+            target=_worker_main,
+            args=(self.broker.id, index, stop, status_queue),
+            name=f"broker-{self.broker.id}-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self.workers[index] = (process, stop, time.time())
+        self.status.pop(index, None)
+        log(f"broker {self.broker.id}: started worker {index} (pid {process.pid})")
+
+    def _stop(self, index):
+        process, stop, _ = self.workers.pop(index)
+        self.status.pop(index, None)
+        stop.set()
+        process.join(WORKER_STOP_TIMEOUT)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        log(f"broker {self.broker.id}: stopped worker {index}")
+
+    def lag(self):
+        """Total lag reported by the live workers (None if any is unknown)."""
+        lags = [self.status.get(i, {}).get("lag") for i in self.workers]
+        if not lags or any(lag is None for lag in lags):
+            return None
+        return sum(lags)
+
+    def supervise(self, n_workers, status_queue):
+        """Restart dead or stale workers, then scale the pool to ``n_workers``."""
+        now = time.time()
+        for index, (process, _, started_at) in list(self.workers.items()):
+            last_seen = self.status.get(index, {}).get("time", started_at)
+            if not process.is_alive():
+                log(
+                    f"broker {self.broker.id}: worker {index} exited "
+                    f"(code {process.exitcode}); restarting"
+                )
+            elif now - last_seen > WORKER_STALE_AFTER:
+                log(f"broker {self.broker.id}: worker {index} is stale; restarting")
+                self._stop(index)
+            else:
+                continue
+            self.workers.pop(index, None)
+            self._start(index, status_queue)
+
+        for index in range(len(self.workers), n_workers):
+            self._start(index, status_queue)
+        for index in sorted(self.workers, reverse=True):
+            if index >= n_workers:
+                self._stop(index)
+
+    def shutdown(self):
+        for index in list(self.workers):
+            self._stop(index)
+
+    def health(self):
+        now = time.time()
+        lines = []
+        for index, (process, _, started_at) in sorted(self.workers.items()):
+            st = self.status.get(index, {})
+            age = now - st.get("time", started_at)
+            lines.append(
+                f"worker {index} pid={process.pid} alive={process.is_alive()} "
+                f"alerts={st.get('alerts', 0)} lag={st.get('lag')} "
+                f"refdata_hit_rate={st.get('refdata_hit_rate', 0.0):.2f} "
+                f"last_report={age:.0f}s ago"
+            )
+        return f"broker {self.broker.id} ({self.broker.name}): " + "; ".join(lines)
+
+
+def _drain_status(status_queue, pools):
+    """Route the workers' queued heartbeats to their pools."""
+    while True:
+        try:
+            st = status_queue.get_nowait()
+        except queue.Empty:
+            return
+        pool = pools.get(st["broker_id"])
+        if pool is not None and st["worker"] in pool.workers:
+            pool.status[st["worker"]] = st
+
+
 async def _run_loop():
     running: dict[int, asyncio.Task] = {}
+    pools: dict[int, _WorkerPool] = {}
+    status_queue = _mp.Queue()
     while True:
         try:
             # Resolve on the baselayer module at call time: init_db() rebinds the
@@ -62,14 +217,51 @@ async def _run_loop():
                 wanted = await _active_ingestion_brokers(session)
         except Exception as e:
             log(f"failed to list brokers: {e}")
-            wanted = {}
+            wanted = None
+
+        _drain_status(status_queue, pools)
 
-        for bid, broker in wanted.items():
-            task = running.get(bid)
-            if task is None or task.done():
-                log(f"starting ingestion for broker {bid} ({broker.name})")
-                running[bid] = asyncio.create_task(_run_broker(broker))
+        # Pools of brokers that were deactivated or went back to a single
+        # in-process consumer are shut down (a failed listing keeps them).
+        for bid in list(pools):
+            if wanted is not None and (
+                bid not in wanted or _worker_bounds(wanted[bid]) is None
+            ):
+                log(f"stopping ingestion workers for broker {bid}")
+                await asyncio.to_thread(pools.pop(bid).shutdown)
 
+        for bid, broker in (wanted or {}).items():
+            bounds = _worker_bounds(broker)
+            if bounds is None:
+                task = running.get(bid)
+                if task is None or task.done():
+                    log(f"starting ingestion for broker {bid} ({broker.name})")
+                    running[bid] = asyncio.create_task(_run_broker(broker))
+                continue
+
+            task = running.pop(bid, None)
+            if task is not None and not task.done():
+                task.cancel()
+            pool = pools.get(bid)
+            if pool is None:
+                log(
+                    f"starting ingestion worker pool for broker {bid} "
+                    f"({broker.name}), {bounds[0]}-{bounds[1]} workers"
+                )
+                pool = pools[bid] = _WorkerPool(broker)
+            pool.broker = broker
+            n_workers = scale_workers(len(pool.workers), pool.lag(), *bounds)
+            if pool.workers and n_workers != len(pool.workers):
+                log(
+                    f"broker {bid}: scaling from {len(pool.workers)} to "
+                    f"{n_workers} workers (lag {pool.lag()})"
+                )
+            await asyncio.to_thread(pool.supervise, n_workers, status_queue)
+
+        for pool in pools.values():
+            log(pool.health())
+        if running:
+            log(f"reference data cache: {REFERENCE_DATA.stats()}")
         await asyncio.sleep(RESCAN_INTERVAL)
 
 
@@ -77,8 +269,6 @@ if __name__ == "__main__":
     if not cfg.get("brokers.ingest_enabled", False):
         log("broker ingestion disabled (set brokers.ingest_enabled: true to enable)")
         # Idle instead of exiting so supervisor doesn't restart-loop.
-        import time
-
         while True:
             time.sleep(3600)
     else:
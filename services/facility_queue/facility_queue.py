@@ -1,4 +1,6 @@
-import time
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 
 import astropy.units as u
@@ -6,6 +8,8 @@ import numpy as np
 import pandas as pd
 import requests
 import sqlalchemy as sa
+import tornado.escape
+import tornado.web
 from astropy.time import Time, TimeDelta
 from requests.auth import HTTPBasicAuth
 
@@ -13,11 +17,15 @@ from baselayer.app.env import load_env
 from baselayer.app.models import init_db
 from baselayer.log import make_log
 from skyportal.models import (
+    Allocation,
     DBSession,
     FacilityTransactionRequest,
     FollowupRequest,
+    Instrument,
 )
 from skyportal.utils.naive_datetime import utcnow_naive
+from skyportal.utils.poll_scheduler import MIN_POLL_INTERVAL, PollScheduler, poll_delay
+from skyportal.utils.services import check_loaded
 
 env, cfg = load_env()
 log = make_log("facility_queue")
@@ -47,300 +55,418 @@ request_session.trust_env = (
 
 WAIT_TIME_BETWEEN_QUERIES = 120  # in seconds
 CUTOFF_TIME_DAYS = 7  # max lookback time for requests to be processed
+# Time between two sweeps of the pending requests (seconds); new requests are
+# polled as soon as they're submitted.
+SWEEP_INTERVAL = 300
+# Maximum number of concurrent polls, by facility (default: 2).
+CONCURRENCY = {"ATLAS": 4, "ZTF": 2}
 
 
-def service():
-    while True:
-        queue = []
-        try:
-            with DBSession() as session:
-                cutoff_time = Time.now() - TimeDelta(CUTOFF_TIME_DAYS * u.day)
-                last_query_dt = Time.now() - TimeDelta(WAIT_TIME_BETWEEN_QUERIES * u.s)
-                requests = (
-                    session.query(FacilityTransactionRequest)
-                    .where(
-                        FacilityTransactionRequest.status != "complete",
-                        FacilityTransactionRequest.status.not_like("error:%"),
-                        FacilityTransactionRequest.created_at >= cutoff_time.datetime,
-                        sa.or_(
-                            FacilityTransactionRequest.last_query
-                            < last_query_dt.datetime,
-                            FacilityTransactionRequest.last_query.is_(None),
-                            FacilityTransactionRequest.last_query
-                            == FacilityTransactionRequest.created_at,
-                        ),
+def pending_requests(request_ids=None):
+    """Requests to poll: recent, not complete, and not in error.
+
+    Parameters
+    ----------
+    request_ids : list of int, optional
+        Only consider these requests.
+
+    Returns
+    -------
+    list of tuple
+        ID of each request, name of its instrument, and delay before it's
+        due to be polled (seconds).
+    """
+    try:
+        with DBSession() as session:
+            cutoff_time = Time.now() - TimeDelta(CUTOFF_TIME_DAYS * u.day)
+            stmt = (
+                sa.select(
+                    FacilityTransactionRequest.id,
+                    Instrument.name,
+                    FacilityTransactionRequest.created_at,
+                    FacilityTransactionRequest.last_query,
+                )
+                .join(
+                    FollowupRequest,
+                    FollowupRequest.id
+                    == FacilityTransactionRequest.followup_request_id,
+                )
+                .join(Allocation, Allocation.id == FollowupRequest.allocation_id)
+                .join(Instrument, Instrument.id == Allocation.instrument_id)
+                .where(
+                    FacilityTransactionRequest.status != "complete",
+                    FacilityTransactionRequest.status.not_like("error:%"),
+                    FacilityTransactionRequest.created_at >= cutoff_time.datetime,
+                )
+            )
+            if request_ids is not None:
+                stmt = stmt.where(FacilityTransactionRequest.id.in_(request_ids))
+            now = utcnow_naive()
+            due = []
+            for req_id, instrument_name, created_at, last_query in session.execute(
+                stmt
+            ):
+                if last_query is None or last_query == created_at:
+                    delay = 0
+                else:
+                    delay = max(
+                        0,
+                        WAIT_TIME_BETWEEN_QUERIES - (now - last_query).total_seconds(),
                     )
-                    .all()
+                due.append((req_id, instrument_name, delay))
+            return due
+    finally:
+        DBSession.remove()
+
+
+def poll_request(req_id):
+    """Poll a facility for the status of a request, and commit its results
+    if it's done.
+
+    Returns
+    -------
+    float or None
+        Delay before polling the request again (seconds), or None if it
+        needn't be polled anymore.
+    """
+    try:
+        return _poll_request(req_id)
+    finally:
+        DBSession.remove()
+
+
+def _poll_request(req_id):
+    with DBSession() as session:
+        try:
+            req = session.scalars(
+                sa.select(FacilityTransactionRequest).where(
+                    FacilityTransactionRequest.id == req_id
                 )
-                for req in requests:
-                    followup_request = session.scalars(
-                        sa.select(FollowupRequest).where(
-                            FollowupRequest.id == req.followup_request_id
-                        )
-                    ).first()
-                    if followup_request is not None:
-                        queue.append(req.id)
-        except Exception as e:
-            log(f"Error retrieving requests to process: {e}")
-            time.sleep(15)
-            continue
-
-        if len(queue) == 0:
-            # this is a retrieval queue service. Requests were sent before and
-            # we are just waiting for the results. No rush to check the queue
-            time.sleep(30)
-            continue
-
-        for req_id in queue:
-            if req_id is None:
-                log("No request ID found in queue. Continuing to next request.")
-                continue
-
-            time.sleep(5)
-            with DBSession() as session:
-                try:
-                    req = session.scalars(
-                        sa.select(FacilityTransactionRequest).where(
-                            FacilityTransactionRequest.id == req_id
-                        )
-                    ).first()
-                    if req is None:
-                        log(f"Facility transaction request {req_id} not found.")
-                        continue
-
-                    log(f"Executing request {req.id}")
-                    followup_request = session.scalars(
-                        sa.select(FollowupRequest).where(
-                            FollowupRequest.id == req.followup_request_id
-                        )
-                    ).first()
-                    if followup_request is None:
-                        log(f"Follow-up request {req.followup_request_id} not found.")
-                        continue
-                    instrument = followup_request.allocation.instrument
-                    altdata = followup_request.allocation.altdata
-
-                    if instrument.name == "ATLAS":
-                        from skyportal.facility_apis.atlas import commit_photometry
-
-                        response = request_session.request(
-                            req.method,
-                            req.endpoint,
-                            json=req.data,
-                            params=req.params,
-                            headers=req.headers,
-                        )
+            ).first()
+            if req is None:
+                log(f"Facility transaction request {req_id} not found.")
+                return None
 
-                        if response.status_code == 200:
-                            try:
-                                json_response = response.json()
-                            except Exception:
-                                raise ValueError("No JSON data returned in request")
+            # the same requests as pending_requests leaves out, which can
+            # have become complete, in error, or too old since scheduled
+            waiting = (utcnow_naive() - req.created_at).total_seconds()
+            if (
+                req.status == "complete"
+                or req.status.startswith("error:")
+                or waiting > CUTOFF_TIME_DAYS * 24 * 3600
+            ):
+                log(f"Job {req.id}: no longer polled (status: {req.status})")
+                return None
 
-                            if json_response["finishtimestamp"]:
-                                followup_request.status = (
-                                    "Committing photometry to database"
-                                )
-                                try:
-                                    if json_response["result_url"] is not None:
-                                        commit_photometry(
-                                            json_response,
-                                            altdata,
-                                            followup_request.id,
-                                            instrument.id,
-                                            followup_request.requester.id,
-                                            parent_session=session,
-                                            duplicates="update",
-                                        )
-                                    req.status = "complete"
-                                    session.add(req)
-                                    session.commit()
-                                    log(f"Job with ID {req.id} completed")
-                                    continue
-                                except Exception as e:
-                                    log(f"Error committing photometry: {str(e)}")
-                                    status = f"error: {str(e)}"
-                                    if followup_request.status != status:
-                                        followup_request.status = status
-                                        session.add(followup_request)
-                                    req.status = f"error: {e}"
-                                    session.add(req)
-                                    session.commit()
-                                    continue
-
-                            elif json_response["starttimestamp"]:
-                                log(
-                                    f"Job {req.id}: running (started at {json_response['starttimestamp']})"
+            log(f"Executing request {req.id}")
+            followup_request = session.scalars(
+                sa.select(FollowupRequest).where(
+                    FollowupRequest.id == req.followup_request_id
+                )
+            ).first()
+            if followup_request is None:
+                log(f"Follow-up request {req.followup_request_id} not found.")
+                return None
+            instrument = followup_request.allocation.instrument
+            altdata = followup_request.allocation.altdata
+
+            if instrument.name == "ATLAS":
+                from skyportal.facility_apis.atlas import commit_photometry
+
+                response = request_session.request(
+                    req.method,
+                    req.endpoint,
+                    json=req.data,
+                    params=req.params,
+                    headers=req.headers,
+                )
+
+                if response.status_code == 200:
+                    try:
+                        json_response = response.json()
+                    except Exception:
+                        raise ValueError("No JSON data returned in request")
+
+                    if json_response["finishtimestamp"]:
+                        followup_request.status = "Committing photometry to database"
+                        try:
+                            if json_response["result_url"] is not None:
+                                commit_photometry(
+                                    json_response,
+                                    altdata,
+                                    followup_request.id,
+                                    instrument.id,
+                                    followup_request.requester.id,
+                                    parent_session=session,
+                                    duplicates="update",
                                 )
-                                status = f"Job is running (started at {json_response['starttimestamp']})"
-                                if followup_request.status != status:
-                                    followup_request.status = status
-                                    session.add(followup_request)
-                                req.last_query = utcnow_naive()
-                                session.add(req)
-                                session.commit()
-                                log(f"Job {req.id}: {status}")
-                            else:
-                                status = f"Waiting for job to start (queued at {json_response['timestamp']})"
-                                if followup_request.status != status:
-                                    followup_request.status = status
-                                    session.add(followup_request)
-                                req.last_query = utcnow_naive()
-                                session.add(req)
-                                session.commit()
-                                log(f"Job {req.id}: {status}")
-                        else:
-                            status = f"error: {response.content}"
+                            req.status = "complete"
+                            session.add(req)
+                            session.commit()
+                            log(f"Job with ID {req.id} completed")
+                            return None
+                        except Exception as e:
+                            log(f"Error committing photometry: {str(e)}")
+                            status = f"error: {str(e)}"
                             if followup_request.status != status:
                                 followup_request.status = status
                                 session.add(followup_request)
-                            req.last_query = utcnow_naive()
+                            req.status = f"error: {e}"
                             session.add(req)
                             session.commit()
-                            log(f"Job {req.id}: {status}")
+                            return None
+
+                    elif json_response["starttimestamp"]:
+                        log(
+                            f"Job {req.id}: running (started at {json_response['starttimestamp']})"
+                        )
+                        status = f"Job is running (started at {json_response['starttimestamp']})"
+                        if followup_request.status != status:
+                            followup_request.status = status
+                            session.add(followup_request)
+                        req.last_query = utcnow_naive()
+                        session.add(req)
+                        session.commit()
+                        log(f"Job {req.id}: {status}")
+                        return MIN_POLL_INTERVAL
+                    else:
+                        queue_position = json_response.get("queuepos")
+                        status = f"Waiting for job to start (queued at {json_response['timestamp']})"
+                        if queue_position is not None:
+                            status += f", position {queue_position} in queue"
+                        if followup_request.status != status:
+                            followup_request.status = status
+                            session.add(followup_request)
+                        req.last_query = utcnow_naive()
+                        session.add(req)
+                        session.commit()
+                        log(f"Job {req.id}: {status}")
+                        return poll_delay(
+                            queue_position=queue_position, waiting=waiting
+                        )
+                else:
+                    status = f"error: {response.content}"
+                    if followup_request.status != status:
+                        followup_request.status = status
+                        session.add(followup_request)
+                    req.last_query = utcnow_naive()
+                    session.add(req)
+                    session.commit()
+                    log(f"Job {req.id}: {status}")
+                    # the error may be transient: retried until the cutoff
+                    return WAIT_TIME_BETWEEN_QUERIES
 
-                    elif instrument.name == "ZTF":
-                        from skyportal.facility_apis.ztf import commit_photometry
+            elif instrument.name == "ZTF":
+                from skyportal.facility_apis.ztf import commit_photometry
 
-                        keys = ["ra", "dec", "jdstart", "jdend"]
+                keys = ["ra", "dec", "jdstart", "jdend"]
 
-                        response = request_session.request(
-                            req.method,
-                            req.endpoint,
-                            json=req.data,
-                            params=req.params,
-                            headers=req.headers,
-                            auth=HTTPBasicAuth(
-                                altdata["ipac_http_user"], altdata["ipac_http_password"]
-                            ),
-                        )
+                response = request_session.request(
+                    req.method,
+                    req.endpoint,
+                    json=req.data,
+                    params=req.params,
+                    headers=req.headers,
+                    auth=HTTPBasicAuth(
+                        altdata["ipac_http_user"], altdata["ipac_http_password"]
+                    ),
+                )
 
-                        if "Zero records returned" in str(response.text):
-                            log(
-                                "Found no records yet for this ZTF forced photometry account."
-                            )
-                            continue
-                        elif response.status_code == 200:
-                            df_result = pd.read_html(StringIO(response.text))[0]
-                            df_result.rename(
-                                inplace=True,
-                                columns={"startJD": "jdstart", "endJD": "jdend"},
+                if "Zero records returned" in str(response.text):
+                    log("Found no records yet for this ZTF forced photometry account.")
+                    return WAIT_TIME_BETWEEN_QUERIES
+                elif response.status_code == 200:
+                    df_result = pd.read_html(StringIO(response.text))[0]
+                    df_result.rename(
+                        inplace=True,
+                        columns={"startJD": "jdstart", "endJD": "jdend"},
+                    )
+                    df_result = df_result.replace({np.nan: None})
+                    if not set(keys).issubset(df_result.columns):
+                        status = "In progress: RA, Dec, jdstart, and jdend required in response."
+                        if followup_request.status != status:
+                            followup_request.status = status
+                            session.add(followup_request)
+                        req.last_query = utcnow_naive()
+                        session.add(req)
+                        session.commit()
+                        log(f"Job {req.id}: {status}")
+                        return poll_delay(waiting=waiting)
+
+                    index_match = None
+                    for index, row in df_result.iterrows():
+                        if all(np.isclose(row[key], req.data[key]) for key in keys):
+                            index_match = index
+                            break
+                    if index_match is None:
+                        status = "In progress: No matching response from forced photometry service. Waiting for database update."
+                        if followup_request.status != status:
+                            followup_request.status = status
+                            session.add(followup_request)
+                        req.last_query = utcnow_naive()
+                        session.add(req)
+                        session.commit()
+                        return poll_delay(waiting=waiting)
+
+                    row = df_result.loc[index_match]
+                    if row["lightcurve"] is None:
+                        status = "In progress: Light curve not yet available. Waiting for it to complete."
+                        if followup_request.status != status:
+                            followup_request.status = status
+                            session.add(followup_request)
+                        req.last_query = utcnow_naive()
+                        session.add(req)
+                        session.commit()
+                        log(f"Job {req.id}: {status}")
+                        return poll_delay(waiting=waiting)
+
+                    lightcurve = row["lightcurve"]
+                    exitcode = row["exitcode"]
+                    exitcode_text = ZTF_PHOTOMETRY_CODES[exitcode]
+
+                    if exitcode in [63, 64, 65, 255]:
+                        status = f"No photometry available: {exitcode_text}"
+                        if followup_request.status != status:
+                            followup_request.status = status
+                            session.add(followup_request)
+                        req.last_query = utcnow_naive()
+                        req.status = "complete"
+                        session.add(req)
+                        session.commit()
+                        log(
+                            f"Job with ID {req.id} has no forced photometry: {exitcode_text}"
+                        )
+                        return None
+                    else:
+                        dataurl = f"{ZTF_FORCED_URL}/{lightcurve}"
+                        try:
+                            commit_photometry(
+                                dataurl,
+                                altdata,
+                                followup_request.id,
+                                instrument.id,
+                                followup_request.requester.id,
+                                parent_session=session,
+                                duplicates="update",
                             )
-                            df_result = df_result.replace({np.nan: None})
-                            if not set(keys).issubset(df_result.columns):
-                                status = "In progress: RA, Dec, jdstart, and jdend required in response."
-                                if followup_request.status != status:
-                                    followup_request.status = status
-                                    session.add(followup_request)
-                                req.last_query = utcnow_naive()
-                                session.add(req)
-                                session.commit()
-                                log(f"Job {req.id}: {status}")
-                                continue
-
-                            index_match = None
-                            for index, row in df_result.iterrows():
-                                if all(
-                                    np.isclose(row[key], req.data[key]) for key in keys
-                                ):
-                                    index_match = index
-                                    break
-                            if index_match is None:
-                                status = "In progress: No matching response from forced photometry service. Waiting for database update."
-                                if followup_request.status != status:
-                                    followup_request.status = status
-                                    session.add(followup_request)
-                                req.last_query = utcnow_naive()
-                                session.add(req)
-                                session.commit()
-                                continue
-
-                            row = df_result.loc[index_match]
-                            if row["lightcurve"] is None:
-                                status = "In progress: Light curve not yet available. Waiting for it to complete."
-                                if followup_request.status != status:
-                                    followup_request.status = status
-                                    session.add(followup_request)
-                                req.last_query = utcnow_naive()
-                                session.add(req)
-                                session.commit()
-                                log(f"Job {req.id}: {status}")
-                                continue
-
-                            lightcurve = row["lightcurve"]
-                            exitcode = row["exitcode"]
-                            exitcode_text = ZTF_PHOTOMETRY_CODES[exitcode]
-
-                            if exitcode in [63, 64, 65, 255]:
-                                status = f"No photometry available: {exitcode_text}"
-                                if followup_request.status != status:
-                                    followup_request.status = status
-                                    session.add(followup_request)
-                                req.last_query = utcnow_naive()
-                                req.status = "complete"
-                                session.add(req)
-                                session.commit()
-                                log(
-                                    f"Job with ID {req.id} has no forced photometry: {exitcode_text}"
-                                )
-                            else:
-                                dataurl = f"{ZTF_FORCED_URL}/{lightcurve}"
-                                try:
-                                    commit_photometry(
-                                        dataurl,
-                                        altdata,
-                                        followup_request.id,
-                                        instrument.id,
-                                        followup_request.requester.id,
-                                        parent_session=session,
-                                        duplicates="update",
-                                    )
-                                    req.status = "complete"
-                                    session.add(req)
-                                    session.commit()
-                                    log(f"Job with ID {req.id} completed")
-                                except Exception as e:
-                                    if "Failed to commit photometry" in str(e):
-                                        status = f"error: {str(e)}"
-                                    else:
-                                        status = "In progress: Light curve not yet available. Waiting for it to complete."
-                                    if followup_request.status != status:
-                                        followup_request.status = status
-                                        session.add(followup_request)
-                                    req.last_query = utcnow_naive()
-                                    session.add(req)
-                                    session.commit()
-                                    log(f"Job {req.id}: {status}")
-                        elif (
-                            "Error: database is busy; try again a minute later."
-                            in str(response.content)
-                        ):
-                            status = "In progress: forced photometry database is busy; trying again in 2 minutes."
-                            if followup_request.status != status:
-                                followup_request.status = status
-                                session.add(followup_request)
-                            req.last_query = utcnow_naive()
+                            req.status = "complete"
                             session.add(req)
                             session.commit()
-                            log(f"Job {req.id}: {status}")
-                        else:
-                            status = f"error: {response.content}"
+                            log(f"Job with ID {req.id} completed")
+                            return None
+                        except Exception as e:
+                            failed = "Failed to commit photometry" in str(e)
+                            if failed:
+                                status = f"error: {str(e)}"
+                            else:
+                                status = "In progress: Light curve not yet available. Waiting for it to complete."
                             if followup_request.status != status:
                                 followup_request.status = status
                                 session.add(followup_request)
                             req.last_query = utcnow_naive()
+                            if failed:
+                                req.status = status
                             session.add(req)
                             session.commit()
                             log(f"Job {req.id}: {status}")
-                    else:
-                        log(f"Job {req.id}: API for {instrument.name} unknown")
+                            return None if failed else WAIT_TIME_BETWEEN_QUERIES
+                elif "Error: database is busy; try again a minute later." in str(
+                    response.content
+                ):
+                    status = "In progress: forced photometry database is busy; trying again in 2 minutes."
+                    if followup_request.status != status:
+                        followup_request.status = status
+                        session.add(followup_request)
+                    req.last_query = utcnow_naive()
+                    session.add(req)
+                    session.commit()
+                    log(f"Job {req.id}: {status}")
+                else:
+                    status = f"error: {response.content}"
+                    if followup_request.status != status:
+                        followup_request.status = status
+                        session.add(followup_request)
+                    req.last_query = utcnow_naive()
+                    session.add(req)
+                    session.commit()
+                    log(f"Job {req.id}: {status}")
+                    # the error may be transient: retried until the cutoff
+                    return WAIT_TIME_BETWEEN_QUERIES
+            else:
+                log(f"Job {req.id}: API for {instrument.name} unknown")
+                return None
 
-                except Exception as e:
-                    log(f"Error processing follow-up request {req_id}: {str(e)}")
-                    try:
-                        session.rollback()
-                    except Exception:
-                        pass
+        except Exception as e:
+            log(f"Error processing follow-up request {req_id}: {str(e)}")
+            try:
+                session.rollback()
+            except Exception:
+                pass
+
+    return WAIT_TIME_BETWEEN_QUERIES
+
+
+async def sweep(scheduler, executor):
+    """Schedule the pending requests, e.g. after a restart, or when a
+    wake-up was missed."""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            for req_id, instrument_name, delay in await loop.run_in_executor(
+                executor, pending_requests
+            ):
+                if req_id not in scheduler:
+                    scheduler.schedule(req_id, instrument_name, delay)
+        except Exception as e:
+            log(f"Error retrieving requests to process: {e}")
+        await asyncio.sleep(SWEEP_INTERVAL)
+
+
+def make_app(scheduler, executor):
+    class QueueHandler(tornado.web.RequestHandler):
+        def get(self):
+            self.set_header("Content-Type", "application/json")
+            self.write({"status": "success", "data": scheduler.stats})
+
+        async def post(self):
+            """Poll new requests right away: {"request_ids": [...]}."""
+            try:
+                data = tornado.escape.json_decode(self.request.body)
+                request_ids = [int(req_id) for req_id in data["request_ids"]]
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                self.set_status(400)
+                return self.write({"status": "error", "message": "Malformed JSON data"})
+
+            loop = asyncio.get_running_loop()
+            due = await loop.run_in_executor(executor, pending_requests, request_ids)
+            for req_id, instrument_name, _ in due:
+                scheduler.schedule(req_id, instrument_name)
+            self.write({"status": "success", "data": scheduler.stats})
+
+    return tornado.web.Application([(r"/", QueueHandler)])
+
+
+async def _run():
+    loop = asyncio.get_running_loop()
+    concurrency = {**CONCURRENCY, **(cfg.get("facility_queue.concurrency") or {})}
+    executor = ThreadPoolExecutor(max_workers=sum(concurrency.values()) + 4)
+
+    async def poll(req_id):
+        try:
+            return await loop.run_in_executor(executor, poll_request, req_id)
+        except Exception as e:
+            log(f"Error processing follow-up request {req_id}: {str(e)}")
+            return WAIT_TIME_BETWEEN_QUERIES
+
+    scheduler = PollScheduler(poll, concurrency)
+    make_app(scheduler, executor).listen(cfg["ports.facility_queue"])
+    loop.create_task(sweep(scheduler, executor))
+    await scheduler.run()
+
+
+@check_loaded(logger=log)
+def service(*args, **kwargs):
+    asyncio.run(_run())
 
 
 if __name__ == "__main__":
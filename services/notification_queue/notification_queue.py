@@ -2,6 +2,8 @@ import asyncio
 import json
 import operator  # noqa: F401
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from threading import Thread
 
 import arrow
@@ -47,6 +49,20 @@ from skyportal.models import (
     UserNotification,
 )
 from skyportal.utils.gcn import get_skymap_properties
+from skyportal.utils.notification_delivery import (
+    CHANNELS,
+    MAX_BATCH_SIZE,
+    batches,
+    claim_deliveries,
+    complete_deliveries,
+    defer_deliveries,
+    enqueue_deliveries,
+    fail_delivery,
+    prune_deliveries,
+    queue_metrics,
+    rate_limiters,
+    release_stale_claims,
+)
 from skyportal.utils.notifications import (
     gcn_email_notification,
     gcn_notification_content,
@@ -78,6 +94,26 @@ if cfg.get("email_service") == "sendgrid" or cfg.get("email_service") == "smtp":
     email = True
 
 
+# Number of workers sending the deliveries of each channel.
+WORKERS = {
+    "frontend": 2,
+    "email": 4,
+    "slack": 4,
+    "sms": 2,
+    "phone": 2,
+    "whatsapp": 2,
+}
+# Number of batches a worker claims at once.
+CLAIM_SIZE = 5
+# Time an idle worker waits before looking for due deliveries (seconds); new
+# notifications wake the workers up immediately.
+POLL_INTERVAL = 5
+# Longest wait for a destination's rate limit before sending a claimed
+# delivery; longer waits put the delivery back in the queue (seconds).
+MAX_RATE_LIMIT_WAIT = 30
+# Maximum number of blocks in a Slack message.
+MAX_SLACK_BLOCKS = 50
+
 op_options = [
     "lt",
     "le",
@@ -167,61 +203,82 @@ def user_preferences(target, notification_setting, resource_type):
         return prefs
 
 
-def send_slack_notification(target):
+def slack_message(target):
+    """Slack webhook payload of a notification, or None if it's not sent on
+    Slack."""
     resource_type = notification_resource_type(target)
     notifications_prefs = user_preferences(target, "slack", resource_type)
     if not notifications_prefs:
         return
     integration_url = target["user"]["preferences"]["slack_integration"].get("url")
 
-    slack_microservice_url = (
-        f"http://{cfg['hosts.slack']}:{cfg['slack.microservice_port']}"
-    )
-
     app_url = get_app_base_url()
 
-    try:
-        if resource_type == "gcn_events":
-            data = json.dumps(
-                {
-                    "url": integration_url,
-                    "blocks": gcn_slack_notification(
-                        target=target,
-                        data=target["content"],
-                        new_tag=(target["notification_type"] == "gcn_events_new_tag"),
-                    ),
-                }
-            )
-        elif resource_type == "sources":
-            data = json.dumps(
-                {
-                    "url": integration_url,
-                    "blocks": source_slack_notification(
-                        target=target, data=target["content"]
-                    ),
-                }
-            )
-        else:
-            data = json.dumps(
-                {
-                    "url": integration_url,
-                    "text": f"{target['text']} ({app_url}{target['url']})",
-                }
-            )
+    if resource_type == "gcn_events":
+        return {
+            "url": integration_url,
+            "blocks": gcn_slack_notification(
+                target=target,
+                data=target["content"],
+                new_tag=(target["notification_type"] == "gcn_events_new_tag"),
+            ),
+        }
+    elif resource_type == "sources":
+        return {
+            "url": integration_url,
+            "blocks": source_slack_notification(target=target, data=target["content"]),
+        }
+    else:
+        return {
+            "url": integration_url,
+            "text": f"{target['text']} ({app_url}{target['url']})",
+        }
+
+
+def send_slack_notification(targets):
+    """Send notifications to a Slack webhook, merging them into as few
+    messages as the Slack block limit allows."""
+    messages = [
+        message for message in map(slack_message, targets) if message is not None
+    ]
+    if len(messages) == 0:
+        return
+    if len(messages) == 1:
+        payloads = messages
+    else:
+        payloads = []
+        blocks = []
+        for message in messages:
+            message_blocks = message.get("blocks") or [
+                {"type": "section", "text": {"type": "mrkdwn", "text": message["text"]}}
+            ]
+            if blocks and len(blocks) + len(message_blocks) + 1 > MAX_SLACK_BLOCKS:
+                payloads.append({"url": messages[0]["url"], "blocks": blocks})
+                blocks = []
+            if blocks:
+                blocks.append({"type": "divider"})
+            blocks += message_blocks
+        payloads.append({"url": messages[0]["url"], "blocks": blocks})
 
-        requests.post(
+    slack_microservice_url = (
+        f"http://{cfg['hosts.slack']}:{cfg['slack.microservice_port']}"
+    )
+    for payload in payloads:
+        response = requests.post(
             slack_microservice_url,
-            data=data,
+            data=json.dumps(payload),
             headers={"Content-Type": "application/json"},
+            timeout=30,
         )
-        log(
-            f"Sent slack notification to user {target['user']['id']} at slack_url: {integration_url}, body: {target['text']}, resource_type: {resource_type}"
-        )
-    except Exception as e:
-        log(f"Error sending slack notification: {e}")
+        response.raise_for_status()
+    log(
+        f"Sent {len(messages)} slack notification(s) to user {targets[0]['user']['id']} at slack_url: {messages[0]['url']}, body: {', '.join(target['text'] for target in targets)}"
+    )
 
 
-def send_email_notification(target):
+def email_message(target):
+    """Subject and body of the email of a notification, or None if it's not
+    sent by email."""
     resource_type = notification_resource_type(target)
     prefs = user_preferences(target, "email", resource_type)
 
@@ -233,115 +290,76 @@ def send_email_notification(target):
 
     app_url = get_app_base_url()
 
-    try:
-        if resource_type == "sources":
-            subject, body = source_email_notification(
-                target=target, data=target["content"]
-            )
-        elif resource_type == "gcn_events":
-            subject, body = gcn_email_notification(
-                target=target,
-                data=target["content"],
-                new_tag=(target["notification_type"] == "gcn_events_new_tag"),
-            )
+    if resource_type == "sources":
+        subject, body = source_email_notification(target=target, data=target["content"])
+    elif resource_type == "gcn_events":
+        subject, body = gcn_email_notification(
+            target=target,
+            data=target["content"],
+            new_tag=(target["notification_type"] == "gcn_events_new_tag"),
+        )
 
-        elif resource_type == "facility_transactions":
-            subject = f"{cfg['app.title']} - New facility transaction"
+    elif resource_type == "facility_transactions":
+        subject = f"{cfg['app.title']} - New facility transaction"
 
-        elif resource_type == "observation_plans":
-            subject = f"{cfg['app.title']} - New observation plans"
+    elif resource_type == "observation_plans":
+        subject = f"{cfg['app.title']} - New observation plans"
 
-        elif resource_type == "analysis_services":
-            subject = f"{cfg['app.title']} - New completed analysis service"
+    elif resource_type == "analysis_services":
+        subject = f"{cfg['app.title']} - New completed analysis service"
 
-        elif resource_type == "favorite_sources":
-            if target["notification_type"] == "favorite_sources_new_classification":
-                subject = (
-                    f"{cfg['app.title']} - New classification on a favorite source"
-                )
-            elif target["notification_type"] == "favorite_sources_new_spectrum":
-                subject = f"{cfg['app.title']} - New spectrum on a favorite source"
-            elif target["notification_type"] == "favorite_sources_new_comment":
-                subject = f"{cfg['app.title']} - New comment on a favorite source"
-            elif target["notification_type"] == "favorite_sources_new_activity":
-                subject = f"{cfg['app.title']} - New activity on a favorite source"
+    elif resource_type == "favorite_sources":
+        if target["notification_type"] == "favorite_sources_new_classification":
+            subject = f"{cfg['app.title']} - New classification on a favorite source"
+        elif target["notification_type"] == "favorite_sources_new_spectrum":
+            subject = f"{cfg['app.title']} - New spectrum on a favorite source"
+        elif target["notification_type"] == "favorite_sources_new_comment":
+            subject = f"{cfg['app.title']} - New comment on a favorite source"
+        elif target["notification_type"] == "favorite_sources_new_activity":
+            subject = f"{cfg['app.title']} - New activity on a favorite source"
 
-        elif resource_type == "mention":
-            subject = f"{cfg['app.title']} - User mentioned you in a comment"
+    elif resource_type == "mention":
+        subject = f"{cfg['app.title']} - User mentioned you in a comment"
 
-        elif resource_type == "group_admission_request":
-            subject = f"{cfg['app.title']} - New group admission request"
+    elif resource_type == "group_admission_request":
+        subject = f"{cfg['app.title']} - New group admission request"
 
-        if subject and target["user"]["contact_email"]:
-            try:
-                if body is None:
-                    body = f"{target['text']} ({app_url}{target['url']})"
-                send_email(
-                    recipients=[target["user"]["contact_email"]],
-                    subject=subject,
-                    body=body,
-                )
-                log(
-                    f"Sent email notification to user {target['user']['id']} at email: {target['user']['contact_email']}, subject: {subject}, body: {body}, resource_type: {resource_type}"
-                )
-            except Exception as e:
-                log(f"Error sending email notification: {e}")
-
-    except Exception as e:
-        log(f"Error sending email notification: {e}")
+    if subject and target["user"]["contact_email"]:
+        if body is None:
+            body = f"{target['text']} ({app_url}{target['url']})"
+        return subject, body
 
 
-def send_sms_notification(target):
-    resource_type = notification_resource_type(target)
-    prefs = user_preferences(target, "sms", resource_type)
-    if not prefs:
+def send_email_notification(targets):
+    """Send notifications to a user by email, as a single digest if there
+    are several."""
+    messages = [
+        message for message in map(email_message, targets) if message is not None
+    ]
+    if len(messages) == 0:
         return
-
-    sending = False
-    if prefs[resource_type]["sms"].get("on_shift", False):
-        current_shift = (
-            Shift.query.join(ShiftUser)
-            .filter(ShiftUser.user_id == target["user"]["id"])
-            .filter(Shift.start_date <= arrow.utcnow().datetime)
-            .filter(Shift.end_date >= arrow.utcnow().datetime)
-            .first()
-        )
-        if current_shift is not None:
-            sending = True
-
-    timeslot = prefs[resource_type]["sms"].get("time_slot", [])
-    if len(timeslot) > 0:
-        current_time = arrow.utcnow().datetime
-        if timeslot[0] < timeslot[1]:
-            if current_time.hour >= timeslot[0] and current_time.hour <= timeslot[1]:
-                sending = True
-        else:
-            if current_time.hour <= timeslot[1] or current_time.hour >= timeslot[0]:
-                sending = True
-
-    if sending:
-        try:
-            client.messages.create(
-                body=f"{cfg['app.title']} - {target['text']}",
-                from_=from_number,
-                to=target["user"]["contact_phone"].e164,
-            )
-            log(
-                f"Sent SMS notification to user {target['user']['id']} at phone number: {target['user']['contact_phone'].e164}, body: {target['text']}, resource_type: {resource_type}"
-            )
-        except Exception as e:
-            log(f"Error sending sms notification: {e}")
+    if len(messages) == 1:
+        subject, body = messages[0]
+    else:
+        subject = f"{cfg['app.title']} - {len(messages)} new notifications"
+        body = "<hr>".join(body for _, body in messages)
+    contact_email = targets[0]["user"]["contact_email"]
+    send_email(recipients=[contact_email], subject=subject, body=body)
+    log(
+        f"Sent {len(messages)} email notification(s) to user {targets[0]['user']['id']} at email: {contact_email}, subject: {subject}"
+    )
 
 
-def send_phone_notification(target):
+def phone_notification_due(target, notification_setting):
+    """Whether a user wants a notification by SMS, phone call or WhatsApp
+    now, i.e. they are on shift or it's within their time slot."""
     resource_type = notification_resource_type(target)
-    prefs = user_preferences(target, "phone", resource_type)
-
+    prefs = user_preferences(target, notification_setting, resource_type)
     if not prefs:
-        return
+        return False
 
     sending = False
-    if prefs[resource_type]["phone"].get("on_shift", False):
+    if prefs[resource_type][notification_setting].get("on_shift", False):
         current_shift = (
             Shift.query.join(ShiftUser)
             .filter(ShiftUser.user_id == target["user"]["id"])
@@ -352,7 +370,7 @@ def send_phone_notification(target):
         if current_shift is not None:
             sending = True
 
-    timeslot = prefs[resource_type]["phone"].get("time_slot", [])
+    timeslot = prefs[resource_type][notification_setting].get("time_slot", [])
     if len(timeslot) > 0:
         current_time = arrow.utcnow().datetime
         if timeslot[0] < timeslot[1]:
@@ -362,64 +380,55 @@ def send_phone_notification(target):
             if current_time.hour <= timeslot[1] or current_time.hour >= timeslot[0]:
                 sending = True
 
-    if sending:
-        try:
-            message = f"Greetings. This is the SkyPortal robot. {target['text']}"
-            client.calls.create(
-                twiml=VoiceResponse().append(Say(message=message)),
-                from_=from_number,
-                to=target["user"]["contact_phone"].e164,
-            )
-            log(
-                f"Sent Phone Call notification to user {target['user']['id']} at phone number: {target['user']['contact_phone'].e164}, message: {message}, resource_type: {resource_type}"
-            )
-        except Exception as e:
-            log(f"Error sending phone call notification: {e}")
+    return sending
 
 
-def send_whatsapp_notification(target):
-    resource_type = notification_resource_type(target)
-    prefs = user_preferences(target, "whatsapp", resource_type)
-    if not prefs:
-        return
+def send_sms_notification(targets):
+    for target in targets:
+        if not phone_notification_due(target, "sms"):
+            continue
+        client.messages.create(
+            body=f"{cfg['app.title']} - {target['text']}",
+            from_=from_number,
+            to=target["user"]["contact_phone"].e164,
+        )
+        log(
+            f"Sent SMS notification to user {target['user']['id']} at phone number: {target['user']['contact_phone'].e164}, body: {target['text']}, resource_type: {notification_resource_type(target)}"
+        )
 
-    sending = False
-    if prefs[resource_type]["whatsapp"].get("on_shift", False):
-        current_shift = (
-            Shift.query.join(ShiftUser)
-            .filter(ShiftUser.user_id == target["user"]["id"])
-            .filter(Shift.start_date <= arrow.utcnow().datetime)
-            .filter(Shift.end_date >= arrow.utcnow().datetime)
-            .first()
+
+def send_phone_notification(targets):
+    for target in targets:
+        if not phone_notification_due(target, "phone"):
+            continue
+        message = f"Greetings. This is the SkyPortal robot. {target['text']}"
+        client.calls.create(
+            twiml=VoiceResponse().append(Say(message=message)),
+            from_=from_number,
+            to=target["user"]["contact_phone"].e164,
+        )
+        log(
+            f"Sent Phone Call notification to user {target['user']['id']} at phone number: {target['user']['contact_phone'].e164}, message: {message}, resource_type: {notification_resource_type(target)}"
         )
-        if current_shift is not None:
-            sending = True
 
-    timeslot = prefs[resource_type]["whatsapp"].get("time_slot", [])
-    if len(timeslot) > 0:
-        current_time = arrow.utcnow().datetime
-        if timeslot[0] < timeslot[1]:
-            if current_time.hour >= timeslot[0] and current_time.hour <= timeslot[1]:
-                sending = True
-        else:
-            if current_time.hour <= timeslot[1] or current_time.hour >= timeslot[0]:
-                sending = True
 
-    if sending:
-        try:
-            client.messages.create(
-                body=f"{cfg['app.title']} - {target['text']}",
-                from_="whatsapp:" + str(from_number),
-                to="whatsapp" + str(target["user"]["contact_phone"].e164),
-            )
-            log(
-                f"Sent WhatsApp notification to user {target['user']['id']} at phone number: {target['user']['contact_phone'].e164}, body: {target['text']}, resource_type: {resource_type}"
-            )
-        except Exception as e:
-            log(f"Error sending WhatsApp notification: {e}")
+def send_whatsapp_notification(targets):
+    for target in targets:
+        if not phone_notification_due(target, "whatsapp"):
+            continue
+        client.messages.create(
+            body=f"{cfg['app.title']} - {target['text']}",
+            from_="whatsapp:" + str(from_number),
+            to="whatsapp" + str(target["user"]["contact_phone"].e164),
+        )
+        log(
+            f"Sent WhatsApp notification to user {target['user']['id']} at phone number: {target['user']['contact_phone'].e164}, body: {target['text']}, resource_type: {notification_resource_type(target)}"
+        )
 
 
-def push_frontend_notification(target):
+def push_frontend_notification(targets):
+    """Have the frontend of a user fetch their new notifications."""
+    target = targets[0]
     if "user_id" in target:
         user_id = target["user_id"]
     elif "user" in target:
@@ -435,14 +444,40 @@ def push_frontend_notification(target):
             "Error sending frontend notification: user_id or user.id not found in notification's target"
         )
         return
-    resource_type = notification_resource_type(target)
     log(
-        f"Sent frontend notification to user {user_id}, body: {target['text']}, resource_type: {resource_type}"
+        f"Sent {len(targets)} frontend notification(s) to user {user_id}, body: {', '.join(target['text'] for target in targets)}"
     )
     ws_flow = Flow()
     ws_flow.push(user_id, "skyportal/FETCH_NOTIFICATIONS")
 
 
+# Senders of a batch of notifications to a single destination, by channel.
+SENDERS = {
+    "frontend": push_frontend_notification,
+    "email": send_email_notification,
+    "slack": send_slack_notification,
+    "sms": send_sms_notification,
+    "phone": send_phone_notification,
+    "whatsapp": send_whatsapp_notification,
+}
+
+
+def notification_destinations(target):
+    """Destination of a notification on each channel it may be sent on."""
+    resource_type = notification_resource_type(target)
+    user = target["user"]
+    destinations = {"frontend": user["id"]}
+    if user_preferences(target, "email", resource_type):
+        destinations["email"] = user["contact_email"]
+    if user_preferences(target, "slack", resource_type):
+        destinations["slack"] = user["preferences"]["slack_integration"]["url"]
+    if client is not None and user.get("contact_phone"):
+        for channel in ["sms", "phone", "whatsapp"]:
+            if user_preferences(target, channel, resource_type):
+                destinations[channel] = user["contact_phone"].e164
+    return destinations
+
+
 def users_on_shift(session):
     users = session.scalars(
         sa.select(ShiftUser).where(
@@ -452,34 +487,214 @@ def users_on_shift(session):
     return [user.user_id for user in users]
 
 
-queue = []
+# Events waking up the workers of each channel when deliveries are queued.
+wakeups = {}
+
+
+def enqueue(session, target):
+    """Queue the deliveries of a notification, and commit.
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+    target : dict
+        The UserNotification, with its user and their preferences, and its
+        content if any.
+
+    Returns
+    -------
+    int
+        Number of deliveries queued.
+    """
+    destinations = notification_destinations(target)
+    enqueue_deliveries(session, target["id"], destinations, target.get("content"))
+    session.commit()
+    for channel in destinations:
+        if channel in wakeups:
+            wakeups[channel].set()
+    return len(destinations)
+
+
+ClaimedDelivery = namedtuple(
+    "ClaimedDelivery", ["id", "destination", "attempts", "target"]
+)
 
 
-def service(queue):
+def claim(channel, limit):
+    """Claim deliveries of a channel, with the notification to send."""
+    try:
+        with DBSession() as session:
+            claimed = []
+            for delivery in claim_deliveries(session, channel, limit):
+                notification = delivery.notification
+                target = {
+                    **notification.to_dict(),
+                    "user": {
+                        **notification.user.to_dict(),
+                        "preferences": notification.user.preferences,
+                    },
+                }
+                if delivery.content is not None:
+                    target["content"] = delivery.content
+                claimed.append(
+                    ClaimedDelivery(
+                        delivery.id, delivery.destination, delivery.attempts, target
+                    )
+                )
+            session.commit()
+            return claimed
+    finally:
+        DBSession.remove()
+
+
+def send(channel, batch):
+    """Send a batch of deliveries to a destination, and record the outcome."""
+    try:
+        error = None
+        try:
+            SENDERS[channel]([delivery.target for delivery in batch])
+        except Exception as e:
+            error = e
+        with DBSession() as session:
+            if error is None:
+                complete_deliveries(session, [delivery.id for delivery in batch])
+            else:
+                retry = False
+                for delivery in batch:
+                    retry = fail_delivery(session, delivery, error) or retry
+                log(
+                    f"Error sending {channel} notification(s) to user {batch[0].target['user']['id']}: {error}{' (will retry)' if retry else ''}"
+                )
+            session.commit()
+    finally:
+        DBSession.remove()
+
+
+def defer(batch, delay):
+    """Put back claimed deliveries, to be sent in `delay` seconds."""
+    try:
+        with DBSession() as session:
+            defer_deliveries(session, [delivery.id for delivery in batch], delay)
+            session.commit()
+    finally:
+        DBSession.remove()
+
+
+async def deliver(channel, executor, limiter=None):
+    """Worker sending the deliveries of a channel."""
+    loop = asyncio.get_running_loop()
+    wakeup = wakeups[channel]
+    max_batch_size = MAX_BATCH_SIZE.get(channel, 1)
     while True:
-        if len(queue) == 0:
-            time.sleep(1)
-            continue
-        notification = queue.pop(0)
-        if notification is None:
+        wakeup.clear()
+        try:
+            claimed = await loop.run_in_executor(
+                executor, claim, channel, CLAIM_SIZE * max_batch_size
+            )
+        except Exception as e:
+            log(f"Error claiming {channel} notifications: {e}")
+            claimed = []
+        if len(claimed) == 0:
+            try:
+                await asyncio.wait_for(wakeup.wait(), POLL_INTERVAL)
+            except TimeoutError:
+                pass
             continue
 
+        for batch in batches(claimed, max_batch_size):
+            try:
+                delay = 0 if limiter is None else limiter.reserve(batch[0].destination)
+                if delay > MAX_RATE_LIMIT_WAIT:
+                    # don't hold on to the claim: a later claim will send it
+                    await loop.run_in_executor(executor, defer, batch, delay)
+                    continue
+                await asyncio.sleep(delay)
+                await loop.run_in_executor(executor, send, channel, batch)
+            except Exception as e:
+                log(f"Error delivering {channel} notifications: {e}")
+
+
+def maintain(prune=False):
+    """Release stale claims, and optionally prune old deliveries.
+
+    Returns
+    -------
+    int
+        Number of claims released.
+    dict
+        Metrics of the queue, see `queue_metrics`.
+    """
+    try:
+        with DBSession() as session:
+            released = release_stale_claims(session)
+            if prune:
+                prune_deliveries(session)
+            return released, queue_metrics(session)
+    finally:
+        DBSession.remove()
+
+
+async def monitor(executor):
+    """Maintain the queue every minute, pruning it every hour."""
+    loop = asyncio.get_running_loop()
+    last_prune = None
+    while True:
+        prune = last_prune is None or time.monotonic() - last_prune > 3600
         try:
-            push_frontend_notification(notification)
-            send_phone_notification(notification)
-            send_sms_notification(notification)
-            send_whatsapp_notification(notification)
-            send_email_notification(notification)
-            send_slack_notification(notification)
+            released, metrics = await loop.run_in_executor(executor, maintain, prune)
+            if prune:
+                last_prune = time.monotonic()
+            if released > 0:
+                log(f"Released {released} stale notification deliveries")
+            queue_length = sum(m["pending"] + m["sending"] for m in metrics.values())
+            log(f"Current notification queue length: {queue_length}")
         except Exception as e:
-            log(f"Error processing notification ID {notification['id']}: {str(e)}")
+            log(f"Error maintaining the notification queue: {e}")
+        await asyncio.sleep(60)
+
+
+def start_workers(loop):
+    """Start the delivery workers of each channel on an event loop."""
+    workers = {**WORKERS, **(cfg.get("notifications.queue.workers") or {})}
+    limiters = rate_limiters(cfg.get("notifications.queue.rate_limits"))
+    executor = ThreadPoolExecutor(max_workers=sum(workers.values()) + 2)
+    tasks = []
+    for channel in CHANNELS:
+        wakeups[channel] = asyncio.Event()
+        for _ in range(workers.get(channel, 1)):
+            tasks.append(
+                loop.create_task(deliver(channel, executor, limiters.get(channel)))
+            )
+    tasks.append(loop.create_task(monitor(executor)))
+    return tasks
 
 
-def api(queue):
+def queue_status():
+    try:
+        with DBSession() as session:
+            return queue_metrics(session)
+    finally:
+        DBSession.remove()
+
+
+def api():
     class QueueHandler(tornado.web.RequestHandler):
-        def get(self):
+        async def get(self):
             self.set_header("Content-Type", "application/json")
-            self.write({"status": "success", "data": {"queue_length": len(queue)}})
+            metrics = await tornado.ioloop.IOLoop.current().run_in_executor(
+                None, queue_status
+            )
+            self.write(
+                {
+                    "status": "success",
+                    "data": {
+                        "queue_length": sum(
+                            m["pending"] + m["sending"] for m in metrics.values()
+                        ),
+                        "channels": metrics,
+                    },
+                }
+            )
 
         async def post(self):
             try:
@@ -747,6 +962,7 @@ def api(queue):
                             users = []
 
                     failure_count = 0
+                    queued = 0
                     nb_users = len(users)
                     for user in users:
                         try:
@@ -957,7 +1173,7 @@ def api(queue):
                                             },
                                             "content": target_content,
                                         }
-                                        queue.append(target)
+                                        queued += enqueue(session, target)
 
                                 elif is_facility_transaction:
                                     if "observation_plan_request" in target_data:
@@ -1003,7 +1219,7 @@ def api(queue):
                                                     "preferences": notification.user.preferences,
                                                 },
                                             }
-                                            queue.append(target)
+                                            queued += enqueue(session, target)
                                     elif "followup_request" in target_data:
                                         allocation_id = target_data["followup_request"][
                                             "allocation_id"
@@ -1052,7 +1268,14 @@ def api(queue):
                                             )
                                             session.add(notification)
                                             session.commit()
-                                            queue.append(notification.id)
+                                            target = {
+                                                **notification.to_dict(),
+                                                "user": {
+                                                    **notification.user.to_dict(),
+                                                    "preferences": notification.user.preferences,
+                                                },
+                                            }
+                                            queued += enqueue(session, target)
                                 elif is_followup_request:
                                     if target_data["status"].startswith("submitted"):
                                         continue
@@ -1119,7 +1342,7 @@ def api(queue):
                                                 "preferences": notification.user.preferences,
                                             },
                                         }
-                                        queue.append(target)
+                                        queued += enqueue(session, target)
                                 elif is_analysis_service:
                                     if target_data["status"] == "completed":
                                         analysis_service_id = target_data[
@@ -1146,7 +1369,7 @@ def api(queue):
                                                 "preferences": notification.user.preferences,
                                             },
                                         }
-                                        queue.append(target)
+                                        queued += enqueue(session, target)
                                 elif is_observation_plan:
                                     observation_plan_request_id = target_data[
                                         "observation_plan_request_id"
@@ -1195,7 +1418,7 @@ def api(queue):
                                                 "preferences": notification.user.preferences,
                                             },
                                         }
-                                        queue.append(target)
+                                        queued += enqueue(session, target)
                                 elif is_group_admission_request:
                                     user_from_request = session.scalars(
                                         sa.select(User).where(
@@ -1222,7 +1445,7 @@ def api(queue):
                                             "preferences": notification.user.preferences,
                                         },
                                     }
-                                    queue.append(target)
+                                    queued += enqueue(session, target)
                                 else:
                                     favorite_sources = session.scalars(
                                         sa.select(Listing)
@@ -1267,7 +1490,7 @@ def api(queue):
                                                     "preferences": notification.user.preferences,
                                                 },
                                             }
-                                            queue.append(target)
+                                            queued += enqueue(session, target)
                                             continue
                                         if (pref is not None) and "sources" in pref:
                                             if "classifications" in pref["sources"]:
@@ -1338,7 +1561,7 @@ def api(queue):
                                                         },
                                                         "content": target_content,
                                                     }
-                                                    queue.append(target)
+                                                    queued += enqueue(session, target)
                                     elif is_spectra:
                                         if (
                                             len(favorite_sources) > 0
@@ -1363,7 +1586,7 @@ def api(queue):
                                                     "preferences": notification.user.preferences,
                                                 },
                                             }
-                                            queue.append(target)
+                                            queued += enqueue(session, target)
                                             continue
                                         if (
                                             (pref is not None)
@@ -1446,7 +1669,7 @@ def api(queue):
                                                 },
                                                 "content": target_content,
                                             }
-                                            queue.append(target)
+                                            queued += enqueue(session, target)
 
                                     elif is_comment:
                                         if (
@@ -1478,7 +1701,7 @@ def api(queue):
                                                         "preferences": notification.user.preferences,
                                                     },
                                                 }
-                                                queue.append(target)
+                                                queued += enqueue(session, target)
                                     elif is_listing:
                                         if (
                                             len(favorite_sources) > 0
@@ -1503,7 +1726,7 @@ def api(queue):
                                                         "preferences": notification.user.preferences,
                                                     },
                                                 }
-                                                queue.append(target)
+                                                queued += enqueue(session, target)
                         except Exception as e:
                             failure_count += 1
                             log(
@@ -1520,7 +1743,7 @@ def api(queue):
                         {
                             "status": "success",
                             "message": f"Notification accepted into queue for {nb_users - failure_count} out of {nb_users} users",
-                            "data": {"queue_length": len(queue)},
+                            "data": {"queued_deliveries": queued},
                         }
                     )
                 except Exception as e:
@@ -1538,27 +1761,21 @@ def api(queue):
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
     app.listen(cfg["ports.notification_queue"])
+    start_workers(loop)
     loop.run_forever()
 
 
 if __name__ == "__main__":
     try:
-        t = Thread(target=service, args=(queue,))
-        t2 = Thread(target=api, args=(queue,))
+        t = Thread(target=api)
         t.start()
-        t2.start()
 
         while True:
-            log(f"Current notification queue length: {len(queue)}")
             time.sleep(60)
             if not t.is_alive():
-                log("Notification queue service thread died, restarting")
-                t = Thread(target=service, args=(queue,))
-                t.start()
-            if not t2.is_alive():
                 log("Notification queue API thread died, restarting")
-                t2 = Thread(target=api, args=(queue,))
-                t2.start()
+                t = Thread(target=api)
+                t.start()
     except Exception as e:
         log(f"Error starting notification queue: {str(e)}")
         raise e
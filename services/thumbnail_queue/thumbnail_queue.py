@@ -1,4 +1,5 @@
 import asyncio
+import datetime
 import time
 
 import requests
@@ -12,8 +13,10 @@ from baselayer.app.models import init_db
 from baselayer.log import make_log
 from skyportal.models import (
     Obj,
+    PendingThumbnail,
     Thumbnail,
 )
+from skyportal.utils.naive_datetime import utcnow_naive
 from skyportal.utils.services import check_loaded
 from skyportal.utils.thumbnail import image_is_grayscale
 
@@ -36,6 +39,15 @@ STATEMENT_TIMEOUT = "120s"
 GRAYSCALE_BATCH_SIZE = 10
 REMOTE_FETCH_TIMEOUT = 10
 
+# Objects missing thumbnails claimed at once, and processed concurrently.
+BATCH_SIZE = cfg.get("thumbnail_queue.batch_size", 32)
+CONCURRENCY = cfg.get("thumbnail_queue.concurrency", 8)
+# Time after which an object claimed but not processed (e.g. the service
+# restarted) is claimed again (seconds), and number of claims after which
+# an object is dropped from the queue.
+CLAIM_TIMEOUT = 600
+MAX_ATTEMPTS = 5
+
 
 async def set_statement_timeout(session):
     """Bound query time for this session. Under pgbouncer transaction pooling
@@ -43,60 +55,90 @@ async def set_statement_timeout(session):
     await session.execute(sa.text(f"SET statement_timeout = '{STATEMENT_TIMEOUT}'"))
 
 
-async def fetch_obj(session):
-    """Fetch the object with the most recent created_at timestamp that is missing at least one thumbnail.
+async def claim_objs(session, limit=BATCH_SIZE):
+    """Claim the most recently created objects queued for thumbnails.
+
+    Objects already claimed by a worker are skipped (their rows are locked
+    with SKIP LOCKED while they're being claimed, and their claim lasts
+    CLAIM_TIMEOUT), so concurrent workers never process the same object.
+    Objects claimed MAX_ATTEMPTS times without success are dropped from the
+    queue.
+
+    Parameters
+    ----------
+    session : `sqlalchemy.ext.asyncio.AsyncSession`
+        The async database session to use for the query; committed.
+    limit : int
+        Maximum number of objects to claim.
+
+    Returns
+    -------
+    obj_ids : list of str
+        The IDs of the claimed objects.
+    """
+    now = utcnow_naive()
+    await session.execute(
+        sa.delete(PendingThumbnail).where(PendingThumbnail.attempts >= MAX_ATTEMPTS)
+    )
+    claimable = (
+        sa.select(PendingThumbnail.id)
+        .where(
+            sa.or_(
+                PendingThumbnail.claimed_at.is_(None),
+                PendingThumbnail.claimed_at
+                < now - datetime.timedelta(seconds=CLAIM_TIMEOUT),
+            )
+        )
+        .order_by(PendingThumbnail.created_at.desc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    obj_ids = (
+        await session.scalars(
+            sa.update(PendingThumbnail)
+            .where(PendingThumbnail.id.in_(claimable.scalar_subquery()))
+            .values(claimed_at=now, attempts=PendingThumbnail.attempts + 1)
+            .returning(PendingThumbnail.obj_id)
+        )
+    ).all()
+    await session.commit()
+    return list(obj_ids)
+
+
+async def fetch_objs(session, limit=BATCH_SIZE):
+    """Claim objects queued for thumbnails, and fetch them.
 
     Parameters
     ----------
     session : `sqlalchemy.ext.asyncio.AsyncSession`
         The async database session to use for the query.
+    limit : int
+        Maximum number of objects to claim.
 
     Returns
     -------
-    obj : `skyportal.models.Obj` or None
-        The object with the most recent created_at timestamp that is missing at least one thumbnail.
+    objs : list of `skyportal.models.Obj`
+        The claimed objects, most recent first, with their thumbnails loaded.
     err : `Exception` or None
         The exception that occurred, if any.
     """
-
-    obj = None
     try:
-        stmt = (
-            sa.select(Obj.id)
-            .where(
-                ~sa.exists(
-                    sa.select(Thumbnail.obj_id)
-                    .where(
-                        sa.and_(
-                            Thumbnail.obj_id == Obj.id,
-                            Thumbnail.type.in_(THUMBNAIL_TYPES),
-                        )
-                    )
-                    .group_by(Thumbnail.obj_id)
-                    .having(
-                        sa.func.count(sa.distinct(Thumbnail.type))
-                        == len(THUMBNAIL_TYPES)
-                    )
-                )
-            )
-            .order_by(Obj.created_at.desc())
-            .limit(1)
-        )
-        result = await session.execute(stmt)
-        objs = result.scalars().all()
-        if len(objs) == 0:
-            return None, None
-        else:
-            # eager-load thumbnails: we read obj.thumbnails below, which would
-            # otherwise lazy-load under the async session.
-            obj = await session.scalar(
+        obj_ids = await claim_objs(session, limit)
+        if len(obj_ids) == 0:
+            return [], None
+        # eager-load thumbnails: we read obj.thumbnails below, which would
+        # otherwise lazy-load under the async session.
+        objs = (
+            await session.scalars(
                 sa.select(Obj)
                 .options(selectinload(Obj.thumbnails))
-                .where(Obj.id == objs[0])
+                .where(Obj.id.in_(obj_ids))
+                .order_by(Obj.created_at.desc())
             )
-            return obj, None
+        ).all()
+        return list(objs), None
     except Exception as e:
-        return None, e
+        return [], e
 
 
 def _classify_remote_thumbnail(public_url):
@@ -149,9 +191,68 @@ async def classify_pending_grayscale(session_factory=None):
         await session.commit()
 
 
+async def process_obj(obj, semaphore):
+    """Add the missing thumbnails of a claimed object, and remove it from the
+    queue. A failed object stays queued, and is retried once its claim
+    expires."""
+    async with semaphore:
+        obj_id = obj.id
+        existing_thumbnail_types = [thumb.type for thumb in obj.thumbnails]
+        thumbnails = list(THUMBNAIL_TYPES - set(existing_thumbnail_types))
+        if len(thumbnails) == 0:
+            log(f"Source {obj_id} has all thumbnails.")
+        else:
+            log(f"Processing thumbnail request for object {obj_id}.")
+
+        # Resolve the slow PanSTARRS cutout URL off the event loop with no DB
+        # transaction open. `obj` is detached but its attributes are loaded.
+        ps1_url = None
+        if "ps1" in thumbnails:
+            ps1_url = await asyncio.to_thread(lambda o=obj: o.panstarrs_url)
+
+        # Short write txn: just the Thumbnail INSERTs, and the dequeue.
+        internal_key = None
+        async with models.async_plain_session_factory() as session:
+            await set_statement_timeout(session)
+            try:
+                obj = await session.get(Obj, obj_id)
+                if obj is not None and len(thumbnails) > 0:
+                    await obj.add_linked_thumbnails(
+                        thumbnails, session, ps1_url=ps1_url
+                    )
+                    internal_key = obj.internal_key
+                await session.execute(
+                    sa.delete(PendingThumbnail).where(PendingThumbnail.obj_id == obj_id)
+                )
+                await session.commit()
+            except Exception as e:
+                log(f"Error processing thumbnail request for object {obj_id}: {str(e)}")
+                if isinstance(e, sa.exc.SQLAlchemyError):
+                    try:
+                        await session.rollback()
+                    except Exception as rollback_err:
+                        log(
+                            f"Error rolling back session after thumbnail failure for object {obj_id}: {str(rollback_err)}"
+                        )
+
+        if internal_key is not None:
+            flow = Flow()
+            flow.push(
+                "*",
+                "skyportal/REFRESH_SOURCE",
+                payload={"obj_key": internal_key},
+            )
+            flow.push(
+                "*",
+                "skyportal/REFRESH_CANDIDATE",
+                payload={"id": internal_key},
+            )
+
+
 async def _run_loop():
     # start a timer we'll use to have a heartbeat every 60 seconds
     heartbeat = time.time()
+    semaphore = asyncio.Semaphore(CONCURRENCY)
     while True:
         if time.time() - heartbeat > 60:
             heartbeat = time.time()
@@ -165,71 +266,25 @@ async def _run_loop():
             except Exception as e:
                 log(f"Error classifying pending thumbnails: {str(e)}")
 
-            internal_key = None
-            # 1. Read/claim: find one obj missing thumbnails and snapshot what we
-            # need, then release the connection before the slow cutout fetch so
-            # we don't sit idle-in-transaction across it.
+            # Claim a batch of objs missing thumbnails, and release the
+            # connection before the slow cutout fetches so we don't sit
+            # idle-in-transaction across them.
             # Access via the module: init_db() (above) rebinds the factory after
             # this module is imported, so a direct `from ... import` would keep
             # the pre-init None and call None() ('NoneType' object is not callable).
             async with models.async_plain_session_factory() as session:
                 await set_statement_timeout(session)
-                obj, err = await fetch_obj(session)
-                if err is not None:
-                    log(f"Error fetching object with missing thumbnails: {str(err)}")
-                    await asyncio.sleep(1)
-                    continue
-                if obj is None:
-                    await asyncio.sleep(5)
-                    continue
-                existing_thumbnail_types = [thumb.type for thumb in obj.thumbnails]
-                thumbnails = list(THUMBNAIL_TYPES - set(existing_thumbnail_types))
-                obj_id = obj.id
-                if len(thumbnails) == 0:
-                    log(f"Source {obj_id} has all thumbnails.")
-                    continue
-                log(f"Processing thumbnail request for object {obj_id}.")
-
-            # 2. Resolve the slow PanSTARRS cutout URL off the event loop with no
-            # DB transaction open. `obj` is detached but its attributes are loaded.
-            ps1_url = None
-            if "ps1" in thumbnails:
-                ps1_url = await asyncio.to_thread(lambda o=obj: o.panstarrs_url)
-
-            # 3. Short write txn: just the Thumbnail INSERTs.
-            async with models.async_plain_session_factory() as session:
-                await set_statement_timeout(session)
-                try:
-                    obj = await session.get(Obj, obj_id)
-                    if obj is not None:
-                        await obj.add_linked_thumbnails(
-                            thumbnails, session, ps1_url=ps1_url
-                        )
-                        internal_key = obj.internal_key
-                except Exception as e:
-                    log(
-                        f"Error processing thumbnail request for object {obj_id}: {str(e)}"
-                    )
-                    if isinstance(e, sa.exc.SQLAlchemyError):
-                        try:
-                            await session.rollback()
-                        except Exception as rollback_err:
-                            log(
-                                f"Error rolling back session after thumbnail failure for object {obj_id}: {str(rollback_err)}"
-                            )
-
-            if internal_key is not None:
-                flow = Flow()
-                flow.push(
-                    "*",
-                    "skyportal/REFRESH_SOURCE",
-                    payload={"obj_key": internal_key},
-                )
-                flow.push(
-                    "*",
-                    "skyportal/REFRESH_CANDIDATE",
-                    payload={"id": internal_key},
-                )
+                objs, err = await fetch_objs(session)
+            if err is not None:
+                log(f"Error fetching objects with missing thumbnails: {str(err)}")
+                await asyncio.sleep(1)
+                continue
+            if len(objs) == 0:
+                await asyncio.sleep(5)
+                continue
+
+            # Process the batch with up to CONCURRENCY objects in flight.
+            await asyncio.gather(*(process_obj(obj, semaphore) for obj in objs))
         except Exception as e:
             log(f"Error processing thumbnail request: {str(e)}")
             await asyncio.sleep(5)
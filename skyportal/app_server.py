@@ -1,3 +1,5 @@
+import functools
+
 import sentry_sdk
 import tornado.web
 from sentry_sdk.integrations.tornado import TornadoIntegration
@@ -6,246 +8,7 @@ from baselayer.app.app_server import MainPageHandler
 from baselayer.app.model_util import create_tables
 from baselayer.log import make_log
 from skyportal.handlers import BecomeUserHandler, LogoutHandler
-from skyportal.handlers.api import (
-    ACLHandler,
-    AllocationHandler,
-    AllocationObservationPlanHandler,
-    AllocationReportHandler,
-    AnalysisHandler,
-    AnalysisProductsHandler,
-    AnalysisServiceHandler,
-    AnalysisUploadOnlyHandler,
-    AnalysisWebhookHandler,
-    AnnotationHandler,
-    AssignmentHandler,
-    BrokerAlertsHandler,
-    BrokerAPIsHandler,
-    BrokerConeSearchHandler,
-    BrokerCutoutsHandler,
-    BrokerFilterModulesHandler,
-    BrokerFiltersHandler,
-    BrokerFilterTestHandler,
-    BrokerFilterValidateHandler,
-    BrokerHandler,
-    BrokerPhotometryHandler,
-    BrokerSaveHandler,
-    BrokerSurveyPhotometryHandler,
-    BulkDeleteCandidatesHandler,
-    BulkDeletePhotometryHandler,
-    BulkSpectraHandler,
-    CandidateFilterHandler,
-    CandidateHandler,
-    CatalogQueryHandler,
-    ClassificationHandler,
-    ClassificationVotesHandler,
-    CommentAttachmentHandler,
-    CommentAttachmentUpdateHandler,
-    CommentHandler,
-    ConfigHandler,
-    DatalabQueryHandler,
-    DefaultAnalysisHandler,
-    DefaultFollowupRequestHandler,
-    DefaultGcnTagHandler,
-    DefaultObservationPlanRequestHandler,
-    DefaultSurveyEfficiencyRequestHandler,
-    EarthquakeHandler,
-    EarthquakeMeasurementHandler,
-    EarthquakePredictionHandler,
-    EarthquakeStatusHandler,
-    EnumTypesHandler,
-    FacilityMessageHandler,
-    FilterHandler,
-    FinderChartFacilitiesHandler,
-    FollowupAPIsHandler,
-    FollowupRequestCommentHandler,
-    FollowupRequestHandler,
-    FollowupRequestPrioritizationHandler,
-    FollowupRequestSchedulerHandler,
-    FollowupRequestWatcherHandler,
-    GaiaPhotometricAlertsQueryHandler,
-    GaiaQueryHandler,
-    GalaxyASCIIFileHandler,
-    GalaxyCatalogHandler,
-    GalaxyGladeHandler,
-    GcnEventAliasesHandler,
-    GcnEventCatalogQueryHandler,
-    GcnEventHandler,
-    GcnEventInstrumentFieldHandler,
-    GcnEventNoticeDownloadHandler,
-    GcnEventObservationPlanRequestsHandler,
-    GcnEventPropertiesHandler,
-    GcnEventSurveyEfficiencyHandler,
-    GcnEventTagsHandler,
-    GcnEventTriggerHandler,
-    GcnEventUserHandler,
-    GcnGraceDBHandler,
-    GcnReportHandler,
-    GCNsAssociatedWithSourceHandler,
-    GcnSummaryHandler,
-    GcnTachHandler,
-    GroupAdmissionRequestHandler,
-    GroupHandler,
-    GroupStreamHandler,
-    GroupUserHandler,
-    GroupUsersFromOtherGroupsHandler,
-    HealpixUpdateHandler,
-    InstrumentFieldHandler,
-    InstrumentHandler,
-    InstrumentLogExternalAPIHandler,
-    InstrumentLogHandler,
-    InstrumentStatusHandler,
-    InvalidEndpointHandler,
-    InvitationHandler,
-    IRSAQueryWISEHandler,
-    LocalizationCrossmatchHandler,
-    LocalizationDownloadHandler,
-    LocalizationHandler,
-    LocalizationNoticeHandler,
-    LocalizationPropertiesHandler,
-    LocalizationTagsHandler,
-    MetricsHandler,
-    MMADetectorHandler,
-    MMADetectorSpectrumHandler,
-    MMADetectorTimeIntervalHandler,
-    MovingObjectFollowupHandler,
-    NewsFeedHandler,
-    ObjClassificationHandler,
-    ObjClassificationQueryHandler,
-    ObjColorMagHandler,
-    ObjGcnEventHandler,
-    ObjGroupsHandler,
-    ObjHandler,
-    ObjHostHandler,
-    ObjMPCHandler,
-    ObjPhotometryHandler,
-    ObjPositionHandler,
-    ObjSpectraHandler,
-    ObjTagHandler,
-    ObjTagOptionHandler,
-    ObjTNSHandler,
-    ObservationASCIIFileHandler,
-    ObservationExternalAPIHandler,
-    ObservationHandler,
-    ObservationPlanAirmassChartHandler,
-    ObservationPlanCreateObservingRunHandler,
-    ObservationPlanFieldsHandler,
-    ObservationPlanGCNHandler,
-    ObservationPlanGeoJSONHandler,
-    ObservationPlanManualRequestHandler,
-    ObservationPlanMovieHandler,
-    ObservationPlanNameHandler,
-    ObservationPlanObservabilityPlotHandler,
-    ObservationPlanRequestHandler,
-    ObservationPlanSimSurveyHandler,
-    ObservationPlanSimSurveyPlotHandler,
-    ObservationPlanSubmitHandler,
-    ObservationPlanSurveyEfficiencyHandler,
-    ObservationPlanTreasureMapHandler,
-    ObservationPlanWorldmapPlotHandler,
-    ObservationSimSurveyHandler,
-    ObservationSimSurveyPlotHandler,
-    ObservationTreasureMapHandler,
-    ObservingRunBulkEditHandler,
-    ObservingRunHandler,
-    PhotometricSeriesHandler,
-    PhotometryHandler,
-    PhotometryOriginHandler,
-    PhotometryRangeHandler,
-    PhotometryRequestHandler,
-    PhotometryValidationHandler,
-    PhotStatAggregateHandler,
-    PhotStatHandler,
-    PhotStatUpdateHandler,
-    PS1QueryHandler,
-    PublicGroupHandler,
-    PublicReleaseHandler,
-    PublicSourcePageHandler,
-    RecurringAPIHandler,
-    ReminderHandler,
-    RoleHandler,
-    ScanReportHandler,
-    ScanReportItemHandler,
-    SharingHandler,
-    SharingServiceCoauthorHandler,
-    SharingServiceGroupAutoPublisherHandler,
-    SharingServiceGroupHandler,
-    SharingServiceHandler,
-    SharingServiceSubmissionHandler,
-    ShiftHandler,
-    ShiftSummary,
-    ShiftUserHandler,
-    SkymapTriggerAPIHandler,
-    SourceCopyPhotometryHandler,
-    SourceExistsHandler,
-    SourceFinderHandler,
-    SourceGroupsHandler,
-    SourceHandler,
-    SourceLabelsHandler,
-    SourceNotificationHandler,
-    SourceObservabilityPlotHandler,
-    SourceOffsetsHandler,
-    SourcesConfirmedInGCNHandler,
-    SpatialCatalogASCIIFileHandler,
-    SpatialCatalogHandler,
-    SpectrumASCIIFileHandler,
-    SpectrumASCIIFileParser,
-    SpectrumHandler,
-    SpectrumRangeHandler,
-    StatsHandler,
-    StreamHandler,
-    StreamUserHandler,
-    SummaryQueryHandler,
-    SurveyEfficiencyForObservationPlanHandler,
-    SurveyEfficiencyForObservationsHandler,
-    SurveyThumbnailHandler,
-    SwiftLSXPSQueryHandler,
-    SyntheticPhotometryHandler,
-    SysInfoHandler,
-    TaxonomyHandler,
-    TeamHandler,
-    TelescopeHandler,
-    ThumbnailHandler,
-    ThumbnailPathHandler,
-    UnsourcedFinderHandler,
-    UserACLHandler,
-    UserHandler,
-    UserObjListHandler,
-    UserRoleHandler,
-    VizierQueryHandler,
-    WeatherHandler,
-)
-from skyportal.handlers.api.internal import (
-    AcrossInstrumentsHandler,
-    AcrossJointVisibilityHandler,
-    AltdataInfoHandler,
-    AnnotationsInfoHandler,
-    BulkNotificationHandler,
-    DBInfoHandler,
-    EphemerisHandler,
-    FilterWavelengthHandler,
-    LogHandler,
-    NotificationHandler,
-    NotificationTestHandler,
-    PlotAssignmentAirmassHandler,
-    PlotHoursBelowAirmassHandler,
-    PlotObjTelAirmassHandler,
-    ProfileHandler,
-    RecentGcnEventsHandler,
-    RecentSourcesHandler,
-    RoboticInstrumentsHandler,
-    SourceCountHandler,
-    SourceSaverHandler,
-    SourceViewsHandler,
-    StandardsHandler,
-    TokenHandler,
-)
-from skyportal.handlers.public import (
-    CachedSourceFinderHandler,
-    ReleaseHandler,
-    ReleaseSourcePageHandler,
-    ReportHandler,
-    SourcePageHandler,
-)
+from skyportal.handlers.lazy import LazyHandlers, resolve_handler
 
 from . import model_util, openapi
 from .models import init_db
@@ -253,6 +16,11 @@ from .utils.observability import setup_observability
 
 log = make_log("app_server")
 
+# the handlers are imported on their first request, see skyportal/handlers/lazy.py
+api = LazyHandlers("skyportal.handlers.api")
+internal = LazyHandlers("skyportal.handlers.api.internal")
+public = LazyHandlers("skyportal.handlers.public")
+
 
 class CustomApplication(tornado.web.Application):
     def log_request(self, handler):
@@ -263,419 +31,461 @@ class CustomApplication(tornado.web.Application):
             return
         return super().log_request(handler)
 
+    def get_handler_delegate(self, request, target_class, *args, **kwargs):
+        # import the handler of a route on its first request
+        return super().get_handler_delegate(
+            request, resolve_handler(target_class), *args, **kwargs
+        )
+
+    @functools.cached_property
+    def openapi_spec(self):
+        # built on first use, since it imports all the handlers
+        return openapi.spec_from_handlers(self.handler_routes)
+
 
 skyportal_handlers = [
     # API endpoints
-    (r"/api/acls", ACLHandler),
-    (r"/api/allocation/report(/[0-9]+)", AllocationReportHandler),
-    (r"/api/allocation/observation_plans/([0-9]+)", AllocationObservationPlanHandler),
-    (r"/api/allocation(/.*)?", AllocationHandler),
-    (r"/api/analysis_service/([0-9]+)/default_analysis(/.*)?", DefaultAnalysisHandler),
-    (r"/api/analysis_service(/.*)?", AnalysisServiceHandler),
+    (r"/api/acls", api.ACLHandler),
+    (r"/api/allocation/report(/[0-9]+)", api.AllocationReportHandler),
+    (
+        r"/api/allocation/observation_plans/([0-9]+)",
+        api.AllocationObservationPlanHandler,
+    ),
+    (r"/api/allocation(/.*)?", api.AllocationHandler),
+    (
+        r"/api/analysis_service/([0-9]+)/default_analysis(/.*)?",
+        api.DefaultAnalysisHandler,
+    ),
+    (r"/api/analysis_service(/.*)?", api.AnalysisServiceHandler),
     (
         r"/api/(obj)/([0-9A-Za-z-_]+)/analysis_upload(/[0-9]+)?",
-        AnalysisUploadOnlyHandler,
+        api.AnalysisUploadOnlyHandler,
     ),
-    (r"/api/(obj)/([0-9A-Za-z-_]+)/analysis(/[0-9]+)?", AnalysisHandler),
-    (r"/api/(obj)/analysis(/[0-9]+)?", AnalysisHandler),
+    (r"/api/(obj)/([0-9A-Za-z-_]+)/analysis(/[0-9]+)?", api.AnalysisHandler),
+    (r"/api/(obj)/analysis(/[0-9]+)?", api.AnalysisHandler),
     (
         r"/api/(obj)/analysis(/[0-9]+)/(corner|results|plots)(/[0-9]+)?",
-        AnalysisProductsHandler,
+        api.AnalysisProductsHandler,
     ),
-    (r"/api/assignment(/.*)?", AssignmentHandler),
-    (r"/api/brokers/([0-9]+)/filter/test", BrokerFilterTestHandler),
+    (r"/api/assignment(/.*)?", api.AssignmentHandler),
+    (r"/api/brokers/([0-9]+)/filter/test", api.BrokerFilterTestHandler),
     (
         r"/api/brokers/([0-9]+)/filters/([0-9]+)/validate",
-        BrokerFilterValidateHandler,
+        api.BrokerFilterValidateHandler,
     ),
-    (r"/api/brokers/([0-9]+)/filter_modules(?:/([^/]+))?", BrokerFilterModulesHandler),
-    (r"/api/brokers/([0-9]+)/filters(?:/([0-9]+))?", BrokerFiltersHandler),
-    (r"/api/brokers/([0-9]+)/alerts/([^/]+)/cutouts", BrokerCutoutsHandler),
-    (r"/api/brokers/([0-9]+)/cone_search", BrokerConeSearchHandler),
-    (r"/api/brokers/([0-9]+)/alerts/([^/]+)/photometry", BrokerPhotometryHandler),
+    (
+        r"/api/brokers/([0-9]+)/filter_modules(?:/([^/]+))?",
+        api.BrokerFilterModulesHandler,
+    ),
+    (r"/api/brokers/([0-9]+)/filters(?:/([0-9]+))?", api.BrokerFiltersHandler),
+    (r"/api/brokers/([0-9]+)/alerts/([^/]+)/cutouts", api.BrokerCutoutsHandler),
+    (r"/api/brokers/([0-9]+)/cone_search", api.BrokerConeSearchHandler),
+    (r"/api/brokers/([0-9]+)/alerts/([^/]+)/photometry", api.BrokerPhotometryHandler),
     # Survey-addressed passthrough for the source-page lightcurve (resolves the
     # broker server-side); "photometry" is non-numeric so it never shadows the
     # numeric /api/brokers/{id} routes.
-    (r"/api/brokers/photometry/([^/]+)", BrokerSurveyPhotometryHandler),
-    (r"/api/brokers/([0-9]+)/alerts/([^/]+)/save", BrokerSaveHandler),
-    (r"/api/brokers/([0-9]+)/alerts(?:/(.+))?", BrokerAlertsHandler),
-    (r"/api/brokers(?:/([0-9]+))?", BrokerHandler),
-    (r"/api/candidates_filter", CandidateFilterHandler),
-    (r"/api/candidates/scan_reports/([0-9]+)/items(/[0-9]+)?", ScanReportItemHandler),
-    (r"/api/candidates/scan_reports", ScanReportHandler),
-    (r"/api/candidates/bulk_delete", BulkDeleteCandidatesHandler),
-    (r"/api/candidates(/[0-9A-Za-z-_]+)/([0-9]+)", CandidateHandler),
-    (r"/api/candidates(/.*)?", CandidateHandler),
-    (r"/api/catalogs/swift_lsxps", SwiftLSXPSQueryHandler),
-    (r"/api/catalogs/gaia_alerts", GaiaPhotometricAlertsQueryHandler),
-    (r"/api/catalog_queries", CatalogQueryHandler),
-    (r"/api/classification/votes(/.*)?", ClassificationVotesHandler),
-    (r"/api/classification/sources(/.*)?", ObjClassificationQueryHandler),
-    (r"/api/classification(/[0-9]+)?", ClassificationHandler),
-    (r"/api/enum_types(/.*)?", EnumTypesHandler),
+    (r"/api/brokers/photometry/([^/]+)", api.BrokerSurveyPhotometryHandler),
+    (r"/api/brokers/([0-9]+)/alerts/([^/]+)/save", api.BrokerSaveHandler),
+    (r"/api/brokers/([0-9]+)/alerts(?:/(.+))?", api.BrokerAlertsHandler),
+    (r"/api/brokers(?:/([0-9]+))?", api.BrokerHandler),
+    (r"/api/candidates_filter", api.CandidateFilterHandler),
+    (
+        r"/api/candidates/scan_reports/([0-9]+)/items(/[0-9]+)?",
+        api.ScanReportItemHandler,
+    ),
+    (r"/api/candidates/scan_reports", api.ScanReportHandler),
+    (r"/api/candidates/bulk_delete", api.BulkDeleteCandidatesHandler),
+    (r"/api/candidates(/[0-9A-Za-z-_]+)/([0-9]+)", api.CandidateHandler),
+    (r"/api/candidates(/.*)?", api.CandidateHandler),
+    (r"/api/catalogs/swift_lsxps", api.SwiftLSXPSQueryHandler),
+    (r"/api/catalogs/gaia_alerts", api.GaiaPhotometricAlertsQueryHandler),
+    (r"/api/catalog_queries", api.CatalogQueryHandler),
+    (r"/api/classification/votes(/.*)?", api.ClassificationVotesHandler),
+    (r"/api/classification/sources(/.*)?", api.ObjClassificationQueryHandler),
+    (r"/api/classification(/[0-9]+)?", api.ClassificationHandler),
+    (r"/api/enum_types(/.*)?", api.EnumTypesHandler),
     (
         r"/api/default_followup_request(/[0-9A-Za-z-_\.\+]+)?",
-        DefaultFollowupRequestHandler,
+        api.DefaultFollowupRequestHandler,
     ),
     (
         r"/api/default_gcn_tag(/[0-9A-Za-z-_\.\+]+)?",
-        DefaultGcnTagHandler,
+        api.DefaultGcnTagHandler,
     ),
     (
         r"/api/default_observation_plan(/[0-9A-Za-z-_\.\+]+)?",
-        DefaultObservationPlanRequestHandler,
+        api.DefaultObservationPlanRequestHandler,
     ),
     (
         r"/api/default_survey_efficiency(/[0-9A-Za-z-_\.\+]+)?",
-        DefaultSurveyEfficiencyRequestHandler,
+        api.DefaultSurveyEfficiencyRequestHandler,
     ),
-    (r"/api/facility", FacilityMessageHandler),
-    (r"/api/filters(/.*)?", FilterHandler),
+    (r"/api/facility", api.FacilityMessageHandler),
+    (r"/api/filters(/.*)?", api.FilterHandler),
     (
         r"/api/followup_request/([0-9A-Za-z-_\.\+]+)/comment",
-        FollowupRequestCommentHandler,
+        api.FollowupRequestCommentHandler,
     ),
-    (r"/api/followup_request/watch(/[0-9]+)", FollowupRequestWatcherHandler),
-    (r"/api/followup_request/schedule(/[0-9]+)", FollowupRequestSchedulerHandler),
+    (r"/api/followup_request/watch(/[0-9]+)", api.FollowupRequestWatcherHandler),
+    (r"/api/followup_request/schedule(/[0-9]+)", api.FollowupRequestSchedulerHandler),
     (
         r"/api/followup_request/prioritization(/.*)?",
-        FollowupRequestPrioritizationHandler,
+        api.FollowupRequestPrioritizationHandler,
     ),
-    (r"/api/followup_request(/.*)?", FollowupRequestHandler),
-    (r"/api/photometry_request(/.*)", PhotometryRequestHandler),
-    (r"/api/galaxy_catalog/glade", GalaxyGladeHandler),
-    (r"/api/galaxy_catalog/ascii", GalaxyASCIIFileHandler),
-    (r"/api/galaxy_catalog(/[0-9A-Za-z-_\.\+]+)?", GalaxyCatalogHandler),
+    (r"/api/followup_request(/.*)?", api.FollowupRequestHandler),
+    (r"/api/photometry_request(/.*)", api.PhotometryRequestHandler),
+    (r"/api/galaxy_catalog/glade", api.GalaxyGladeHandler),
+    (r"/api/galaxy_catalog/ascii", api.GalaxyASCIIFileHandler),
+    (r"/api/galaxy_catalog(/[0-9A-Za-z-_\.\+]+)?", api.GalaxyCatalogHandler),
     (
         r"/api/earthquake/([0-9A-Za-z-_\.\+]+)/mmadetector/([0-9A-Za-z-_\.\+]+)/predictions",
-        EarthquakePredictionHandler,
+        api.EarthquakePredictionHandler,
     ),
     (
         r"/api/earthquake/([0-9A-Za-z-_\.\+]+)/mmadetector/([0-9A-Za-z-_\.\+]+)/measurements",
-        EarthquakeMeasurementHandler,
+        api.EarthquakeMeasurementHandler,
     ),
     (
         r"/api/(sources|spectra|gcn_event|shift|earthquake)(/[0-9A-Za-z-_\.\+]+)?/comments(/[0-9]+)?",
-        CommentHandler,
+        api.CommentHandler,
     ),
     (
         r"/api/(sources|spectra|gcn_event|shift|earthquake)(/[0-9A-Za-z-_\.\+]+)/comments(/[0-9]+)/attachment",
-        CommentAttachmentHandler,
+        api.CommentAttachmentHandler,
     ),
     # Allow the '.pdf' suffix for the attachment route, as the
     # react-file-previewer package expects URLs ending with '.pdf' to
     # load PDF files.
     (
         r"/api/(sources|spectra|gcn_event|shift|earthquake)/([0-9A-Za-z-_\.\+]+)/comments(/[0-9]+)/attachment.pdf",
-        CommentAttachmentHandler,
+        api.CommentAttachmentHandler,
     ),
     (
         r"/api/gcn_event(/[0-9]+)/observation_plan_requests",
-        GcnEventObservationPlanRequestsHandler,
+        api.GcnEventObservationPlanRequestsHandler,
     ),
     (
         r"/api/gcn_event(/[0-9]+)/survey_efficiency",
-        GcnEventSurveyEfficiencyHandler,
+        api.GcnEventSurveyEfficiencyHandler,
     ),
     (
         r"/api/gcn_event(/[0-9]+)/catalog_query",
-        GcnEventCatalogQueryHandler,
+        api.GcnEventCatalogQueryHandler,
     ),
     (
         r"/api/(source|spectra|gcn_event|shift|earthquake)/([0-9A-Za-z-_\.\+]+)/reminders(/[0-9]+)?",
-        ReminderHandler,
-    ),
-    (r"/api/moving_object/([0-9A-Za-z-_\.\+]+)/followup", MovingObjectFollowupHandler),
-    (r"/api/earthquake/status", EarthquakeStatusHandler),
-    (r"/api/earthquake(/.*)?", EarthquakeHandler),
-    (r"/api/gcn_event(/.*)/alias", GcnEventAliasesHandler),
-    (r"/api/gcn_event(/.*)/triggered(/.*)?", GcnEventTriggerHandler),
-    (r"/api/gcn_event(/.*)/gracedb", GcnGraceDBHandler),
-    (r"/api/gcn_event/(.*)/report(/.*)?", GcnReportHandler),
-    (r"/api/gcn_event(/.*)/tach", GcnTachHandler),
-    (r"/api/gcn_event/(.*)/summary(/.*)?", GcnSummaryHandler),
-    (r"/api/gcn_event/(.*)/instrument(/.*)?", GcnEventInstrumentFieldHandler),
-    (r"/api/gcn_event(/.*)/users(/[0-9]+)?", GcnEventUserHandler),
-    (r"/api/gcn_event(/.*)/notice/([0-9]+)/download", GcnEventNoticeDownloadHandler),
-    (r"/api/gcn_event/tags(/.*)?", GcnEventTagsHandler),
-    (r"/api/gcn_event/properties", GcnEventPropertiesHandler),
-    (r"/api/gcn_event(/.*)?", GcnEventHandler),
-    (r"/api/sources_in_gcn/([0-9T\\:\\.\\-]+)(/.*)?", SourcesConfirmedInGCNHandler),
-    (r"/api/associated_gcns/(.*)", GCNsAssociatedWithSourceHandler),
+        api.ReminderHandler,
+    ),
+    (
+        r"/api/moving_object/([0-9A-Za-z-_\.\+]+)/followup",
+        api.MovingObjectFollowupHandler,
+    ),
+    (r"/api/earthquake/status", api.EarthquakeStatusHandler),
+    (r"/api/earthquake(/.*)?", api.EarthquakeHandler),
+    (r"/api/gcn_event(/.*)/alias", api.GcnEventAliasesHandler),
+    (r"/api/gcn_event(/.*)/triggered(/.*)?", api.GcnEventTriggerHandler),
+    (r"/api/gcn_event(/.*)/gracedb", api.GcnGraceDBHandler),
+    (r"/api/gcn_event/(.*)/report(/.*)?", api.GcnReportHandler),
+    (r"/api/gcn_event(/.*)/tach", api.GcnTachHandler),
+    (r"/api/gcn_event/(.*)/summary(/.*)?", api.GcnSummaryHandler),
+    (r"/api/gcn_event/(.*)/instrument(/.*)?", api.GcnEventInstrumentFieldHandler),
+    (r"/api/gcn_event(/.*)/users(/[0-9]+)?", api.GcnEventUserHandler),
+    (
+        r"/api/gcn_event(/.*)/notice/([0-9]+)/download",
+        api.GcnEventNoticeDownloadHandler,
+    ),
+    (r"/api/gcn_event/tags(/.*)?", api.GcnEventTagsHandler),
+    (r"/api/gcn_event/properties", api.GcnEventPropertiesHandler),
+    (r"/api/gcn_event/crossmatch", api.GcnEventCrossmatchHandler),
+    (r"/api/gcn_event(/.*)?", api.GcnEventHandler),
+    (r"/api/sources_in_gcn/([0-9T\\:\\.\\-]+)(/.*)?", api.SourcesConfirmedInGCNHandler),
+    (r"/api/associated_gcns/(.*)", api.GCNsAssociatedWithSourceHandler),
     (
         r"/api/localization(/[0-9]+)/observability",
-        ObservationPlanObservabilityPlotHandler,
+        api.ObservationPlanObservabilityPlotHandler,
     ),
     (
         r"/api/localization(/[0-9]+)/airmass(/[0-9]+)?",
-        ObservationPlanAirmassChartHandler,
+        api.ObservationPlanAirmassChartHandler,
     ),
     (
         r"/api/localization(/[0-9]+)/worldmap",
-        ObservationPlanWorldmapPlotHandler,
-    ),
-    (r"/api/healpix", HealpixUpdateHandler),
-    (r"/api/comment_attachment", CommentAttachmentUpdateHandler),
-    (r"/api/sources/([0-9A-Za-z-_\.\+]+)/phot_stat", PhotStatHandler),
-    (r"/api/phot_stats", PhotStatUpdateHandler),
-    (r"/api/phot_stats/aggregate", PhotStatAggregateHandler),
-    (r"/api/localization/tags", LocalizationTagsHandler),
-    (r"/api/localization/properties", LocalizationPropertiesHandler),
-    (r"/api/localization(/.*)/name(/.*)/download", LocalizationDownloadHandler),
-    (r"/api/localization(/.*)/name(/.*)?", LocalizationHandler),
-    (r"/api/localization(/.*)/notice(/.*)?", LocalizationNoticeHandler),
-    (r"/api/localizationcrossmatch", LocalizationCrossmatchHandler),
-    (r"/api/groups/public", PublicGroupHandler),
-    (r"/api/groups(/[0-9]+)/streams(/[0-9]+)?", GroupStreamHandler),
-    (r"/api/groups(/[0-9]+)/users(/.*)?", GroupUserHandler),
+        api.ObservationPlanWorldmapPlotHandler,
+    ),
+    (r"/api/healpix", api.HealpixUpdateHandler),
+    (r"/api/comment_attachment", api.CommentAttachmentUpdateHandler),
+    (r"/api/sources/([0-9A-Za-z-_\.\+]+)/phot_stat", api.PhotStatHandler),
+    (r"/api/phot_stats", api.PhotStatUpdateHandler),
+    (r"/api/phot_stats/aggregate", api.PhotStatAggregateHandler),
+    (r"/api/localization/tags", api.LocalizationTagsHandler),
+    (r"/api/localization/properties", api.LocalizationPropertiesHandler),
+    (r"/api/localization(/.*)/name(/.*)/download", api.LocalizationDownloadHandler),
+    (r"/api/localization(/.*)/name(/.*)?", api.LocalizationHandler),
+    (r"/api/localization(/.*)/notice(/.*)?", api.LocalizationNoticeHandler),
+    (r"/api/localizationcrossmatch", api.LocalizationCrossmatchHandler),
+    (r"/api/groups/public", api.PublicGroupHandler),
+    (r"/api/groups(/[0-9]+)/streams(/[0-9]+)?", api.GroupStreamHandler),
+    (r"/api/groups(/[0-9]+)/users(/.*)?", api.GroupUserHandler),
     (
         r"/api/groups(/[0-9]+)/usersFromGroups(/.*)?",
-        GroupUsersFromOtherGroupsHandler,
-    ),
-    (r"/api/groups(/[0-9]+)?", GroupHandler),
-    (r"/api/mmadetector(/[0-9]+)?", MMADetectorHandler),
-    (r"/api/mmadetector/spectra(/[0-9]+)?", MMADetectorSpectrumHandler),
-    (r"/api/mmadetector/time_intervals(/[0-9]+)?", MMADetectorTimeIntervalHandler),
-    (r"/api/listing(/[0-9]+)?", UserObjListHandler),
-    (r"/api/group_admission_requests(/[0-9]+)?", GroupAdmissionRequestHandler),
-    (r"/api/instrument(/[0-9]+)/fields", InstrumentFieldHandler),
-    (r"/api/instrument(/[0-9]+)/log", InstrumentLogHandler),
-    (r"/api/instrument(/[0-9]+)/external_api", InstrumentLogExternalAPIHandler),
-    (r"/api/instrument(/[0-9]+)/status", InstrumentStatusHandler),
-    (r"/api/instrument(/[0-9]+)?", InstrumentHandler),
-    (r"/api/invitations(/.*)?", InvitationHandler),
-    (r"/api/newsfeed", NewsFeedHandler),
-    (r"/api/observation(/[0-9]+)?", ObservationHandler),
-    (r"/api/observation/ascii(/[0-9]+)?", ObservationASCIIFileHandler),
-    (r"/api/observation/simsurvey(/[0-9]+)?", ObservationSimSurveyHandler),
-    (r"/api/observation/simsurvey(/[0-9]+)/plot", ObservationSimSurveyPlotHandler),
-    (r"/api/observation/treasuremap(/[0-9]+)", ObservationTreasureMapHandler),
-    (r"/api/observation/external_api(/[0-9]+)?", ObservationExternalAPIHandler),
-    (r"/api/observing_run(/[0-9]+)/not_observed", ObservingRunBulkEditHandler),
-    (r"/api/observing_run(/[0-9]+)?", ObservingRunHandler),
-    (r"/api/observation_plan/manual", ObservationPlanManualRequestHandler),
-    (r"/api/observation_plan/plan_names", ObservationPlanNameHandler),
-    (r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)?", ObservationPlanRequestHandler),
+        api.GroupUsersFromOtherGroupsHandler,
+    ),
+    (r"/api/groups(/[0-9]+)?", api.GroupHandler),
+    (r"/api/mmadetector(/[0-9]+)?", api.MMADetectorHandler),
+    (r"/api/mmadetector/spectra(/[0-9]+)?", api.MMADetectorSpectrumHandler),
+    (r"/api/mmadetector/time_intervals(/[0-9]+)?", api.MMADetectorTimeIntervalHandler),
+    (r"/api/listing(/[0-9]+)?", api.UserObjListHandler),
+    (r"/api/group_admission_requests(/[0-9]+)?", api.GroupAdmissionRequestHandler),
+    (r"/api/instrument(/[0-9]+)/fields", api.InstrumentFieldHandler),
+    (r"/api/instrument(/[0-9]+)/log", api.InstrumentLogHandler),
+    (r"/api/instrument(/[0-9]+)/external_api", api.InstrumentLogExternalAPIHandler),
+    (r"/api/instrument(/[0-9]+)/status", api.InstrumentStatusHandler),
+    (r"/api/instrument(/[0-9]+)?", api.InstrumentHandler),
+    (r"/api/invitations(/.*)?", api.InvitationHandler),
+    (r"/api/newsfeed", api.NewsFeedHandler),
+    (r"/api/observation(/[0-9]+)?", api.ObservationHandler),
+    (r"/api/observation/ascii(/[0-9]+)?", api.ObservationASCIIFileHandler),
+    (r"/api/observation/simsurvey(/[0-9]+)?", api.ObservationSimSurveyHandler),
+    (r"/api/observation/simsurvey(/[0-9]+)/plot", api.ObservationSimSurveyPlotHandler),
+    (r"/api/observation/treasuremap(/[0-9]+)", api.ObservationTreasureMapHandler),
+    (r"/api/observation/external_api(/[0-9]+)?", api.ObservationExternalAPIHandler),
+    (r"/api/observing_run(/[0-9]+)/not_observed", api.ObservingRunBulkEditHandler),
+    (r"/api/observing_run(/[0-9]+)?", api.ObservingRunHandler),
+    (r"/api/observation_plan/manual", api.ObservationPlanManualRequestHandler),
+    (r"/api/observation_plan/plan_names", api.ObservationPlanNameHandler),
+    (r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)?", api.ObservationPlanRequestHandler),
     (
         r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)/treasuremap",
-        ObservationPlanTreasureMapHandler,
+        api.ObservationPlanTreasureMapHandler,
     ),
     (
         r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)/gcn",
-        ObservationPlanGCNHandler,
+        api.ObservationPlanGCNHandler,
     ),
     (
         r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)/queue",
-        ObservationPlanSubmitHandler,
+        api.ObservationPlanSubmitHandler,
     ),
     (
         r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)/movie",
-        ObservationPlanMovieHandler,
+        api.ObservationPlanMovieHandler,
     ),
     (
         r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)/simsurvey/plot",
-        ObservationPlanSimSurveyPlotHandler,
+        api.ObservationPlanSimSurveyPlotHandler,
     ),
     (
         r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)/simsurvey",
-        ObservationPlanSimSurveyHandler,
+        api.ObservationPlanSimSurveyHandler,
     ),
     (
         r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)/geojson",
-        ObservationPlanGeoJSONHandler,
+        api.ObservationPlanGeoJSONHandler,
     ),
     (
         r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)/survey_efficiency",
-        ObservationPlanSurveyEfficiencyHandler,
+        api.ObservationPlanSurveyEfficiencyHandler,
     ),
     (
         r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)/observing_run",
-        ObservationPlanCreateObservingRunHandler,
+        api.ObservationPlanCreateObservingRunHandler,
     ),
     (
         r"/api/observation_plan(/[0-9A-Za-z-_\.\+]+)/fields",
-        ObservationPlanFieldsHandler,
-    ),
-    (r"/api/objs(/[0-9A-Za-z-_\.\+]+)", ObjHandler),
-    (r"/api/objtagoption(/[0-9]+)?", ObjTagOptionHandler),
-    (r"/api/objtag(/[0-9]+)?", ObjTagHandler),
-    (r"/api/photometry(/[0-9]+)?", PhotometryHandler),
-    (r"/api/photometry(/[0-9]+)/validation", PhotometryValidationHandler),
-    (r"/api/photometric_series(/[0-9]+)?", PhotometricSeriesHandler),
-    (r"/api/summary_query", SummaryQueryHandler),
-    (r"/api/sharing", SharingHandler),
-    (r"/api/shifts/summary(/[0-9]+)?", ShiftSummary),
-    (r"/api/shifts(/[0-9]+)?", ShiftHandler),
-    (r"/api/shifts(/[0-9]+)/users(/[0-9]+)?", ShiftUserHandler),
-    (r"/api/photometry/bulk_delete/(.*)", BulkDeletePhotometryHandler),
-    (r"/api/photometry/range(/.*)?", PhotometryRangeHandler),
-    (r"/api/photometry/origins", PhotometryOriginHandler),
-    (r"/api/recurring_api(/.*)?", RecurringAPIHandler),
-    (r"/api/roles", RoleHandler),
-    (r"/api/skymap_trigger(/[0-9]+)?", SkymapTriggerAPIHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/copy_photometry", SourceCopyPhotometryHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/photometry", ObjPhotometryHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/spectra", ObjSpectraHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/host", ObjHostHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/offsets", SourceOffsetsHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/finder", SourceFinderHandler),
-    (r"/api/finder_chart/facilities", FinderChartFacilitiesHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/classifications", ObjClassificationHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/groups", ObjGroupsHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/labels", SourceLabelsHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/color_mag", ObjColorMagHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/gcn_event", ObjGcnEventHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/mpc", ObjMPCHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/tns", ObjTNSHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/position", ObjPositionHandler),
+        api.ObservationPlanFieldsHandler,
+    ),
+    (r"/api/objs(/[0-9A-Za-z-_\.\+]+)", api.ObjHandler),
+    (r"/api/objtagoption(/[0-9]+)?", api.ObjTagOptionHandler),
+    (r"/api/objtag(/[0-9]+)?", api.ObjTagHandler),
+    (r"/api/photometry(/[0-9]+)?", api.PhotometryHandler),
+    (r"/api/photometry(/[0-9]+)/validation", api.PhotometryValidationHandler),
+    (r"/api/photometric_series(/[0-9]+)?", api.PhotometricSeriesHandler),
+    (r"/api/summary_query", api.SummaryQueryHandler),
+    (r"/api/sharing", api.SharingHandler),
+    (r"/api/shifts/summary(/[0-9]+)?", api.ShiftSummary),
+    (r"/api/shifts(/[0-9]+)?", api.ShiftHandler),
+    (r"/api/shifts(/[0-9]+)/users(/[0-9]+)?", api.ShiftUserHandler),
+    (r"/api/photometry/bulk_delete/(.*)", api.BulkDeletePhotometryHandler),
+    (r"/api/photometry/range(/.*)?", api.PhotometryRangeHandler),
+    (r"/api/photometry/origins", api.PhotometryOriginHandler),
+    (r"/api/recurring_api(/.*)?", api.RecurringAPIHandler),
+    (r"/api/roles", api.RoleHandler),
+    (r"/api/skymap_trigger(/[0-9]+)?", api.SkymapTriggerAPIHandler),
+    (
+        r"/api/sources(/[0-9A-Za-z-_\.\+]+)/copy_photometry",
+        api.SourceCopyPhotometryHandler,
+    ),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/photometry", api.ObjPhotometryHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/spectra", api.ObjSpectraHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/host", api.ObjHostHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/offsets", api.SourceOffsetsHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/finder", api.SourceFinderHandler),
+    (r"/api/finder_chart/facilities", api.FinderChartFacilitiesHandler),
+    (
+        r"/api/sources(/[0-9A-Za-z-_\.\+]+)/classifications",
+        api.ObjClassificationHandler,
+    ),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/groups", api.ObjGroupsHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/labels", api.SourceLabelsHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/color_mag", api.ObjColorMagHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/gcn_event", api.ObjGcnEventHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/mpc", api.ObjMPCHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/tns", api.ObjTNSHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/position", api.ObjPositionHandler),
     (
         r"/api/sources(/[0-9A-Za-z-_\.\+]+)/observability",
-        SourceObservabilityPlotHandler,
+        api.SourceObservabilityPlotHandler,
+    ),
+    (r"/api/(sources|spectra)/([0-9A-Za-z-_\.\+]+)/comments", api.CommentHandler),
+    (
+        r"/api/(sources|spectra)/([0-9A-Za-z-_\.\+]+)/comments(/[0-9]+)?",
+        api.CommentHandler,
     ),
-    (r"/api/(sources|spectra)/([0-9A-Za-z-_\.\+]+)/comments", CommentHandler),
-    (r"/api/(sources|spectra)/([0-9A-Za-z-_\.\+]+)/comments(/[0-9]+)?", CommentHandler),
     (
         r"/api/(sources|spectra)(/[0-9A-Za-z-_\.\+]+)/comments(/[0-9]+)/attachment",
-        CommentAttachmentHandler,
+        api.CommentAttachmentHandler,
     ),
     # Allow the '.pdf' suffix for the attachment route, as the
     # react-file-previewer package expects URLs ending with '.pdf' to
     # load PDF files.
     (
         r"/api/(sources|spectra)/([0-9A-Za-z-_\.\+]+)/comments(/[0-9]+)/attachment.pdf",
-        CommentAttachmentHandler,
+        api.CommentAttachmentHandler,
     ),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/annotations/gaia", GaiaQueryHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/annotations/irsa", IRSAQueryWISEHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/annotations/vizier", VizierQueryHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/annotations/datalab", DatalabQueryHandler),
-    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/annotations/ps1", PS1QueryHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/annotations/gaia", api.GaiaQueryHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/annotations/irsa", api.IRSAQueryWISEHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/annotations/vizier", api.VizierQueryHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/annotations/datalab", api.DatalabQueryHandler),
+    (r"/api/sources(/[0-9A-Za-z-_\.\+]+)/annotations/ps1", api.PS1QueryHandler),
     (
         r"/api/(sources|spectra|photometry)(/[0-9A-Za-z-_\.\+]+)/annotations",
-        AnnotationHandler,
+        api.AnnotationHandler,
     ),
     (
         r"/api/(sources|spectra|photometry)(/[0-9A-Za-z-_\.\+]+)/annotations(/[0-9]+)?",
-        AnnotationHandler,
-    ),
-    (r"/api/sources(/[^/]*)?", SourceHandler),
-    (r"/api/source_exists(/.*)?", SourceExistsHandler),
-    (r"/api/source_notifications", SourceNotificationHandler),
-    (r"/api/source_groups(/.*)?", SourceGroupsHandler),
-    (r"/api/spatial_catalog/ascii", SpatialCatalogASCIIFileHandler),
-    (r"/api/spatial_catalog(/[0-9A-Za-z-_\.\+]+)?", SpatialCatalogHandler),
-    (r"/api/spectra/bulk", BulkSpectraHandler),
-    (r"/api/spectra(/[0-9]+)?", SpectrumHandler),
-    (r"/api/spectra/parse/ascii", SpectrumASCIIFileParser),
-    (r"/api/spectra/ascii(/[0-9]+)?", SpectrumASCIIFileHandler),
-    (r"/api/spectra/synthphot(/[0-9]+)?", SyntheticPhotometryHandler),
-    (r"/api/spectra/range(/.*)?", SpectrumRangeHandler),
+        api.AnnotationHandler,
+    ),
+    (r"/api/sources(/[^/]*)?", api.SourceHandler),
+    (r"/api/source_exists(/.*)?", api.SourceExistsHandler),
+    (r"/api/source_notifications", api.SourceNotificationHandler),
+    (r"/api/source_groups(/.*)?", api.SourceGroupsHandler),
+    (r"/api/spatial_catalog/ascii", api.SpatialCatalogASCIIFileHandler),
+    (r"/api/spatial_catalog(/[0-9A-Za-z-_\.\+]+)?", api.SpatialCatalogHandler),
+    (r"/api/spectra/bulk", api.BulkSpectraHandler),
+    (r"/api/spectra(/[0-9]+)?", api.SpectrumHandler),
+    (r"/api/spectra/parse/ascii", api.SpectrumASCIIFileParser),
+    (r"/api/spectra/ascii(/[0-9]+)?", api.SpectrumASCIIFileHandler),
+    (r"/api/spectra/synthphot(/[0-9]+)?", api.SyntheticPhotometryHandler),
+    (r"/api/spectra/range(/.*)?", api.SpectrumRangeHandler),
     # FIXME: TODO: Deprecated, to be removed in an upcoming release
-    (r"/api/spectrum(/[0-9]+)?", SpectrumHandler),
-    (r"/api/spectrum/parse/ascii", SpectrumASCIIFileParser),
-    (r"/api/spectrum/ascii(/[0-9]+)?", SpectrumASCIIFileHandler),
-    (r"/api/spectrum/range(/.*)?", SpectrumRangeHandler),
+    (r"/api/spectrum(/[0-9]+)?", api.SpectrumHandler),
+    (r"/api/spectrum/parse/ascii", api.SpectrumASCIIFileParser),
+    (r"/api/spectrum/ascii(/[0-9]+)?", api.SpectrumASCIIFileHandler),
+    (r"/api/spectrum/range(/.*)?", api.SpectrumRangeHandler),
     # End deprecated
-    (r"/api/streams(/[0-9]+)/users(/.*)?", StreamUserHandler),
-    (r"/api/streams(/[0-9]+)?", StreamHandler),
+    (r"/api/streams(/[0-9]+)/users(/.*)?", api.StreamUserHandler),
+    (r"/api/streams(/[0-9]+)?", api.StreamHandler),
     (
         r"/api/survey_efficiency/observations(/[0-9]+)?",
-        SurveyEfficiencyForObservationsHandler,
+        api.SurveyEfficiencyForObservationsHandler,
     ),
     (
         r"/api/survey_efficiency/observation_plan(/[0-9]+)?",
-        SurveyEfficiencyForObservationPlanHandler,
-    ),
-    (r"/api/db_stats", StatsHandler),
-    (r"/api/sysinfo", SysInfoHandler),
-    (r"/api/config", ConfigHandler),
-    (r"/api/taxonomy(/.*)?", TaxonomyHandler),
-    (r"/api/teams(/[0-9]+)?", TeamHandler),
-    (r"/api/telescope(/[0-9]+)?", TelescopeHandler),
-    (r"/api/thumbnail(/[0-9]+)?", ThumbnailHandler),
-    (r"/api/thumbnailPath", ThumbnailPathHandler),
+        api.SurveyEfficiencyForObservationPlanHandler,
+    ),
+    (r"/api/db_stats", api.StatsHandler),
+    (r"/api/sysinfo", api.SysInfoHandler),
+    (r"/api/config", api.ConfigHandler),
+    (r"/api/taxonomy(/.*)?", api.TaxonomyHandler),
+    (r"/api/teams(/[0-9]+)?", api.TeamHandler),
+    (r"/api/telescope(/[0-9]+)?", api.TelescopeHandler),
+    (r"/api/thumbnail(/[0-9]+)?", api.ThumbnailHandler),
+    (r"/api/thumbnailPath", api.ThumbnailPathHandler),
     # Sharing service endpoints
     (
         r"/api/sharing_service/submission(/[0-9]+)?",
-        SharingServiceSubmissionHandler,
+        api.SharingServiceSubmissionHandler,
     ),
     (
         r"/api/sharing_service(/[0-9]+)/coauthor(/[0-9]+)?",
-        SharingServiceCoauthorHandler,
+        api.SharingServiceCoauthorHandler,
     ),
     (
         r"/api/sharing_service(/[0-9]+)/group(/[0-9]+)?",
-        SharingServiceGroupHandler,
+        api.SharingServiceGroupHandler,
     ),
     (
         r"/api/sharing_service(/[0-9]+)/group(/[0-9]+)/auto_publisher(/[0-9]+)?",
-        SharingServiceGroupAutoPublisherHandler,
+        api.SharingServiceGroupAutoPublisherHandler,
     ),
-    (r"/api/sharing_service(/[0-9]+)?", SharingServiceHandler),
+    (r"/api/sharing_service(/[0-9]+)?", api.SharingServiceHandler),
     #
-    (r"/api/unsourced_finder", UnsourcedFinderHandler),
-    (r"/api/user(/[0-9]+)/acls(/.*)?", UserACLHandler),
-    (r"/api/user(/[0-9]+)/roles(/.*)?", UserRoleHandler),
-    (r"/api/user(/.*)?", UserHandler),
-    (r"/api/weather(/.*)?", WeatherHandler),
+    (r"/api/unsourced_finder", api.UnsourcedFinderHandler),
+    (r"/api/user(/[0-9]+)/acls(/.*)?", api.UserACLHandler),
+    (r"/api/user(/[0-9]+)/roles(/.*)?", api.UserRoleHandler),
+    (r"/api/user(/.*)?", api.UserHandler),
+    (r"/api/weather(/.*)?", api.WeatherHandler),
     # strictly require uuid4 token for this unauthenticated endpoint
     (
         r"/api/webhook/(obj)_analysis/([0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12})?",
-        AnalysisWebhookHandler,
+        api.AnalysisWebhookHandler,
     ),
     # Public pages managed by the API.
-    (r"/api/public_pages/source(/[0-9A-Za-z-_\.\+]+)", PublicSourcePageHandler),
-    (r"/api/public_pages/release(/[0-9]+)?", PublicReleaseHandler),
+    (r"/api/public_pages/source(/[0-9A-Za-z-_\.\+]+)", api.PublicSourcePageHandler),
+    (r"/api/public_pages/release(/[0-9]+)?", api.PublicReleaseHandler),
     # Internal API endpoints
-    (r"/api/internal/tokens(/[0-9A-Za-z-]+)?", TokenHandler),
-    (r"/api/internal/profile(/[0-9]+)?", ProfileHandler),
-    (r"/api/internal/dbinfo", DBInfoHandler),
-    (r"/api/internal/source_views(/.*)?", SourceViewsHandler),
-    (r"/api/internal/source_counts(/.*)?", SourceCountHandler),
-    (r"/api/internal/source_savers(/.*)?", SourceSaverHandler),
-    (r"/api/internal/instrument_forms", RoboticInstrumentsHandler),
-    (r"/api/internal/broker_apis", BrokerAPIsHandler),
-    (r"/api/internal/followup_apis", FollowupAPIsHandler),
-    (r"/api/internal/standards", StandardsHandler),
-    (r"/api/internal/wavelengths(/.*)?", FilterWavelengthHandler),
-    (r"/api/internal/plot/airmass/assignment/(.*)", PlotAssignmentAirmassHandler),
+    (r"/api/internal/tokens(/[0-9A-Za-z-]+)?", internal.TokenHandler),
+    (r"/api/internal/profile(/[0-9]+)?", internal.ProfileHandler),
+    (r"/api/internal/dbinfo", internal.DBInfoHandler),
+    (r"/api/internal/source_views(/.*)?", internal.SourceViewsHandler),
+    (r"/api/internal/source_counts(/.*)?", internal.SourceCountHandler),
+    (r"/api/internal/source_savers(/.*)?", internal.SourceSaverHandler),
+    (r"/api/internal/instrument_forms", internal.RoboticInstrumentsHandler),
+    (r"/api/internal/broker_apis", api.BrokerAPIsHandler),
+    (r"/api/internal/followup_apis", api.FollowupAPIsHandler),
+    (r"/api/internal/standards", internal.StandardsHandler),
+    (r"/api/internal/wavelengths(/.*)?", internal.FilterWavelengthHandler),
+    (
+        r"/api/internal/plot/airmass/assignment/(.*)",
+        internal.PlotAssignmentAirmassHandler,
+    ),
     (
         r"/api/internal/plot/airmass/objtel/(.*)/([0-9]+)",
-        PlotObjTelAirmassHandler,
+        internal.PlotObjTelAirmassHandler,
     ),
     (
         r"/api/internal/plot/airmass/hours_below/(.*)/([0-9]+)",
-        PlotHoursBelowAirmassHandler,
+        internal.PlotHoursBelowAirmassHandler,
     ),
-    (r"/api/internal/ephemeris(/[0-9]+)?", EphemerisHandler),
-    (r"/api/internal/across/instruments", AcrossInstrumentsHandler),
+    (r"/api/internal/ephemeris(/[0-9]+)?", internal.EphemerisHandler),
+    (r"/api/internal/across/instruments", internal.AcrossInstrumentsHandler),
     (
         r"/api/internal/across/joint_visibility/(.*)",
-        AcrossJointVisibilityHandler,
-    ),
-    (r"/api/internal/log(/.*)?", LogHandler),
-    (r"/api/internal/recent_sources(/.*)?", RecentSourcesHandler),
-    (r"/api/internal/altdata_info", AltdataInfoHandler),
-    (r"/api/internal/annotations_info", AnnotationsInfoHandler),
-    (r"/api/internal/notifications(/[0-9]+)?", NotificationHandler),
-    (r"/api/internal/notifications/all", BulkNotificationHandler),
-    (r"/api/internal/notifications_test(/[0-9]+)?", NotificationTestHandler),
-    (r"/api/internal/survey_thumbnail", SurveyThumbnailHandler),
-    (r"/api/internal/recent_gcn_events", RecentGcnEventsHandler),
-    (r"/api/.*", InvalidEndpointHandler),
+        internal.AcrossJointVisibilityHandler,
+    ),
+    (r"/api/internal/log(/.*)?", internal.LogHandler),
+    (r"/api/internal/recent_sources(/.*)?", internal.RecentSourcesHandler),
+    (r"/api/internal/altdata_info", internal.AltdataInfoHandler),
+    (r"/api/internal/annotations_info", internal.AnnotationsInfoHandler),
+    (r"/api/internal/notifications(/[0-9]+)?", internal.NotificationHandler),
+    (r"/api/internal/notifications/all", internal.BulkNotificationHandler),
+    (r"/api/internal/notifications_test(/[0-9]+)?", internal.NotificationTestHandler),
+    (r"/api/internal/survey_thumbnail", api.SurveyThumbnailHandler),
+    (r"/api/internal/recent_gcn_events", internal.RecentGcnEventsHandler),
+    (r"/api/.*", api.InvalidEndpointHandler),
     # Public pages.
     (
         r"/public/sources(?:/)?([0-9A-Za-z-_\.\+]+)?(?:/)?(?:version)?(?:/)?([0-9a-f]+)?",
-        SourcePageHandler,
+        public.SourcePageHandler,
     ),
     (
         r"/public/releases/([0-9A-Za-z-_\.\+]+)/sources/([0-9A-Za-z-_\.\+]+)/version/([0-9a-f]+)",
-        ReleaseSourcePageHandler,
+        public.ReleaseSourcePageHandler,
     ),
-    (r"/public/releases(?:/)?([0-9A-Za-z-_\.\+]+)?", ReleaseHandler),
-    (r"/public/reports/(gcn)(/[0-9]+)?(/.*)?", ReportHandler),
-    (r"/public/finding_charts(?:/)?(.*)?", CachedSourceFinderHandler),
-    (r"/public/.*", InvalidEndpointHandler),
+    (r"/public/releases(?:/)?([0-9A-Za-z-_\.\+]+)?", public.ReleaseHandler),
+    (r"/public/reports/(gcn)(/[0-9]+)?(/.*)?", public.ReportHandler),
+    (r"/public/finding_charts(?:/)?(.*)?", public.CachedSourceFinderHandler),
+    (r"/public/.*", api.InvalidEndpointHandler),
     # Debug and logout pages.
     (r"/become_user(/.*)?", BecomeUserHandler),
     (r"/logout", LogoutHandler),
@@ -714,12 +524,19 @@ def make_app(cfg, baselayer_handlers, baselayer_settings, process=None, env=None
         print("  in the configuration file!")
         print("!" * 80)
 
-    handlers = baselayer_handlers + skyportal_handlers
+    routes = skyportal_handlers
+    if not cfg.get("server.lazy_handlers", True):
+        # import all the handlers now, rather than on their first request
+        routes = [
+            (pattern, resolve_handler(handler), *args)
+            for pattern, handler, *args in routes
+        ]
+    handlers = baselayer_handlers + routes
 
     # Opt-in OpenTelemetry instrumentation; exposes Prometheus metrics at
     # /api/internal/metrics (matched before the /api/.* catch-all) per worker.
     if setup_observability(cfg):
-        handlers = [(r"/api/internal/metrics", MetricsHandler), *handlers]
+        handlers = [(r"/api/internal/metrics", api.MetricsHandler), *handlers]
 
     settings = baselayer_settings
     settings.update(
@@ -806,6 +623,6 @@ def make_app(cfg, baselayer_handlers, baselayer_settings, process=None, env=None
         print("-" * 78)
 
     model_util.provision_public_group()
-    app.openapi_spec = openapi.spec_from_handlers(handlers)
+    app.handler_routes = handlers
 
     return app
@@ -5,16 +5,79 @@ from a broker's ``altdata['kafka']`` block and decodes Avro the same way; keep i
 here rather than re-deriving it per provider.
 """
 
+# ``altdata['kafka']['batch_size']``: alerts fetched (and persisted in one
+# transaction) per consume call. 1 keeps the per-alert path: one poll, one
+# session and one commit per alert, offsets auto-committed by the client.
+DEFAULT_BATCH_SIZE = 1
+# ``altdata['kafka']['linger']``: max seconds a consume call waits to fill a batch.
+DEFAULT_LINGER = 2.0
+
+
+# Worker-pool autoscaling (services/broker_ingest): a pool grows by one worker
+# while its consumer lag exceeds this many messages per worker.
+LAG_PER_WORKER = 10_000
+# Seconds between two progress reports (alert count, lag) from a consumer.
+REPORT_INTERVAL = 30
+
+
+def kafka_worker_bounds(kafka):
+    """``(min_workers, max_workers)`` from an ``altdata['kafka']`` block: a fixed
+    ``workers`` count, or ``min_workers``/``max_workers`` to let the ingestion
+    service autoscale on consumer lag. Defaults to a single worker."""
+    low = max(1, int(kafka.get("min_workers", kafka.get("workers", 1))))
+    high = max(low, int(kafka.get("max_workers", low)))
+    return low, high
+
+
+def scale_workers(current, lag, low, high):
+    """Worker count for the next interval: one more while the lag exceeds
+    ``LAG_PER_WORKER`` per worker, one fewer once the pool has caught up (zero
+    lag), always within ``[low, high]``. An unknown lag keeps the count."""
+    target = current or low
+    if lag is not None:
+        if lag > LAG_PER_WORKER * target:
+            target += 1
+        elif lag == 0:
+            target -= 1
+    return min(max(target, low), high)
+
+
+def consumer_lag(consumer, timeout=5):
+    """Messages between the consumer's position and the high watermark, summed
+    over its assigned partitions (None until partitions are assigned). Blocking:
+    queries the brokers for the watermarks."""
+    partitions = consumer.assignment()
+    if not partitions:
+        return None
+    lag = 0
+    for tp in consumer.position(partitions):
+        low, high = consumer.get_watermark_offsets(tp, timeout=timeout)
+        # a negative offset means "nothing consumed yet" (OFFSET_INVALID)
+        offset = tp.offset if tp.offset >= 0 else low
+        lag += max(high - offset, 0)
+    return lag
+
+
+def kafka_batch_config(kafka):
+    """``(batch_size, linger)`` from an ``altdata['kafka']`` block."""
+    batch_size = max(1, int(kafka.get("batch_size", DEFAULT_BATCH_SIZE)))
+    linger = float(kafka.get("linger", DEFAULT_LINGER))
+    return batch_size, linger
+
 
 def kafka_consumer_config(kafka, default_group):
     """Build a confluent_kafka Consumer config from an ``altdata['kafka']`` block
-    (host/port/group_id/username/password/sasl_mechanism/auto_offset_reset)."""
+    (host/port/group_id/username/password/sasl_mechanism/auto_offset_reset/
+    batch_size)."""
     config = {
         "bootstrap.servers": f"{kafka.get('host', 'localhost')}:{kafka.get('port', 9092)}",
         "group.id": kafka.get("group_id", default_group),
         "auto.offset.reset": kafka.get("auto_offset_reset", "earliest"),
         "security.protocol": "PLAINTEXT",
     }
+    if kafka_batch_config(kafka)[0] > 1:
+        # Batched ingestion commits offsets itself, once the batch is persisted.
+        config["enable.auto.commit"] = False
     if kafka.get("username"):
         config.update(
             {
@@ -36,3 +99,130 @@ def read_avro(value):
     for record in fastavro.reader(io.BytesIO(value)):
         return record
     return None
+
+
+async def consume_records(consumer, batch_size, linger, log):
+    """Fetch up to ``batch_size`` messages, waiting at most ``linger`` seconds,
+    and decode them. Returns ``(n_messages, records)``: the raw message count
+    (so the caller knows whether there are offsets to commit) and the decoded,
+    non-empty Avro records."""
+    import asyncio
+
+    from confluent_kafka import KafkaError
+
+    # consume is blocking; offload so one event loop can host several brokers.
+    messages = await asyncio.to_thread(consumer.consume, batch_size, linger)
+    records = []
+    for msg in messages:
+        if msg.error():
+            if msg.error().code() != KafkaError._PARTITION_EOF:
+                log(f"Kafka error: {msg.error()}")
+            continue
+        record = read_avro(msg.value())
+        if record is not None:
+            records.append(record)
+    return len(messages), records
+
+
+async def _save_one(item, log):
+    import sqlalchemy as sa
+
+    from baselayer.app.models import async_plain_session_factory
+
+    from ..models import User
+    from ._save import save_object_as_candidate
+
+    try:
+        async with async_plain_session_factory() as session:
+            user = await session.scalar(sa.select(User).where(User.id == 1))
+            await save_object_as_candidate(
+                item["data"],
+                item["survey"],
+                session,
+                user,
+                item["filter_ids"],
+                passing_alert_id=item.get("passing_alert_id"),
+                cutouts=item.get("cutouts"),
+            )
+    except Exception as e:
+        log(f"Error ingesting alert {item['data'].get('objectId')}: {e}")
+
+
+async def _save_batch(items, log):
+    import sqlalchemy as sa
+
+    from baselayer.app.models import async_plain_session_factory
+
+    from ..models import User
+    from ._save import save_objects_as_candidates
+
+    try:
+        async with async_plain_session_factory() as session:
+            user = await session.scalar(sa.select(User).where(User.id == 1))
+            await save_objects_as_candidates(items, session, user)
+    except Exception as e:
+        # Don't let one poison alert wedge the stream: retry the batch alert by
+        # alert, so only the offending alerts are lost (and logged).
+        log(f"Error ingesting a batch of {len(items)} alerts ({e}); retrying singly")
+        for item in items:
+            await _save_one(item, log)
+
+
+async def run_kafka_ingestion(
+    broker, consumer, to_item, log, stop=None, max_messages=None, report=None
+):
+    """Drive a subscribed ``consumer`` until ``stop`` is set (or ``max_messages``
+    alerts are consumed), turning each decoded record into a save item with
+    ``to_item`` (``None`` to skip) and persisting it through the shared save
+    machinery. Closes the consumer on exit and returns the alert count.
+
+    A save item is a dict with ``data`` (standard alert object), ``survey``,
+    ``filter_ids`` and optionally ``passing_alert_id`` / ``cutouts``. With a
+    ``batch_size`` above 1 in ``altdata['kafka']``, each consumed batch is
+    persisted in a single transaction and its offsets committed only once that
+    transaction has landed (at-least-once; re-consumed alerts are deduped).
+
+    ``report``, if given, is called every ``REPORT_INTERVAL`` seconds (idle or
+    not) with ``{"alerts": count, "lag": consumer_lag}``: the heartbeat the
+    ingestion service's worker pool uses for health and lag reporting.
+    """
+    import asyncio
+    import time
+
+    kafka = (broker.altdata or {}).get("kafka") or {}
+    batch_size, linger = kafka_batch_config(kafka)
+
+    count = 0
+    last_report = 0.0
+    try:
+        while not (stop is not None and stop.is_set()):
+            if report is not None and time.monotonic() - last_report >= REPORT_INTERVAL:
+                last_report = time.monotonic()
+                try:
+                    lag = await asyncio.to_thread(consumer_lag, consumer)
+                except Exception as e:
+                    log(f"Failed to compute Kafka consumer lag: {e}")
+                    lag = None
+                report({"alerts": count, "lag": lag})
+            n_messages, records = await consume_records(
+                consumer, batch_size, linger, log
+            )
+            if not n_messages:
+                continue
+            items = [item for item in map(to_item, records) if item is not None]
+            if batch_size == 1:
+                for item in items:
+                    await _save_one(item, log)
+            else:
+                if items:
+                    await _save_batch(items, log)
+                try:
+                    await asyncio.to_thread(consumer.commit, asynchronous=False)
+                except Exception as e:
+                    log(f"Failed to commit Kafka offsets: {e}")
+            count += len(records)
+            if max_messages is not None and count >= max_messages:
+                break
+    finally:
+        consumer.close()
+    return count
@@ -153,16 +153,9 @@ async def fetch_broker_groups(cls, broker, object_id, survey, session):
     """
     import asyncio
 
-    import sqlalchemy as sa
-
-    from ..models import Instrument
-    from ._save import build_photometry_groups, programid_to_stream_ids
+    from ._save import _instrument_id, build_photometry_groups, programid_to_stream_ids
 
-    instrument_id = await session.scalar(
-        sa.select(Instrument.id).where(Instrument.name == survey)
-    )
-    if instrument_id is None:
-        raise ValueError(f"Instrument '{survey}' not found in the database.")
+    instrument_id = await _instrument_id(session, survey)
     programid2streamid = await programid_to_stream_ids(session)
 
     loop = asyncio.get_event_loop()
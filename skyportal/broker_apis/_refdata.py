@@ -0,0 +1,126 @@
+"""Per-process reference-data cache for the broker save path.
+
+Every ingested alert needs the survey's Instrument id, the (survey, programid)
+-> Stream map and the criteria of the Filters it passed. These change rarely
+(an admin edits a stream or a filter), so re-selecting them per alert is pure
+overhead. They are cached here as plain values (never ORM instances, which
+would be bound to the session that loaded them):
+
+* Entries expire after ``brokers.reference_data_ttl`` seconds (default 60),
+  which bounds staleness across processes: the ingestion service does not see
+  edits made by the app processes.
+* Within a process, inserting/updating/deleting an Instrument, Stream or Filter
+  drops the matching entries immediately (SQLAlchemy mapper events).
+* Hit/miss counters are exposed via :meth:`ReferenceDataCache.stats`.
+"""
+
+import time
+
+DEFAULT_TTL = 60  # seconds
+
+
+class ReferenceDataCache:
+    """TTL cache keyed by ``(kind, key)``; ``kind`` is the invalidation unit."""
+
+    def __init__(self, ttl=None):
+        self._ttl = ttl
+        self._entries = {}  # (kind, key) -> (value, expires_at)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl(self):
+        if self._ttl is None:
+            from baselayer.app.env import load_env
+
+            _, cfg = load_env()
+            self._ttl = float(cfg.get("brokers.reference_data_ttl", DEFAULT_TTL))
+        return self._ttl
+
+    def _lookup(self, entry_key, now):
+        entry = self._entries.get(entry_key)
+        if entry is not None and entry[1] > now:
+            self.hits += 1
+            return True, entry[0]
+        self.misses += 1
+        return False, None
+
+    async def get(self, kind, key, loader):
+        """Cached value for ``(kind, key)``; on a miss, ``await loader()`` and
+        cache its result (a raising loader caches nothing)."""
+        _register_invalidation()
+        found, value = self._lookup((kind, key), time.monotonic())
+        if found:
+            return value
+        value = await loader()
+        self._entries[(kind, key)] = (value, time.monotonic() + self.ttl)
+        return value
+
+    async def get_many(self, kind, keys, loader):
+        """Cached ``{key: value}`` for ``keys``; the misses are resolved with a
+        single ``await loader(missing_keys)`` returning a dict (keys it omits
+        cache as None)."""
+        _register_invalidation()
+        now = time.monotonic()
+        values, missing = {}, []
+        for key in keys:
+            found, value = self._lookup((kind, key), now)
+            if found:
+                values[key] = value
+            else:
+                missing.append(key)
+        if missing:
+            loaded = await loader(missing)
+            expires_at = time.monotonic() + self.ttl
+            for key in missing:
+                values[key] = loaded.get(key)
+                self._entries[(kind, key)] = (values[key], expires_at)
+        return values
+
+    def invalidate(self, *kinds):
+        """Drop every entry of the given kinds (all entries if none given)."""
+        if not kinds:
+            self._entries.clear()
+            return
+        for entry_key in [k for k in self._entries if k[0] in kinds]:
+            self._entries.pop(entry_key, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+REFERENCE_DATA = ReferenceDataCache()
+
+_registered = False
+
+
+def _register_invalidation():
+    """Hook the model write events once. Deferred to first use: broker_apis is
+    imported by the models package, so the models aren't importable at module
+    import time."""
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    from sqlalchemy import event
+
+    from ..models import Filter, Instrument, Stream
+
+    for model, kind in (
+        (Instrument, "instrument"),
+        (Stream, "stream"),
+        (Filter, "filter"),
+    ):
+
+        def _invalidate(mapper, connection, target, kind=kind):
+            REFERENCE_DATA.invalidate(kind)
+
+        for event_name in ("after_insert", "after_update", "after_delete"):
+            event.listen(model, event_name, _invalidate)
@@ -9,6 +9,8 @@ provider's ``save_as_source`` should fetch the object and delegate here.
 
 from baselayer.log import make_log
 
+from ._refdata import REFERENCE_DATA
+
 log = make_log("broker/save")
 
 # AB zeropoint per survey (psfFlux is in Jy after the 1e-9 scaling below).
@@ -81,37 +83,74 @@ def _passes_criteria(data, criteria):
     return True
 
 
-async def _filters_passing_criteria(session, filter_ids, data):
-    """Subset of ``filter_ids`` whose Filter criteria the alert satisfies (a
-    filter with no criteria always passes)."""
+async def _filter_criteria(session, filter_ids):
+    """Map filter id -> its ``altdata['criteria']`` block (None when unset),
+    through the reference-data cache."""
     import sqlalchemy as sa
 
     from ..models import Filter
 
-    rows = (
-        await session.scalars(sa.select(Filter).where(Filter.id.in_(filter_ids)))
-    ).all()
-    criteria_by_id = {f.id: (f.altdata or {}).get("criteria") for f in rows}
+    async def load(missing):
+        rows = (
+            await session.scalars(sa.select(Filter).where(Filter.id.in_(missing)))
+        ).all()
+        return {f.id: (f.altdata or {}).get("criteria") for f in rows}
+
+    return await REFERENCE_DATA.get_many("filter", filter_ids, load)
+
+
+async def _filters_passing_criteria(session, filter_ids, data):
+    """Subset of ``filter_ids`` whose Filter criteria the alert satisfies (a
+    filter with no criteria always passes)."""
+    criteria_by_id = await _filter_criteria(session, filter_ids)
     return [
         fid for fid in filter_ids if _passes_criteria(data, criteria_by_id.get(fid))
     ]
 
 
+async def _instrument_id(session, survey):
+    """The id of the Instrument named after ``survey`` (raises if missing),
+    through the reference-data cache."""
+    import sqlalchemy as sa
+
+    from ..models import Instrument
+
+    async def load():
+        instrument_id = await session.scalar(
+            sa.select(Instrument.id).where(Instrument.name == survey)
+        )
+        if instrument_id is None:
+            raise ValueError(f"Instrument '{survey}' not found in the database.")
+        return instrument_id
+
+    return await REFERENCE_DATA.get("instrument", survey, load)
+
+
 async def programid_to_stream_ids(session):
-    """Map (survey, programid) -> [stream_id] from each Stream's altdata."""
+    """Map (survey, programid) -> [stream_id] from each Stream's altdata,
+    through the reference-data cache (treat the result as read-only)."""
     import sqlalchemy as sa
 
     from ..models import Stream
 
-    streams = (await session.scalars(sa.select(Stream))).all()
-    mapper: dict = {}
-    for stream in streams:
-        altdata = stream.altdata or {}
-        if "collection" not in altdata or "selector" not in altdata:
-            continue
-        key = (altdata["collection"].split("_")[0], max(altdata["selector"]))
-        mapper.setdefault(key, []).append(stream.id)
-    return mapper
+    async def load():
+        streams = (await session.scalars(sa.select(Stream))).all()
+        mapper: dict = {}
+        for stream in streams:
+            altdata = stream.altdata or {}
+            if "collection" not in altdata or "selector" not in altdata:
+                continue
+            key = (altdata["collection"].split("_")[0], max(altdata["selector"]))
+            mapper.setdefault(key, []).append(stream.id)
+        return mapper
+
+    return await REFERENCE_DATA.get("stream", "programid_map", load)
+
+
+# Below this many points, numpy's per-call overhead outweighs the vectorization.
+_COLUMNAR_MIN_POINTS = 64
+
+_PHOTOMETRY_ARRAYS = ("prv_candidates", "prv_nondetections", "fp_hists")
 
 
 def build_photometry_groups(object_id, survey, data, instrument_id, programid2streamid):
@@ -121,13 +160,135 @@ def build_photometry_groups(object_id, survey, data, instrument_id, programid2st
     Pure (no I/O), so the persisting path and the read-only passthrough
     (``_photometry.py``) share one transform and cannot drift: what a
     passthrough displays is exactly what a save would have written.
-    """
-    import numpy as np
 
+    Long histories (LSST) go through a columnar NumPy implementation; short
+    ones through the point-by-point one. Both produce identical output.
+    """
     zp = ZP_PER_SURVEY.get(survey)
     if zp is None:
         raise ValueError(f"No zeropoint configured for survey '{survey}'.")
 
+    n_points = sum(len(data.get(name) or []) for name in _PHOTOMETRY_ARRAYS)
+    if n_points < _COLUMNAR_MIN_POINTS:
+        return _build_photometry_groups_pointwise(
+            object_id, survey, zp, data, instrument_id, programid2streamid
+        )
+    return _build_photometry_groups_columnar(
+        object_id, survey, zp, data, instrument_id, programid2streamid
+    )
+
+
+def _build_photometry_groups_columnar(
+    object_id, survey, zp, data, instrument_id, programid2streamid
+):
+    """Columnar ``build_photometry_groups``: the alert's points are transposed
+    into NumPy columns once, then the NaN checks, flux scaling and mag -> flux
+    conversion run over whole arrays."""
+    import numpy as np
+
+    # One pass over the points; zip(*rows) transposes at C speed.
+    rows = [
+        (
+            p.get("jd"),
+            p.get("band"),
+            p.get("psfFlux"),
+            p.get("psfFluxErr"),
+            p.get("magpsf"),
+            p.get("sigmapsf"),
+            p.get("ra"),
+            p.get("dec"),
+            p.get("programid", 1),
+        )
+        for name in _PHOTOMETRY_ARRAYS
+        for p in (data.get(name) or [])
+    ]
+    if not rows:
+        return {}
+
+    def objects(values):
+        # values as-is (None stays None), in an array indexable by masks
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        return array
+
+    jd, band, psf_flux, psf_flux_err, mag, mag_err, ra, dec, programid = (
+        objects(column) for column in zip(*rows)
+    )
+
+    # Flux space (psfFlux, e.g. BOOM/babamul) or magnitude space (magpsf, e.g.
+    # Lasair); points with neither, or without jd/band, are dropped.
+    is_flux = np.not_equal(psf_flux_err, None)
+    is_mag = ~is_flux & np.not_equal(mag, None) & np.not_equal(mag_err, None)
+    keep = np.not_equal(jd, None) & np.not_equal(band, None) & (is_flux | is_mag)
+    if not keep.any():
+        return {}
+    is_flux, is_mag = is_flux[keep], is_mag[keep]
+
+    flux_is_none = np.equal(psf_flux[keep], None) & is_flux
+    flux = psf_flux[keep].astype(float)  # None -> NaN
+    fluxerr = psf_flux_err[keep].astype(float) * 1e-9
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scaled = ~np.isnan(flux)
+        flux[scaled] *= 1e-9
+        # S/N <= 3 on a measurable error -> upper limit
+        flux[scaled & ~np.isnan(fluxerr) & (np.abs(flux) / fluxerr <= 3)] = np.nan
+
+    # Magnitude space: convert with the survey zeropoint so it flows through the
+    # flux path. mag = -2.5*log10(flux) + zp, so flux = 10**(-0.4*(mag - zp)).
+    # (The power itself goes through Python floats: NumPy's SIMD pow can differ
+    # from libm in the last ulp, and the output must match the pointwise path.)
+    exponents = -0.4 * (mag[keep][is_mag].astype(float) - zp)
+    mag_flux = np.array([10.0**e for e in exponents.tolist()], dtype=float)
+    flux[is_mag] = mag_flux
+    fluxerr[is_mag] = (
+        mag_flux * mag_err[keep][is_mag].astype(float) * 0.9210340371976184
+    )
+
+    flux_out = flux.astype(object)
+    flux_out[flux_is_none] = None
+    mjd = jd[keep].astype(float) - 2400000.5
+    # Normalize each distinct band once (see _normalize_band: "ztfg" and "g"
+    # both give "ztfg").
+    band = band[keep]
+    filters = objects([None] * len(band))
+    for b in set(band.tolist()):
+        filters[band == b] = f"{survey.lower()}{_normalize_band(b)}"
+    ra, dec = ra[keep], dec[keep]
+
+    indices_by_key = {}
+    programids = programid[keep].tolist() if survey == "ZTF" else [1] * len(band)
+    for i, pid in enumerate(programids):
+        indices_by_key.setdefault((survey, pid), []).append(i)
+
+    photometry_data = {}
+    for key, indices in indices_by_key.items():
+        stream_ids = programid2streamid.get(key)
+        if not stream_ids:
+            continue
+        idx = np.array(indices)
+        photometry_data[key] = {
+            "obj_id": object_id,
+            "stream_ids": stream_ids,
+            "instrument_id": instrument_id,
+            "mjd": mjd[idx].tolist(),
+            "filter": filters[idx].tolist(),
+            "magsys": ["ab"] * len(idx),
+            "ra": ra[idx].tolist(),
+            "dec": dec[idx].tolist(),
+            "flux": flux_out[idx].tolist(),
+            "fluxerr": fluxerr[idx].tolist(),
+            "zp": [zp] * len(idx),
+        }
+    return photometry_data
+
+
+def _build_photometry_groups_pointwise(
+    object_id, survey, zp, data, instrument_id, programid2streamid
+):
+    """Point-by-point ``build_photometry_groups``: cheaper than the columnar path
+    for short histories, and the reference the columnar path must match."""
+    import numpy as np
+
     photometry_data: dict = {}
     for array_name in ["prv_candidates", "prv_nondetections", "fp_hists"]:
         for phot in data.get(array_name) or []:
@@ -222,7 +383,7 @@ async def _ingest_object(
     import sqlalchemy as sa
 
     from ..handlers.api.photometry import add_external_photometry
-    from ..models import Candidate, Group, Instrument, Obj, Source
+    from ..models import Candidate, Group, Obj, Source
     from ..utils.naive_datetime import utcnow_naive
 
     object_id = data["objectId"]
@@ -236,12 +397,7 @@ async def _ingest_object(
         if not filter_ids and not group_ids:
             return {"id": object_id}
 
-    instrument_id = await session.scalar(
-        sa.select(Instrument.id).where(Instrument.name == survey)
-    )
-    if instrument_id is None:
-        raise ValueError(f"Instrument '{survey}' not found in the database.")
-
+    instrument_id = await _instrument_id(session, survey)
     programid2streamid = await programid_to_stream_ids(session)
 
     obj = await session.scalar(sa.select(Obj).where(Obj.id == object_id))
@@ -340,3 +496,149 @@ async def save_object_as_candidate(
         passing_alert_id=passing_alert_id,
         cutouts=cutouts,
     )
+
+
+async def save_objects_as_candidates(items, session, user):
+    """Batched ingestion save: the many-alert counterpart of
+    ``save_object_as_candidate``, persisting a whole consumer batch in one
+    transaction.
+
+    Reference data (filter criteria, instruments, the stream map) is loaded once
+    per batch, Objs and Candidates are written with one multi-row INSERT each,
+    and photometry is ingested per alert inside a savepoint so one bad alert
+    does not roll back the rest. Thumbnails are rendered after the commit
+    (``post_thumbnail`` commits on its own).
+
+    Parameters
+    ----------
+    items : list of dict
+        One entry per alert, with ``data`` (standard alert object), ``survey``,
+        ``filter_ids`` and optionally ``passing_alert_id`` / ``cutouts``.
+
+    Returns
+    -------
+    list of str
+        Ids of the objects registered as Candidates (alerts failing every
+        filter's criteria are dropped, as in the single-alert path).
+    """
+    import sqlalchemy as sa
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    from ..handlers.api.photometry import add_external_photometry
+    from ..models import Candidate, Obj
+    from ..utils.naive_datetime import utcnow_naive
+
+    criteria_by_id = await _filter_criteria(
+        session, sorted({fid for item in items for fid in item["filter_ids"]})
+    )
+    instrument_ids = {}
+    kept = []
+    for item in items:
+        data, survey = item["data"], item["survey"]
+        filter_ids = [
+            fid
+            for fid in item["filter_ids"]
+            if _passes_criteria(data, criteria_by_id.get(fid))
+        ]
+        if not filter_ids:
+            continue
+        if survey not in instrument_ids:
+            try:
+                instrument_ids[survey] = await _instrument_id(session, survey)
+            except ValueError as e:
+                instrument_ids[survey] = None
+                log(str(e))
+        if instrument_ids[survey] is None:
+            continue
+        kept.append({**item, "filter_ids": filter_ids})
+    if not kept:
+        return []
+
+    programid2streamid = await programid_to_stream_ids(session)
+
+    # Objs: first alert wins for a new object, existing objects are left as is
+    # (exactly what the single-alert path does).
+    obj_rows = {}
+    for item in kept:
+        cand = item["data"].get("candidate") or {}
+        obj_rows.setdefault(
+            item["data"]["objectId"],
+            {
+                "id": item["data"]["objectId"],
+                "ra": cand.get("ra"),
+                "dec": cand.get("dec"),
+                "ra_dis": cand.get("ra"),
+                "dec_dis": cand.get("dec"),
+                "score": cand.get("drb"),
+                "origin": item["survey"],
+            },
+        )
+    await session.execute(
+        pg_insert(Obj)
+        .values(list(obj_rows.values()))
+        .on_conflict_do_nothing(index_elements=["id"])
+    )
+
+    # Candidates, deduped on the passing alert against the DB and the batch.
+    seen = set(
+        (
+            await session.execute(
+                sa.select(
+                    Candidate.obj_id, Candidate.filter_id, Candidate.passing_alert_id
+                ).where(Candidate.obj_id.in_(list(obj_rows)))
+            )
+        ).all()
+    )
+    candidate_rows = []
+    for item in kept:
+        for fid in item["filter_ids"]:
+            key = (item["data"]["objectId"], fid, item.get("passing_alert_id"))
+            if key in seen:
+                continue
+            seen.add(key)
+            candidate_rows.append(
+                {
+                    "obj_id": key[0],
+                    "filter_id": fid,
+                    "passed_at": utcnow_naive(),
+                    "passing_alert_id": key[2],
+                    "uploader_id": user.id,
+                }
+            )
+    if candidate_rows:
+        await session.execute(
+            pg_insert(Candidate).values(candidate_rows).on_conflict_do_nothing()
+        )
+
+    for item in kept:
+        object_id, survey = item["data"]["objectId"], item["survey"]
+        photometry_data = build_photometry_groups(
+            object_id,
+            survey,
+            item["data"],
+            instrument_ids[survey],
+            programid2streamid,
+        )
+        try:
+            async with session.begin_nested():
+                for pd in photometry_data.values():
+                    if pd["mjd"]:
+                        await add_external_photometry(pd, user, session)
+        except Exception as e:
+            log(f"Failed to add photometry for {object_id}: {e}")
+
+    await session.commit()
+
+    for item in kept:
+        if item.get("cutouts"):
+            object_id = item["data"]["objectId"]
+            try:
+                from ._thumbnails import add_thumbnails
+
+                await add_thumbnails(
+                    object_id, item["cutouts"], item["survey"], session, user_id=user.id
+                )
+            except Exception as e:
+                log(f"Failed to add thumbnails for {object_id}: {e}")
+
+    return [item["data"]["objectId"] for item in kept]
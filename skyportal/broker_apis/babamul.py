@@ -46,6 +46,8 @@ class BABAMULBROKER(BrokerAPI):
     """
 
     surveys = ["ZTF", "LSST"]
+    # Kafka consumer group: ingestion can be spread over several workers.
+    parallel_ingestion = True
 
     form_json_schema_config = {
         "type": "object",
@@ -104,19 +106,13 @@ class BABAMULBROKER(BrokerAPI):
         """Consume babamul's Kafka stream (Avro ZTF alerts) and ingest each alert
         via the shared transform, registering Candidates under ``filter_ids``.
         Config lives in ``broker.altdata["kafka"]`` (host/port/group_id/username/
-        password/sasl_mechanism/topics) plus ``filter_ids`` (skyportal Filter ids
-        the alerts pass) and ``survey``.
+        password/sasl_mechanism/topics, and batch_size/linger for batched
+        ingestion) plus ``filter_ids`` (skyportal Filter ids the alerts pass) and
+        ``survey``.
         """
-        import asyncio
+        from confluent_kafka import Consumer
 
-        import sqlalchemy as sa
-        from confluent_kafka import Consumer, KafkaError
-
-        from baselayer.app.models import async_plain_session_factory
-
-        from ..models import User
-        from ._kafka import kafka_consumer_config, read_avro
-        from ._save import save_object_as_candidate
+        from ._kafka import kafka_consumer_config, run_kafka_ingestion
 
         altdata = broker.altdata or {}
         kafka = altdata.get("kafka") or {}
@@ -130,40 +126,25 @@ class BABAMULBROKER(BrokerAPI):
         consumer.subscribe(topics)
         log(f"babamul ingestion (broker {broker.id}): subscribed to {topics}")
 
-        count = 0
-        try:
-            while not (stop is not None and stop.is_set()):
-                # poll is blocking; offload so one event loop can host several brokers.
-                msg = await asyncio.to_thread(consumer.poll, 2.0)
-                if msg is None:
-                    continue
-                if msg.error():
-                    if msg.error().code() != KafkaError._PARTITION_EOF:
-                        log(f"Kafka error: {msg.error()}")
-                    continue
-                record = read_avro(msg.value())
-                if record is None:
-                    continue
-                candid = record.get("candid") or (record.get("candidate") or {}).get(
-                    "candid"
-                )
-                try:
-                    async with async_plain_session_factory() as session:
-                        user = await session.scalar(sa.select(User).where(User.id == 1))
-                        await save_object_as_candidate(
-                            record,
-                            survey,
-                            session,
-                            user,
-                            filter_ids,
-                            passing_alert_id=candid,
-                        )
-                except Exception as e:
-                    log(f"Error ingesting alert {record.get('objectId')}: {e}")
-                count += 1
-                if max_messages is not None and count >= max_messages:
-                    break
-        finally:
-            consumer.close()
+        def to_item(record):
+            candid = record.get("candid") or (record.get("candidate") or {}).get(
+                "candid"
+            )
+            return {
+                "data": record,
+                "survey": survey,
+                "filter_ids": filter_ids,
+                "passing_alert_id": candid,
+            }
+
+        count = await run_kafka_ingestion(
+            broker,
+            consumer,
+            to_item,
+            log,
+            stop=stop,
+            max_messages=max_messages,
+            report=kwargs.get("report"),
+        )
         log(f"babamul ingestion (broker {broker.id}): consumed {count} alerts")
         return count
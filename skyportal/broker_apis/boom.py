@@ -228,6 +228,8 @@ class BOOMBROKER(BrokerAPI):
     filter_kind = "pipeline"
     # cone_search returns BOOM's reference catalogs (Gaia/PS1/AllWISE, ...).
     cross_match_catalogs = True
+    # Kafka consumer group: ingestion can be spread over several workers.
+    parallel_ingestion = True
 
     form_json_schema_config = {
         "type": "object",
@@ -369,18 +371,16 @@ class BOOMBROKER(BrokerAPI):
         """Consume BOOM's Kafka filter-result streams (Avro) and register each
         alert as a Candidate under the skyportal Filters mapped to the BOOM filter
         ids it passed (``Filter.altdata['boom']['filter_id']``), falling back to
-        ``broker.altdata['filter_ids']``. Kafka config in ``broker.altdata['kafka']``.
+        ``broker.altdata['filter_ids']``. Kafka config (including batch_size/
+        linger for batched ingestion) in ``broker.altdata['kafka']``.
         """
-        import asyncio
-
         import sqlalchemy as sa
-        from confluent_kafka import Consumer, KafkaError
+        from confluent_kafka import Consumer
 
         from baselayer.app.models import async_plain_session_factory
 
-        from ..models import Filter, User
-        from ._kafka import kafka_consumer_config, read_avro
-        from ._save import save_object_as_candidate
+        from ..models import Filter
+        from ._kafka import kafka_consumer_config, run_kafka_ingestion
 
         altdata = broker.altdata or {}
         kafka = altdata.get("kafka") or {}
@@ -401,54 +401,35 @@ class BOOMBROKER(BrokerAPI):
                 if boom and boom.get("filter_id") is not None:
                     boom_map[boom["filter_id"]] = f.id
 
-        count = 0
-        try:
-            while not (stop is not None and stop.is_set()):
-                # poll is blocking; offload so one loop can host several brokers.
-                msg = await asyncio.to_thread(consumer.poll, 2.0)
-                if msg is None:
-                    continue
-                if msg.error():
-                    if msg.error().code() != KafkaError._PARTITION_EOF:
-                        log(f"Kafka error: {msg.error()}")
-                    continue
-                record = read_avro(msg.value())
-                if record is None:
-                    continue
-
-                survey = _record_survey(record)
-                data = _normalize_boom_alert(record)
-                # Route to the skyportal Filters mapped to the passing BOOM filters.
-                passed = [
-                    boom_map[f["filter_id"]]
-                    for f in (record.get("filters") or [])
-                    if f.get("filter_id") in boom_map
-                ]
-                filter_ids = passed or default_filter_ids
-                cutouts = {
-                    k: record[k]
-                    for k in ("cutoutScience", "cutoutTemplate", "cutoutDifference")
-                    if record.get(k) is not None
-                } or None
-                try:
-                    async with async_plain_session_factory() as session:
-                        user = await session.scalar(sa.select(User).where(User.id == 1))
-                        await save_object_as_candidate(
-                            data,
-                            survey,
-                            session,
-                            user,
-                            filter_ids,
-                            passing_alert_id=record.get("candid"),
-                            cutouts=cutouts,
-                        )
-                except Exception as e:
-                    log(f"Error ingesting alert {record.get('objectId')}: {e}")
-                count += 1
-                if max_messages is not None and count >= max_messages:
-                    break
-        finally:
-            consumer.close()
+        def to_item(record):
+            # Route to the skyportal Filters mapped to the passing BOOM filters.
+            passed = [
+                boom_map[f["filter_id"]]
+                for f in (record.get("filters") or [])
+                if f.get("filter_id") in boom_map
+            ]
+            cutouts = {
+                k: record[k]
+                for k in ("cutoutScience", "cutoutTemplate", "cutoutDifference")
+                if record.get(k) is not None
+            } or None
+            return {
+                "data": _normalize_boom_alert(record),
+                "survey": _record_survey(record),
+                "filter_ids": passed or default_filter_ids,
+                "passing_alert_id": record.get("candid"),
+                "cutouts": cutouts,
+            }
+
+        count = await run_kafka_ingestion(
+            broker,
+            consumer,
+            to_item,
+            log,
+            stop=stop,
+            max_messages=max_messages,
+            report=kwargs.get("report"),
+        )
         log(f"BOOM ingestion (broker {broker.id}): consumed {count} alerts")
         return count
 
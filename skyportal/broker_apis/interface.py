@@ -248,3 +248,9 @@ class BrokerAPI(_Base):
     # cross-match overlay. Providers whose cone_search returns their own alert
     # objects (Lasair, Fink) leave this False so the overlay doesn't query them.
     cross_match_catalogs = False
+
+    # whether run_ingestion may run as several concurrent worker processes. Only
+    # true for consumer-group transports (Kafka), where the broker splits the
+    # partitions between workers; a REST poller would just ingest everything N
+    # times. See ``altdata['kafka']['workers']`` in ``_kafka.py``.
+    parallel_ingestion = False
@@ -13,6 +13,7 @@ from baselayer.log import make_log
 
 from .broker_apis import BROKERS
 from .facility_apis import APIS, LISTENERS
+from .utils.bandpasses import register_bandpass
 
 log = make_log("enum_types")
 
@@ -45,7 +46,7 @@ for additional_bandpasses in cfg.get("additional_bandpasses", []):
         log(f"Could not make bandpass for {name}: {e}")
         continue
 
-    sncosmo.registry.register(band)
+    register_bandpass(band)
     additional_bandpasses_names.append(name)
 
 if len(additional_bandpasses_names) > 0:
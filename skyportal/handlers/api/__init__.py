@@ -1,248 +1,253 @@
-from .acls import ACLHandler, UserACLHandler
-from .allocation import (
-    AllocationHandler,
-    AllocationObservationPlanHandler,
-    AllocationReportHandler,
+# The handlers are imported on first access, see skyportal/handlers/lazy.py
+from ..lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(
+    __name__,
+    {
+        ".acls": ["ACLHandler", "UserACLHandler"],
+        ".allocation": [
+            "AllocationHandler",
+            "AllocationObservationPlanHandler",
+            "AllocationReportHandler",
+        ],
+        ".analysis": [
+            "AnalysisHandler",
+            "AnalysisProductsHandler",
+            "AnalysisServiceHandler",
+            "AnalysisUploadOnlyHandler",
+            "DefaultAnalysisHandler",
+        ],
+        ".annotation": ["AnnotationHandler"],
+        ".annotation_services": [
+            "DatalabQueryHandler",
+            "GaiaQueryHandler",
+            "IRSAQueryWISEHandler",
+            "PS1QueryHandler",
+            "VizierQueryHandler",
+        ],
+        ".broker": [
+            "BrokerAlertsHandler",
+            "BrokerConeSearchHandler",
+            "BrokerCutoutsHandler",
+            "BrokerFilterModulesHandler",
+            "BrokerFiltersHandler",
+            "BrokerFilterTestHandler",
+            "BrokerFilterValidateHandler",
+            "BrokerHandler",
+            "BrokerPhotometryHandler",
+            "BrokerSaveHandler",
+            "BrokerSurveyPhotometryHandler",
+        ],
+        ".broker_apis": ["BrokerAPIsHandler"],
+        ".candidate.candidate": ["BulkDeleteCandidatesHandler", "CandidateHandler"],
+        ".candidate.candidate_filter": ["CandidateFilterHandler"],
+        ".candidate.scan_report": ["ScanReportHandler"],
+        ".candidate.scan_report_item": ["ScanReportItemHandler"],
+        ".catalog_services": [
+            "CatalogQueryHandler",
+            "GaiaPhotometricAlertsQueryHandler",
+            "SwiftLSXPSQueryHandler",
+        ],
+        ".classification": [
+            "ClassificationHandler",
+            "ClassificationVotesHandler",
+            "ObjClassificationHandler",
+            "ObjClassificationQueryHandler",
+        ],
+        ".color_mag": ["ObjColorMagHandler"],
+        ".comment": ["CommentAttachmentHandler", "CommentHandler"],
+        ".comment_attachment": ["CommentAttachmentUpdateHandler"],
+        ".config_handler": ["ConfigHandler"],
+        ".db_stats": ["StatsHandler"],
+        ".earthquake": [
+            "EarthquakeHandler",
+            "EarthquakeMeasurementHandler",
+            "EarthquakePredictionHandler",
+            "EarthquakeStatusHandler",
+        ],
+        ".enum_types": ["EnumTypesHandler"],
+        ".facility_listener": ["FacilityMessageHandler"],
+        ".filter": ["FilterHandler"],
+        ".followup_apis": ["FollowupAPIsHandler"],
+        ".followup_request": [
+            "AssignmentHandler",
+            "DefaultFollowupRequestHandler",
+            "FollowupRequestCommentHandler",
+            "FollowupRequestHandler",
+            "FollowupRequestPrioritizationHandler",
+            "FollowupRequestSchedulerHandler",
+            "FollowupRequestWatcherHandler",
+        ],
+        ".galaxy": [
+            "GalaxyASCIIFileHandler",
+            "GalaxyCatalogHandler",
+            "GalaxyGladeHandler",
+            "ObjHostHandler",
+        ],
+        ".gcn": [
+            "DefaultGcnTagHandler",
+            "GcnEventAliasesHandler",
+            "GcnEventCatalogQueryHandler",
+            "GcnEventCrossmatchHandler",
+            "GcnEventHandler",
+            "GcnEventInstrumentFieldHandler",
+            "GcnEventNoticeDownloadHandler",
+            "GcnEventObservationPlanRequestsHandler",
+            "GcnEventPropertiesHandler",
+            "GcnEventSurveyEfficiencyHandler",
+            "GcnEventTagsHandler",
+            "GcnEventTriggerHandler",
+            "GcnEventUserHandler",
+            "GcnReportHandler",
+            "GcnSummaryHandler",
+            "LocalizationCrossmatchHandler",
+            "LocalizationDownloadHandler",
+            "LocalizationHandler",
+            "LocalizationNoticeHandler",
+            "LocalizationPropertiesHandler",
+            "LocalizationTagsHandler",
+            "ObjGcnEventHandler",
+        ],
+        ".gcn_gracedb": ["GcnGraceDBHandler"],
+        ".gcn_tach": ["GcnTachHandler"],
+        ".group": [
+            "GroupHandler",
+            "GroupStreamHandler",
+            "GroupUserHandler",
+            "GroupUsersFromOtherGroupsHandler",
+            "ObjGroupsHandler",
+        ],
+        ".group_admission_request": ["GroupAdmissionRequestHandler"],
+        ".healpix": ["HealpixUpdateHandler"],
+        ".instrument": ["InstrumentFieldHandler", "InstrumentHandler"],
+        ".instrument_log": [
+            "InstrumentLogExternalAPIHandler",
+            "InstrumentLogHandler",
+            "InstrumentStatusHandler",
+        ],
+        ".invalid": ["InvalidEndpointHandler"],
+        ".invitations": ["InvitationHandler"],
+        ".metrics": ["MetricsHandler"],
+        ".mmadetector": [
+            "MMADetectorHandler",
+            "MMADetectorSpectrumHandler",
+            "MMADetectorTimeIntervalHandler",
+        ],
+        ".moving_object": ["MovingObjectFollowupHandler"],
+        ".mpc": ["ObjMPCHandler"],
+        ".news_feed": ["NewsFeedHandler"],
+        ".obj": ["ObjHandler", "ObjPositionHandler"],
+        ".observation": [
+            "ObservationASCIIFileHandler",
+            "ObservationExternalAPIHandler",
+            "ObservationHandler",
+            "ObservationSimSurveyHandler",
+            "ObservationSimSurveyPlotHandler",
+            "ObservationTreasureMapHandler",
+        ],
+        ".observation_plan": [
+            "DefaultObservationPlanRequestHandler",
+            "ObservationPlanAirmassChartHandler",
+            "ObservationPlanCreateObservingRunHandler",
+            "ObservationPlanFieldsHandler",
+            "ObservationPlanGCNHandler",
+            "ObservationPlanGeoJSONHandler",
+            "ObservationPlanManualRequestHandler",
+            "ObservationPlanMovieHandler",
+            "ObservationPlanNameHandler",
+            "ObservationPlanObservabilityPlotHandler",
+            "ObservationPlanRequestHandler",
+            "ObservationPlanSimSurveyHandler",
+            "ObservationPlanSimSurveyPlotHandler",
+            "ObservationPlanSubmitHandler",
+            "ObservationPlanSurveyEfficiencyHandler",
+            "ObservationPlanTreasureMapHandler",
+            "ObservationPlanWorldmapPlotHandler",
+        ],
+        ".observingrun": ["ObservingRunBulkEditHandler", "ObservingRunHandler"],
+        ".phot_stat": [
+            "PhotStatAggregateHandler",
+            "PhotStatHandler",
+            "PhotStatUpdateHandler",
+        ],
+        ".photometric_series": ["PhotometricSeriesHandler"],
+        ".photometry": [
+            "BulkDeletePhotometryHandler",
+            "ObjPhotometryHandler",
+            "PhotometryHandler",
+            "PhotometryOriginHandler",
+            "PhotometryRangeHandler",
+        ],
+        ".photometry_request": ["PhotometryRequestHandler"],
+        ".photometry_validation": ["PhotometryValidationHandler"],
+        ".public_group": ["PublicGroupHandler"],
+        ".public_pages.public_release": ["PublicReleaseHandler"],
+        ".public_pages.public_source_page": ["PublicSourcePageHandler"],
+        ".recurring_api": ["RecurringAPIHandler"],
+        ".reminder": ["ReminderHandler"],
+        ".roles": ["RoleHandler", "UserRoleHandler"],
+        ".sharing": ["SharingHandler"],
+        ".sharing_service.sharing_service": ["SharingServiceHandler"],
+        ".sharing_service.sharing_service_coauthor": ["SharingServiceCoauthorHandler"],
+        ".sharing_service.sharing_service_group": ["SharingServiceGroupHandler"],
+        ".sharing_service.sharing_service_group_auto_publisher": [
+            "SharingServiceGroupAutoPublisherHandler"
+        ],
+        ".sharing_service.sharing_service_submission": [
+            "SharingServiceSubmissionHandler"
+        ],
+        ".shift": ["ShiftHandler", "ShiftSummary", "ShiftUserHandler"],
+        ".skymap_trigger": ["SkymapTriggerAPIHandler"],
+        ".source": [
+            "FinderChartFacilitiesHandler",
+            "SourceCopyPhotometryHandler",
+            "SourceFinderHandler",
+            "SourceHandler",
+            "SourceNotificationHandler",
+            "SourceObservabilityPlotHandler",
+            "SourceOffsetsHandler",
+            "SurveyThumbnailHandler",
+        ],
+        ".source_exists": ["SourceExistsHandler"],
+        ".source_groups": ["SourceGroupsHandler"],
+        ".source_labels": ["SourceLabelsHandler"],
+        ".sources_confirmed_in_gcn": [
+            "GCNsAssociatedWithSourceHandler",
+            "SourcesConfirmedInGCNHandler",
+        ],
+        ".spatial_catalog": ["SpatialCatalogASCIIFileHandler", "SpatialCatalogHandler"],
+        ".spectrum": [
+            "BulkSpectraHandler",
+            "ObjSpectraHandler",
+            "SpectrumASCIIFileHandler",
+            "SpectrumASCIIFileParser",
+            "SpectrumHandler",
+            "SpectrumRangeHandler",
+            "SyntheticPhotometryHandler",
+        ],
+        ".stream": ["StreamHandler", "StreamUserHandler"],
+        ".summary_query": ["SummaryQueryHandler"],
+        ".survey_efficiency": [
+            "DefaultSurveyEfficiencyRequestHandler",
+            "SurveyEfficiencyForObservationPlanHandler",
+            "SurveyEfficiencyForObservationsHandler",
+        ],
+        ".sysinfo": ["SysInfoHandler"],
+        ".tag": ["ObjTagHandler", "ObjTagOptionHandler"],
+        ".taxonomy": ["TaxonomyHandler"],
+        ".team": ["TeamHandler"],
+        ".telescope": ["TelescopeHandler"],
+        ".thumbnail": ["ThumbnailHandler", "ThumbnailPathHandler"],
+        ".tns.obj_tns": ["ObjTNSHandler"],
+        ".unsourced_finder": ["UnsourcedFinderHandler"],
+        ".user": [
+            "UserHandler",
+            "set_default_acls",
+            "set_default_group",
+            "set_default_role",
+        ],
+        ".user_obj_list": ["UserObjListHandler"],
+        ".weather": ["WeatherHandler"],
+        ".webhook": ["AnalysisWebhookHandler"],
+    },
 )
-from .analysis import (
-    AnalysisHandler,
-    AnalysisProductsHandler,
-    AnalysisServiceHandler,
-    AnalysisUploadOnlyHandler,
-    DefaultAnalysisHandler,
-)
-from .annotation import AnnotationHandler
-from .annotation_services import (
-    DatalabQueryHandler,
-    GaiaQueryHandler,
-    IRSAQueryWISEHandler,
-    PS1QueryHandler,
-    VizierQueryHandler,
-)
-from .broker import (
-    BrokerAlertsHandler,
-    BrokerConeSearchHandler,
-    BrokerCutoutsHandler,
-    BrokerFilterModulesHandler,
-    BrokerFiltersHandler,
-    BrokerFilterTestHandler,
-    BrokerFilterValidateHandler,
-    BrokerHandler,
-    BrokerPhotometryHandler,
-    BrokerSaveHandler,
-    BrokerSurveyPhotometryHandler,
-)
-from .broker_apis import BrokerAPIsHandler
-from .candidate.candidate import BulkDeleteCandidatesHandler, CandidateHandler
-from .candidate.candidate_filter import CandidateFilterHandler
-from .candidate.scan_report import ScanReportHandler
-from .candidate.scan_report_item import ScanReportItemHandler
-from .catalog_services import (
-    CatalogQueryHandler,
-    GaiaPhotometricAlertsQueryHandler,
-    SwiftLSXPSQueryHandler,
-)
-from .classification import (
-    ClassificationHandler,
-    ClassificationVotesHandler,
-    ObjClassificationHandler,
-    ObjClassificationQueryHandler,
-)
-from .color_mag import ObjColorMagHandler
-from .comment import CommentAttachmentHandler, CommentHandler
-from .comment_attachment import CommentAttachmentUpdateHandler
-from .config_handler import ConfigHandler
-from .db_stats import StatsHandler
-from .earthquake import (
-    EarthquakeHandler,
-    EarthquakeMeasurementHandler,
-    EarthquakePredictionHandler,
-    EarthquakeStatusHandler,
-)
-from .enum_types import EnumTypesHandler
-from .facility_listener import FacilityMessageHandler
-from .filter import FilterHandler
-from .followup_apis import FollowupAPIsHandler
-from .followup_request import (
-    AssignmentHandler,
-    DefaultFollowupRequestHandler,
-    FollowupRequestCommentHandler,
-    FollowupRequestHandler,
-    FollowupRequestPrioritizationHandler,
-    FollowupRequestSchedulerHandler,
-    FollowupRequestWatcherHandler,
-)
-from .galaxy import (
-    GalaxyASCIIFileHandler,
-    GalaxyCatalogHandler,
-    GalaxyGladeHandler,
-    ObjHostHandler,
-)
-from .gcn import (
-    DefaultGcnTagHandler,
-    GcnEventAliasesHandler,
-    GcnEventCatalogQueryHandler,
-    GcnEventHandler,
-    GcnEventInstrumentFieldHandler,
-    GcnEventNoticeDownloadHandler,
-    GcnEventObservationPlanRequestsHandler,
-    GcnEventPropertiesHandler,
-    GcnEventSurveyEfficiencyHandler,
-    GcnEventTagsHandler,
-    GcnEventTriggerHandler,
-    GcnEventUserHandler,
-    GcnReportHandler,
-    GcnSummaryHandler,
-    LocalizationCrossmatchHandler,
-    LocalizationDownloadHandler,
-    LocalizationHandler,
-    LocalizationNoticeHandler,
-    LocalizationPropertiesHandler,
-    LocalizationTagsHandler,
-    ObjGcnEventHandler,
-)
-from .gcn_gracedb import GcnGraceDBHandler
-from .gcn_tach import GcnTachHandler
-from .group import (
-    GroupHandler,
-    GroupStreamHandler,
-    GroupUserHandler,
-    GroupUsersFromOtherGroupsHandler,
-    ObjGroupsHandler,
-)
-from .group_admission_request import GroupAdmissionRequestHandler
-from .healpix import HealpixUpdateHandler
-from .instrument import InstrumentFieldHandler, InstrumentHandler
-from .instrument_log import (
-    InstrumentLogExternalAPIHandler,
-    InstrumentLogHandler,
-    InstrumentStatusHandler,
-)
-from .invalid import InvalidEndpointHandler
-from .invitations import InvitationHandler
-from .metrics import MetricsHandler
-from .mmadetector import (
-    MMADetectorHandler,
-    MMADetectorSpectrumHandler,
-    MMADetectorTimeIntervalHandler,
-)
-from .moving_object import MovingObjectFollowupHandler
-from .mpc import ObjMPCHandler
-from .news_feed import NewsFeedHandler
-from .obj import ObjHandler, ObjPositionHandler
-from .observation import (
-    ObservationASCIIFileHandler,
-    ObservationExternalAPIHandler,
-    ObservationHandler,
-    ObservationSimSurveyHandler,
-    ObservationSimSurveyPlotHandler,
-    ObservationTreasureMapHandler,
-)
-from .observation_plan import (
-    DefaultObservationPlanRequestHandler,
-    ObservationPlanAirmassChartHandler,
-    ObservationPlanCreateObservingRunHandler,
-    ObservationPlanFieldsHandler,
-    ObservationPlanGCNHandler,
-    ObservationPlanGeoJSONHandler,
-    ObservationPlanManualRequestHandler,
-    ObservationPlanMovieHandler,
-    ObservationPlanNameHandler,
-    ObservationPlanObservabilityPlotHandler,
-    ObservationPlanRequestHandler,
-    ObservationPlanSimSurveyHandler,
-    ObservationPlanSimSurveyPlotHandler,
-    ObservationPlanSubmitHandler,
-    ObservationPlanSurveyEfficiencyHandler,
-    ObservationPlanTreasureMapHandler,
-    ObservationPlanWorldmapPlotHandler,
-)
-from .observingrun import ObservingRunBulkEditHandler, ObservingRunHandler
-from .phot_stat import (
-    PhotStatAggregateHandler,
-    PhotStatHandler,
-    PhotStatUpdateHandler,
-)
-from .photometric_series import PhotometricSeriesHandler
-from .photometry import (
-    BulkDeletePhotometryHandler,
-    ObjPhotometryHandler,
-    PhotometryHandler,
-    PhotometryOriginHandler,
-    PhotometryRangeHandler,
-)
-from .photometry_request import PhotometryRequestHandler
-from .photometry_validation import PhotometryValidationHandler
-from .public_group import PublicGroupHandler
-from .public_pages.public_release import PublicReleaseHandler
-from .public_pages.public_source_page import PublicSourcePageHandler
-from .recurring_api import RecurringAPIHandler
-from .reminder import ReminderHandler
-from .roles import RoleHandler, UserRoleHandler
-from .sharing import SharingHandler
-from .sharing_service.sharing_service import SharingServiceHandler
-from .sharing_service.sharing_service_coauthor import (
-    SharingServiceCoauthorHandler,
-)
-from .sharing_service.sharing_service_group import (
-    SharingServiceGroupHandler,
-)
-from .sharing_service.sharing_service_group_auto_publisher import (
-    SharingServiceGroupAutoPublisherHandler,
-)
-from .sharing_service.sharing_service_submission import (
-    SharingServiceSubmissionHandler,
-)
-from .shift import ShiftHandler, ShiftSummary, ShiftUserHandler
-from .skymap_trigger import SkymapTriggerAPIHandler
-from .source import (
-    FinderChartFacilitiesHandler,
-    SourceCopyPhotometryHandler,
-    SourceFinderHandler,
-    SourceHandler,
-    SourceNotificationHandler,
-    SourceObservabilityPlotHandler,
-    SourceOffsetsHandler,
-    SurveyThumbnailHandler,
-)
-from .source_exists import SourceExistsHandler
-from .source_groups import SourceGroupsHandler
-from .source_labels import SourceLabelsHandler
-from .sources_confirmed_in_gcn import (
-    GCNsAssociatedWithSourceHandler,
-    SourcesConfirmedInGCNHandler,
-)
-from .spatial_catalog import SpatialCatalogASCIIFileHandler, SpatialCatalogHandler
-from .spectrum import (
-    BulkSpectraHandler,
-    ObjSpectraHandler,
-    SpectrumASCIIFileHandler,
-    SpectrumASCIIFileParser,
-    SpectrumHandler,
-    SpectrumRangeHandler,
-    SyntheticPhotometryHandler,
-)
-from .stream import StreamHandler, StreamUserHandler
-from .summary_query import SummaryQueryHandler
-from .survey_efficiency import (
-    DefaultSurveyEfficiencyRequestHandler,
-    SurveyEfficiencyForObservationPlanHandler,
-    SurveyEfficiencyForObservationsHandler,
-)
-from .sysinfo import SysInfoHandler
-from .tag import ObjTagHandler, ObjTagOptionHandler
-from .taxonomy import TaxonomyHandler
-from .team import TeamHandler
-from .telescope import TelescopeHandler
-from .thumbnail import ThumbnailHandler, ThumbnailPathHandler
-from .tns.obj_tns import ObjTNSHandler
-from .unsourced_finder import UnsourcedFinderHandler
-from .user import (
-    UserHandler,
-    set_default_acls,
-    set_default_group,
-    set_default_role,
-)
-from .user_obj_list import UserObjListHandler
-from .weather import WeatherHandler
-from .webhook import AnalysisWebhookHandler
@@ -53,6 +53,7 @@ from ....utils.data_access import (
     accessible_group_and_filter_ids,
     accessible_group_ids_async,
 )
+from ....utils.localization_tiles import in_credible_region, min_probdensity_async
 from ....utils.parse import get_page_and_n_per_page
 from ....utils.sizeof import SIZE_WARNING_THRESHOLD, sizeof
 from ...base import BaseHandler
@@ -1356,34 +1357,14 @@ class CandidateHandler(BaseHandler):
                             "def", LocalizationTile
                         )
 
-                cum_prob = (
-                    sa.func.sum(
-                        localizationtilescls.probdensity
-                        * localizationtilescls.healpix.area
-                    )
-                    .over(order_by=localizationtilescls.probdensity.desc())
-                    .label("cum_prob")
+                threshold = await min_probdensity_async(
+                    session, localization.id, localization_cumprob, localizationtilescls
                 )
 
-                localizationtile_subquery = (
-                    sa.select(localizationtilescls.probdensity, cum_prob).where(
-                        localizationtilescls.localization_id == localization.id
-                    )
-                ).subquery()
-
-                min_probdensity = (
-                    sa.select(
-                        sa.func.min(localizationtile_subquery.columns.probdensity)
-                    ).where(
-                        localizationtile_subquery.columns.cum_prob
-                        <= localization_cumprob
-                    )
-                ).scalar_subquery()
-
                 tile_ids_result = await session.scalars(
                     sa.select(localizationtilescls.id).where(
                         localizationtilescls.localization_id == localization.id,
-                        localizationtilescls.probdensity >= min_probdensity,
+                        in_credible_region(localizationtilescls, threshold),
                     )
                 )
                 tile_ids = tile_ids_result.all()
@@ -21,10 +21,14 @@ from ...models import (
     User,
 )
 from ..base import BaseHandler
+from ..response_cache import cached_response
 
 
 class StatsHandler(BaseHandler):
+    # Admin-only and approximate by design (see the photometry estimate), so
+    # one shared entry, refreshed by TTL only.
     @permissions(["System admin"])
+    @cached_response("db_stats", scope="global")
     async def get(self):
         """
         ---
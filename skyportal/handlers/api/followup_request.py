@@ -27,6 +27,8 @@ from astroplan.constraints import (
     AtNightConstraint,
     Constraint,
     MoonSeparationConstraint,
+    max_best_rescale,
+    min_best_rescale,
 )
 from astroplan.plots import plot_schedule_airmass
 from astroplan.scheduling import PriorityScheduler, Schedule, Transitioner
@@ -66,6 +68,12 @@ from ...models import (
     cosmo,
 )
 from ...models.schema import AssignmentSchema, FollowupRequestPost
+from ...utils.airmass import (
+    altitude,
+    apparent_coordinates,
+    local_sidereal_time,
+    sun_altitude,
+)
 from ...utils.naive_datetime import utcnow_naive
 from ...utils.offset import get_formatted_standards_list
 from ...utils.parse import get_list_typed, get_page_and_n_per_page, str_to_bool
@@ -1899,6 +1907,65 @@ class FollowupRequestCommentHandler(BaseHandler):
                 return self.error(f"Failed to update followup request comment: {e}")
 
 
+def _apparent_coordinates(times, targets):
+    """Apparent coordinates of the targets (radians), over the time grid."""
+    targets = targets.icrs
+    return apparent_coordinates(targets.ra.deg, targets.dec.deg, times)
+
+
+def _altitudes(times, observer, targets):
+    """Altitudes of the targets at the times (degrees), broadcast as astroplan
+    does, using the cached sidereal times of the time grid."""
+    location = observer.location
+    ras, decs = _apparent_coordinates(times, targets)
+    lst = local_sidereal_time(times, location.lon.deg)
+    return altitude(ras, decs, lst, location.lat.deg)
+
+
+class VectorizedAltitudeConstraint(AltitudeConstraint):
+    """`astroplan.constraints.AltitudeConstraint`, with the altitudes
+    of all the targets computed at once."""
+
+    def compute_constraint(self, times, observer, targets):
+        alt = _altitudes(times, observer, targets) * u.deg
+        if self.boolean_constraint:
+            return (self.min <= alt) & (alt <= self.max)
+        return max_best_rescale(alt, self.min, self.max)
+
+
+class VectorizedAirmassConstraint(AirmassConstraint):
+    """`astroplan.constraints.AirmassConstraint`, with the airmasses
+    of all the targets computed at once."""
+
+    def compute_constraint(self, times, observer, targets):
+        secz = 1.0 / np.sin(np.deg2rad(_altitudes(times, observer, targets)))
+        if self.boolean_constraint:
+            if self.min is None and self.max is None:
+                raise ValueError("No max and/or min specified in AirmassConstraint.")
+            mask = np.ones(secz.shape, dtype=bool)
+            if self.min is not None:
+                mask &= self.min <= secz
+            if self.max is not None:
+                mask &= secz <= self.max
+            return mask
+        if self.max is None:
+            raise ValueError("Cannot have a float AirmassConstraint if max is None.")
+        # values below 1 (below the horizon) should be disregarded
+        return min_best_rescale(
+            secz, 1 if self.min is None else self.min, self.max, less_than_min=0
+        )
+
+
+class VectorizedAtNightConstraint(AtNightConstraint):
+    """`astroplan.constraints.AtNightConstraint`, with the altitudes
+    of the Sun cached by time grid."""
+
+    def compute_constraint(self, times, observer, targets):
+        location = observer.location
+        solar_altitude = sun_altitude(times, location.lon.deg, location.lat.deg)
+        return solar_altitude * u.deg <= self.max_solar_altitude
+
+
 class HourAngleConstraint(Constraint):
     """
     Constrain the hour angle of a target.
@@ -1916,30 +1983,10 @@ class HourAngleConstraint(Constraint):
         self.max = max
 
     def compute_constraint(self, times, observer, targets):
-        jds = np.array([t.jd for t in times])
-        GMST = 18.697374558 + 24.06570982441908 * (jds - 2451545)
-        GMST = np.mod(GMST, 24)
-
-        lon = observer.location.lon.value / 15
-        if targets.size == 1:
-            lst = np.mod(GMST + lon, 24)
-            ras = np.tile([targets.ra.hour], len(jds))
-        else:
-            if len(jds) == 1:
-                lst = np.array([np.mod(GMST + lon, 24)] * len(targets)).flatten()
-                ras = np.array([target.ra.hour for target in targets]).flatten()
-            else:
-                lst = np.tile(np.mod(GMST + lon, 24), (len(targets), 1))
-                ras = np.tile(
-                    np.array([target.ra.hour for target in targets]).flatten(),
-                    (len(jds), 1),
-                ).T
-        has = np.mod(lst - ras, 24)
-        has = np.squeeze(has)
-
+        lst = local_sidereal_time(times, observer.location.lon.deg)
+        ras, _ = _apparent_coordinates(times, targets)
         # Use hours from -12 to 12
-        idx = np.where(has > 12)[0]
-        has[idx] = has[idx] - 24
+        has = np.mod(np.rad2deg(lst - ras) / 15 + 12, 24) - 12
 
         if self.min is None and self.max is not None:
             mask = has <= self.max
@@ -2097,7 +2144,7 @@ def observation_schedule(
 
         if "maximum_airmass" in payload:
             constraints.append(
-                AirmassConstraint(
+                VectorizedAirmassConstraint(
                     max=payload["maximum_airmass"], boolean_constraint=False
                 )
             )
@@ -2190,9 +2237,9 @@ def observation_schedule(
     start_time = time.time()
 
     global_constraints = [
-        AirmassConstraint(max=2.50, boolean_constraint=False),
-        AltitudeConstraint(20 * u.deg, 90 * u.deg),
-        AtNightConstraint.twilight_nautical(),
+        VectorizedAirmassConstraint(max=2.50, boolean_constraint=False),
+        VectorizedAltitudeConstraint(20 * u.deg, 90 * u.deg),
+        VectorizedAtNightConstraint.twilight_nautical(),
         HourAngleConstraint(min=-5.5, max=5.5),
         MoonSeparationConstraint(min=30.0 * u.deg),
         TargetOfOpportunityConstraint(toos=toos),
@@ -1,16 +1,12 @@
 import os
-import time
 from io import StringIO
 
 import arrow
-import astropy.units as u
 import conesearch_alchemy as ca
-import healpix_alchemy as ha
 import healpy as hp
 import numpy as np
 import pandas as pd
 import sqlalchemy as sa
-from astropy.io import ascii
 from geojson import Feature, Point
 from scipy.integrate import quad
 from scipy.stats import norm
@@ -31,7 +27,17 @@ from ...models import (
     Obj,
 )
 from ...utils.asynchronous import run_async
-from ...utils.naive_datetime import utcnow_naive
+from ...utils.galaxy_ingest import (
+    IngestCheckpoint,
+    checkpoint_path,
+    clean_galaxies,
+    copy_galaxies,
+    encode_galaxies,
+    glade_galaxies,
+    load_galaxy_chunks,
+    read_glade,
+)
+from ...utils.localization_tiles import in_credible_region, min_probdensity
 from ..base import BaseHandler, format_doc
 
 log = make_log("api/galaxy")
@@ -198,29 +204,14 @@ def get_galaxies(
                     "def", localizationtilescls
                 )
 
-        cum_prob = (
-            sa.func.sum(
-                localizationtilescls.probdensity * localizationtilescls.healpix.area
-            )
-            .over(order_by=localizationtilescls.probdensity.desc())
-            .label("cum_prob")
+        threshold = min_probdensity(
+            session, localization.id, localization_cumprob, localizationtilescls
         )
-        localizationtile_subquery = (
-            sa.select(localizationtilescls.probdensity, cum_prob).filter(
-                localizationtilescls.localization_id == localization.id
-            )
-        ).subquery()
-
-        min_probdensity = (
-            sa.select(sa.func.min(localizationtile_subquery.columns.probdensity)).where(
-                localizationtile_subquery.columns.cum_prob <= localization_cumprob
-            )
-        ).scalar_subquery()
 
         tile_ids = session.scalars(
             sa.select(localizationtilescls.id).where(
                 localizationtilescls.localization_id == localization.id,
-                localizationtilescls.probdensity >= min_probdensity,
+                in_credible_region(localizationtilescls, threshold),
             )
         ).all()
 
@@ -914,62 +905,8 @@ def add_galaxies(catalog_metadata, catalog_data):
             )
             session.add(catalog)
             session.commit()
-        galaxies = [
-            Galaxy(
-                catalog_id=catalog.id,
-                ra=ra,
-                dec=dec,
-                name=name,
-                alt_name=alt_name,
-                distmpc=distmpc,
-                distmpc_unc=distmpc_unc,
-                redshift=redshift,
-                redshift_error=redshift_error,
-                sfr_fuv=sfr_fuv,
-                sfr_w4=sfr_w4,
-                mstar=mstar,
-                magk=magk,
-                magb=magb,
-                mag_nuv=mag_nuv,
-                mag_fuv=mag_fuv,
-                mag_w1=mag_w1,
-                mag_w2=mag_w2,
-                mag_w3=mag_w3,
-                mag_w4=mag_w4,
-                a=a,
-                b2a=b2a,
-                pa=pa,
-                btc=btc,
-                healpix=ha.constants.HPX.lonlat_to_healpix(ra * u.deg, dec * u.deg),
-            )
-            for ra, dec, name, alt_name, distmpc, distmpc_unc, redshift, redshift_error, sfr_fuv, sfr_w4, mstar, magb, magk, mag_fuv, mag_nuv, mag_w1, mag_w2, mag_w3, mag_w4, a, b2a, pa, btc in zip(
-                catalog_data["ra"],
-                catalog_data["dec"],
-                catalog_data["name"],
-                catalog_data["alt_name"],
-                catalog_data["distmpc"],
-                catalog_data["distmpc_unc"],
-                catalog_data["redshift"],
-                catalog_data["redshift_error"],
-                catalog_data["sfr_fuv"],
-                catalog_data["sfr_w4"],
-                catalog_data["mstar"],
-                catalog_data["magb"],
-                catalog_data["magk"],
-                catalog_data["mag_fuv"],
-                catalog_data["mag_nuv"],
-                catalog_data["mag_w1"],
-                catalog_data["mag_w2"],
-                catalog_data["mag_w3"],
-                catalog_data["mag_w4"],
-                catalog_data["a"],
-                catalog_data["b2a"],
-                catalog_data["pa"],
-                catalog_data["btc"],
-            )
-        ]
-
-        session.add_all(galaxies)
+        galaxies = clean_galaxies(pd.DataFrame(catalog_data))
+        copy_galaxies(session, encode_galaxies(galaxies, catalog.id))
         session.commit()
         return log("Generated galaxy table")
     except Exception as e:
@@ -1086,50 +1023,7 @@ class GalaxyASCIIFileHandler(BaseHandler):
         return self.success()
 
 
-def add_glade(file_path=None, file_url=None):
-    column_names = [
-        "GLADE_no",
-        "PGC_no",
-        "GWGC_name",
-        "HyperLEDA_name",
-        "2MASS_name",
-        "WISExSCOS_name",
-        "SDSS-DR16Q_name",
-        "Object_type",
-        "RA",
-        "Dec",
-        "B",
-        "B_err",
-        "B_flag",
-        "B_Abs",
-        "J",
-        "J_err",
-        "H",
-        "H_err",
-        "K",
-        "K_err",
-        "W1",
-        "W1_err",
-        "W2",
-        "W2_err",
-        "W1_flag",
-        "B_J",
-        "B_J_err",
-        "z_helio",
-        "z_cmb",
-        "z_flag",
-        "v_err",
-        "z_err",
-        "d_L",
-        "d_L_err",
-        "dist",
-        "Mstar",
-        "Mstar_err",
-        "Mstar_flag",
-        "Merger_rate",
-        "Merger_rate_error",
-    ]
-
+def add_glade(file_path=None, file_url=None, processes=None):
     if file_path is not None:
         datafile = file_path
     elif file_url is not None:
@@ -1155,212 +1049,21 @@ def add_glade(file_path=None, file_url=None):
             session.commit()
         catalog_id = catalog.id
 
-    start_dl_timer = time.perf_counter()
-    tbls = ascii.read(
-        datafile,
-        names=column_names,
-        guess=False,
-        delimiter=" ",
-        format="no_header",
-        fast_reader={"chunk_size": int(10 * 1e7), "chunk_generator": True},  # 100 MB
-    )
-    if datafile.startswith("http"):
-        end_dl_timer = time.perf_counter()
-        print(
-            f"add_glade - Downloaded {datafile} in {end_dl_timer - start_dl_timer:0.4f} seconds"
+    # chunks that were committed before an interruption are skipped
+    checkpoint = IngestCheckpoint(checkpoint_path("GLADE", datafile))
+    if len(checkpoint.done) > 0:
+        log(f"add_glade - Resuming: {len(checkpoint.done)} file part(s) already loaded")
+    with DBSession() as session:
+        totals = load_galaxy_chunks(
+            session,
+            read_glade(datafile),
+            glade_galaxies,
+            catalog_id,
+            checkpoint=checkpoint,
+            processes=processes,
+            label="add_glade",
         )
-    full_length = 0
-    full_blueshift_length = 0
-    start_loop_timer = time.perf_counter()
-    for ii, df in enumerate(tbls):
-        try:
-            start_timer = time.perf_counter()
-            df = df.to_pandas()
-            df = df.replace({"null": np.nan})
-            # df['GLADE_name'] = ['GLADE-' + str(n) for n in df['GLADE_no']]
-            # create a GLADE_name column, where names are: GLADE-<GLADE_no> with GLADE_no as a string using pandas
-            df["GLADE_name"] = "GLADE-" + df["GLADE_no"].astype(str)
-            df.rename(
-                columns={
-                    "RA": "ra",
-                    "Dec": "dec",
-                    "GLADE_name": "name",
-                    "Mstar": "mstar",
-                    "K": "magk",
-                    "B": "magb",
-                    "W1": "mag_w1",
-                    "W2": "mag_w2",
-                    "z_helio": "redshift",
-                    "z_err": "redshift_error",
-                    "d_L": "distmpc",
-                    "d_L_err": "distmpc_unc",
-                },
-                inplace=True,
-            )
-
-            float_columns = [
-                "ra",
-                "dec",
-                "mstar",
-                "magk",
-                "magb",
-                "mag_w1",
-                "mag_w2",
-                "mag_w3",
-                "mag_w4",
-                "redshift",
-                "redshift_error",
-                "distmpc",
-                "distmpc_unc",
-            ]
-            for col in float_columns:
-                df[col] = df[col].astype(float)
-
-            drop_columns = list(
-                set(df.columns.values)
-                - {
-                    "ra",
-                    "dec",
-                    "name",
-                    "mstar",
-                    "magk",
-                    "magb",
-                    "redshift",
-                    "redshift_error",
-                    "distmpc",
-                    "distmpc_unc",
-                }
-            )
-
-            df.drop(
-                columns=drop_columns,
-                inplace=True,
-            )
-            df = df.replace({np.nan: None})
-            positive_definite_parameters = [
-                "distmpc",
-                "distmpc_unc",
-                "redshift_error",
-            ]
-            # remove rows where any of the positive definite parameters are negative using pandas
-            for key in positive_definite_parameters:
-                df = df.drop(df.index[df[key] < 0])
-            # if ra, dec or name are missing, remove the row
-            required_columns = ["ra", "dec", "name"]
-            df = df[df[required_columns].notnull().all(axis=1)]
-
-            # fill in any missing optional parameters
-            optional_parameters = [
-                "alt_name",
-                "distmpc",
-                "distmpc_unc",
-                "redshift",
-                "redshift_error",
-                "sfr_fuv",
-                "mstar",
-                "magk",
-                "magb",
-                "mag_fuv",
-                "mag_nuv",
-                "mag_w1",
-                "mag_w2",
-                "mag_w3",
-                "mag_w4",
-                "a",
-                "b2a",
-                "pa",
-                "btc",
-            ]
-
-            # for the optional parameters, if a row is missing a value, fill it in with None
-            for key in optional_parameters:
-                if key not in df.columns.values:
-                    df[key] = None
-            # remove rows with incorrect ra or dec
-            df = df[(df["ra"] >= 0) & (df["ra"] < 360)]
-            df = df[(df["dec"] >= -90) & (df["dec"] <= 90)]
-
-            # the mstar in Glade is in 10^10 M_Sun units, so multiply by 1e10 where its not None
-            df["mstar"] = df["mstar"].apply(
-                lambda x: x * 1e10 if x is not None else None
-            )
-
-            # add a healpix column where healpix = ha.constants.HPX.lonlat_to_healpix(ra * u.deg, dec * u.deg)
-            df["healpix"] = [
-                ha.constants.HPX.lonlat_to_healpix(ra * u.deg, dec * u.deg)
-                for ra, dec in zip(df["ra"], df["dec"])
-            ]
-
-            df["catalog_id"] = catalog_id
-            utcnow = utcnow_naive().isoformat()
-            df["created_at"] = utcnow
-            df["modified_at"] = utcnow
-            blueshift_length = len(df[(df["redshift"] < 0)])
-            length = len(df)
-            full_length += length
-            full_blueshift_length += blueshift_length
-            columns = (
-                "ra",
-                "dec",
-                "magb",
-                "magk",
-                "redshift",
-                "redshift_error",
-                "distmpc",
-                "distmpc_unc",
-                "mstar",
-                "name",
-                "alt_name",
-                "sfr_fuv",
-                "mag_fuv",
-                "mag_nuv",
-                "mag_w1",
-                "mag_w2",
-                "mag_w3",
-                "mag_w4",
-                "a",
-                "b2a",
-                "pa",
-                "btc",
-                "healpix",
-                "catalog_id",
-                "created_at",
-                "modified",
-            )
-            output = StringIO()
-            df.replace("NaN", "null", inplace=True)
-            df.replace(np.nan, "NaN", inplace=True)
-            df.to_csv(
-                output,
-                index=False,
-                sep="\t",
-                header=False,
-                encoding="utf8",
-                quotechar="'",
-            )
-            output.seek(0)
-            connection = DBSession().connection().connection
-            quoted_columns = ", ".join(f'"{c}"' for c in columns)
-            copy_sql = (
-                f"COPY galaxys ({quoted_columns}) FROM STDIN "
-                "WITH (FORMAT text, DELIMITER E'\\t', NULL '')"
-            )
-            with connection.cursor() as cursor:
-                with cursor.copy(copy_sql) as copy:
-                    copy.write(output.getvalue())
-            output.close()
-            DBSession().commit()
-            end_timer = time.perf_counter()
-            log(
-                f"add_glade - File part {ii}: Added {length} galaxies (including {blueshift_length} with a negative redshift) in {end_timer - start_timer:0.4f} seconds"
-            )
-        except Exception as e:
-            log(f"add_glade - File part {ii}: Error: {e}")
-            continue
-    log(
-        f"add_glade - Added a total of {full_length} galaxies (including {full_blueshift_length} with a negative redshift) to the database in {time.perf_counter() - start_loop_timer:0.4f} seconds"
-    )
-    return full_length, full_blueshift_length
+    return totals["rows"], totals["blueshifted"]
 
 
 def get_galaxies_completeness(galaxies, dist_min=0, dist_max=10000, M_min=8, M_max=12):
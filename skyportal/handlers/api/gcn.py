@@ -107,6 +107,13 @@ from ...utils.gcn import (
     get_xml_notice_type,
     has_skymap,
 )
+from ...utils.gcn_crossmatch import crossmatch_gcn_events
+from ...utils.localization_tiles import (
+    copy_localization_tiles,
+    credible_thresholds,
+    in_credible_region,
+    min_probdensity_async,
+)
 from ...utils.naive_datetime import UTCTZnaiveDateTime, utcnow_naive
 from ...utils.notifications import post_notification
 from ...utils.parse import get_page_and_n_per_page
@@ -2269,19 +2276,21 @@ def add_tiles_and_properties_and_contour(
             )
 
         log(f"Adding tiles for localization {localization_id}")
-        tiles = [
-            LocalizationTile(
-                localization_id=localization_id,
-                healpix=uniq,
-                probdensity=probdensity,
-                dateobs=localization.dateobs,
-            )
-            for uniq, probdensity in zip(localization.uniq, localization.probdensity)
-        ]
-
         if parent_session is None:
             session.add(localization)
-        session.add_all(tiles)
+        # The COPY bypasses the unit of work, so pending rows must be in the
+        # database first.
+        session.flush()
+        copy_localization_tiles(
+            session,
+            localization_id,
+            localization.dateobs,
+            localization.uniq,
+            localization.probdensity,
+        )
+        localization.credible_thresholds = credible_thresholds(
+            localization.uniq, localization.probdensity
+        )
         session.commit()
 
         log(f"Adding contour for localization {localization_id}")
@@ -5365,26 +5374,9 @@ class GcnEventInstrumentFieldHandler(BaseHandler):
             if instrument is None:
                 return self.error(f"No instrument with ID: {instrument_id}")
 
-            cum_prob = (
-                sa.func.sum(
-                    LocalizationTile.probdensity * LocalizationTile.healpix.area
-                )
-                .over(order_by=LocalizationTile.probdensity.desc())
-                .label("cum_prob")
+            threshold = await min_probdensity_async(
+                session, localization.id, integrated_probability
             )
-            localizationtile_subquery = (
-                sa.select(LocalizationTile.probdensity, cum_prob).filter(
-                    LocalizationTile.localization_id == localization.id
-                )
-            ).subquery()
-
-            min_probdensity = (
-                sa.select(
-                    sa.func.min(localizationtile_subquery.columns.probdensity)
-                ).filter(
-                    localizationtile_subquery.columns.cum_prob <= integrated_probability
-                )
-            ).scalar_subquery()
 
             area = (InstrumentFieldTile.healpix * LocalizationTile.healpix).area
             prob = sa.func.sum(LocalizationTile.probdensity * area)
@@ -5393,7 +5385,7 @@ class GcnEventInstrumentFieldHandler(BaseHandler):
                 sa.select(InstrumentField.field_id, prob)
                 .where(
                     LocalizationTile.localization_id == localization.id,
-                    LocalizationTile.probdensity >= min_probdensity,
+                    in_credible_region(LocalizationTile, threshold),
                     InstrumentFieldTile.instrument_id == instrument.id,
                     InstrumentFieldTile.instrument_field_id == InstrumentField.id,
                     InstrumentFieldTile.healpix.overlaps(LocalizationTile.healpix),
@@ -5918,6 +5910,31 @@ def crossmatch_gcn_objects(obj_id, event_ids, user_id, integrated_probability=0.
     integrated_probability : float
         Confidence level up to which to perform crossmatch
     """
+    crossmatch_gcn_objects_batch(
+        [obj_id],
+        event_ids,
+        user_id,
+        integrated_probability=integrated_probability,
+        replace=True,
+    )
+
+
+def crossmatch_gcn_objects_batch(
+    obj_ids, event_ids, user_id, integrated_probability=0.95, replace=False
+):
+    """Crossmatch objects against GCN events, one tile query per localization.
+    obj_ids : List[str]
+        Object IDs
+    event_ids : List[int]
+        GCN Event IDs to crossmatch against
+    user_id : int
+        SkyPortal ID of User posting the crossmatch results
+    integrated_probability : float
+        Confidence level up to which to perform crossmatch
+    replace : bool
+        Whether to replace the objects' crossmatches with other events,
+        rather than only updating those with the given events
+    """
 
     if Session.registry.has():
         session = Session()
@@ -5927,99 +5944,124 @@ def crossmatch_gcn_objects(obj_id, event_ids, user_id, integrated_probability=0.
     user = session.scalar(sa.select(User).where(User.id == user_id))
 
     try:
-        obj = session.scalars(
-            Obj.select(user, mode="update").where(Obj.id == obj_id)
-        ).first()
-        if obj is None:
-            raise ValueError(f"Cannot find object with ID {obj_id}.")
-
-        events = []
-        for event_id in event_ids:
-            event = session.scalars(
-                GcnEvent.select(
-                    user,
-                    options=[
-                        joinedload(GcnEvent.localizations),
-                    ],
-                ).where(GcnEvent.id == event_id)
-            ).first()
-            if event is None:
-                continue
-            if len(event.localizations) == 0:
-                continue
-            localization_id = event.localizations[0].id
+        updated_obj_ids = crossmatch_gcn_events(
+            session,
+            user,
+            obj_ids,
+            event_ids,
+            integrated_probability=integrated_probability,
+            replace=replace,
+        )
+        session.commit()
 
-            partition_key = event.dateobs
-            # now get the dateobs in the format YYYY_MM
-            localizationtile_partition_name = (
-                f"{partition_key.year}_{partition_key.month:02d}"
-            )
-            localizationtilescls = LocalizationTile.partitions.get(
-                localizationtile_partition_name, None
+        flow = Flow()
+        for internal_key in session.scalars(
+            sa.select(Obj.internal_key).where(Obj.id.in_(updated_obj_ids))
+        ):
+            flow.push(
+                "*",
+                "skyportal/REFRESH_SOURCE",
+                payload={"obj_key": internal_key},
             )
-            if localizationtilescls is None:
-                localizationtilescls = LocalizationTile
-            else:
-                # check that there is actually a localizationTile with the given localization_id in the partition
-                # if not, use the default partition
-                if not (
-                    session.scalars(
-                        sa.select(localizationtilescls.localization_id).where(
-                            localizationtilescls.localization_id == localization_id
-                        )
-                    ).first()
-                ):
-                    localizationtilescls = LocalizationTile.partitions.get(
-                        "def", LocalizationTile
-                    )
 
-            cum_prob = (
-                sa.func.sum(
-                    localizationtilescls.probdensity * localizationtilescls.healpix.area
-                )
-                .over(order_by=localizationtilescls.probdensity.desc())
-                .label("cum_prob")
-            )
-            localizationtile_subquery = (
-                sa.select(localizationtilescls.probdensity, cum_prob).filter(
-                    localizationtilescls.localization_id == localization_id
-                )
-            ).subquery()
+        log(
+            f"Generated GCN crossmatch for {len(obj_ids)} object(s) against "
+            f"{len(event_ids)} event(s), {len(updated_obj_ids)} updated"
+        )
+    except Exception as e:
+        log(f"Unable to generate GCN crossmatch for {obj_ids}: {e}")
+    finally:
+        session.close()
+        Session.remove()
 
-            min_probdensity = (
-                sa.select(
-                    sa.func.min(localizationtile_subquery.columns.probdensity)
-                ).filter(
-                    localizationtile_subquery.columns.cum_prob <= integrated_probability
-                )
-            ).scalar_subquery()
 
-            obj_query = sa.select(Obj.id).where(
-                Obj.id == obj.id,
-                localizationtilescls.localization_id == localization_id,
-                localizationtilescls.probdensity >= min_probdensity,
-                localizationtilescls.healpix.contains(Obj.healpix),
-            )
-            obj_check = session.scalars(obj_query).first()
-            if obj_check is not None:
-                events.append(event.dateobs)
+class GcnEventCrossmatchHandler(BaseHandler):
+    @auth_or_token
+    async def post(self):
+        """
+        ---
+        summary: Crossmatch objects with GCN events
+        description: |
+          Crossmatch a list of objects against a list of GCN events in the
+          background, and update the objects' GCN crossmatches.
+        tags:
+          - gcn events
+          - objs
+        requestBody:
+          content:
+            application/json:
+              schema:
+                type: object
+                properties:
+                  objIds:
+                    type: array
+                    items:
+                      type: string
+                    required: true
+                    description: IDs of the objects to crossmatch.
+                  eventIds:
+                    type: array
+                    items:
+                      type: integer
+                    required: true
+                    description: IDs of the GCN events to crossmatch against.
+                  probability:
+                    type: number
+                    description: Integrated probability contour to crossmatch within (default 0.95).
+                  replace:
+                    type: boolean
+                    description: |
+                      If true, replace the objects' crossmatches with other
+                      events too. By default, only the crossmatches with the
+                      given events are updated.
+        responses:
+          200:
+            content:
+              application/json:
+                schema: Success
+          400:
+            content:
+              application/json:
+                schema: Error
+        """
 
-        obj.gcn_crossmatch = events
-        session.commit()
+        data = self.get_json()
+        obj_ids = data.get("objIds")
+        event_ids = data.get("eventIds")
+        replace = data.get("replace", False)
+        try:
+            integrated_probability = float(data.get("probability", 0.95))
+        except (TypeError, ValueError):
+            return self.error("probability must be a number.")
+        if not 0 < integrated_probability <= 1:
+            return self.error("probability must be between 0 and 1.")
+
+        if not isinstance(obj_ids, list) or len(obj_ids) == 0:
+            return self.error("Must provide a non-empty list of objIds.")
+        if not isinstance(event_ids, list) or len(event_ids) == 0:
+            return self.error("Must provide a non-empty list of eventIds.")
+        if not all(isinstance(obj_id, str) and obj_id.strip() for obj_id in obj_ids):
+            return self.error("objIds must be non-empty strings.")
+        obj_ids = [obj_id.strip() for obj_id in obj_ids]
+        try:
+            event_ids = [int(event_id) for event_id in event_ids]
+        except (TypeError, ValueError):
+            return self.error("eventIds must be integers.")
+        if not isinstance(replace, bool):
+            return self.error("replace must be a boolean.")
 
-        flow = Flow()
-        flow.push(
-            "*",
-            "skyportal/REFRESH_SOURCE",
-            payload={"obj_key": obj.internal_key},
+        IOLoop.current().run_in_executor(
+            None,
+            lambda: crossmatch_gcn_objects_batch(
+                obj_ids,
+                event_ids,
+                self.associated_user_object.id,
+                integrated_probability=integrated_probability,
+                replace=replace,
+            ),
         )
 
-        log(f"Generated GCN crossmatch for {obj_id}")
-    except Exception as e:
-        log(f"Unable to generate GCN crossmatch for {obj_id}: {e}")
-    finally:
-        session.close()
-        Session.remove()
+        return self.success()
 
 
 class DefaultGcnTagHandler(BaseHandler):
@@ -41,6 +41,7 @@ from ...models import (
 )
 from ...utils.asynchronous import run_async
 from ...utils.cache import Cache, array_to_bytes
+from ...utils.localization_tiles import in_credible_region, min_probdensity_async
 from ..base import BaseHandler, format_doc
 
 log = make_log("api/instrument")
@@ -607,28 +608,12 @@ class InstrumentHandler(BaseHandler):
                                 "def", LocalizationTile
                             )
 
-                    cum_prob = (
-                        sa.func.sum(
-                            localizationtilescls.probdensity
-                            * localizationtilescls.healpix.area
-                        )
-                        .over(order_by=localizationtilescls.probdensity.desc())
-                        .label("cum_prob")
+                    threshold = await min_probdensity_async(
+                        session,
+                        localization.id,
+                        localization_cumprob,
+                        localizationtilescls,
                     )
-                    localizationtile_subquery = (
-                        sa.select(localizationtilescls.probdensity, cum_prob).filter(
-                            localizationtilescls.localization_id == localization.id
-                        )
-                    ).subquery()
-
-                    min_probdensity = (
-                        sa.select(
-                            sa.func.min(localizationtile_subquery.columns.probdensity)
-                        ).filter(
-                            localizationtile_subquery.columns.cum_prob
-                            <= localization_cumprob
-                        )
-                    ).scalar_subquery()
 
                     query_id = f"{str(localization.id)}_{str(instrument.id)}_{str(localization_cumprob)}"
 
@@ -656,7 +641,7 @@ class InstrumentHandler(BaseHandler):
                                 .filter(
                                     localizationtilescls.localization_id
                                     == localization.id,
-                                    localizationtilescls.probdensity >= min_probdensity,
+                                    in_credible_region(localizationtilescls, threshold),
                                     InstrumentFieldTile.instrument_id == instrument.id,
                                     InstrumentFieldTile.instrument_field_id
                                     == InstrumentField.id,
@@ -687,7 +672,7 @@ class InstrumentHandler(BaseHandler):
                                 sa.select(InstrumentField).where(
                                     localizationtilescls.localization_id
                                     == localization.id,
-                                    localizationtilescls.probdensity >= min_probdensity,
+                                    in_credible_region(localizationtilescls, threshold),
                                     InstrumentFieldTile.instrument_id == instrument.id,
                                     InstrumentFieldTile.instrument_field_id
                                     == InstrumentField.id,
@@ -1,27 +1,35 @@
 from baselayer.app.env import load_env
 
+from ...lazy import lazy_exports
+
 _, cfg = load_env()
 
-from .across import AcrossInstrumentsHandler, AcrossJointVisibilityHandler
-from .altdata_info import AltdataInfoHandler
-from .annotations_info import AnnotationsInfoHandler
-from .dbinfo import DBInfoHandler
-from .ephemeris import EphemerisHandler
-from .log import LogHandler
-from .notifications import BulkNotificationHandler, NotificationHandler
-from .notifications_test import NotificationTestHandler
-from .plot import (
-    FilterWavelengthHandler,
-    PlotAssignmentAirmassHandler,
-    PlotHoursBelowAirmassHandler,
-    PlotObjTelAirmassHandler,
+# The handlers are imported on first access, see skyportal/handlers/lazy.py
+__getattr__, __dir__, __all__ = lazy_exports(
+    __name__,
+    {
+        ".across": ["AcrossInstrumentsHandler", "AcrossJointVisibilityHandler"],
+        ".altdata_info": ["AltdataInfoHandler"],
+        ".annotations_info": ["AnnotationsInfoHandler"],
+        ".dbinfo": ["DBInfoHandler"],
+        ".ephemeris": ["EphemerisHandler"],
+        ".log": ["LogHandler"],
+        ".notifications": ["BulkNotificationHandler", "NotificationHandler"],
+        ".notifications_test": ["NotificationTestHandler"],
+        ".plot": [
+            "FilterWavelengthHandler",
+            "PlotAssignmentAirmassHandler",
+            "PlotHoursBelowAirmassHandler",
+            "PlotObjTelAirmassHandler",
+        ],
+        ".profile": ["ProfileHandler"],
+        ".recent_gcn_events": ["RecentGcnEventsHandler"],
+        ".recent_sources": ["RecentSourcesHandler"],
+        ".robotic_instruments": ["RoboticInstrumentsHandler"],
+        ".source_counts": ["SourceCountHandler"],
+        ".source_savers": ["SourceSaverHandler"],
+        ".source_views": ["SourceViewsHandler"],
+        ".standards": ["StandardsHandler"],
+        ".token": ["TokenHandler"],
+    },
 )
-from .profile import ProfileHandler
-from .recent_gcn_events import RecentGcnEventsHandler
-from .recent_sources import RecentSourcesHandler
-from .robotic_instruments import RoboticInstrumentsHandler
-from .source_counts import SourceCountHandler
-from .source_savers import SourceSaverHandler
-from .source_views import SourceViewsHandler
-from .standards import StandardsHandler
-from .token import TokenHandler
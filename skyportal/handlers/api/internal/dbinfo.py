@@ -6,10 +6,12 @@ from baselayer.app.access import auth_or_token
 
 from ....models import Source
 from ...base import BaseHandler
+from ...response_cache import cached_response
 
 
 class DBInfoHandler(BaseHandler):
     @auth_or_token
+    @cached_response("dbinfo", scope="global", invalidate_on=(Source,))
     async def get(self):
         """
         ---
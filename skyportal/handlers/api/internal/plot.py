@@ -16,8 +16,8 @@ from ....models import (
     ObservingRun,
     Telescope,
 )
+from ....utils.bandpasses import get_effective_wavelength
 from ...base import BaseHandler
-from ..photometry import get_effective_wavelength
 
 device_types = [
     "browser",
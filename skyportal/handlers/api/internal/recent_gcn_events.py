@@ -2,14 +2,21 @@ from sqlalchemy.orm import selectinload
 
 from baselayer.app.access import auth_or_token
 
-from ....models import GcnEvent, Localization
+from ....models import GcnEvent, GcnTag, GcnTrigger, Localization, LocalizationTag
 from ...base import BaseHandler
+from ...response_cache import cached_response
 
 default_prefs = {"maxNumGcnEvents": 10}
 
 
 class RecentGcnEventsHandler(BaseHandler):
     @auth_or_token
+    @cached_response(
+        "recent_gcn_events",
+        scope="groups",
+        preferences=("recentGcnEvents",),
+        invalidate_on=(GcnEvent, GcnTag, GcnTrigger, Localization, LocalizationTag),
+    )
     async def get(self):
         """
         ---
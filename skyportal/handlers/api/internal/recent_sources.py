@@ -9,13 +9,21 @@ from baselayer.app.env import load_env
 from baselayer.log import make_log
 from skyportal.models.group import Group
 
-from ....models import Obj, ObjTag, Source, serialize_obj_tag
+from ....models import (
+    Classification,
+    Obj,
+    ObjTag,
+    Source,
+    Thumbnail,
+    serialize_obj_tag,
+)
 from ....utils.data_access import (
     accessible_group_ids_async,
     team_scoped_group_ids,
 )
 from ....utils.parse import get_list_typed
 from ...base import BaseHandler
+from ...response_cache import cached_response
 from .source_views import t_index
 
 # maxNumSources is the maximum number of sources to return
@@ -70,6 +78,12 @@ class RecentSourcesHandler(BaseHandler):
         return [src.obj_id for src in result.all()]
 
     @auth_or_token
+    @cached_response(
+        "recent_sources",
+        query_args=("teamID",),
+        preferences=("recentSources",),
+        invalidate_on=(Source, Classification, ObjTag, Thumbnail),
+    )
     async def get(self):
         async with self.AsyncSession() as session:
             user_group_ids = set(
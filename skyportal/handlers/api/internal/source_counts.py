@@ -11,12 +11,19 @@ from ....utils.data_access import (
     team_scoped_group_ids,
 )
 from ...base import BaseHandler
+from ...response_cache import cached_response
 
 default_prefs = {"sinceDaysAgo": 7}
 
 
 class SourceCountHandler(BaseHandler):
     @auth_or_token
+    @cached_response(
+        "source_counts",
+        query_args=("teamID",),
+        preferences=("sourceCounts",),
+        invalidate_on=(Source,),
+    )
     async def get(self):
         user_prefs = getattr(self.current_user, "preferences", None) or {}
         source_count_prefs = user_prefs.get("sourceCounts", {})
@@ -8,13 +8,22 @@ from sqlalchemy.orm import selectinload
 
 from baselayer.app.access import auth_or_token
 
-from ....models import Obj, ObjTag, Source, SourceView, serialize_obj_tag
+from ....models import (
+    Classification,
+    Obj,
+    ObjTag,
+    Source,
+    SourceView,
+    Thumbnail,
+    serialize_obj_tag,
+)
 from ....utils.data_access import (
     accessible_group_ids_async,
     team_scoped_group_ids,
 )
 from ....utils.naive_datetime import utcnow_naive
 from ...base import BaseHandler
+from ...response_cache import cached_response
 
 default_prefs = {
     "maxNumSources": 10,
@@ -59,7 +68,15 @@ class SourceViewsHandler(BaseHandler):
         result = await session.execute(stmt)
         return result.all()
 
+    # Not invalidated on SourceView: every source page visit adds one, so the
+    # view counts are left to age out with the TTL.
     @auth_or_token
+    @cached_response(
+        "source_views",
+        query_args=("teamID",),
+        preferences=("topSources",),
+        invalidate_on=(Classification, ObjTag, Thumbnail),
+    )
     async def get(self):
         async with self.AsyncSession() as session:
             user_group_ids = set(
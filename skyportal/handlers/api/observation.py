@@ -49,7 +49,8 @@ from ...models import (
 )
 from ...models.schema import ObservationExternalAPIHandlerPost
 from ...utils.cache import Cache
-from ...utils.observation_plan import combine_healpix_tuples
+from ...utils.healpix_ranges import TILE_RANGES_DTYPE, HealpixRangeSet
+from ...utils.localization_tiles import in_credible_region, min_probdensity_async
 from ...utils.parse import str_to_bool
 from ...utils.simsurvey import (
     get_simsurvey_parameters,
@@ -465,23 +466,9 @@ async def get_observations(
                     "def", LocalizationTile
                 )
 
-        cum_prob = (
-            sa.func.sum(
-                localizationtilescls.probdensity * localizationtilescls.healpix.area
-            )
-            .over(order_by=localizationtilescls.probdensity.desc())
-            .label("cum_prob")
+        threshold = await min_probdensity_async(
+            session, localization.id, localization_cumprob, localizationtilescls
         )
-        localizationtile_subquery = (
-            sa.select(localizationtilescls.probdensity, cum_prob).filter(
-                localizationtilescls.localization_id == localization.id
-            )
-        ).subquery()
-        min_probdensity = (
-            sa.select(
-                sa.func.min(localizationtile_subquery.columns.probdensity)
-            ).filter(localizationtile_subquery.columns.cum_prob <= localization_cumprob)
-        ).scalar_subquery()
 
         if telescope_name is not None and instrument_name is not None:
             query_id = f"{str(localization.id)}_{str(instrument.id)}_{str(localization_cumprob)}"
@@ -510,7 +497,7 @@ async def get_observations(
         else:
             field_tiles_query = sa.select(InstrumentField.id).where(
                 localizationtilescls.localization_id == localization.id,
-                localizationtilescls.probdensity >= min_probdensity,
+                in_credible_region(localizationtilescls, threshold),
                 InstrumentFieldTile.instrument_field_id == InstrumentField.id,
                 InstrumentFieldTile.healpix.overlaps(localizationtilescls.healpix),
             )
@@ -548,16 +535,20 @@ async def get_observations(
         if return_statistics:
             if stats_method == "python":
                 t0 = time.time()
-                localization_tiles_result = await session.scalars(
-                    sa.select(localizationtilescls)
-                    .where(
+                localization_tiles_result = await session.execute(
+                    sa.select(
+                        localizationtilescls.healpix.lower,
+                        localizationtilescls.healpix.upper,
+                        localizationtilescls.probdensity,
+                    ).where(
                         localizationtilescls.localization_id == localization.id,
-                        localizationtilescls.probdensity >= min_probdensity,
+                        in_credible_region(localizationtilescls, threshold),
                     )
-                    .order_by(localizationtilescls.probdensity.desc())
-                    .distinct()
                 )
-                localization_tiles = localization_tiles_result.all()
+                localization_tiles = np.array(
+                    [tuple(t) for t in localization_tiles_result],
+                    dtype=TILE_RANGES_DTYPE,
+                )
                 if stats_logging:
                     log(
                         "STATS: ",
@@ -576,14 +567,10 @@ async def get_observations(
                         InstrumentFieldTile.instrument_field_id
                         == obs_subquery.c.instrument_field_id,
                     )
-                    .order_by(InstrumentFieldTile.healpix.lower)
                     .distinct()
                 )
                 instrument_field_tuples = instrument_field_tuples_result.all()
 
-                field_lower_bounds = np.array([f[0] for f in instrument_field_tuples])
-                field_upper_bounds = np.array([f[1] for f in instrument_field_tuples])
-
                 if stats_logging:
                     log(
                         "STATS: ",
@@ -592,55 +579,26 @@ async def get_observations(
                     )
 
                 t0 = time.time()
-                merged_tuples = combine_healpix_tuples(instrument_field_tuples)
-                total_area = sum(t[1] - t[0] for t in merged_tuples)
-                total_area *= ha.constants.PIXEL_AREA
+                fields = HealpixRangeSet.from_ranges(instrument_field_tuples)
+                total_area = fields.area
                 if stats_logging:
                     log(
                         "STATS: ",
-                        f"len(merged_tuples)= {len(merged_tuples)}, "
+                        f"len(merged_tuples)= {len(fields)}, "
                         f"total_area= {total_area:.2f}. "
                         f"Runtime= {time.time() - t0:.2f}s. ",
                     )
 
                 t0 = time.time()
-                intarea = 0  # total area covered by instrument field tiles
-                intprob = 0  # total probability covered by instrument field tiles
-
-                for i, t in enumerate(localization_tiles):
-                    # has True values where tile t has any overlap with one of the fields
-                    overlap_array = np.logical_and(
-                        t.healpix.lower <= field_upper_bounds,
-                        t.healpix.upper >= field_lower_bounds,
-                    )
-                    overlap_indices = np.where(overlap_array)[0]
-
-                    # only add area/prob if there's any overlap
-                    overlap = 0
-                    if len(overlap_indices) > 0:
-                        # print(f'sum(overlap_array): {np.sum(overlap_array)}')
-                        lower_upper = zip(
-                            field_lower_bounds[overlap_indices],
-                            field_upper_bounds[overlap_indices],
-                        )
-                        # tuples of (lower, upper) for all fields that overlap with tile t
-                        new_fields = [(tup[0], tup[1]) for tup in lower_upper]
-
-                        # combine any overlapping fields
-                        output_fields = combine_healpix_tuples(new_fields)
-
-                        # get the area of the combined fields that overlaps with tile t
-                        for lower, upper in output_fields:
-                            mx = np.minimum(t.healpix.upper, upper)
-                            mn = np.maximum(t.healpix.lower, lower)
-                            overlap += mx - mn
-
-                    intarea += overlap
-                    intprob += t.probdensity * overlap
-
-                # sum_probability *= ha.constants.PIXEL_AREA
-                intarea *= ha.constants.PIXEL_AREA
-                intprob *= ha.constants.PIXEL_AREA
+                # pixels of the union of the fields within each tile
+                overlap = fields.overlap_npix(
+                    localization_tiles["lower"], localization_tiles["upper"]
+                )
+                intarea = float(np.sum(overlap)) * ha.constants.PIXEL_AREA
+                intprob = (
+                    float(np.sum(localization_tiles["probdensity"] * overlap))
+                    * ha.constants.PIXEL_AREA
+                )
 
                 if stats_logging:
                     log(
@@ -679,12 +637,12 @@ async def get_observations(
                 )
                 query_area = sa.select(area).filter(
                     localizationtilescls.localization_id == localization.id,
-                    localizationtilescls.probdensity >= min_probdensity,
+                    in_credible_region(localizationtilescls, threshold),
                     union.columns.healpix.overlaps(localizationtilescls.healpix),
                 )
                 query_prob = sa.select(prob).filter(
                     localizationtilescls.localization_id == localization.id,
-                    localizationtilescls.probdensity >= min_probdensity,
+                    in_credible_region(localizationtilescls, threshold),
                     union.columns.healpix.overlaps(localizationtilescls.healpix),
                 )
                 intprob_result = await session.execute(query_prob)
@@ -12,21 +12,19 @@ import urllib
 import uuid
 from datetime import datetime, timedelta
 
-import afterglowpy
 import arrow
 import astropy
+import astropy_healpix as ah
 import geopandas
 import healpy as hp
 import humanize
 import jsonschema
-import ligo.skymap
 import matplotlib
 import matplotlib.patches as mpatches
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import requests
-import simsurvey
 import sncosmo
 import sqlalchemy as sa
 from astroplan import (
@@ -42,12 +40,8 @@ from astropy.utils.masked import MaskedNDArray
 from ligo.skymap import plot  # noqa: F401 F811
 from ligo.skymap.bayestar import rasterize
 from ligo.skymap.distance import parameters_to_marginal_moments
-from ligo.skymap.tool.ligo_skymap_plot_airmass import main as plot_airmass
 from marshmallow.exceptions import ValidationError
 from matplotlib import animation, dates
-from simsurvey.models import AngularTimeSeriesSource
-from simsurvey.utils import model_tools
-from sncosmo import get_bandpass
 from sqlalchemy import func
 from sqlalchemy.orm import (
     joinedload,
@@ -90,6 +84,13 @@ from ...models import (
     User,
 )
 from ...models.schema import ObservationPlanPost
+from ...utils.airmass import (
+    airmass_grid,
+    night_times,
+    sun_altitude,
+    weighted_percentiles,
+)
+from ...utils.bandpasses import BANDPASS_TABLE
 from ...utils.earthquake import COUNTRIES_FILE
 from ...utils.naive_datetime import utcnow_naive
 from ...utils.parse import get_page_and_n_per_page
@@ -165,7 +166,7 @@ TREASUREMAP_FILTERS = {
 with astropy.utils.data.conf.set_temp("remote_timeout", 2):
     for bandpass_name in ALLOWED_BANDPASSES:
         try:
-            bandpass = get_bandpass(bandpass_name)
+            bandpass = BANDPASS_TABLE.bandpass(bandpass_name)
             central_wavelength = (bandpass.minwave() + bandpass.maxwave()) / 2
             bandwidth = bandpass.maxwave() - bandpass.minwave()
             TREASUREMAP_FILTERS[bandpass_name] = [central_wavelength, bandwidth]
@@ -2856,36 +2857,88 @@ class ObservationPlanAirmassChartHandler(BaseHandler):
                 )
             )
             localization = await session.scalar(stmt)
+            if telescope is None or localization is None:
+                return self.error(
+                    f"Could not find telescope {telescope_id} or localization {localization_id}"
+                )
+            if telescope.lon is None or telescope.lat is None:
+                return self.error(f"Telescope {telescope.nickname} has no location")
 
             trigger_time = astropy.time.Time(localization.dateobs, format="datetime")
+            times = night_times(trigger_time, telescope.lon, telescope.lat)
+
+            # airmass of the pixels holding 99.9% of the probability
+            sky_map = localization.table_2d
+            level, ipix = ah.uniq_to_level_ipix(sky_map["UNIQ"])
+            nside = ah.level_to_nside(level)
+            prob = np.asarray(sky_map["PROBDENSITY"]) * ah.nside_to_pixel_area(
+                nside
+            ).to_value(u.sr)
+            keep = np.argsort(prob)[::-1]
+            keep = keep[
+                : np.searchsorted(np.cumsum(prob[keep]), 0.999 * prob.sum()) + 1
+            ]
+            ra, dec = ah.healpix_to_lonlat(ipix[keep], nside[keep], order="nested")
+            airmass = airmass_grid(ra.deg, dec.deg, times, telescope.lon, telescope.lat)
+
+            # probability-weighted credible intervals of the airmass
+            levels = np.arange(90, 0, -10)
+            percentiles = weighted_percentiles(
+                airmass,
+                prob[keep],
+                np.concatenate((50 - 0.5 * levels, 50 + 0.5 * levels)),
+            )
+            sun_altitudes = sun_altitude(times, telescope.lon, telescope.lat)
 
             output_format = "pdf"
-            with (
-                tempfile.NamedTemporaryFile(suffix=".fits") as fitsfile,
-                tempfile.NamedTemporaryFile(suffix=f".{output_format}") as imgfile,
-                matplotlib.style.context("default"),
-            ):
-                ligo.skymap.io.write_sky_map(
-                    fitsfile.name, localization.table_2d, moc=True
+            with matplotlib.style.context("default"):
+                fig = plt.figure(figsize=(8, 6))
+                ax = plt.axes()
+                # shade the twilights and the night
+                for horizon in [0, -6, -12, -18]:
+                    ax.fill_between(
+                        times.plot_date,
+                        0,
+                        1,
+                        where=sun_altitudes < horizon,
+                        transform=ax.get_xaxis_transform(),
+                        color="black",
+                        alpha=0.15,
+                        linewidth=0,
+                    )
+                cmap = matplotlib.cm.ScalarMappable(
+                    matplotlib.colors.Normalize(0, 100), plt.get_cmap()
                 )
-                plot_airmass(
+                for credible_level, low, high in zip(
+                    levels, percentiles[: len(levels)], percentiles[len(levels) :]
+                ):
+                    ax.fill_between(
+                        times.plot_date,
+                        np.minimum(low, 1e3),
+                        np.minimum(high, 1e3),
+                        color=cmap.to_rgba(credible_level),
+                        zorder=2,
+                    )
+                ax.axvline(trigger_time.plot_date, color="black", linestyle="--")
+                ax.legend(
                     [
-                        "--site-longitude",
-                        str(telescope.lon),
-                        "--site-latitude",
-                        str(telescope.lat),
-                        "--site-height",
-                        str(telescope.elevation),
-                        "--time",
-                        trigger_time.isot,
-                        fitsfile.name,
-                        "-o",
-                        imgfile.name,
-                    ]
+                        mpatches.Patch(facecolor=cmap.to_rgba(credible_level))
+                        for credible_level in levels
+                    ],
+                    [f"{credible_level}%" for credible_level in levels],
+                    loc="upper right",
                 )
-
-                with open(imgfile.name, mode="rb") as g:
-                    content = g.read()
+                ax.set_xlim(times[0].plot_date, times[-1].plot_date)
+                ax.set_ylim(3, 1)
+                ax.xaxis.set_major_formatter(dates.DateFormatter("%H:%M"))
+                ax.set_xlabel(f"Time from {times[0].datetime.date()} [UTC]")
+                ax.set_ylabel("Airmass")
+                ax.set_title(f"{telescope.nickname}")
+
+                buf = io.BytesIO()
+                fig.savefig(buf, format=output_format, bbox_inches="tight")
+                plt.close(fig)
+                content = buf.getvalue()
 
             data = io.BytesIO(content)
             # we remove special characters and extensions other than .pdf
@@ -3078,6 +3131,12 @@ def observation_simsurvey(
         Optional parameters to specify the injection type, along with a list of possible values (to be used in a dropdown UI)
     """
 
+    # only needed here, and slow to import: imported on first use
+    import afterglowpy
+    import simsurvey
+    from simsurvey.models import AngularTimeSeriesSource
+    from simsurvey.utils import model_tools
+
     if Session.registry.has():
         session = Session()
     else:
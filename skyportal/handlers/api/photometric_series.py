@@ -892,6 +892,20 @@ class PhotometricSeriesHandler(BaseHandler):
                 (to see how to unpack this data format, look at `photometric_series.md`)
                 If `json`, the data will be returned as a JSON object, where each key
                 is a list of values for that column.
+            - in: query
+              name: mjdMin
+              required: false
+              schema:
+                type: number
+              description: |
+                Only return the data at or after this MJD.
+            - in: query
+              name: mjdMax
+              required: false
+              schema:
+                type: number
+              description: |
+                Only return the data at or before this MJD.
           responses:
             200:
               content:
@@ -1350,9 +1364,18 @@ class PhotometricSeriesHandler(BaseHandler):
                 if ps is None:
                     return self.error("Invalid photometric series ID.")
                 data_format = self.get_query_argument("dataFormat", "json")
+                mjd_min = self.get_query_argument("mjdMin", None)
+                mjd_max = self.get_query_argument("mjdMax", None)
+                try:
+                    mjd_min = float(mjd_min) if mjd_min is not None else None
+                    mjd_max = float(mjd_max) if mjd_max is not None else None
+                except ValueError:
+                    return self.error("mjdMin and mjdMax must be numbers.")
 
                 try:
-                    output_dict = ps.to_dict(data_format=data_format)
+                    output_dict = ps.to_dict(
+                        data_format=data_format, mjd_min=mjd_min, mjd_max=mjd_max
+                    )
                 except Exception:
                     return self.error(
                         f"Cannot convert photometric series to dictionary: {traceback.format_exc()}"
@@ -1,4 +1,5 @@
 import copy
+import heapq
 import json
 import traceback
 import uuid
@@ -9,13 +10,10 @@ import arrow
 import astropy.utils.data
 import numpy as np
 import pandas as pd
-import sncosmo
 import sqlalchemy as sa
 from astropy.table import Table
 from astropy.time import Time
 from marshmallow.exceptions import ValidationError
-from matplotlib import colormaps
-from matplotlib.colors import LinearSegmentedColormap, rgb2hex
 from sncosmo.photdata import PhotometricData
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import joinedload, load_only, selectinload
@@ -48,10 +46,16 @@ from ...models.schema import (
     PhotometryMag,
     PhotometryRangeQuery,
 )
-from ...utils.extinction import calculate_extinction, deredden_flux
+from ...utils.bandpasses import (
+    BANDPASS_TABLE,
+    get_color,
+    get_effective_wavelength,
+)
+from ...utils.extinction import deredden_flux, extinction_by_filter
 from ...utils.naive_datetime import utcnow_naive
 from ...utils.parse import str_to_bool
-from ..base import BaseHandler, format_doc
+from ...utils.tables import TABLE_FORMATS, records_to_table
+from ..base import STREAM_BATCH_SIZE, STREAM_FORMATS, BaseHandler, format_doc
 from .photometry_validation import USE_PHOTOMETRY_VALIDATION
 
 _, cfg = load_env()
@@ -115,125 +119,6 @@ def numpy_to_native(value):
     return value
 
 
-cmap_ir = colormaps["autumn"]
-cmap_deep_ir = LinearSegmentedColormap.from_list(
-    "deep_ir", [(0.8, 0.2, 0), (0.6, 0.1, 0)]
-)
-
-
-def hex2rgb(hex):
-    """Convert hex color string to rgb tuple.
-
-    Parameters
-    ----------
-    hex : str
-        Hex color string.
-
-    Returns
-    -------
-    tuple
-        RGB tuple.
-    """
-
-    return tuple(int(hex[i : i + 2], 16) for i in (0, 2, 4))
-
-
-def get_effective_wavelength(bandpass_name, radius=None):
-    """Get the effective wavelength of an sncosmo bandpass.
-
-    Parameters
-    ----------
-    bandpass_name : str
-        Name of the bandpass.
-    radius : float, optional
-        Radius to get the bandpass for. If None, the default bandpass is used.
-
-    Returns
-    -------
-    float
-        Effective wavelength of the bandpass.
-    """
-    try:
-        args = {}
-        if radius is not None:
-            args["radius"] = radius
-        bandpass = sncosmo.get_bandpass(bandpass_name, **args)
-    except ValueError as e:
-        raise ValueError(
-            f"Could not get bandpass for {bandpass_name} due to sncosmo error: {e}"
-        )
-
-    return float(bandpass.wave_eff)
-
-
-def get_color(bandpass, format="hex"):
-    """Get a color for a bandpass, in hex or rgb format.
-
-    Parameters
-    ----------
-    bandpass : str
-        Name of the sncosmo bandpass.
-    format : str, optional
-        Format of the output color. Must be one of "hex" or "rgb".
-
-    Returns
-    -------
-    str or tuple
-        Color of the bandpass in the requested format
-    """
-
-    wavelength = get_effective_wavelength(bandpass)
-
-    if 0 < wavelength <= 1500:  # EUV
-        bandcolor = "#4B0082"
-    elif 1500 < wavelength <= 2100:  # uvw2
-        bandcolor = "#6A5ACD"
-    elif 2100 < wavelength <= 2400:  # uvm2
-        bandcolor = "#9400D3"
-    elif 2400 < wavelength <= 3000:  # uvw1
-        bandcolor = "#FF00FF"
-    elif 3000 < wavelength <= 4000:  # U, sdss u
-        bandcolor = "#0000FF"
-    elif 4000 < wavelength <= 4800:  # B, sdss g
-        bandcolor = "#02d193"
-    elif 4800 < wavelength <= 5000:  # ztfg
-        bandcolor = "#008000"
-    elif 5000 < wavelength <= 6000:  # V
-        bandcolor = "#9ACD32"
-    elif 6000 < wavelength <= 6400:  # sdssr
-        bandcolor = "#ff6f00"
-    elif 6400 < wavelength <= 6600:  # ztfr
-        bandcolor = "#FF0000"
-    elif 6400 < wavelength <= 7000:  # bessellr, atlaso
-        bandcolor = "#c80000"
-    elif 7000 < wavelength <= 8000:  # sdss i
-        bandcolor = "#FFA500"
-    elif 8000 < wavelength <= 9000:  # sdss z
-        bandcolor = "#A52A2A"
-    elif 9000 < wavelength <= 10000:  # PS1 y
-        bandcolor = "#B8860B"
-    elif 10000 < wavelength <= 13000:  # 2MASS J
-        bandcolor = "#000000"
-    elif 13000 < wavelength <= 17000:  # 2MASS H
-        bandcolor = "#9370D8"
-    elif 17000 < wavelength <= 1e5:  # mm to Radio
-        bandcolor = rgb2hex(cmap_ir((5 - np.log10(wavelength)) / 0.77)[:3])
-    elif 1e5 < wavelength <= 3e5:  # JWST miri and miri-tophat
-        bandcolor = rgb2hex(cmap_deep_ir((5.48 - np.log10(wavelength)) / 0.48)[:3])
-    else:
-        log(
-            f"{bandpass} with effective wavelength {wavelength} is out of range for color maps, using black"
-        )
-        bandcolor = "#000000"
-
-    if format == "rgb":
-        return hex2rgb(bandcolor[1:])
-    elif format not in ["hex", "rgb"]:
-        raise ValueError(f"Invalid color format: {format}")
-
-    return bandcolor
-
-
 def get_bandpasses_to_colors(bandpasses, colors_type="rgb"):
     # Build per-bandpass instead of with a dict comprehension so a single
     # broken sncosmo bandpass (occasionally produces an empty Bandpass on some
@@ -366,12 +251,9 @@ def _serialize_plot(phot, outsys):
     if filter == "swiftxrt":
         outsys = "ab"
 
-    magsys_db = sncosmo.get_magsystem("ab")
-    outsys_ms = sncosmo.get_magsystem(outsys)
-
     try:
-        relzp_out = 2.5 * np.log10(outsys_ms.zpbandflux(filter))
-        relzp_db = 2.5 * np.log10(magsys_db.zpbandflux(filter))
+        relzp_out = BANDPASS_TABLE.relzp(outsys, filter)
+        relzp_db = BANDPASS_TABLE.relzp("ab", filter)
         db_correction = relzp_out - relzp_db
         corrected_db_zp = PHOT_ZP + db_correction
 
@@ -379,8 +261,9 @@ def _serialize_plot(phot, outsys):
             phot.original_user_data is not None
             and "limiting_mag" in phot.original_user_data
         ):
-            magsys_packet = sncosmo.get_magsystem(phot.original_user_data["magsys"])
-            relzp_packet = 2.5 * np.log10(magsys_packet.zpbandflux(filter))
+            relzp_packet = BANDPASS_TABLE.relzp(
+                phot.original_user_data["magsys"], filter
+            )
             packet_correction = relzp_out - relzp_packet
             maglimit = float(phot.original_user_data["limiting_mag"])
             maglimit_out = maglimit + packet_correction
@@ -409,20 +292,25 @@ def _serialize_plot(phot, outsys):
         )
 
 
-def serialize(
+def _has_ref(phot):
+    return (
+        phot.ref_flux is not None
+        and not np.isnan(phot.ref_flux)
+        and phot.ref_fluxerr is not None
+        and not np.isnan(phot.ref_fluxerr)
+    )
+
+
+def _serialize_fields(
     phot,
-    outsys,
-    format,
     created_at=True,
     groups=True,
     annotations=True,
     owner=False,
     stream=False,
     validation=False,
-    extinction_dict=None,
 ):
-    if format == "plot":
-        return _serialize_plot(phot, outsys)
+    """The fields of ``serialize`` that don't depend on the output magsys."""
     return_value = {
         "obj_id": phot.obj_id,
         "ra": phot.ra,
@@ -476,12 +364,7 @@ def serialize(
             validation.to_dict() for validation in phot.validations
         ]
 
-    if (
-        phot.ref_flux is not None
-        and not np.isnan(phot.ref_flux)
-        and phot.ref_fluxerr is not None
-        and not np.isnan(phot.ref_fluxerr)
-    ):
+    if _has_ref(phot):
         return_value["ref_flux"] = phot.ref_flux
         return_value["tot_flux"] = phot.tot_flux
         return_value["ref_fluxerr"] = phot.ref_fluxerr
@@ -490,23 +373,47 @@ def serialize(
         return_value["magtot"] = phot.magtot
         return_value["e_magref"] = phot.e_magref
         return_value["e_magtot"] = phot.e_magtot
+    return return_value
+
+
+def serialize(
+    phot,
+    outsys,
+    format,
+    created_at=True,
+    groups=True,
+    annotations=True,
+    owner=False,
+    stream=False,
+    validation=False,
+    extinction_dict=None,
+):
+    if format == "plot":
+        return _serialize_plot(phot, outsys)
+    return_value = _serialize_fields(
+        phot,
+        created_at=created_at,
+        groups=groups,
+        annotations=annotations,
+        owner=owner,
+        stream=stream,
+        validation=validation,
+    )
 
     filter = phot.filter
 
     if filter == "swiftxrt":
         outsys = "ab"
 
-    magsys_db = sncosmo.get_magsystem("ab")
-    outsys = sncosmo.get_magsystem(outsys)
-
     try:
-        relzp_out = 2.5 * np.log10(outsys.zpbandflux(filter))
+        relzp_out = BANDPASS_TABLE.relzp(outsys, filter)
+        outsys = BANDPASS_TABLE.magsystem(outsys)
 
         # note: these are not the actual zeropoints for magnitudes in the db or
         # packet, just ones that can be used to derive corrections when
         # compared to relzp_out
 
-        relzp_db = 2.5 * np.log10(magsys_db.zpbandflux(filter))
+        relzp_db = BANDPASS_TABLE.relzp("ab", filter)
         db_correction = relzp_out - relzp_db
 
         # this is the zeropoint for fluxes in the database that is tied
@@ -534,8 +441,9 @@ def serialize(
                 phot.original_user_data is not None
                 and "limiting_mag" in phot.original_user_data
             ):
-                magsys_packet = sncosmo.get_magsystem(phot.original_user_data["magsys"])
-                relzp_packet = 2.5 * np.log10(magsys_packet.zpbandflux(filter))
+                relzp_packet = BANDPASS_TABLE.relzp(
+                    phot.original_user_data["magsys"], filter
+                )
                 packet_correction = relzp_out - relzp_packet
                 maglimit = float(phot.original_user_data["limiting_mag"])
                 maglimit_out = maglimit + packet_correction
@@ -564,12 +472,7 @@ def serialize(
                 )
 
             return_value.update(mag_data)
-            if (
-                phot.ref_flux is not None
-                and not np.isnan(phot.ref_flux)
-                and phot.ref_fluxerr is not None
-                and not np.isnan(phot.ref_fluxerr)
-            ):
+            if _has_ref(phot):
                 return_value.update(
                     {
                         "magref": (
@@ -600,12 +503,7 @@ def serialize(
                 )
 
             return_value.update(flux_data)
-            if (
-                phot.ref_flux is not None
-                and not np.isnan(phot.ref_flux)
-                and phot.ref_fluxerr is not None
-                and not np.isnan(phot.ref_fluxerr)
-            ):
+            if _has_ref(phot):
                 return_value.update(
                     {
                         "ref_flux": phot.ref_flux,
@@ -623,6 +521,191 @@ def serialize(
     return return_value
 
 
+def _zp_corrections(filter, outsys):
+    """Output magsys and its zero-point terms for ``filter``, computed exactly
+    as ``serialize`` does per point: ``(outsys, relzp_out, db_correction,
+    corrected_db_zp)``."""
+    if filter == "swiftxrt":
+        outsys = "ab"
+    relzp_out = BANDPASS_TABLE.relzp(outsys, filter)
+    db_correction = relzp_out - BANDPASS_TABLE.relzp("ab", filter)
+    return (
+        BANDPASS_TABLE.magsystem(outsys),
+        relzp_out,
+        db_correction,
+        PHOT_ZP + db_correction,
+    )
+
+
+def _photometry_columns(points, filter, outsys, extinction_value):
+    """Vectorized magnitude/limit/extinction columns for ``points``, all in
+    ``filter``. Entries are None where ``serialize`` would give None."""
+    outsys, relzp_out, db_correction, corrected_db_zp = _zp_corrections(filter, outsys)
+    n = len(points)
+    flux = np.fromiter((p.flux for p in points), dtype=float, count=n)
+    fluxerr = np.fromiter((p.fluxerr for p in points), dtype=float, count=n)
+
+    with np.errstate(all="ignore"):
+        # Photometry.mag / Photometry.e_mag, then the magsys correction.
+        detected = ~np.isnan(flux) & (flux > 0)
+        mag_ab = -2.5 * np.log10(flux) + PHOT_ZP
+        mag = mag_ab + db_correction
+        magerr = (2.5 / np.log(10)) * (fluxerr / flux)
+        limiting_mag = -2.5 * np.log10(5 * fluxerr) + corrected_db_zp
+
+    # Points carrying the limiting mag they were uploaded with keep it,
+    # converted from the packet's magsys.
+    packet_corrections = {}
+    limiting = limiting_mag.tolist()
+    for i, phot in enumerate(points):
+        user_data = phot.original_user_data
+        if user_data is not None and "limiting_mag" in user_data:
+            packet_sys = user_data["magsys"]
+            if packet_sys not in packet_corrections:
+                packet_corrections[packet_sys] = relzp_out - BANDPASS_TABLE.relzp(
+                    packet_sys, filter
+                )
+            limiting[i] = (
+                float(user_data["limiting_mag"]) + packet_corrections[packet_sys]
+            )
+
+    has_mag = detected & ~np.isnan(mag_ab)
+    has_magerr = detected & (fluxerr > 0) & ~np.isnan(magerr)
+    columns = {
+        "outsys": outsys,
+        "db_correction": db_correction,
+        "corrected_db_zp": corrected_db_zp,
+        "flux": flux.tolist(),
+        "mag": np.where(has_mag, mag, None).tolist(),
+        "magerr": np.where(has_magerr, magerr, None).tolist(),
+        "limiting_mag": limiting,
+        "flux_corr": [None] * n,
+        "mag_corr": [None] * n,
+    }
+    if extinction_value is not None:
+        # deredden_flux leaves non-detections (NaN / non-positive) unchanged.
+        correction_factor = 10 ** (0.4 * extinction_value)
+        columns["flux_corr"] = np.where(
+            detected, flux * correction_factor, flux
+        ).tolist()
+        columns["mag_corr"] = np.where(has_mag, mag - extinction_value, None).tolist()
+    return columns
+
+
+def serialize_many(
+    photometry,
+    outsys,
+    format,
+    created_at=True,
+    groups=True,
+    annotations=True,
+    owner=False,
+    stream=False,
+    validation=False,
+    extinction_dict=None,
+):
+    """Serialize many points at once; same output as
+    ``[serialize(phot, outsys, format, ...) for phot in photometry]``.
+
+    Points are grouped by filter so the magsys zero points are looked up once
+    per filter and the magnitude columns are computed with NumPy, instead of
+    zero-point lookups and a few scalar logs per point. Large light
+    curves (e.g. forced photometry) are dominated by that per-point work.
+    """
+    if format not in ("plot", "mag", "flux", "both"):
+        # Let serialize raise its usual error.
+        return [
+            serialize(phot, outsys, format, extinction_dict=extinction_dict)
+            for phot in photometry
+        ]
+
+    by_filter = defaultdict(list)
+    for i, phot in enumerate(photometry):
+        by_filter[phot.filter].append(i)
+
+    results = [None] * len(photometry)
+    for filter, indices in by_filter.items():
+        points = [photometry[i] for i in indices]
+        extinction_value = (
+            extinction_dict.get(filter) if extinction_dict is not None else None
+        )
+        try:
+            columns = _photometry_columns(points, filter, outsys, extinction_value)
+        except ValueError:
+            # An unknown bandpass or magsys: serialize reports the offending
+            # point.
+            for phot in points:
+                serialize(phot, outsys, format, extinction_dict=extinction_dict)
+            raise
+
+        if format == "plot":
+            for i, phot, mag, magerr, limiting_mag in zip(
+                indices,
+                points,
+                columns["mag"],
+                columns["magerr"],
+                columns["limiting_mag"],
+            ):
+                results[i] = {
+                    "id": phot.id,
+                    "obj_id": phot.obj_id,
+                    "filter": filter,
+                    "mjd": phot.mjd,
+                    "origin": phot.origin,
+                    "mag": mag,
+                    "magerr": magerr,
+                    "limiting_mag": limiting_mag,
+                }
+            continue
+
+        magsys = columns["outsys"].name
+        db_correction = columns["db_correction"]
+        for j, (i, phot) in enumerate(zip(indices, points)):
+            value = _serialize_fields(
+                phot,
+                created_at=created_at,
+                groups=groups,
+                annotations=annotations,
+                owner=owner,
+                stream=stream,
+                validation=validation,
+            )
+            has_ref = _has_ref(phot)
+            if format in ["mag", "both"]:
+                value["mag"] = columns["mag"][j]
+                value["magerr"] = columns["magerr"][j]
+                value["magsys"] = magsys
+                value["limiting_mag"] = columns["limiting_mag"][j]
+                if extinction_dict is not None:
+                    value["extinction"] = extinction_value
+                    value["mag_corr"] = columns["mag_corr"][j]
+                    value["flux_corr"] = columns["flux_corr"][j]
+                if has_ref:
+                    value["magref"] = (
+                        phot.magref + db_correction
+                        if nan_to_none(phot.magref) is not None
+                        else None
+                    )
+                    value["magtot"] = phot.magtot
+                    value["e_magref"] = phot.e_magref
+                    value["e_magtot"] = phot.e_magtot
+            if format in ["flux", "both"]:
+                value["flux"] = nan_to_none(columns["flux"][j])
+                value["magsys"] = magsys
+                value["zp"] = columns["corrected_db_zp"]
+                value["fluxerr"] = phot.fluxerr
+                if extinction_dict is not None:
+                    value["extinction"] = extinction_value
+                    value["flux_corr"] = nan_to_none(columns["flux_corr"][j])
+                if has_ref:
+                    value["ref_flux"] = phot.ref_flux
+                    value["tot_flux"] = phot.tot_flux
+                    value["ref_fluxerr"] = phot.ref_fluxerr
+                    value["tot_fluxerr"] = phot.tot_fluxerr
+            results[i] = value
+    return results
+
+
 async def standardize_photometry_data(data, session):
     if not isinstance(data, dict):
         raise ValidationError(
@@ -2396,6 +2479,8 @@ class ObjPhotometryHandler(BaseHandler):
             "includeSuperObjsPhotometry", False
         )
         deduplicate_photometry = self.get_query_argument("deduplicatePhotometry", False)
+        stream = self.get_query_argument("stream", None)
+        output_format = self.get_query_argument("output_format", "json")
 
         include_owner_info = str_to_bool(include_owner_info, default=False)
 
@@ -2407,6 +2492,52 @@ class ObjPhotometryHandler(BaseHandler):
 
         include_extinction = str_to_bool(include_extinction, default=False)
 
+        query_options = {
+            "format": format,
+            "annotations": include_annotation_info,
+            "owner": include_owner_info,
+            "stream": include_stream_info,
+            "validation": include_validation_info,
+            "superobjs": include_superobjs_photometry,
+        }
+        serialize_options = {
+            "annotations": include_annotation_info,
+            "owner": include_owner_info,
+            "stream": include_stream_info,
+            "validation": include_validation_info,
+        }
+
+        if output_format != "json":
+            if output_format not in TABLE_FORMATS:
+                return self.error(
+                    f"Invalid output_format {output_format}, must be one of "
+                    f"{['json', *TABLE_FORMATS]}"
+                )
+            if stream is not None:
+                return self.error("stream is only supported for JSON output")
+
+        if stream is not None:
+            if stream not in STREAM_FORMATS:
+                return self.error(
+                    f"Invalid stream format {stream}, must be one of "
+                    f"{list(STREAM_FORMATS)}"
+                )
+            if deduplicate_photometry:
+                return self.error(
+                    "deduplicatePhotometry is not supported when streaming"
+                )
+            # Tornado awaits the coroutine returned by a handler method.
+            return self._stream_photometry(
+                obj_id,
+                stream,
+                individual_or_series,
+                phase_fold_data,
+                outsys,
+                include_extinction,
+                query_options,
+                serialize_options,
+            )
+
         with self.Session() as session:
             obj: Obj = session.scalars(
                 Obj.select(session.user_or_token).where(Obj.id == obj_id)
@@ -2420,101 +2551,23 @@ class ObjPhotometryHandler(BaseHandler):
             phot_data = []
             series_data = []
             if individual_or_series in ["individual", "both"]:
-                if format == "plot":
-                    options = [
-                        load_only(*(getattr(Photometry, c) for c in PHOT_PLOT_COLUMNS))
-                    ]
-                else:
-                    options = [
-                        joinedload(Photometry.instrument).load_only(Instrument.name),
-                        joinedload(Photometry.groups).load_only(
-                            Group.id,
-                            Group.name,
-                            Group.nickname,
-                            Group.single_user_group,
-                        ),
-                    ]
-                    if include_annotation_info:
-                        options.append(joinedload(Photometry.annotations))
-                    if include_owner_info:
-                        options.append(
-                            joinedload(Photometry.owner).load_only(
-                                User.id,
-                                User.username,
-                                User.first_name,
-                                User.last_name,
-                            )
-                        )
-                    if include_stream_info:
-                        options.append(
-                            joinedload(Photometry.streams).load_only(
-                                Stream.id,
-                                Stream.name,
-                            )
-                        )
-                    if include_validation_info and USE_PHOTOMETRY_VALIDATION:
-                        # selectinload (not joinedload) so validations load via a
-                        # single WHERE id IN (...) query instead of an N+1 per
-                        # point — the lazy default makes dense sources time out.
-                        options.append(selectinload(Photometry.validations))
-
-                obj_ids = {obj_id}
-                if include_superobjs_photometry:
-                    super_objs = (
-                        session.scalars(
-                            sa.select(SuperObj).where(
-                                SuperObj.objs.any(Obj.id == obj_id)
-                            )
-                        )
-                        .unique()
-                        .all()
-                    )
-                    for super_obj in super_objs:
-                        obj_ids.update({o.id for o in super_obj.objs})
-
-                stmt = (
-                    Photometry.select(
-                        session.user_or_token,
-                        options=options,
-                    )
-                    .where(
-                        Photometry.obj_id.in_(obj_ids)
-                        if len(obj_ids) > 1
-                        else Photometry.obj_id == obj_id
-                    )
-                    .distinct()
-                )
+                stmt = self._photometry_statement(session, obj_id, **query_options)
                 photometry = session.scalars(stmt).unique().all()
 
                 # Compute extinction for all filters
                 extinction_dict = None
-                if (
-                    include_extinction
-                    and format != "plot"
-                    and len(photometry) > 0
-                    and nan_to_none(obj.ra) is not None
-                    and nan_to_none(obj.dec) is not None
-                ):
-                    extinction_dict = {}
-                    filters = {phot.filter for phot in photometry}
-                    for filt in filters:
-                        extinction_dict[filt] = calculate_extinction(
-                            obj.ra, obj.dec, filt
-                        )
-
-                phot_data = [
-                    serialize(
-                        phot,
-                        outsys,
-                        format,
-                        annotations=include_annotation_info,
-                        owner=include_owner_info,
-                        stream=include_stream_info,
-                        validation=include_validation_info,
-                        extinction_dict=extinction_dict,
+                if include_extinction and format != "plot" and len(photometry) > 0:
+                    extinction_dict = self._extinction_by_filter(
+                        obj, {phot.filter for phot in photometry}
                     )
-                    for phot in photometry
-                ]
+
+                phot_data = serialize_many(
+                    photometry,
+                    outsys,
+                    format,
+                    extinction_dict=extinction_dict,
+                    **serialize_options,
+                )
                 if deduplicate_photometry and format != "plot" and len(phot_data) > 0:
                     df_phot = pd.DataFrame.from_records(phot_data)
                     # drop duplicate mjd/filter points, keeping most recent
@@ -2526,48 +2579,224 @@ class ObjPhotometryHandler(BaseHandler):
                     )
 
             if individual_or_series in ["series", "both"]:
-                series = (
-                    session.scalars(
-                        PhotometricSeries.select(session.user_or_token).where(
-                            PhotometricSeries.obj_id == obj_id
-                        )
-                    )
-                    .unique()
-                    .all()
-                )
-                series_data = []
-                for s in series:
-                    series_data += s.get_data_with_extra_columns().to_dict(
-                        orient="records"
-                    )
+                series_data = self._series_points(session, obj_id)
 
             data = phot_data + series_data
 
             data.sort(key=lambda x: x["mjd"])
 
             if phase_fold_data:
-                period, modified = None, arrow.Arrow(1, 1, 1)
-
-                annotations = session.scalars(
-                    Annotation.select(session.user_or_token).where(
-                        Annotation.obj_id == obj_id
-                    )
-                ).all()
-                period_str_options = ["period", "Period", "PERIOD"]
-                for an in annotations:
-                    if not isinstance(an.data, dict):
-                        continue
-                    for period_str in period_str_options:
-                        if period_str in an.data and arrow.get(an.modified) > modified:
-                            period = an.data[period_str]
-                            modified = arrow.get(an.modified)
+                period = self._period(session, obj_id)
                 if period is None:
                     self.error(f"No period for object {obj_id}")
                 for ii in range(len(data)):
                     data[ii]["phase"] = np.mod(data[ii]["mjd"], period) / period
 
+            if output_format in TABLE_FORMATS:
+                table = records_to_table(
+                    data, metadata={"obj_id": obj_id, "magsys": outsys}
+                )
+                return self.send_table(table, f"{obj_id}_photometry", output_format)
+
             return self.success(data=data)
 
+    @staticmethod
+    def _photometry_statement(
+        session,
+        obj_id,
+        format,
+        annotations,
+        owner,
+        stream,
+        validation,
+        superobjs,
+        streaming=False,
+    ):
+        """The access-controlled select of the object's photometry points.
+
+        When ``streaming``, collections are loaded with selectinload (joined
+        eager loading of collections can't be combined with ``yield_per``) and
+        the points come ordered by mjd.
+        """
+        collection_load = selectinload if streaming else joinedload
+        if format == "plot":
+            options = [load_only(*(getattr(Photometry, c) for c in PHOT_PLOT_COLUMNS))]
+        else:
+            options = [
+                joinedload(Photometry.instrument).load_only(Instrument.name),
+                collection_load(Photometry.groups).load_only(
+                    Group.id,
+                    Group.name,
+                    Group.nickname,
+                    Group.single_user_group,
+                ),
+            ]
+            if annotations:
+                options.append(collection_load(Photometry.annotations))
+            if owner:
+                options.append(
+                    joinedload(Photometry.owner).load_only(
+                        User.id,
+                        User.username,
+                        User.first_name,
+                        User.last_name,
+                    )
+                )
+            if stream:
+                options.append(
+                    collection_load(Photometry.streams).load_only(
+                        Stream.id,
+                        Stream.name,
+                    )
+                )
+            if validation and USE_PHOTOMETRY_VALIDATION:
+                # selectinload (not joinedload) so validations load via a
+                # single WHERE id IN (...) query instead of an N+1 per
+                # point — the lazy default makes dense sources time out.
+                options.append(selectinload(Photometry.validations))
+
+        obj_ids = {obj_id}
+        if superobjs:
+            super_objs = (
+                session.scalars(
+                    sa.select(SuperObj).where(SuperObj.objs.any(Obj.id == obj_id))
+                )
+                .unique()
+                .all()
+            )
+            for super_obj in super_objs:
+                obj_ids.update({o.id for o in super_obj.objs})
+
+        stmt = (
+            Photometry.select(
+                session.user_or_token,
+                options=options,
+            )
+            .where(
+                Photometry.obj_id.in_(obj_ids)
+                if len(obj_ids) > 1
+                else Photometry.obj_id == obj_id
+            )
+            .distinct()
+        )
+        if streaming:
+            stmt = stmt.order_by(Photometry.mjd, Photometry.id).execution_options(
+                yield_per=STREAM_BATCH_SIZE
+            )
+        return stmt
+
+    @staticmethod
+    def _extinction_by_filter(obj, filters):
+        """Extinction in each of ``filters`` at the object's position, or None
+        when the object has no position."""
+        if nan_to_none(obj.ra) is None or nan_to_none(obj.dec) is None:
+            return None
+        return extinction_by_filter(obj.ra, obj.dec, filters)
+
+    @staticmethod
+    def _series_points(session, obj_id):
+        series = (
+            session.scalars(
+                PhotometricSeries.select(session.user_or_token).where(
+                    PhotometricSeries.obj_id == obj_id
+                )
+            )
+            .unique()
+            .all()
+        )
+        series_data = []
+        for s in series:
+            series_data += s.get_data_with_extra_columns().to_dict(orient="records")
+        return series_data
+
+    @staticmethod
+    def _period(session, obj_id):
+        """The period from the object's most recently modified annotation
+        that has one, or None."""
+        period, modified = None, arrow.Arrow(1, 1, 1)
+
+        annotations = session.scalars(
+            Annotation.select(session.user_or_token).where(Annotation.obj_id == obj_id)
+        ).all()
+        period_str_options = ["period", "Period", "PERIOD"]
+        for an in annotations:
+            if not isinstance(an.data, dict):
+                continue
+            for period_str in period_str_options:
+                if period_str in an.data and arrow.get(an.modified) > modified:
+                    period = an.data[period_str]
+                    modified = arrow.get(an.modified)
+        return period
+
+    async def _stream_photometry(
+        self,
+        obj_id,
+        stream_format,
+        individual_or_series,
+        phase_fold_data,
+        outsys,
+        include_extinction,
+        query_options,
+        serialize_options,
+    ):
+        """Streaming variant of ``get``: the points are read through a
+        server-side cursor and sent in batches, merged by mjd with the
+        photometric series points, so the whole light curve is never held in
+        memory."""
+        format = query_options["format"]
+        with self.Session() as session:
+            obj = session.scalars(
+                Obj.select(session.user_or_token).where(Obj.id == obj_id)
+            ).first()
+            if obj is None:
+                return self.error(
+                    f"Insufficient permissions for User {self.current_user.id} to read Obj {obj_id}",
+                    status=403,
+                )
+            period = None
+            if phase_fold_data:
+                period = self._period(session, obj_id)
+                if period is None:
+                    return self.error(f"No period for object {obj_id}")
+
+            streams = []
+            if individual_or_series in ["individual", "both"]:
+                stmt = self._photometry_statement(
+                    session, obj_id, streaming=True, **query_options
+                )
+                extinction_dict = None
+                if include_extinction and format != "plot":
+                    filters = session.scalars(
+                        stmt.with_only_columns(Photometry.filter)
+                        .order_by(None)
+                        .distinct()
+                    ).all()
+                    extinction_dict = self._extinction_by_filter(obj, filters)
+
+                def points():
+                    for partition in session.scalars(stmt).partitions():
+                        yield from serialize_many(
+                            partition,
+                            outsys,
+                            format,
+                            extinction_dict=extinction_dict,
+                            **serialize_options,
+                        )
+
+                streams.append(points())
+            if individual_or_series in ["series", "both"]:
+                series_data = self._series_points(session, obj_id)
+                series_data.sort(key=lambda x: x["mjd"])
+                streams.append(series_data)
+
+            rows = heapq.merge(*streams, key=lambda x: x["mjd"])
+            if period is not None:
+                rows = (
+                    {**row, "phase": np.mod(row["mjd"], period) / period}
+                    for row in rows
+                )
+            await self.stream_success(rows, stream_format)
+
     @permissions(["Delete bulk photometry"])
     def delete(self, obj_id: str):
         """
@@ -2704,6 +2933,13 @@ class PhotometryRangeHandler(BaseHandler):
         if format not in ["mag", "flux"]:
             return self.error("Invalid output format.")
 
+        output_format = self.get_query_argument("output_format", default="json")
+        if output_format != "json" and output_format not in TABLE_FORMATS:
+            return self.error(
+                f"Invalid output_format {output_format}, must be one of "
+                f"{['json', *TABLE_FORMATS]}"
+            )
+
         with self.Session() as session:
             try:
                 standardized = PhotometryRangeQuery.load(json)
@@ -2736,10 +2972,12 @@ class PhotometryRangeHandler(BaseHandler):
                 group_phot_subquery, Photometry.id == group_phot_subquery.c.photometr_id
             )
 
-            output = [
-                serialize(p, magsys, format)
-                for p in session.scalars(query.distinct()).unique().all()
-            ]
+            output = serialize_many(
+                session.scalars(query.distinct()).unique().all(), magsys, format
+            )
+            if output_format in TABLE_FORMATS:
+                table = records_to_table(output, metadata={"magsys": magsys})
+                return self.send_table(table, "photometry", output_format)
             return self.success(data=output)
 
 
@@ -2880,6 +3118,28 @@ ObjPhotometryHandler.get.__doc__ = f"""
               type: boolean
             description: |
               Boolean indicating whether to include photometry validation information. Defaults to false.
+          - in: query
+            name: stream
+            nullable: true
+            schema:
+              type: string
+              enum: [json, ndjson]
+            description: |
+              Stream the points, sorted by mjd, as they are read from the
+              database instead of building the whole response in memory.
+              `json` sends a bare JSON array of points, `ndjson` one point
+              per line. Not compatible with deduplicatePhotometry.
+          - in: query
+            name: output_format
+            nullable: true
+            schema:
+              type: string
+              enum: [json, arrow, parquet]
+            description: |
+              Return the points as an Apache Arrow IPC stream or a Parquet
+              file, one row per point, instead of JSON. Numeric columns keep
+              their types; nested fields (groups, annotations, ...) are
+              JSON-encoded strings. Defaults to json.
         responses:
           200:
             content:
@@ -2921,6 +3181,16 @@ PhotometryRangeHandler.get.__doc__ = f"""
             schema:
               type: string
               enum: {list(ALLOWED_MAGSYSTEMS)}
+          - in: query
+            name: output_format
+            required: false
+            description: >-
+              Return the photometry as an Apache Arrow IPC stream or a
+              Parquet file, one row per point, instead of JSON.
+              (Default json)
+            schema:
+              type: string
+              enum: [json, arrow, parquet]
         requestBody:
           content:
             application/json:
@@ -12,6 +12,7 @@ from ...models import (
     Localization,
     LocalizationTile,
 )
+from ...utils.localization_tiles import in_credible_region, min_probdensity_async
 from ..base import BaseHandler
 
 
@@ -114,26 +115,9 @@ class SkymapTriggerAPIHandler(BaseHandler):
                         "def", LocalizationTile
                     )
 
-            cum_prob = (
-                sa.func.sum(
-                    localizationtilescls.probdensity * localizationtilescls.healpix.area
-                )
-                .over(order_by=localizationtilescls.probdensity.desc())
-                .label("cum_prob")
+            threshold = await min_probdensity_async(
+                session, localization.id, integrated_probability, localizationtilescls
             )
-            localizationtile_subquery = (
-                sa.select(localizationtilescls.probdensity, cum_prob).filter(
-                    localizationtilescls.localization_id == localization.id
-                )
-            ).subquery()
-
-            min_probdensity = (
-                sa.select(
-                    sa.func.min(localizationtile_subquery.columns.probdensity)
-                ).filter(
-                    localizationtile_subquery.columns.cum_prob <= integrated_probability
-                )
-            ).scalar_subquery()
 
             area = (InstrumentFieldTile.healpix * localizationtilescls.healpix).area
             prob = sa.func.sum(localizationtilescls.probdensity * area)
@@ -142,7 +126,7 @@ class SkymapTriggerAPIHandler(BaseHandler):
                 sa.select(InstrumentField.field_id, prob)
                 .where(
                     localizationtilescls.localization_id == localization.id,
-                    localizationtilescls.probdensity >= min_probdensity,
+                    in_credible_region(localizationtilescls, threshold),
                     InstrumentFieldTile.instrument_id == instrument.id,
                     InstrumentFieldTile.instrument_field_id == InstrumentField.id,
                     InstrumentFieldTile.healpix.overlaps(localizationtilescls.healpix),
@@ -11,7 +11,6 @@ import traceback
 from json.decoder import JSONDecodeError
 
 import arrow
-import astropy
 import astropy.units as u
 import conesearch_alchemy as ca
 import healpix_alchemy as ha
@@ -20,13 +19,6 @@ import numpy as np
 import pandas as pd
 import python_http_client.exceptions
 import sqlalchemy as sa
-from astroplan import (
-    AirmassConstraint,
-    AtNightConstraint,
-    Observer,
-    is_event_observable,
-)
-from astropy.coordinates import EarthLocation
 from astropy.time import Time
 from dateutil.parser import isoparse
 from marshmallow import Schema, fields
@@ -82,6 +74,12 @@ from ...models import (
     Token,
     User,
 )
+from ...utils.airmass import (
+    NIGHT_RESOLUTION,
+    TWILIGHT_SUN_ALTITUDES,
+    airmass_grid,
+    sun_altitude,
+)
 from ...utils.asynchronous import run_async
 from ...utils.calculations import great_circle_distance
 from ...utils.data_access import (
@@ -102,7 +100,7 @@ from ...utils.offset import (
 )
 from ...utils.parse import get_list_typed, get_page_and_n_per_page, str_to_bool
 from ...utils.sizeof import SIZE_WARNING_THRESHOLD, sizeof
-from ..base import BaseHandler
+from ..base import STREAM_FORMATS, BaseHandler
 from .candidate.candidate import (
     update_healpix_if_relevant,
     update_redshift_history_if_relevant,
@@ -1982,6 +1980,19 @@ class SourceHandler(BaseHandler):
             description: |
               Boolean indicating whether to include associated GeoJSON. Defaults to
               false.
+          - in: query
+            name: stream
+            nullable: true
+            schema:
+              type: string
+              enum: [json, ndjson]
+            description: |
+              Stream the page of sources instead of returning it in the usual
+              response envelope: `json` sends a bare JSON array of sources,
+              `ndjson` one source per line. totalMatches, pageNumber,
+              numPerPage and queryID are returned in the X-Total-Matches,
+              X-Page-Number, X-Num-Per-Page and X-Query-ID headers. Not
+              compatible with includeGeoJSON.
           - in: query
             name: useCache
             nullable: true
@@ -2139,6 +2150,16 @@ class SourceHandler(BaseHandler):
         # optional, use caching
         use_cache = self.get_query_argument("useCache", False)
         query_id = self.get_query_argument("queryID", None)
+        stream = self.get_query_argument("stream", None)
+
+        if stream is not None:
+            if stream not in STREAM_FORMATS:
+                return self.error(
+                    f"Invalid stream format {stream}, must be one of "
+                    f"{list(STREAM_FORMATS)}"
+                )
+            if str_to_bool(includeGeoJSON, default=False):
+                return self.error("includeGeoJSON is not supported when streaming")
 
         class Validator(Schema):
             saved_after = UTCTZnaiveDateTime(required=False, load_default=None)
@@ -2394,6 +2415,21 @@ class SourceHandler(BaseHandler):
                 log(
                     f"User {self.associated_user_object.id} source query returned {query_size} bytes in {duration} seconds"
                 )
+
+            if stream is not None:
+                # The pagination metadata goes in headers, the body is the
+                # bare list of sources.
+                for key, header in (
+                    ("totalMatches", "X-Total-Matches"),
+                    ("pageNumber", "X-Page-Number"),
+                    ("numPerPage", "X-Num-Per-Page"),
+                    ("queryID", "X-Query-ID"),
+                    ("group_id", "X-Group-ID"),
+                ):
+                    if query_results.get(key) is not None:
+                        self.set_header(header, str(query_results[key]))
+                return await self.stream_success(query_results["sources"], stream)
+
             return self.success(data=query_results)
 
     @permissions(["Upload data"])
@@ -3549,8 +3585,15 @@ class SourceObservabilityPlotHandler(BaseHandler):
                 schema: Success
         """
 
-        max_airmass = self.get_query_argument("maxAirmass", 2.5)
+        try:
+            max_airmass = float(self.get_query_argument("maxAirmass", 2.5))
+        except ValueError:
+            return self.error("maxAirmass must be a number")
         twilight = self.get_query_argument("twilight", "astronomical")
+        if twilight not in TWILIGHT_SUN_ALTITUDES:
+            return self.error(
+                f"twilight must be one of {', '.join(TWILIGHT_SUN_ALTITUDES)}"
+            )
 
         async with self.AsyncSession() as session:
             telescopes_result = await session.scalars(
@@ -3563,33 +3606,28 @@ class SourceObservabilityPlotHandler(BaseHandler):
             )
             if source is None:
                 return self.error("Source not found", status=404)
-            coords = astropy.coordinates.SkyCoord(source.ra, source.dec, unit="deg")
 
-            trigger_time = Time.now()
-            times = trigger_time + np.linspace(0, 1) * u.day
-
-            observers = []
-            for telescope in telescopes:
-                if not telescope.fixed_location:
-                    continue
-                location = EarthLocation(
-                    lon=telescope.lon * u.deg,
-                    lat=telescope.lat * u.deg,
-                    height=(telescope.elevation or 0) * u.m,
-                )
-
-                observers.append(Observer(location, name=telescope.nickname))
-            observers = list(reversed(observers))
+            # the next 24 hours, on a grid aligned on NIGHT_RESOLUTION so
+            # that the sidereal times of each telescope are cached
+            step = NIGHT_RESOLUTION.to_value(u.day)
+            start = np.floor(Time.now().mjd / step)
+            times = Time(
+                (start + np.arange(int(round(1 / step)) + 1)) * step, format="mjd"
+            )
 
-            constraints = [
-                getattr(AtNightConstraint, f"twilight_{twilight}")(),
-                AirmassConstraint(max_airmass),
+            sites = [
+                telescope
+                for telescope in telescopes
+                if telescope.fixed_location
+                and telescope.lon is not None
+                and telescope.lat is not None
             ]
+            sites = list(reversed(sites))
 
             output_format = "pdf"
             fig = plt.figure(figsize=(14, 10))
             width, height = fig.get_size_inches()
-            fig.set_size_inches(width, (len(observers) + 1) / 16 * width)
+            fig.set_size_inches(width, (len(sites) + 1) / 16 * width)
             ax = plt.axes()
             locator = dates.AutoDateLocator()
             formatter = dates.DateFormatter("%H:%M")
@@ -3598,16 +3636,21 @@ class SourceObservabilityPlotHandler(BaseHandler):
             ax.xaxis.set_major_locator(locator)
             ax.set_xlabel(f"Time from {min(times).datetime.date()} [UTC]")
             plt.setp(ax.get_xticklabels(), rotation=30, ha="right")
-            ax.set_yticks(np.arange(len(observers)))
-            ax.set_yticklabels([observer.name for observer in observers])
+            ax.set_yticks(np.arange(len(sites)))
+            ax.set_yticklabels([site.nickname for site in sites])
             ax.yaxis.set_tick_params(left=False)
             ax.grid(axis="x")
             ax.spines["bottom"].set_visible(False)
             ax.spines["top"].set_visible(False)
 
-            for i, observer in enumerate(observers):
-                observable = 100 * np.dot(
-                    1.0, is_event_observable(constraints, observer, coords, times)
+            for i, site in enumerate(sites):
+                airmass = airmass_grid(
+                    source.ra, source.dec, times, site.lon, site.lat
+                )[0]
+                sun_altitudes = sun_altitude(times, site.lon, site.lat)
+                observable = 100.0 * (
+                    (airmass <= max_airmass)
+                    & (sun_altitudes <= TWILIGHT_SUN_ALTITUDES[twilight])
                 )
                 ax.contourf(
                     times.plot_date,
@@ -35,6 +35,7 @@ from skyportal.models import (
 
 from ...utils.cache import Cache, array_to_bytes
 from ...utils.calculations import radec2lb
+from ...utils.localization_tiles import min_probdensity_async
 
 _, cfg = load_env()
 cache_dir = "cache/sources_queries"
@@ -453,7 +454,7 @@ async def get_localization(localization_dateobs, localization_name, session):
     endTime = time.time()
     log_verbose(f"get_localization took {endTime - startTime} seconds")
 
-    return localization_id, localizationtilescls.__tablename__
+    return localization_id, localizationtilescls
 
 
 def get_luminosity_distance(obj):
@@ -1533,31 +1534,30 @@ async def get_sources(
             try:
                 localization_dateobs = arrow.get(localization_dateobs).naive
                 localization_cumprob = float(localization_cumprob)
-                localization_id, partition = await get_localization(
+                localization_id, tilecls = await get_localization(
                     localization_dateobs,
                     localization_name,
                     session,
                 )
-                # this is twice as fast as if we ran each query (the localization tiles query,
-                # and its overall with the sources) separately.
-                # we used caching for that in prod, but now that we have partitions, we can do it this way
-                localization_queries.append(
-                    f"""EXISTS (
-                    SELECT lt.id
-                    FROM (
-                        SELECT  {partition}.id,
-                                {partition}.healpix,
-                                {partition}.probdensity,
-                                SUM({partition}.probdensity *
-                                    (upper({partition}.healpix) - lower({partition}.healpix)) * 3.6331963520923245e-18
-                                ) OVER (ORDER BY {partition}.probdensity DESC) AS cum_prob
+                partition = tilecls.__tablename__
+                threshold = await min_probdensity_async(
+                    session, localization_id, localization_cumprob, tilecls
+                )
+                # the credible region is every tile at or above the threshold
+                # probdensity, so the tiles are filtered on it instead of
+                # summing the probability of every tile for each query
+                if threshold is None:
+                    localization_queries.append("FALSE")
+                else:
+                    localization_queries.append(
+                        f"""EXISTS (
+                        SELECT {partition}.id
                         FROM {partition}
                         WHERE {partition}.localization_id = {localization_id}
-                    ) AS lt
-                    WHERE lt.cum_prob <= {localization_cumprob} and lt.healpix @> objs.healpix
-                    ORDER BY lt.probdensity DESC
-                    )"""
-                )
+                        AND {partition}.probdensity >= {threshold!r}::float8
+                        AND {partition}.healpix @> objs.healpix
+                        )"""
+                    )
                 if localization_reject_sources or sort_by == "gcn_status":
                     joins.append(
                         f"""
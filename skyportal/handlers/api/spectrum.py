@@ -44,6 +44,14 @@ from ...models.schema import (
     SpectrumPost,
 )
 from ...utils.data_access import accessible_group_ids_async
+from ...utils.parse import str_to_bool
+from ...utils.spectrum_preview import (
+    MIN_PREVIEW_POINTS,
+    PREVIEW_MAX_POINTS,
+    invalidate_preview,
+    preview_indices,
+)
+from ...utils.tables import TABLE_FORMATS, spectra_to_table
 from ..base import BaseHandler
 from .photometry import add_external_photometry
 
@@ -1124,6 +1132,7 @@ class SpectrumHandler(BaseHandler):
                 setattr(spectrum, k, data[k])
 
             await session.commit()
+            invalidate_preview(spectrum.id)
 
             obj = await session.scalar(sa.select(Obj).where(Obj.id == spectrum.obj_id))
             if obj is not None:
@@ -1175,9 +1184,11 @@ class SpectrumHandler(BaseHandler):
                 return self.error("Could not find spectrum.", status=403)
             obj = await session.scalar(sa.select(Obj).where(Obj.id == spectrum.obj_id))
             obj_key = obj.internal_key if obj is not None else None
+            deleted_id = spectrum.id
 
             await session.delete(spectrum)
             await session.commit()
+            invalidate_preview(deleted_id)
 
             if obj_key is not None:
                 self.push_all(
@@ -1528,6 +1539,36 @@ class ObjSpectraHandler(BaseHandler):
             description: |
                 The order to sort the spectra by. Defaults to asc.
                 Options are: asc, desc
+          - in: query
+            name: output_format
+            required: false
+            schema:
+                type: string
+                enum: [json, arrow, parquet]
+            description: |
+                Return the spectra as an Apache Arrow IPC stream or a Parquet
+                file instead of JSON: one row per spectrum, with wavelengths,
+                fluxes and errors as list<double> columns and nested fields
+                (groups, comments, ...) as JSON-encoded strings.
+                Defaults to json.
+          - in: query
+            name: preview
+            required: false
+            schema:
+                type: boolean
+            description: |
+                Return downsampled spectra for plotting, with at most
+                maxPoints pixels each: the pixels with the lowest and
+                highest flux are kept in consecutive bins of pixels, so
+                that lines are preserved. Defaults to false.
+          - in: query
+            name: maxPoints
+            required: false
+            schema:
+                type: integer
+            description: |
+                Maximum number of pixels per spectrum when previewing.
+                Defaults to 2000. Implies preview.
 
         responses:
           200:
@@ -1568,6 +1609,29 @@ class ObjSpectraHandler(BaseHandler):
         # original_file_string (the raw uploaded file) is opt-in.
         include_original_file = self.get_query_argument("includeOriginalFile", False)
 
+        output_format = self.get_query_argument("output_format", "json")
+        if output_format != "json" and output_format not in TABLE_FORMATS:
+            return self.error(
+                f"Invalid output_format {output_format}, must be one of "
+                f"{['json', *TABLE_FORMATS]}"
+            )
+
+        preview = str_to_bool(
+            self.get_query_argument("preview", "false"), default=False
+        )
+        max_points = self.get_query_argument("maxPoints", None)
+        if max_points is not None:
+            try:
+                max_points = int(max_points)
+            except ValueError:
+                return self.error("Invalid maxPoints, must be an integer.")
+            if max_points < MIN_PREVIEW_POINTS:
+                return self.error(
+                    f"Invalid maxPoints, must be at least {MIN_PREVIEW_POINTS}."
+                )
+        elif preview:
+            max_points = PREVIEW_MAX_POINTS
+
         async with self.AsyncSession() as session:
             obj = await session.scalar(
                 Obj.select(session.user_or_token).where(Obj.id == obj_id)
@@ -1708,6 +1772,22 @@ class ObjSpectraHandler(BaseHandler):
                         f'Invalid "normalization" value "{normalization}, use '
                         '"median" or None'
                     )
+
+            if max_points is not None:
+                # the normalization above uses all the pixels
+                for spec, s in zip(spectra, return_values):
+                    indices = preview_indices(
+                        spec.id, spec.modified, spec.fluxes, max_points
+                    )
+                    if len(indices) == len(spec.fluxes):
+                        continue
+                    for key in ["wavelengths", "fluxes", "errors"]:
+                        if s[key] is not None:
+                            s[key] = np.asarray(s[key])[indices]
+
+            if output_format in TABLE_FORMATS:
+                table = spectra_to_table(return_values, metadata={"obj_id": obj.id})
+                return await self.send_table(table, f"{obj.id}_spectra", output_format)
             return self.success(data={"obj_id": obj.id, "spectra": return_values})
 
 
@@ -1916,6 +1996,15 @@ class SpectrumRangeHandler(BaseHandler):
             description: |
               Maximum UTC date of range in ISOT format. If None,
               open ended range.
+          - in: query
+            name: output_format
+            required: false
+            schema:
+              type: string
+              enum: [json, arrow, parquet]
+            description: |
+              Return the spectra as an Apache Arrow IPC stream or a Parquet
+              file, one row per spectrum, instead of JSON. Defaults to json.
 
         responses:
           200:
@@ -1945,6 +2034,12 @@ class SpectrumRangeHandler(BaseHandler):
         instrument_ids = self.get_query_arguments("instrument_ids")
         min_date = self.get_query_argument("min_date", None)
         max_date = self.get_query_argument("max_date", None)
+        output_format = self.get_query_argument("output_format", "json")
+        if output_format != "json" and output_format not in TABLE_FORMATS:
+            return self.error(
+                f"Invalid output_format {output_format}, must be one of "
+                f"{['json', *TABLE_FORMATS]}"
+            )
 
         try:
             instrument_ids = [int(i) for i in instrument_ids]
@@ -1967,7 +2062,11 @@ class SpectrumRangeHandler(BaseHandler):
                 query = query.where(Spectrum.observed_at <= utc.datetime)
 
             result = await session.scalars(query)
-            return self.success(data=result.unique().all())
+            spectra = result.unique().all()
+            if output_format in TABLE_FORMATS:
+                table = spectra_to_table([spectrum.to_dict() for spectrum in spectra])
+                return await self.send_table(table, "spectra", output_format)
+            return self.success(data=spectra)
 
 
 class SyntheticPhotometryHandler(BaseHandler):
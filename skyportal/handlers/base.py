@@ -1,5 +1,6 @@
 import functools
 import inspect
+import itertools
 import types
 import typing
 from math import ceil
@@ -8,11 +9,22 @@ from tornado.gen import sleep
 from tornado.iostream import StreamClosedError
 
 from baselayer.app.handlers.base import BaseHandler as BaselayerHandler
+from baselayer.app.json_util import to_json
 
 from .. import __version__
+from ..utils.tables import TABLE_FORMATS, table_bytes
 
 HANDLER_METHODS = ("get", "post", "put", "patch", "delete")
 
+# Body formats of `BaseHandler.stream_success`: a JSON array, or one JSON
+# document per line.
+STREAM_FORMATS = {"json": "application/json", "ndjson": "application/x-ndjson"}
+# Rows serialized, and rows fetched per cursor round trip, between flushes.
+STREAM_BATCH_SIZE = 1000
+# Arrow/Parquet exports are whole light curves or sets of spectra, so they get
+# a larger ceiling than `send_file`'s default.
+MAX_TABLE_FILE_SIZE = 1024**3
+
 
 def resolve_cast(annotation):
     """Resolve a parameter annotation to a cast callable.
@@ -141,11 +153,87 @@ class BaseHandler(BaselayerHandler):
         return self.current_user.created_by
 
     def success(self, *args, **kwargs):
+        # Hand the payload to an enclosing `cached_response` (see
+        # response_cache.py), which stores it once the handler returns.
+        capture = getattr(self, "_response_cache_capture", None)
+        if capture is not None:
+            capture.append(
+                kwargs["data"] if "data" in kwargs else args[0] if args else {}
+            )
         super().success(*args, **kwargs, extra={"version": __version__})
 
     def error(self, message, *args, **kwargs):
         super().error(message, *args, **kwargs, extra={"version": __version__})
 
+    async def stream_success(
+        self, rows, format="json", serialize=None, batch_size=STREAM_BATCH_SIZE
+    ):
+        """Send ``rows`` as they are produced instead of building the body.
+
+        rows : iterable
+            The items to send, typically drawn lazily from a server-side
+            cursor.
+        format : str
+            "json" sends a JSON array, "ndjson" one JSON document per line.
+        serialize : callable, optional
+            Applied to each row before it is encoded.
+        batch_size : int
+            Rows encoded and written between two flushes to the client.
+
+        Unlike `success`, the body is not wrapped in the usual
+        ``{"status": ..., "data": ...}`` envelope: by the time a row fails,
+        earlier ones have been sent, so errors can only truncate the body.
+        """
+        if format not in STREAM_FORMATS:
+            raise ValueError(
+                f"Invalid stream format {format}, must be one of {list(STREAM_FORMATS)}"
+            )
+        self.set_status(200)
+        self.set_header("Content-Type", f"{STREAM_FORMATS[format]}; charset=UTF-8")
+        self.set_header("Cache-Control", "no-store")
+
+        if format == "json":
+            opening, separator, closing = "[", ",", "]"
+        else:
+            opening, separator, closing = "", "\n", "\n"
+
+        rows = iter(rows)
+        first = True
+        try:
+            self.write(opening)
+            while batch := list(itertools.islice(rows, batch_size)):
+                if serialize is not None:
+                    batch = [serialize(row) for row in batch]
+                chunk = separator.join(to_json(row) for row in batch)
+                self.write(chunk if first else separator + chunk)
+                first = False
+                await self.flush()
+                # let other handlers run between batches
+                await sleep(1e-9)
+            if format == "json" or not first:
+                self.write(closing)
+            await self.flush()
+        except StreamClosedError:
+            # the client went away; nothing left to send to
+            pass
+
+    async def send_table(self, table, filename, format):
+        """Send a pyarrow Table as an Arrow IPC stream or a Parquet file.
+
+        table : pyarrow.Table
+            The table to send.
+        filename : str
+            Downloaded filename, without extension.
+        format : str
+            One of "arrow" or "parquet" (see `skyportal.utils.tables`).
+        """
+        await self.send_file(
+            table_bytes(table, format),
+            f"{filename}.{format}",
+            output_type=format,
+            max_file_size=MAX_TABLE_FILE_SIZE,
+        )
+
     async def send_file(
         self,
         data,
@@ -180,6 +268,9 @@ class BaseHandler(BaselayerHandler):
         elif output_type in ["txt", "xml", "json", "csv"]:
             self.set_header("Content-type", "text/plain")
             self.set_header("Content-Disposition", f"attachment; filename={filename}")
+        elif output_type in TABLE_FORMATS:
+            self.set_header("Content-type", TABLE_FORMATS[output_type])
+            self.set_header("Content-Disposition", f"attachment; filename={filename}")
         else:
             self.set_header("Content-type", f"image/{output_type}")
 
@@ -0,0 +1,100 @@
+"""Lazy imports of the handlers.
+
+Importing all the handler modules, and the scientific packages they use,
+takes most of the start-up time of an app server or microservice. Instead:
+
+- the handler packages export their handlers lazily (`lazy_exports`), so
+  importing one handler module doesn't import all the others;
+- the routes of the app server refer to placeholders of the handlers
+  (`LazyHandlers`), which are resolved to the handlers on their first request.
+"""
+
+import functools
+import importlib
+import sys
+
+import tornado.web
+
+
+def lazy_exports(package, exports):
+    """
+    Export attributes of the submodules of a package, importing each
+    submodule on the first access to one of its attributes.
+
+    Parameters
+    ----------
+    package : str
+        Name of the package, i.e. ``__name__`` in its ``__init__.py``.
+    exports : dict
+        The names of the exported attributes, by relative submodule name.
+
+    Returns
+    -------
+    __getattr__ : function
+        The module ``__getattr__`` of the package.
+    __dir__ : function
+        The module ``__dir__`` of the package.
+    __all__ : list of str
+        The exported names.
+    """
+    modules = {name: module for module, names in exports.items() for name in names}
+
+    def __getattr__(name):
+        if name not in modules:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(modules[name], package), name)
+        # later accesses don't go through __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(modules))
+
+    return __getattr__, __dir__, list(modules)
+
+
+class LazyHandler(tornado.web.RequestHandler):
+    """Placeholder of a handler in a route, until its first request.
+    See `resolve_handler`."""
+
+    package = None
+    handler_name = None
+    _handler = None
+
+    @classmethod
+    def resolve(cls):
+        if cls._handler is None:
+            package = importlib.import_module(cls.package)
+            cls._handler = getattr(package, cls.handler_name)
+        return cls._handler
+
+
+@functools.cache
+def lazy_handler(package, name):
+    """The placeholder of the handler `name` of `package`."""
+    if name not in importlib.import_module(package).__all__:
+        raise AttributeError(f"{package} has no handler {name}")
+    return type(name, (LazyHandler,), {"package": package, "handler_name": name})
+
+
+def resolve_handler(handler):
+    """The handler of a route: imports the handler of a placeholder."""
+    if isinstance(handler, type) and issubclass(handler, LazyHandler):
+        return handler.resolve()
+    return handler
+
+
+class LazyHandlers:
+    """Placeholders of the handlers exported by a package, as attributes.
+
+    Parameters
+    ----------
+    package : str
+        Name of the package, which exports its handlers with `lazy_exports`.
+    """
+
+    def __init__(self, package):
+        self.package = package
+
+    def __getattr__(self, name):
+        return lazy_handler(self.package, name)
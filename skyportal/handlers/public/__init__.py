@@ -1,4 +1,12 @@
-from .finder import CachedSourceFinderHandler
-from .release import ReleaseHandler
-from .report import ReportHandler
-from .source_page import ReleaseSourcePageHandler, SourcePageHandler
+# The handlers are imported on first access, see skyportal/handlers/lazy.py
+from ..lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(
+    __name__,
+    {
+        ".finder": ["CachedSourceFinderHandler"],
+        ".release": ["ReleaseHandler"],
+        ".report": ["ReportHandler"],
+        ".source_page": ["ReleaseSourcePageHandler", "SourcePageHandler"],
+    },
+)
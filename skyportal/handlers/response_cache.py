@@ -0,0 +1,228 @@
+"""Shared read-through cache for expensive handler GET responses.
+
+Declared per endpoint with :func:`cached_response`, which wraps an async
+``get`` so that a successful response's ``data`` is stored in Valkey (via
+:func:`skyportal.utils.valkey_cache.get_cache`) and served from there by every
+app process until it expires or is invalidated. With ``cache.enabled`` false
+(the default) the cache is a no-op and the wrapped method always runs.
+
+Keys are ``respcache:v1:{endpoint}:{scope}:{variant}``:
+
+* ``scope`` is what makes a cached payload safe to share. ``"user"`` keys on
+  the requesting user (or token: a token's ACLs may be narrower than its
+  owner's), ``"groups"`` on a hash of the requester's accessible group ids and
+  ``"global"`` shares one entry between everyone allowed through the handler's
+  auth decorators (e.g. admin-only statistics).
+* ``variant`` hashes the query arguments and user preference sections that
+  change the response, so e.g. a different ``teamID`` or ``sinceDaysAgo`` gets
+  its own entry and a preference change moves the user to a new key.
+
+Invalidation is by endpoint prefix: when a flush inserts, updates or deletes a
+row of one of the endpoint's ``invalidate_on`` models, every cached entry of
+the endpoint is dropped with ``delete_prefix`` once the session commits (a
+rolled-back change may also invalidate, which only costs a miss). This
+runs in whichever process commits (app, ingestion service, ...), and since the
+entries live in the shared Valkey, all processes see it. Outside a running
+event loop the delete is skipped and the TTL bounds staleness.
+
+TTLs come from ``cache.ttl.<endpoint>``, falling back to ``cache.ttl.default``.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from baselayer.app.env import load_env
+from baselayer.app.json_util import to_json
+from baselayer.log import make_log
+
+from ..utils.valkey_cache import get_cache
+
+log = make_log("response_cache")
+
+KEY_PREFIX = "respcache:v1"
+SCOPES = ("user", "groups", "global")
+
+# Model class -> endpoints whose cached responses it invalidates.
+_invalidated_by = {}
+# Keep the scheduled delete tasks alive until they finish.
+_pending = set()
+
+
+def endpoint_prefix(endpoint):
+    """Key prefix shared by every cached response of ``endpoint``."""
+    return f"{KEY_PREFIX}:{endpoint}:"
+
+
+def response_key(endpoint, scope, variant):
+    return f"{endpoint_prefix(endpoint)}{scope}:{variant}"
+
+
+def _short_sha(value):
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def principal_scope(user_or_token):
+    """``"user"`` scope of a request: the user id, or the token id for token
+    requests."""
+    if hasattr(user_or_token, "username"):
+        return f"u{user_or_token.id}"
+    return f"t{user_or_token.id}"
+
+
+def groups_scope(group_ids):
+    """``"groups"`` scope of a request: a hash of its accessible group ids."""
+    return f"g{_short_sha(sorted(int(g) for g in group_ids))}"
+
+
+def variant_hash(query_args, preferences):
+    """Hash the query arguments and preference sections a response depends on.
+
+    Parameters
+    ----------
+    query_args : dict
+        Query argument name -> value (None when absent).
+    preferences : dict
+        Preference section name -> the user's settings for it (None when unset).
+    """
+    return _short_sha({"q": query_args, "p": preferences})
+
+
+def endpoint_ttl(endpoint):
+    _, cfg = load_env()
+    ttl = cfg.get(f"cache.ttl.{endpoint}")
+    if ttl is None:
+        ttl = cfg.get("cache.ttl.default", 300)
+    return int(ttl)
+
+
+def _mark_stale(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    endpoints = set()
+    for model in type(target).__mro__:
+        endpoints |= _invalidated_by.get(model, set())
+    if endpoints:
+        session.info.setdefault("response_cache_stale", set()).update(endpoints)
+
+
+def _invalidate_after_commit(session):
+    endpoints = session.info.pop("response_cache_stale", None)
+    if not endpoints:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    cache = get_cache()
+    for endpoint in endpoints:
+        task = loop.create_task(cache.delete_prefix(endpoint_prefix(endpoint)))
+        _pending.add(task)
+        task.add_done_callback(_pending.discard)
+
+
+def register_invalidation(endpoint, models):
+    """Drop ``endpoint``'s cached responses whenever a row of one of
+    ``models`` is inserted, updated or deleted (after the commit)."""
+    if not _invalidated_by:
+        event.listen(Session, "after_commit", _invalidate_after_commit)
+    for model in models:
+        if model not in _invalidated_by:
+            _invalidated_by[model] = set()
+            for event_name in ("after_insert", "after_update", "after_delete"):
+                event.listen(model, event_name, _mark_stale)
+        _invalidated_by[model].add(endpoint)
+
+
+def cached_response(
+    endpoint,
+    scope="user",
+    query_args=(),
+    preferences=(),
+    invalidate_on=(),
+):
+    """Serve an async ``get`` through the shared response cache.
+
+    Apply below the auth decorator, so access is checked before a cached
+    response is served and ``self.current_user`` is available::
+
+        @auth_or_token
+        @cached_response("source_counts", query_args=("teamID",),
+                         preferences=("sourceCounts",), invalidate_on=(Source,))
+        async def get(self):
+            ...
+
+    Only successful responses are cached; ``self.error`` responses never are.
+
+    Parameters
+    ----------
+    endpoint : str
+        Name of the endpoint in keys and in the ``cache.ttl`` config block.
+    scope : str
+        Who may share a cached response: "user", "groups" or "global".
+    query_args : sequence of str
+        Query arguments that change the response.
+    preferences : sequence of str
+        Sections of the user's preferences that change the response.
+    invalidate_on : sequence of model classes
+        Models whose changes invalidate the endpoint's cached responses.
+    """
+    if scope not in SCOPES:
+        raise ValueError(f"Invalid response cache scope: {scope}")
+    if invalidate_on:
+        register_invalidation(endpoint, invalidate_on)
+
+    def wrap(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            cache = get_cache()
+            if not cache.enabled:
+                return await method(self, *args, **kwargs)
+            key = await _request_key(self, endpoint, scope, query_args, preferences)
+            cached = await cache.get(key)
+            if cached is not None:
+                try:
+                    data = json.loads(cached)
+                except ValueError as e:
+                    log(f"undecodable entry [{key}]: {e}")
+                else:
+                    return self.success(data=data)
+
+            self._response_cache_capture = capture = []
+            try:
+                result = await method(self, *args, **kwargs)
+            finally:
+                del self._response_cache_capture
+            if capture and self.get_status() == 200:
+                await cache.set(key, to_json(capture[0]), ttl=endpoint_ttl(endpoint))
+            return result
+
+        return wrapper
+
+    return wrap
+
+
+async def _request_key(handler, endpoint, scope, query_args, preferences):
+    if scope == "user":
+        scope_part = principal_scope(handler.current_user)
+    elif scope == "groups":
+        from ..utils.data_access import accessible_group_ids_async
+
+        async with handler.AsyncSession() as session:
+            group_ids = await accessible_group_ids_async(session.user_or_token, session)
+        scope_part = groups_scope(group_ids)
+    else:
+        scope_part = "all"
+
+    user_prefs = getattr(handler.current_user, "preferences", None) or {}
+    variant = variant_hash(
+        {name: handler.get_query_argument(name, None) for name in query_args},
+        {name: user_prefs.get(name) for name in preferences},
+    )
+    return response_key(endpoint, scope_part, variant)
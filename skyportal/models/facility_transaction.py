@@ -1,12 +1,15 @@
 __all__ = ["FacilityTransaction", "FacilityTransactionRequest"]
 
 import sqlalchemy as sa
+from sqlalchemy import event, inspect
 from sqlalchemy.dialects import postgresql as psql
 from sqlalchemy.orm import relationship
+from tornado.ioloop import IOLoop
 
 from baselayer.app.models import Base
 
 from ..utils.naive_datetime import utcnow_naive
+from ..utils.services import post_facility_requests
 
 
 class FacilityTransaction(Base):
@@ -142,3 +145,16 @@ class FacilityTransactionRequest(Base):
         index=True,
         doc="The status of the request.",
     )
+
+
+@event.listens_for(FacilityTransactionRequest, "after_insert")
+def wake_facility_queue(mapper, connection, target):
+    # Have the facility queue poll the new request once it's committed
+    request_id = target.id
+
+    @event.listens_for(inspect(target).session, "after_commit", once=True)
+    def receive_after_commit(session):
+        IOLoop.current().run_in_executor(
+            None,
+            lambda: post_facility_requests([request_id]),
+        )
@@ -13,6 +13,7 @@ import healpix_alchemy
 import numpy as np
 import sqlalchemy as sa
 from astropy import coordinates as ap_coord
+from astropy import units as u
 from sqlalchemy import cast, event
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import deferred, relationship
@@ -34,6 +35,7 @@ from ..enum_types import (
     instrument_types,
     listener_classnames,
 )
+from ..utils.airmass import altitude_grid, pickering_airmass
 from .sharing_service import SharingService
 
 _, cfg = load_env()
@@ -160,24 +162,8 @@ class InstrumentField(Base):
            The airmass of the Obj at the requested times
         """
 
-        output_shape = time.shape
-        time = np.atleast_1d(time)
         altitude = self.altitude(self.instrument.telescope, time).to("degree").value
-        above = altitude > 0
-
-        # use Pickering (2002) interpolation to calculate the airmass
-        # The Pickering interpolation tends toward 38.7494 as the altitude
-        # approaches zero.
-        sinarg = np.zeros_like(altitude)
-        airmass = np.ones_like(altitude) * np.inf
-        sinarg[above] = altitude[above] + 244 / (165 + 47 * altitude[above] ** 1.1)
-        airmass[above] = 1.0 / np.sin(np.deg2rad(sinarg[above]))
-
-        # set objects below the horizon to an airmass of infinity
-        airmass[~above] = below_horizon
-        airmass = airmass.reshape(output_shape)
-
-        return airmass
+        return pickering_airmass(altitude, below_horizon)
 
     def altitude(self, telescope, time):
         """Return the altitude of the object at a given time.
@@ -189,11 +175,15 @@ class InstrumentField(Base):
 
         Returns
         -------
-        alt : `astropy.coordinates.AltAz`
+        alt : `astropy.units.Quantity`
            The altitude of the Obj at the requested times
         """
 
-        return self.instrument.telescope.observer.altaz(time, self.target).alt
+        location = self.instrument.telescope.observer.location
+        altitude = altitude_grid(
+            self.ra, self.dec, time, location.lon.deg, location.lat.deg
+        )
+        return altitude.reshape(np.shape(time)) * u.deg
 
 
 class InstrumentLog(Base):
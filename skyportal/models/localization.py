@@ -7,7 +7,6 @@ __all__ = [
 
 import datetime
 
-import dustmaps.sfd
 import healpix_alchemy
 import healpy
 import ligo.skymap.bayestar as ligo_bayestar
@@ -20,7 +19,6 @@ from astropy import units as u
 from astropy.coordinates import SkyCoord
 from astropy.table import Table
 from dateutil.relativedelta import relativedelta
-from dustmaps.config import config
 from sqlalchemy import event, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.hybrid import hybrid_property
@@ -31,10 +29,10 @@ from baselayer.app.env import load_env
 from baselayer.app.models import AccessibleIfUserMatches, Base
 from baselayer.log import make_log
 
+from ..utils.extinction import get_ebv_at
 from ..utils.files import delete_file_data, save_file_data
 
 _, cfg = load_env()
-config["data_dir"] = cfg["misc.dustmap_folder"]
 
 log = make_log("models/localizations")
 
@@ -114,6 +112,16 @@ class Localization(Base):
 
     contour = deferred(sa.Column(JSONB, doc="GeoJSON contours"))
 
+    credible_thresholds = sa.Column(
+        JSONB,
+        nullable=True,
+        doc=(
+            "Minimum tile probability density of the standard credible "
+            "regions, keyed by credible level (e.g. '0.9'), set when the "
+            "tiles are added."
+        ),
+    )
+
     _localization_path = sa.Column(
         sa.String,
         nullable=True,
@@ -243,7 +251,7 @@ class Localization(Base):
         center_info["gal_lon"] = coord.galactic.l.deg
 
         try:
-            ebv = float(dustmaps.sfd.SFDQuery()(coord))
+            ebv = get_ebv_at(coord)
         except Exception:
             ebv = None
         center_info["ebv"] = ebv
@@ -33,6 +33,8 @@ from baselayer.app.models import (
 )
 from baselayer.log import make_log
 
+from ..utils.airmass import altitude_grid, pickering_airmass
+from ..utils.extinction import get_ebv
 from .candidate import Candidate
 from .cosmo import cosmo
 from .photometric_series import PhotometricSeries
@@ -878,24 +880,8 @@ class Obj(Base, conesearch_alchemy.Point):
            The airmass of the Obj at the requested times
         """
 
-        output_shape = time.shape
-        time = np.atleast_1d(time)
         altitude = self.altitude(telescope, time).to("degree").value
-        above = altitude > 0
-
-        # use Pickering (2002) interpolation to calculate the airmass
-        # The Pickering interpolation tends toward 38.7494 as the altitude
-        # approaches zero.
-        sinarg = np.zeros_like(altitude)
-        airmass = np.ones_like(altitude) * np.inf
-        sinarg[above] = altitude[above] + 244 / (165 + 47 * altitude[above] ** 1.1)
-        airmass[above] = 1.0 / np.sin(np.deg2rad(sinarg[above]))
-
-        # set objects below the horizon to an airmass of infinity
-        airmass[~above] = below_horizon
-        airmass = airmass.reshape(output_shape)
-
-        return airmass
+        return pickering_airmass(altitude, below_horizon)
 
     def altitude(self, telescope, time):
         """Return the altitude of the object at a given time.
@@ -910,19 +896,22 @@ class Obj(Base, conesearch_alchemy.Point):
 
         Returns
         -------
-        alt : `astropy.coordinates.AltAz`
+        alt : `astropy.units.Quantity`
            The altitude of the Obj at the requested times
         """
 
-        return telescope.observer.altaz(time, self.target).alt
+        location = telescope.observer.location
+        altitude = altitude_grid(
+            self.ra, self.dec, time, location.lon.deg, location.lat.deg
+        )
+        return altitude.reshape(np.shape(time)) * u.deg
 
     @property
     def ebv(self):
         """E(B-V) extinction for the object"""
 
-        coord = ap_coord.SkyCoord(self.ra, self.dec, unit="deg")
         try:
-            return float(dustmaps.sfd.SFDQuery()(coord))
+            return get_ebv(self.ra, self.dec)
         except Exception:
             return None
 
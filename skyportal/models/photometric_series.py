@@ -31,6 +31,14 @@ from baselayer.app.models import (
 )
 
 from ..enum_types import allowed_bandpasses, time_stamp_alignment_types
+from ..utils.cache import MemoryCache
+from ..utils.columnar_files import (
+    COLUMNAR_EXTENSION,
+    hash_dataframe,
+    load_dataframe,
+    sort_by_mjd,
+    write_dataframe,
+)
 from ..utils.hdf5_files import dump_dataframe_to_bytestream
 
 # Cast literal "NaN" once at module import — comparing a double-precision
@@ -48,6 +56,20 @@ RE_SLASHES = re.compile(r"^[\w_\-\+\/\\]*$")
 RE_NO_SLASHES = re.compile(r"^[\w_\-\+]*$")
 MAX_FILEPATH_LENGTH = 255
 
+# format of the data files of new or updated series: "hdf5" or "columnar"
+# (memory-mapped files, see utils/columnar_files.py); files in either format
+# can always be read, and tools/photseries_update/convert_storage.py converts
+# existing files to this format.
+STORAGE_FORMAT = cfg.get("photometric_series_format", "hdf5")
+if STORAGE_FORMAT not in ("hdf5", "columnar"):
+    raise ValueError(
+        f'Invalid photometric_series_format: "{STORAGE_FORMAT}". '
+        'Use "hdf5" or "columnar".'
+    )
+
+# decoded data of the most recently used series, keyed by the hash of their file
+series_data_cache = MemoryCache(cfg.get("photometric_series_cache_size", 32))
+
 # these must be given explicitly to the initialization function
 REQUIRED_ATTRIBUTES = [
     "series_name",
@@ -371,7 +393,12 @@ class PhotometricSeries(conesearch_alchemy.Point, Base):
         This is called when the object
         is loaded from the database.
         ref: https://docs.sqlalchemy.org/en/14/orm/constructors.html
+
+        The data is only read from disk when it is first accessed
+        (e.g., through the data or fluxes properties), so that listing
+        series only uses the summary statistics stored in the DB.
         """
+        self._data = None
         self._mjds = None
         self._fluxes = None
         self._fluxerr = None
@@ -388,14 +415,14 @@ class PhotometricSeries(conesearch_alchemy.Point, Base):
             self.group_ids = []
             self.stream_ids = []
 
-        try:
-            self.load_data()
-            self.calc_flux_mag()
-            self.calc_stats()
-        except Exception:
-            pass  # silently fail to load
-
-    def to_dict(self, data_format="json", include_groups=True, include_streams=True):
+    def to_dict(
+        self,
+        data_format="json",
+        include_groups=True,
+        include_streams=True,
+        mjd_min=None,
+        mjd_max=None,
+    ):
         """
         Convert the object into a dictionary.
 
@@ -408,15 +435,24 @@ class PhotometricSeries(conesearch_alchemy.Point, Base):
             Whether to include group information. Defaults to True.
         include_streams : bool
             Whether to include stream information. Defaults to True.
+        mjd_min, mjd_max : float, optional
+            Only return the data in this range of MJD (inclusive),
+            see `get_data_slice`.
         """
         # use the baselayer base model's method
         d = super().to_dict()
 
+        if data_format.lower() in ["json", "hdf5"]:
+            if mjd_min is None and mjd_max is None:
+                data = self.data
+            else:
+                data = self.get_data_slice(mjd_min, mjd_max)
+
         if data_format.lower() == "json":
-            output_data = self.data.to_dict(orient="list")
+            output_data = data.to_dict(orient="list")
         elif data_format.lower() == "hdf5":
             output_data = dump_dataframe_to_bytestream(
-                self.data, self.get_metadata(), encode=True
+                data, self.get_metadata(), encode=True
             )
         elif data_format.lower() == "none":
             output_data = None
@@ -787,13 +823,69 @@ class PhotometricSeries(conesearch_alchemy.Point, Base):
 
     def load_data(self):
         """
-        Load the underlying photometric data from disk.
+        Load the underlying photometric data from disk,
+        or from the cache of recently loaded series.
+        """
+        data = series_data_cache.get(self.hash) if self.hash else None
+        if data is None:
+            if self.is_columnar:
+                data, _ = load_dataframe(self.filename)
+            else:
+                with pd.HDFStore(self.filename, mode="r") as store:
+                    keys = list(store.keys())
+                    if len(keys) != 1:
+                        raise ValueError(
+                            "HDF5 file must contain exactly one data table"
+                        )
+                    data = store[keys[0]]
+            if self.hash:
+                series_data_cache[self.hash] = data
+        # the cached dataframe is shared, so hand out a copy
+        self._data = data.copy()
+
+    @property
+    def is_columnar(self):
+        """Whether the data file is a columnar file (see STORAGE_FORMAT)."""
+        if self.filename is None:
+            return STORAGE_FORMAT == "columnar"
+        return self.filename.endswith(COLUMNAR_EXTENSION)
+
+    def get_data_slice(self, mjd_min=None, mjd_max=None):
+        """
+        Get the rows of the data within a range of MJD (inclusive).
+
+        If the data is not loaded yet and the file is columnar,
+        only the part of the file holding these rows is read
+        (the rows of columnar files are sorted by MJD),
+        and the data is not kept on this object.
+
+        Parameters
+        ----------
+        mjd_min : float, optional
+            The earliest MJD to include.
+        mjd_max : float, optional
+            The latest MJD to include.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The rows in the range.
         """
-        with pd.HDFStore(self.filename, mode="r") as store:
-            keys = list(store.keys())
-            if len(keys) != 1:
-                raise ValueError("HDF5 file must contain exactly one data table")
-            self._data = store[keys[0]]
+        if (
+            self._data is None
+            and self.is_columnar
+            and self.hash not in series_data_cache
+        ):
+            data, _ = load_dataframe(self.filename, mjd_min=mjd_min, mjd_max=mjd_max)
+            return data
+
+        mjds = self.data["mjd"] if "mjd" in self.data else self.data["mjds"]
+        mask = np.ones(len(mjds), dtype=bool)
+        if mjd_min is not None:
+            mask &= mjds >= mjd_min
+        if mjd_max is not None:
+            mask &= mjds <= mjd_max
+        return self.data[mask]
 
     def get_data_bytes(self):
         """
@@ -826,7 +918,7 @@ class PhotometricSeries(conesearch_alchemy.Point, Base):
                 # ref: https://github.com/pandas-dev/pandas/blob/b1b70c7390e589bbfa0d8896aa76e64bec0cf51e/pandas/tests/io/pytables/test_store.py#L324
                 store.put(
                     "phot_series",
-                    self._data,
+                    self.data,
                     format="table",
                     index=None,
                     track_times=False,
@@ -845,16 +937,34 @@ class PhotometricSeries(conesearch_alchemy.Point, Base):
         first call to this function.
         That data is kept for later when
         it can be dumped to file.
+        Columnar files are hashed as they are
+        generated instead, chunk by chunk.
         """
         # first make sure to order the lists
         # so that the hash is the same
         self.group_ids = sorted(self.group_ids or [])
         self.stream_ids = sorted(self.stream_ids or [])
 
+        if STORAGE_FORMAT == "columnar":
+            # hash the columnar file as it is generated, without building it
+            self.sort_data_by_mjd()
+            self.hash = hash_dataframe(self.data, self.get_metadata())
+            return
+
         self.hash = hashlib.md5()
         self.hash.update(self.get_data_bytes())
         self.hash = self.hash.hexdigest()
 
+    def sort_data_by_mjd(self):
+        """
+        Sort the rows of the data by MJD, as they are stored
+        in columnar files, so the data in memory (and in the
+        cache of loaded series) is the same as on disk.
+        """
+        data = sort_by_mjd(self.data)
+        if data is not self.data:
+            self.data = data
+
     def make_full_name(self):
         """
         Make the full name for the data associated
@@ -884,10 +994,9 @@ class PhotometricSeries(conesearch_alchemy.Point, Base):
 
         origin = "_" + self.origin.replace(" ", "_") if self.origin else ""
         channel = "_" + self.channel.replace(" ", "_") if self.channel else ""
+        extension = COLUMNAR_EXTENSION if STORAGE_FORMAT == "columnar" else ".h5"
 
-        filename = (
-            f"series_{self.series_obj_id}_inst_{self.instrument_id}{channel}{origin}.h5"
-        )
+        filename = f"series_{self.series_obj_id}_inst_{self.instrument_id}{channel}{origin}{extension}"
 
         path = os.path.join(root_folder, subfolder)
 
@@ -922,11 +1031,8 @@ class PhotometricSeries(conesearch_alchemy.Point, Base):
 
         Use temp=True to save a temporary file
         (same file, appended with .tmp).
+        The file is written in the STORAGE_FORMAT.
         """
-
-        # make sure no changes were made since object was initialized
-        self.calc_hash()
-
         full_name, path = self.make_full_name()
 
         if not os.path.exists(path):
@@ -936,10 +1042,20 @@ class PhotometricSeries(conesearch_alchemy.Point, Base):
         if temp:
             file_to_write += ".tmp"
 
-        with open(file_to_write, "wb") as f:
-            f.write(self.get_data_bytes())
+        if STORAGE_FORMAT == "columnar":
+            # the hash is calculated while writing the file
+            self.group_ids = sorted(self.group_ids or [])
+            self.stream_ids = sorted(self.stream_ids or [])
+            self.sort_data_by_mjd()
+            self.hash = write_dataframe(file_to_write, self.data, self.get_metadata())
+        else:
+            # make sure no changes were made since object was initialized
+            self.calc_hash()
+            with open(file_to_write, "wb") as f:
+                f.write(self.get_data_bytes())
 
         self.filename = full_name
+        series_data_cache[self.hash] = self._data.copy()
 
     def move_temp_data(self):
         """Rename a temp data file to not have the .tmp extension."""
@@ -1282,6 +1398,7 @@ class PhotometricSeries(conesearch_alchemy.Point, Base):
         verify_data(data)
 
         self._data = data
+        self._data_bytes = None
 
         self.calc_flux_mag()
         self.calc_stats()
@@ -1577,3 +1694,4 @@ def delete_dataset(mapper, connection, target):
         and os.path.isfile(target.filename)
     ):
         os.remove(target.filename)
+    series_data_cache.pop(target.hash)
@@ -46,6 +46,40 @@ class NumpyArray(sa.types.TypeDecorator):
         return np.array(value)
 
 
+class BinaryNumpyArray(sa.types.TypeDecorator):
+    """SQLAlchemy representation of a NumPy array, stored as the raw bytes of
+    its values (a `bytea` column) rather than as a PostgreSQL array.
+
+    Values are bound with a single copy of the array's buffer and loaded
+    with `np.frombuffer`, without going through a Python list. The loaded
+    arrays share the memory of the query results and are read-only.
+    """
+
+    impl = sa.LargeBinary
+    cache_ok = True
+
+    def __init__(self, dtype="<f8"):
+        """
+        Parameters
+        ----------
+        dtype : str
+            NumPy dtype of the values, including their byte order,
+            e.g. "<f8" (float64) or "<f4" (float32).
+        """
+        super().__init__()
+        self.dtype = np.dtype(dtype)
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return value
+        return np.ascontiguousarray(value, dtype=self.dtype).tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return value
+        return np.frombuffer(value, dtype=self.dtype)
+
+
 class Spectrum(Base):
     """Wavelength-dependent measurement of the flux of an object through a
     dispersive element."""
@@ -54,17 +88,18 @@ class Spectrum(Base):
     update = delete = accessible_by_owner
 
     __tablename__ = "spectra"
-    # TODO better numpy integration
     wavelengths = sa.Column(
-        NumpyArray, nullable=False, doc="Wavelengths of the spectrum [Angstrom]."
+        BinaryNumpyArray,
+        nullable=False,
+        doc="Wavelengths of the spectrum [Angstrom].",
     )
     fluxes = sa.Column(
-        NumpyArray,
+        BinaryNumpyArray,
         nullable=False,
         doc="Flux of the Spectrum [F_lambda, arbitrary units].",
     )
     errors = sa.Column(
-        NumpyArray,
+        BinaryNumpyArray,
         doc="Errors on the fluxes of the spectrum [F_lambda, same units as `fluxes`.]",
     )
 
@@ -1,12 +1,12 @@
-__all__ = ["Thumbnail"]
+__all__ = ["Thumbnail", "PendingThumbnail"]
 
 import os
 
 import sqlalchemy as sa
-from sqlalchemy import event
+from sqlalchemy import DDL, event
 from sqlalchemy.orm import relationship
 
-from baselayer.app.models import AccessibleIfRelatedRowsAreAccessible, Base
+from baselayer.app.models import AccessibleIfRelatedRowsAreAccessible, Base, restricted
 from baselayer.log import make_log
 
 from ..enum_types import thumbnail_types
@@ -70,6 +70,56 @@ class Thumbnail(Base):
     )
 
 
+class PendingThumbnail(Base):
+    """An Obj the thumbnail_queue service hasn't generated the survey
+    thumbnails of yet.
+
+    Rows are inserted by a trigger on objs, so objects inserted in bulk are
+    queued too, and deleted once the thumbnails are added.
+    """
+
+    __tablename__ = "pending_thumbnails"
+
+    create = read = update = delete = restricted
+
+    obj_id = sa.Column(
+        sa.ForeignKey("objs.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+        doc="ID of the Obj missing thumbnails.",
+    )
+    claimed_at = sa.Column(
+        sa.DateTime,
+        nullable=True,
+        doc="UTC time at which a thumbnail_queue worker last claimed the Obj.",
+    )
+    attempts = sa.Column(
+        sa.Integer,
+        nullable=False,
+        default=0,
+        doc="Number of times the Obj was claimed.",
+    )
+
+
+# Queue every new Obj, including those inserted with a bulk INSERT.
+QUEUE_OBJ_THUMBNAILS_SQL = """
+CREATE OR REPLACE FUNCTION queue_obj_thumbnails() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO pending_thumbnails (obj_id, attempts, created_at, modified)
+    VALUES (NEW.id, 0, NEW.created_at, NEW.created_at)
+    ON CONFLICT (obj_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER objs_queue_thumbnails
+AFTER INSERT ON objs
+FOR EACH ROW EXECUTE FUNCTION queue_obj_thumbnails();
+"""
+
+event.listen(PendingThumbnail.__table__, "after_create", DDL(QUEUE_OBJ_THUMBNAILS_SQL))
+
+
 @event.listens_for(Thumbnail, "before_insert")
 def classify_thumbnail_grayscale(mapper, connection, target):
     # Only classify local files here (a fast disk read). Remote thumbnails are
@@ -1,12 +1,13 @@
-__all__ = ["UserNotification"]
+__all__ = ["UserNotification", "NotificationDelivery"]
 
 
 import sqlalchemy as sa
 from sqlalchemy import event, inspect
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from tornado.ioloop import IOLoop
 
-from baselayer.app.models import AccessibleIfUserMatches, Base
+from baselayer.app.models import AccessibleIfUserMatches, Base, restricted
 
 from ..utils.notifications import post_notification
 from .analysis import ObjAnalysis
@@ -57,6 +58,98 @@ class UserNotification(Base):
         doc="URL to which to direct upon click, if relevant",
     )
 
+    deliveries = relationship(
+        "NotificationDelivery",
+        back_populates="notification",
+        cascade="delete",
+        passive_deletes=True,
+        doc="Deliveries of the notification, one per channel.",
+    )
+
+
+class NotificationDelivery(Base):
+    """Delivery of a UserNotification on one channel (frontend, email, Slack,
+    SMS, phone or WhatsApp), as queued by the notification queue service."""
+
+    __tablename__ = "notification_deliveries"
+
+    create = read = update = delete = restricted
+
+    notification_id = sa.Column(
+        sa.ForeignKey("usernotifications.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        doc="ID of the delivered UserNotification",
+    )
+    notification = relationship(
+        "UserNotification",
+        back_populates="deliveries",
+        doc="The delivered UserNotification",
+    )
+    channel = sa.Column(
+        sa.String(),
+        nullable=False,
+        doc="Channel of the delivery: frontend, email, slack, sms, phone or whatsapp",
+    )
+    destination = sa.Column(
+        sa.String(),
+        nullable=False,
+        doc="Address the delivery goes to (email address, Slack webhook, phone number...), which sends are rate limited by",
+    )
+    content = sa.Column(
+        JSONB,
+        nullable=True,
+        doc="Content of the notification (GCN event or source summary), if any",
+    )
+    status = sa.Column(
+        sa.String(),
+        nullable=False,
+        default="pending",
+        doc="Status of the delivery: pending, sending, sent or failed",
+    )
+    attempts = sa.Column(
+        sa.Integer,
+        nullable=False,
+        default=0,
+        doc="Number of attempts at sending the delivery",
+    )
+    next_attempt_at = sa.Column(
+        sa.DateTime,
+        nullable=False,
+        doc="UTC time after which the delivery can be (re)tried",
+    )
+    claimed_at = sa.Column(
+        sa.DateTime,
+        nullable=True,
+        doc="UTC time at which a worker last claimed the delivery",
+    )
+    sent_at = sa.Column(
+        sa.DateTime,
+        nullable=True,
+        doc="UTC time at which the delivery was sent",
+    )
+    error = sa.Column(
+        sa.String(),
+        nullable=True,
+        doc="Error of the last failed attempt",
+    )
+
+
+NotificationDelivery.__table_args__ = (
+    # the workers only ever scan the deliveries waiting to be sent
+    sa.Index(
+        "notification_deliveries_pending_index",
+        NotificationDelivery.channel,
+        NotificationDelivery.next_attempt_at,
+        postgresql_where=NotificationDelivery.status == "pending",
+    ),
+    sa.Index(
+        "notification_deliveries_sending_index",
+        NotificationDelivery.claimed_at,
+        postgresql_where=NotificationDelivery.status == "sending",
+    ),
+)
+
 
 @event.listens_for(Classification, "after_insert")
 @event.listens_for(Spectrum, "after_insert")
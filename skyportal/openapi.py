@@ -6,6 +6,7 @@ from apispec.ext.marshmallow import MarshmallowPlugin
 from tornado.routing import URLSpec
 
 from . import __version__
+from .handlers.lazy import resolve_handler
 from .models import schema
 
 HTTP_METHODS = ("head", "get", "post", "put", "patch", "delete", "options")
@@ -103,6 +104,7 @@ def spec_from_handlers(handlers, exclude_internal=True, metadata=None):
             if "/internal/" not in route
         ]
     for endpoint, handler in handlers:
+        handler = resolve_handler(handler)
         for http_method in HTTP_METHODS:
             method = getattr(handler, http_method)
             if method.__doc__ is None:
@@ -9,7 +9,7 @@ import pytest
 import sqlalchemy as sa
 
 from baselayer.app.models import async_plain_session_factory
-from skyportal.models import DBSession, Obj, Thumbnail
+from skyportal.models import DBSession, Obj, PendingThumbnail, Thumbnail
 from skyportal.tests import api, assert_api
 
 
@@ -89,13 +89,11 @@ def test_token_user_post_get_thumbnail(upload_data_token, public_group, ztf_came
     assert thumbnails_loaded
 
 
-def test_thumbnail_queue_fetch_obj_finds_unprocessed_source(
-    upload_data_token, public_group
-):
-    """Direct test for services/thumbnail_queue/fetch_obj — the only
-    queue-specific logic not exercised by the synchronous bypass above.
+def test_thumbnail_queue_claims_new_source(upload_data_token, public_group):
+    """Direct test for services/thumbnail_queue — new objs are queued by the
+    objs trigger, and claims are exclusive.
     """
-    from services.thumbnail_queue.thumbnail_queue import fetch_obj
+    from services.thumbnail_queue.thumbnail_queue import claim_objs
 
     obj_id = str(uuid.uuid4())
     status, _ = api(
@@ -111,21 +109,41 @@ def test_thumbnail_queue_fetch_obj_finds_unprocessed_source(
     )
     assert status == 200
 
-    async def _fetch_backfill_fetch():
-        async with async_plain_session_factory() as session:
-            # The new obj has no (sdss, ls, ps1) thumbnails, so fetch_obj's
-            # most-recent-missing query must surface it.
-            obj, err = await fetch_obj(session)
-            assert err is None
-            assert obj is not None and obj.id == obj_id
-
-            # After backfill the same query must no longer return it.
-            await obj.add_linked_thumbnails(["sdss", "ls", "ps1"], session)
-            obj, err = await fetch_obj(session)
-            assert err is None
-            assert obj is None or obj.id != obj_id
+    async def _claim():
+        async with (
+            async_plain_session_factory() as session,
+            async_plain_session_factory() as other_session,
+        ):
+            # lock the queued obj, as a worker claiming it does
+            pending = await session.scalar(
+                sa.select(PendingThumbnail)
+                .where(PendingThumbnail.obj_id == obj_id)
+                .with_for_update()
+            )
+            if pending is None:
+                # the running thumbnail_queue service already processed it
+                thumbnail_types = (
+                    await session.scalars(
+                        sa.select(Thumbnail.type).where(Thumbnail.obj_id == obj_id)
+                    )
+                ).all()
+                assert {"sdss", "ls", "ps1"} <= set(thumbnail_types)
+                return
+
+            # other workers skip it
+            claimed = await claim_objs(other_session, limit=1)
+            assert obj_id not in claimed
+            await session.rollback()
+
+            # give back what we claimed to the service
+            await other_session.execute(
+                sa.update(PendingThumbnail)
+                .where(PendingThumbnail.obj_id.in_(claimed))
+                .values(claimed_at=None, attempts=PendingThumbnail.attempts - 1)
+            )
+            await other_session.commit()
 
-    asyncio.run(_fetch_backfill_fetch())
+    asyncio.run(_claim())
 
 
 def test_thumbnail_queue_classifies_remote_grayscale(
@@ -0,0 +1,170 @@
+import json
+from datetime import timedelta
+
+import pytest
+import sqlalchemy as sa
+
+from skyportal.models import (
+    Allocation,
+    DBSession,
+    FacilityTransactionRequest,
+    FollowupRequest,
+    Instrument,
+)
+from skyportal.tests.fixtures import TelescopeFactory
+
+from ....utils.naive_datetime import utcnow_naive
+
+TARGET = {"ra": 234.22, "dec": -22.33, "jdstart": 2460000.5, "jdend": 2460030.5}
+
+
+class IPACResponse:
+    """Response of the ZTF forced photometry service listing one job."""
+
+    status_code = 200
+
+    def __init__(self, lightcurve, exitcode):
+        self.text = (
+            "<table><tr><th>ra</th><th>dec</th><th>startJD</th><th>endJD</th>"
+            "<th>lightcurve</th><th>exitcode</th></tr>"
+            f"<tr><td>{TARGET['ra']}</td><td>{TARGET['dec']}</td>"
+            f"<td>{TARGET['jdstart']}</td><td>{TARGET['jdend']}</td>"
+            f"<td>{lightcurve}</td><td>{exitcode}</td></tr></table>"
+        )
+        self.content = self.text.encode()
+
+
+@pytest.fixture()
+def ztf_forced_photometry_request(public_group, public_source, user):
+    # the facility queue recognizes ZTF by the name of its instrument
+    instrument = DBSession().scalar(
+        sa.select(Instrument).where(Instrument.name == "ZTF")
+    )
+    telescope_id = None
+    if instrument is None:
+        telescope = TelescopeFactory()
+        telescope_id = telescope.id
+        instrument = Instrument(
+            name="ZTF", type="imager", band="Optical", telescope_id=telescope_id
+        )
+        DBSession().add(instrument)
+        DBSession().commit()
+    allocation = Allocation(
+        instrument_id=instrument.id,
+        group_id=public_group.id,
+        hours_allocated=100,
+        altdata=json.dumps({"ipac_http_user": "user", "ipac_http_password": "pwd"}),
+    )
+    DBSession().add(allocation)
+    DBSession().commit()
+    followup_request = FollowupRequest(
+        obj_id=public_source.id,
+        allocation_id=allocation.id,
+        payload={"request_type": "forced_photometry"},
+        status="submitted",
+        requester_id=user.id,
+        last_modified_by_id=user.id,
+    )
+    DBSession().add(followup_request)
+    DBSession().commit()
+    request = FacilityTransactionRequest(
+        method="GET",
+        endpoint="https://ztfweb.ipac.caltech.edu/cgi-bin/getForcedPhotometryRequests.cgi",
+        data=TARGET,
+        followup_request_id=followup_request.id,
+        initiator_id=user.id,
+    )
+    DBSession().add(request)
+    DBSession().commit()
+    request_id, allocation_id = request.id, allocation.id
+    instrument_id = instrument.id
+
+    yield request_id
+
+    session = DBSession()
+    for model, ident in [
+        (FacilityTransactionRequest, request_id),
+        (Allocation, allocation_id),
+    ]:
+        row = session.scalar(sa.select(model).where(model.id == ident))
+        if row is not None:
+            session.delete(row)
+            session.commit()
+    if telescope_id is not None:
+        session.delete(session.get(Instrument, instrument_id))
+        session.commit()
+        TelescopeFactory.teardown(telescope_id)
+
+
+def get_status(request_id):
+    with DBSession() as session:
+        return session.scalar(
+            sa.select(FacilityTransactionRequest.status).where(
+                FacilityTransactionRequest.id == request_id
+            )
+        )
+
+
+def test_facility_queue_stops_polling_complete_ztf_request(
+    ztf_forced_photometry_request, monkeypatch
+):
+    from services.facility_queue import facility_queue as fq
+    from skyportal.facility_apis import ztf
+
+    queries, commits = [], []
+
+    def request(*args, **kwargs):
+        queries.append(args)
+        return IPACResponse("/lc/forcedphotometry_req00001_lc.txt", 0)
+
+    monkeypatch.setattr(fq.request_session, "request", request)
+    monkeypatch.setattr(
+        ztf, "commit_photometry", lambda url, *args, **kwargs: commits.append(url)
+    )
+
+    # the finished light curve is committed, and the request isn't polled again
+    assert fq.poll_request(ztf_forced_photometry_request) is None
+    assert get_status(ztf_forced_photometry_request) == "complete"
+    assert commits == [f"{fq.ZTF_FORCED_URL}/lc/forcedphotometry_req00001_lc.txt"]
+
+    # if it still is, IPAC is not queried again
+    assert fq.poll_request(ztf_forced_photometry_request) is None
+    assert len(queries) == 1
+    assert len(commits) == 1
+
+
+def test_facility_queue_stops_polling_ztf_request_without_photometry(
+    ztf_forced_photometry_request, monkeypatch
+):
+    from services.facility_queue import facility_queue as fq
+
+    monkeypatch.setattr(
+        fq.request_session,
+        "request",
+        lambda *args, **kwargs: IPACResponse("/lc/forcedphotometry_lc.txt", 63),
+    )
+    assert fq.poll_request(ztf_forced_photometry_request) is None
+    assert get_status(ztf_forced_photometry_request) == "complete"
+
+
+def test_facility_queue_skips_stale_requests(
+    ztf_forced_photometry_request, monkeypatch
+):
+    from services.facility_queue import facility_queue as fq
+
+    def request(*args, **kwargs):
+        raise AssertionError("stale requests are not polled")
+
+    monkeypatch.setattr(fq.request_session, "request", request)
+
+    session = DBSession()
+    req = session.get(FacilityTransactionRequest, ztf_forced_photometry_request)
+    req.created_at = utcnow_naive() - timedelta(days=fq.CUTOFF_TIME_DAYS + 1)
+    session.commit()
+    assert fq.poll_request(ztf_forced_photometry_request) is None
+
+    req = session.get(FacilityTransactionRequest, ztf_forced_photometry_request)
+    req.created_at = utcnow_naive()
+    req.status = "error: Failed to commit photometry"
+    session.commit()
+    assert fq.poll_request(ztf_forced_photometry_request) is None
@@ -1,3 +1,4 @@
+import json
 import uuid
 
 from skyportal.tests import api
@@ -24,3 +25,65 @@ def test_obj_photometry(upload_data_token, public_source):
         data["message"]
         == f"Insufficient permissions for User {upload_data_token} to read Obj {obj_id}"
     )
+
+
+def test_obj_photometry_stream(
+    upload_data_token, public_source, public_group, ztf_camera
+):
+    status, data = api(
+        "POST",
+        "photometry",
+        data={
+            "obj_id": public_source.id,
+            "instrument_id": ztf_camera.id,
+            "mjd": [59410.1, 59411.2, 59412.3, 59413.4],
+            "mag": [19.2, 19.3, 19.4, None],
+            "magerr": [0.05, 0.06, 0.07, None],
+            "limiting_mag": [20.0, 20.1, 20.2, 20.3],
+            "magsys": "ab",
+            "filter": ["ztfr", "ztfg", "ztfr", "ztfg"],
+            "group_ids": [public_group.id],
+        },
+        token=upload_data_token,
+    )
+    assert status == 200, data
+
+    params = {"includeOwnerInfo": "true", "includeStreamInfo": "true"}
+    status, data = api(
+        "GET",
+        f"sources/{public_source.id}/photometry",
+        params=params,
+        token=upload_data_token,
+    )
+    assert status == 200, data
+    expected = data["data"]
+    assert len(expected) >= 4
+
+    response = api(
+        "GET",
+        f"sources/{public_source.id}/photometry",
+        params={**params, "stream": "json"},
+        token=upload_data_token,
+        raw_response=True,
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("application/json")
+    assert response.json() == expected
+
+    response = api(
+        "GET",
+        f"sources/{public_source.id}/photometry",
+        params={**params, "stream": "ndjson"},
+        token=upload_data_token,
+        raw_response=True,
+    )
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == expected
+
+    status, data = api(
+        "GET",
+        f"sources/{public_source.id}/photometry",
+        params={"stream": "ndjson", "deduplicatePhotometry": "true"},
+        token=upload_data_token,
+    )
+    assert status == 400
@@ -2233,6 +2233,68 @@ def test_download_formats_single_series(upload_data_token, photometric_series):
         assert_api_fail(status, data, 400, 'Invalid dataFormat: "foobar"')
 
 
+def test_download_single_series_mjd_range(upload_data_token, photometric_series):
+    mjds = np.sort(photometric_series.mjds)
+    status, data = api(
+        "GET",
+        f"photometric_series/{photometric_series.id}",
+        params={"mjdMin": mjds[5], "mjdMax": mjds[14]},
+        token=upload_data_token,
+    )
+    assert_api(status, data)
+    assert np.allclose(data["data"]["data"]["mjd"], mjds[5:15])
+
+    status, data = api(
+        "GET",
+        f"photometric_series/{photometric_series.id}",
+        params={"mjdMin": "yesterday"},
+        token=upload_data_token,
+    )
+    assert_api_fail(status, data, 400, "mjdMin and mjdMax must be numbers")
+
+
+def test_columnar_series_sorted_by_mjd(
+    monkeypatch, user, public_source, ztf_camera, phot_series_maker
+):
+    from skyportal.models import photometric_series as photometric_series_module
+
+    monkeypatch.setattr(photometric_series_module, "STORAGE_FORMAT", "columnar")
+    df = phot_series_maker(format="pandas", number=50)
+    unsorted = df.sample(frac=1, random_state=0)
+    ps = PhotometricSeries(
+        data=unsorted,
+        obj_id=public_source.id,
+        instrument_id=ztf_camera.id,
+        owner_id=user.id,
+        group_ids=[],
+        stream_ids=[],
+        series_name="test_series_columnar",
+        series_obj_id=str(np.random.randint(0, 1e6)),
+        ra=10.0,
+        dec=20.0,
+        exp_time=30.0,
+        filter="ztfg",
+    )
+    # the data is sorted before it is hashed, as it is written
+    assert np.all(np.diff(ps.mjds) >= 0)
+
+    try:
+        ps.save_data()
+        assert ps.is_columnar
+        photometric_series_module.series_data_cache.pop(ps.hash)
+
+        ps._data = None
+        mjd_min, mjd_max = df["mjd"][10], df["mjd"][29]
+        data = ps.get_data_slice(mjd_min, mjd_max)
+        # read from the file, without loading all of the data
+        assert ps._data is None
+        np.testing.assert_array_equal(data["mjd"], df["mjd"][10:30])
+        np.testing.assert_array_equal(data["mag"], df["mag"][10:30])
+        pd.testing.assert_frame_equal(ps.data, df.reset_index(drop=True))
+    finally:
+        ps.delete_data()
+
+
 def test_download_formats_multiple_series(
     upload_data_token, photometric_series, photometric_series2
 ):
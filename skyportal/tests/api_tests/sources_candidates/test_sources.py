@@ -1,3 +1,5 @@
+import json
+import time
 import uuid
 from datetime import UTC, datetime, timedelta
 
@@ -2918,3 +2920,124 @@ def test_source_gcn_crossmatch_string_dateobs(
         if event is not None:
             session.delete(event)
         session.commit()
+
+
+def test_source_gcn_crossmatch_fractional_dateobs(
+    super_admin_token, super_admin_user, public_source
+):
+    # Crossmatches are stored with the full precision of the event dateobs,
+    # which get_source() matches exactly against GcnEvent.dateobs.
+    import sqlalchemy as sa
+
+    from skyportal.models import DBSession, GcnEvent, Localization, Obj
+    from skyportal.utils.localization_tiles import (
+        copy_localization_tiles,
+        credible_thresholds,
+    )
+
+    dateobs = datetime(2019, 4, 25, 8, 18, 18, 2909)
+    # the whole sky, in the 12 base pixels
+    uniq = np.arange(4, 16)
+    probdensity = np.full(12, 1 / (4 * np.pi))
+
+    session = DBSession()
+    event = GcnEvent(dateobs=dateobs, sent_by_id=super_admin_user.id)
+    localization = Localization(
+        dateobs=dateobs,
+        localization_name=str(uuid.uuid4()),
+        sent_by_id=super_admin_user.id,
+        uniq=uniq.tolist(),
+        probdensity=probdensity.tolist(),
+        credible_thresholds=credible_thresholds(uniq, probdensity),
+    )
+    session.add_all([event, localization])
+    obj = session.scalar(sa.select(Obj).where(Obj.id == public_source.id))
+    obj.healpix = ha.constants.HPX.lonlat_to_healpix(obj.ra * u.deg, obj.dec * u.deg)
+    session.flush()
+    copy_localization_tiles(session, localization.id, dateobs, uniq, probdensity)
+    session.commit()
+    event_id, localization_id = event.id, localization.id
+
+    try:
+        status, data = api(
+            "POST",
+            "gcn_event/crossmatch",
+            data={"objIds": [public_source.id], "eventIds": [event_id]},
+            token=super_admin_token,
+        )
+        assert status == 200, data
+
+        n_retries = 0
+        while True:
+            status, data = api(
+                "GET",
+                f"sources/{public_source.id}",
+                params={"includeGCNCrossmatches": "true"},
+                token=super_admin_token,
+            )
+            assert status == 200, data
+            crossmatches = data["data"]["gcn_crossmatch"]
+            try:
+                assert any(
+                    arrow.get(c["dateobs"]).naive == dateobs for c in crossmatches
+                ), crossmatches
+                break
+            except AssertionError as e:
+                if n_retries == 10:
+                    raise e
+                n_retries += 1
+                time.sleep(2)
+    finally:
+        session = DBSession()
+        obj = session.scalar(sa.select(Obj).where(Obj.id == public_source.id))
+        if obj is not None:
+            obj.gcn_crossmatch = None
+        for model, ident in ((Localization, localization_id), (GcnEvent, event_id)):
+            instance = session.scalar(sa.select(model).where(model.id == ident))
+            if instance is not None:
+                session.delete(instance)
+        session.commit()
+
+
+def test_gcn_crossmatch_rejects_invalid_ids(upload_data_token, public_source):
+    status, data = api(
+        "POST",
+        "gcn_event/crossmatch",
+        data={"objIds": [public_source.id, None], "eventIds": [1]},
+        token=upload_data_token,
+    )
+    assert status == 400
+    assert "objIds must be non-empty strings" in data["message"]
+
+    status, data = api(
+        "POST",
+        "gcn_event/crossmatch",
+        data={"objIds": [public_source.id], "eventIds": ["GW190425"]},
+        token=upload_data_token,
+    )
+    assert status == 400
+    assert "eventIds must be integers" in data["message"]
+
+
+def test_source_list_stream(view_only_token, public_source, public_group):
+    params = {"sourceID": public_source.id, "group_ids": f"{public_group.id}"}
+    status, data = api("GET", "sources", params=params, token=view_only_token)
+    assert status == 200, data
+    expected = data["data"]
+    assert [source["id"] for source in expected["sources"]] == [public_source.id]
+
+    for stream in ["json", "ndjson"]:
+        response = api(
+            "GET",
+            "sources",
+            params={**params, "stream": stream},
+            token=view_only_token,
+            raw_response=True,
+        )
+        assert response.status_code == 200
+        if stream == "json":
+            sources = response.json()
+        else:
+            sources = [json.loads(line) for line in response.text.splitlines()]
+        assert sources == expected["sources"]
+        assert int(response.headers["X-Total-Matches"]) == expected["totalMatches"]
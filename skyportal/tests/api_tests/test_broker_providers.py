@@ -655,6 +655,51 @@ def test_build_photometry_groups_drops_ungated_programs():
     assert build_photometry_groups("ZTF1", "ZTF", data, 42, {("ZTF", 1): [10]}) == {}
 
 
+def test_build_photometry_groups_columnar_matches_pointwise():
+    """Long histories take the columnar path, which must reproduce the
+    point-by-point transform exactly: NaN vs None fluxes, the S/N<=3 upper-limit
+    rule, mag-space points, dropped points, ungated programs and point order."""
+    import random
+
+    from skyportal.broker_apis._save import (
+        _COLUMNAR_MIN_POINTS,
+        ZP_PER_SURVEY,
+        _build_photometry_groups_columnar,
+        _build_photometry_groups_pointwise,
+    )
+
+    rng = random.Random(0)
+
+    def point(i):
+        p = {"jd": 2459000.5 + i, "band": rng.choice(["g", "ztfr", "i", "lsst_z"])}
+        kind = rng.random()
+        if kind < 0.5:
+            p["psfFluxErr"] = rng.choice([rng.uniform(1, 100), float("nan")])
+            p["psfFlux"] = rng.choice([rng.uniform(-300, 3000), None, float("nan")])
+        elif kind < 0.8:
+            p["magpsf"] = rng.uniform(16, 22)
+            p["sigmapsf"] = rng.choice([rng.uniform(0.01, 0.3), None])
+        if rng.random() < 0.05:
+            p.pop(rng.choice(["jd", "band"]))
+        p["programid"] = rng.choice([1, 2, 3])
+        p["ra"], p["dec"] = rng.choice([(1.5, -2.5), (None, None)])
+        return p
+
+    n = 3 * _COLUMNAR_MIN_POINTS
+    data = {
+        "prv_candidates": [point(i) for i in range(n)],
+        "prv_nondetections": [point(i + n) for i in range(n)],
+        "fp_hists": [point(i + 2 * n) for i in range(n)],
+    }
+    streams = {("ZTF", 1): [10], ("ZTF", 2): [20], ("LSST", 1): [30]}
+    for survey in ("ZTF", "LSST"):
+        args = ("obj", survey, ZP_PER_SURVEY[survey], data, 42, streams)
+        expected = _build_photometry_groups_pointwise(*args)
+        # repr compares NaN/None exactly and would expose numpy scalar types
+        assert repr(_build_photometry_groups_columnar(*args)) == repr(expected)
+        assert repr(build_photometry_groups(*args[:2], *args[3:])) == repr(expected)
+
+
 def test_scope_hash_order_independent_and_sensitive():
     assert scope_hash(7, [3, 1], [9, 5]) == scope_hash(7, [1, 3], [5, 9])
     base = scope_hash(7, [1], [9])
@@ -858,3 +903,225 @@ def test_get_photometry_capability_gated_on_get_alert():
 
     assert _BareBroker.implements()["get_photometry"] is False
     assert FINKBROKER.implements()["query_alerts"] is True
+
+
+# --- batched Kafka ingestion --------------------------------------------------
+
+
+class _FakeMessage:
+    def __init__(self, value):
+        self._value = value
+
+    def error(self):
+        return None
+
+    def value(self):
+        return self._value
+
+
+class _FakeConsumer:
+    """Serves pre-canned batches to ``consume`` and records offset commits."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.consume_calls = []
+        self.commits = 0
+        self.closed = False
+
+    def consume(self, num_messages, timeout):
+        self.consume_calls.append((num_messages, timeout))
+        return self.batches.pop(0) if self.batches else []
+
+    def commit(self, asynchronous=True):
+        self.commits += 1
+
+    def close(self):
+        self.closed = True
+
+
+def _avro_message(record):
+    import io
+
+    schema = {
+        "type": "record",
+        "name": "alert",
+        "fields": [
+            {"name": "objectId", "type": "string"},
+            {"name": "candid", "type": "long"},
+        ],
+    }
+    buf = io.BytesIO()
+    fastavro.writer(buf, schema, [record])
+    return _FakeMessage(buf.getvalue())
+
+
+def test_kafka_batch_config_and_auto_commit():
+    from skyportal.broker_apis._kafka import kafka_batch_config, kafka_consumer_config
+
+    assert kafka_batch_config({}) == (1, 2.0)
+    assert kafka_batch_config({"batch_size": 500, "linger": 0.5}) == (500, 0.5)
+    assert kafka_batch_config({"batch_size": 0}) == (1, 2.0)
+    # per-alert mode leaves offset commits to the client; batch mode owns them
+    assert "enable.auto.commit" not in kafka_consumer_config({}, "g")
+    assert (
+        kafka_consumer_config({"batch_size": 100}, "g")["enable.auto.commit"] is False
+    )
+
+
+def test_run_kafka_ingestion_commits_after_each_batch(monkeypatch):
+    """Batch mode persists each consumed batch in one save call and commits the
+    offsets only afterwards."""
+    import asyncio
+
+    from skyportal.broker_apis import _kafka
+
+    events = []
+
+    async def _fake_save_batch(items, log):
+        events.append(("save", [i["passing_alert_id"] for i in items]))
+
+    monkeypatch.setattr(_kafka, "_save_batch", _fake_save_batch)
+
+    consumer = _FakeConsumer(
+        [
+            [_avro_message({"objectId": f"ZTF{i}", "candid": i}) for i in (1, 2, 3)],
+            [],
+            [_avro_message({"objectId": "ZTF4", "candid": 4})],
+        ]
+    )
+    consumer.commit = lambda asynchronous=True: events.append(("commit", None))
+
+    class _Broker:
+        altdata = {"kafka": {"batch_size": 3, "linger": 0.1}}
+
+    def to_item(record):
+        return {
+            "data": record,
+            "survey": "ZTF",
+            "filter_ids": [1],
+            "passing_alert_id": record["candid"],
+        }
+
+    count = asyncio.run(
+        _kafka.run_kafka_ingestion(
+            _Broker(), consumer, to_item, lambda msg: None, max_messages=4
+        )
+    )
+    assert count == 4
+    assert consumer.closed
+    assert consumer.consume_calls[0] == (3, 0.1)
+    # the empty poll neither saves nor commits
+    assert events == [
+        ("save", [1, 2, 3]),
+        ("commit", None),
+        ("save", [4]),
+        ("commit", None),
+    ]
+
+
+# --- reference-data cache ------------------------------------------------------
+
+
+def test_reference_data_cache_hits_misses_and_invalidation():
+    import asyncio
+
+    from skyportal.broker_apis._refdata import ReferenceDataCache
+
+    cache = ReferenceDataCache(ttl=60)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return len(calls)
+
+    async def load_many(missing):
+        calls.append(tuple(missing))
+        return {k: f"criteria-{k}" for k in missing if k != 3}
+
+    assert asyncio.run(cache.get("instrument", "ZTF", load)) == 1
+    assert asyncio.run(cache.get("instrument", "ZTF", load)) == 1  # hit
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # only the misses reach the loader, in one call; unknown keys cache as None
+    assert asyncio.run(cache.get_many("filter", [1, 3], load_many)) == {
+        1: "criteria-1",
+        3: None,
+    }
+    assert asyncio.run(cache.get_many("filter", [1, 2, 3], load_many)) == {
+        1: "criteria-1",
+        2: "criteria-2",
+        3: None,
+    }
+    assert calls[-2:] == [(1, 3), (2,)]
+
+    # invalidating a kind leaves the others alone
+    cache.invalidate("filter")
+    assert asyncio.run(cache.get("instrument", "ZTF", load)) == 1
+    asyncio.run(cache.get_many("filter", [1], load_many))
+    assert calls[-1] == (1,)
+
+
+def test_reference_data_cache_expires():
+    import asyncio
+
+    from skyportal.broker_apis._refdata import ReferenceDataCache
+
+    cache = ReferenceDataCache(ttl=0)
+    values = iter([1, 2])
+
+    async def load():
+        return next(values)
+
+    assert asyncio.run(cache.get("stream", "programid_map", load)) == 1
+    assert asyncio.run(cache.get("stream", "programid_map", load)) == 2
+    assert cache.stats()["misses"] == 2
+
+
+# --- ingestion worker pools ----------------------------------------------------
+
+
+def test_kafka_worker_bounds():
+    from skyportal.broker_apis._kafka import kafka_worker_bounds
+
+    assert kafka_worker_bounds({}) == (1, 1)
+    assert kafka_worker_bounds({"workers": 4}) == (4, 4)
+    assert kafka_worker_bounds({"min_workers": 2, "max_workers": 8}) == (2, 8)
+    # max below min is clamped up rather than producing an empty range
+    assert kafka_worker_bounds({"min_workers": 3, "max_workers": 1}) == (3, 3)
+
+
+def test_scale_workers_follows_lag_within_bounds():
+    from skyportal.broker_apis._kafka import LAG_PER_WORKER, scale_workers
+
+    assert scale_workers(0, None, 2, 6) == 2  # a new pool starts at the minimum
+    assert scale_workers(2, None, 2, 6) == 2  # unknown lag: hold
+    assert scale_workers(2, 3 * LAG_PER_WORKER, 2, 6) == 3  # behind: grow by one
+    assert scale_workers(6, 100 * LAG_PER_WORKER, 2, 6) == 6  # capped
+    assert scale_workers(4, 10, 2, 6) == 4  # some lag, keeping up: hold
+    assert scale_workers(4, 0, 2, 6) == 3  # caught up: shrink by one
+    assert scale_workers(2, 0, 2, 6) == 2  # floored
+
+
+def test_consumer_lag_sums_assigned_partitions():
+    from skyportal.broker_apis._kafka import consumer_lag
+
+    class _TP:
+        def __init__(self, partition, offset):
+            self.partition, self.offset = partition, offset
+
+    class _Consumer:
+        def __init__(self, positions):
+            self.positions = positions
+
+        def assignment(self):
+            return list(self.positions)
+
+        def position(self, partitions):
+            return partitions
+
+        def get_watermark_offsets(self, tp, timeout=None):
+            return (10, 100)
+
+    assert consumer_lag(_Consumer([])) is None
+    # consumed up to 40 on one partition, nothing yet (-1001) on the other
+    assert consumer_lag(_Consumer([_TP(0, 40), _TP(1, -1001)])) == 60 + 90
@@ -0,0 +1,84 @@
+import numpy as np
+from astropy import units as u
+from astropy.coordinates import AltAz, EarthLocation, SkyCoord
+from astropy.time import Time
+
+from skyportal.utils.airmass import (
+    airmass_grid,
+    altitude_grid,
+    local_sidereal_time,
+    night_times,
+    pickering_airmass,
+    sidereal_time_cache,
+    weighted_percentiles,
+)
+
+# Palomar
+LONGITUDE, LATITUDE = -116.8650, 33.3563
+
+
+def test_altitude_grid_matches_astropy():
+    times = Time("2024-03-01T00:00:00") + np.linspace(0, 1, 49) * u.day
+    ra = np.array([10.0, 150.0, 280.0, 359.0])
+    dec = np.array([-30.0, 0.0, 45.0, 85.0])
+
+    altitudes = altitude_grid(ra, dec, times, LONGITUDE, LATITUDE)
+    assert altitudes.shape == (4, 49)
+
+    location = EarthLocation(lon=LONGITUDE * u.deg, lat=LATITUDE * u.deg)
+    expected = (
+        SkyCoord(ra[:, np.newaxis] * u.deg, dec[:, np.newaxis] * u.deg)
+        .transform_to(AltAz(obstime=times[np.newaxis], location=location))
+        .alt.deg
+    )
+    # within 2 arcseconds
+    assert np.allclose(altitudes, expected, atol=2 / 3600)
+
+    airmass = airmass_grid(ra, dec, times, LONGITUDE, LATITUDE, below_horizon=-1)
+    assert np.all(airmass[altitudes <= 0] == -1)
+    assert np.all(airmass[altitudes > 0] >= 1)
+
+
+def test_pickering_airmass():
+    airmass = pickering_airmass([90, 30, 0, -10], below_horizon=np.inf)
+    assert np.isclose(airmass[0], 1, atol=1e-6)
+    assert np.isclose(airmass[1], 1.993, atol=1e-3)
+    assert np.all(np.isinf(airmass[2:]))
+
+
+def test_sidereal_times_are_cached_per_night():
+    first = night_times(Time("2024-03-01T03:00:00"), LONGITUDE, LATITUDE)
+    second = night_times(Time("2024-03-01T11:17:00"), LONGITUDE, LATITUDE)
+    # both times fall in the same night, which is centered on its midnight
+    assert np.array_equal(first.jd1, second.jd1)
+    assert np.array_equal(first.jd2, second.jd2)
+    assert len(first) == 289
+    assert abs(first[144].mjd - Time("2024-03-01T07:50:00").mjd) < 30 / 1440
+
+    sidereal_time = local_sidereal_time(first, LONGITUDE)
+    assert local_sidereal_time(second, LONGITUDE) is sidereal_time
+    assert local_sidereal_time(second, LONGITUDE + 1) is not sidereal_time
+    assert len(sidereal_time_cache) >= 2
+
+
+def test_weighted_percentiles():
+    rng = np.random.default_rng(0)
+    values = rng.random((1000, 5))
+    # uniform weights give the usual percentiles
+    percentiles = weighted_percentiles(values, np.ones(1000), [10, 50, 90])
+    assert percentiles.shape == (3, 5)
+    assert np.allclose(
+        percentiles, np.percentile(values, [10, 50, 90], axis=0), atol=0.01
+    )
+    # processing the columns in chunks gives the same result
+    assert np.array_equal(
+        percentiles,
+        weighted_percentiles(values, np.ones(1000), [10, 50, 90], max_elements=2000),
+    )
+
+    # all the weight on a single row
+    weights = np.zeros(1000)
+    weights[3] = 1
+    assert np.array_equal(
+        weighted_percentiles(values, weights, [5, 95]), np.tile(values[3], (2, 1))
+    )
@@ -0,0 +1,72 @@
+import astropy.units as u
+import numpy as np
+import pytest
+import sncosmo
+
+from skyportal.utils.bandpasses import (
+    BANDPASS_TABLE,
+    BandpassTable,
+    get_color,
+    get_effective_wavelength,
+    register_bandpass,
+)
+
+
+def test_values_match_sncosmo():
+    table = BandpassTable()
+    vega = sncosmo.get_magsystem("vega")
+    assert table.zpbandflux("vega", "ztfg") == vega.zpbandflux("ztfg")
+    assert table.relzp("vega", "ztfg") == 2.5 * np.log10(vega.zpbandflux("ztfg"))
+    assert table.effective_wavelength("ztfr") == float(
+        sncosmo.get_bandpass("ztfr").wave_eff
+    )
+    assert table.magsystem("ab").name == "ab"
+    assert table.color("ztfr") == "#FF0000"
+    assert table.color("ztfr", "rgb") == (255, 0, 0)
+
+
+def test_lookups_are_memoized(monkeypatch):
+    table = BandpassTable()
+    table.zpbandflux("ab", "ztfg")
+    table.effective_wavelength("ztfg")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("sncosmo registry queried again")
+
+    monkeypatch.setattr(sncosmo, "get_magsystem", fail)
+    monkeypatch.setattr(sncosmo, "get_bandpass", fail)
+    table.zpbandflux("ab", "ztfg")
+    table.effective_wavelength("ztfg")
+    table.color("ztfg")
+
+
+def test_errors_are_not_cached():
+    table = BandpassTable()
+    with pytest.raises(Exception):
+        table.effective_wavelength("not-a-bandpass")
+    with pytest.raises(ValueError, match="Invalid color format"):
+        table.color("ztfg", "cmyk")
+    assert ("not-a-bandpass", None) not in table._wavelengths
+    assert ("ztfg", "cmyk") not in table._colors
+
+
+def test_register_bandpass_invalidates():
+    wave = np.linspace(4000, 5000, 50)
+    register_bandpass(
+        sncosmo.Bandpass(
+            wave, np.ones_like(wave), name="test_table_band", wave_unit=u.AA
+        ),
+        force=True,
+    )
+    first = get_effective_wavelength("test_table_band")
+    assert get_color("test_table_band") == "#02d193"
+
+    wave = np.linspace(6000, 7000, 50)
+    register_bandpass(
+        sncosmo.Bandpass(
+            wave, np.ones_like(wave), name="test_table_band", wave_unit=u.AA
+        ),
+        force=True,
+    )
+    assert BANDPASS_TABLE._wavelengths == {}
+    assert get_effective_wavelength("test_table_band") > first
@@ -5,6 +5,7 @@ from os.path import join as pjoin
 
 import pytest
 
+from skyportal.utils.cache import MemoryCache
 from skyportal.utils.offset import Cache
 
 
@@ -93,3 +94,65 @@ def test_cache_no_max_limit(cache_parent_dir):
         cache[str(i)] = b"x"
 
     assert len(cache) == 100
+
+
+def test_cache_max_bytes(cache_parent_dir):
+    cache = Cache(pjoin(cache_parent_dir, "cache_max_bytes"), max_bytes=10)
+    cache["a"] = b"12345"
+    cache["b"] = b"12345"
+    assert len(cache) == 2
+
+    cache["a"]  # refresh "a", so "b" is now the least recently used
+    cache["c"] = b"123"
+    assert cache["b"] is None
+    assert cache["a"] is not None and cache["c"] is not None
+
+
+def test_cache_write_is_atomic(cache):
+    cache["key"] = b"first"
+    cache["key"] = b"second"
+    with open(cache["key"], "rb") as f:
+        assert f.read() == b"second"
+    # no temporary files are left behind, and none count as entries
+    assert os.listdir(cache._cache_dir) == [os.path.basename(cache["key"])]
+    assert len(cache) == 1
+
+
+def test_cache_hits_do_not_scan_directory(cache, monkeypatch):
+    cache["key"] = b"abc"
+
+    def _scan():
+        raise AssertionError("the cache directory was scanned")
+
+    monkeypatch.setattr(cache, "_entries", _scan)
+    for _ in range(10):
+        assert cache["key"] is not None
+    cache["other"] = b"def"
+
+
+def test_cache_picks_up_other_processes_entries(cache):
+    other = Cache(cache._cache_dir, max_items=3, max_age=3)
+    other["shared"] = b"abc"
+    assert cache["shared"] is not None
+
+    # the periodic rescan brings the other writer's entries under the limits
+    for i in range(3):
+        other[str(i)] = b"x"
+    cache.clean_cache()
+    assert len(cache) == 3
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_items=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+    cache["c"] = 3
+    assert "b" not in cache
+    assert len(cache) == 2
+    assert cache.pop("a") == 1
+    assert cache["a"] is None
+
+    disabled = MemoryCache(max_items=0)
+    disabled["a"] = 1
+    assert len(disabled) == 0
@@ -0,0 +1,127 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from skyportal.utils.columnar_files import (
+    ALIGNMENT,
+    hash_dataframe,
+    load_columns,
+    load_dataframe,
+    read_header,
+    sort_by_mjd,
+    write_dataframe,
+)
+
+
+def make_series(num_rows=1000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "mjd": 60000 + np.arange(num_rows) / 1440,
+            "flux": rng.normal(100, 5, num_rows),
+            "fluxerr": np.full(num_rows, 5.0),
+            "flag": np.arange(num_rows) % 2 == 0,
+            "band": ["ztfg", "ztfr"] * (num_rows // 2),
+        }
+    )
+
+
+def test_columnar_file_round_trip(tmp_path):
+    filename = str(tmp_path / "series.npc")
+    df = make_series()
+    metadata = {"series_name": "test", "ra": np.float64(10.5), "group_ids": [1, 2]}
+
+    file_hash = write_dataframe(filename, df, metadata)
+    with open(filename, "rb") as f:
+        assert file_hash == hashlib.md5(f.read()).hexdigest()
+    assert file_hash == hash_dataframe(df, metadata)
+
+    header, data_offset = read_header(filename)
+    assert header["rows"] == len(df)
+    assert data_offset % ALIGNMENT == 0
+    assert all(column["offset"] % ALIGNMENT == 0 for column in header["columns"])
+
+    columns, loaded_metadata = load_columns(filename)
+    assert isinstance(columns["flux"], np.memmap)
+    assert loaded_metadata == {"series_name": "test", "ra": 10.5, "group_ids": [1, 2]}
+
+    data, _ = load_dataframe(filename)
+    pd.testing.assert_frame_equal(data, df, check_dtype=False)
+    assert data["flux"].dtype == np.float64
+    assert data["flag"].dtype == bool
+
+
+def test_columnar_file_mjd_range(tmp_path):
+    filename = str(tmp_path / "series.npc")
+    df = make_series()
+    write_dataframe(filename, df)
+
+    mjd_min, mjd_max = df["mjd"][100], df["mjd"][199]
+    data, _ = load_dataframe(filename, mjd_min=mjd_min, mjd_max=mjd_max)
+    assert len(data) == 100
+    np.testing.assert_array_equal(data["flux"], df["flux"][100:200])
+
+    data, _ = load_dataframe(filename, mjd_min=df["mjd"][990], columns=["mjd"])
+    assert list(data.columns) == ["mjd"]
+    assert len(data) == 10
+
+    data, _ = load_dataframe(filename, mjd_max=59000)
+    assert len(data) == 0
+
+
+def test_columnar_hash_depends_on_data_and_metadata():
+    df = make_series(10)
+    assert hash_dataframe(df) == hash_dataframe(df.copy())
+    assert hash_dataframe(df) != hash_dataframe(df, {"filter": "ztfg"})
+    changed = df.copy()
+    changed.loc[3, "flux"] += 1
+    assert hash_dataframe(df) != hash_dataframe(changed)
+
+
+def test_columnar_file_sorts_rows_by_mjd(tmp_path):
+    filename = str(tmp_path / "series.npc")
+    df = make_series()
+    unsorted = df.sample(frac=1, random_state=0)
+    assert sort_by_mjd(df) is df
+
+    # the file is the same as for the sorted data
+    assert write_dataframe(filename, unsorted) == hash_dataframe(df)
+    data, _ = load_dataframe(filename)
+    pd.testing.assert_frame_equal(data, df, check_dtype=False)
+
+    data, _ = load_dataframe(filename, mjd_min=df["mjd"][100], mjd_max=df["mjd"][199])
+    np.testing.assert_array_equal(data["flux"], df["flux"][100:200])
+
+
+def test_columnar_file_missing_strings(tmp_path):
+    filename = str(tmp_path / "series.npc")
+    df = make_series(10)
+    df["band"] = df["band"].astype(object)
+    df.loc[2, "band"] = None
+    df.loc[7, "band"] = np.nan
+    write_dataframe(filename, df)
+
+    columns, _ = load_columns(filename)
+    assert isinstance(columns["band"], np.ma.MaskedArray)
+    assert not isinstance(columns["flux"], np.ma.MaskedArray)
+
+    # missing values are kept, not turned into "None" or "nan" strings
+    data, _ = load_dataframe(filename)
+    assert data["band"].isna().tolist() == df["band"].isna().tolist()
+    assert data["band"].dropna().tolist() == df["band"].dropna().tolist()
+    pd.testing.assert_frame_equal(
+        data.drop(columns="band"), df.drop(columns="band"), check_dtype=False
+    )
+
+    data, _ = load_dataframe(filename, mjd_min=df["mjd"][1], mjd_max=df["mjd"][3])
+    assert data["band"].isna().tolist() == [False, True, False]
+
+
+def test_columnar_file_rejects_mixed_objects(tmp_path):
+    df = make_series(10)
+    df["band"] = df["band"].astype(object)
+    df.loc[2, "band"] = 3
+    with pytest.raises(ValueError, match='Column "band"'):
+        write_dataframe(str(tmp_path / "series.npc"), df)
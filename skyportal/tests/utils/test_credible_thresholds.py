@@ -0,0 +1,99 @@
+import numpy as np
+from healpix_alchemy.constants import PIXEL_AREA
+
+from skyportal.utils import localization_tiles
+from skyportal.utils.localization_tiles import (
+    credible_level_key,
+    credible_thresholds,
+    min_probdensity,
+    uniq_to_ranges,
+)
+
+
+def _skymap(rng, n, ties=False):
+    level = rng.integers(4, 9, n)
+    ipix = (rng.random(n) * 12 * 4.0**level).astype(np.int64)
+    uniq = 4 * 4**level + ipix
+    lower, upper = uniq_to_ranges(uniq)
+    probdensity = rng.random(n)
+    if ties:
+        probdensity = np.round(probdensity, 1)
+    # normalize so the levels fall within the map
+    probdensity /= np.sum(probdensity * (upper - lower) * PIXEL_AREA)
+    return uniq, probdensity
+
+
+def _reference(uniq, probdensity, level):
+    # the window query: each tile's running sum includes all its peers
+    lower, upper = uniq_to_ranges(uniq)
+    prob = probdensity * ((upper - lower) * PIXEL_AREA)
+    in_region = [p for p in probdensity if prob[probdensity >= p].sum() <= level]
+    return min(in_region) if in_region else None
+
+
+def test_thresholds_match_window_query():
+    rng = np.random.default_rng(0)
+    for ties in (False, True):
+        uniq, probdensity = _skymap(rng, 500, ties=ties)
+        levels = (0.1, 0.5, 0.9, 0.99, 1.5)
+        thresholds = credible_thresholds(uniq, probdensity, levels)
+        for level in levels:
+            expected = _reference(uniq, probdensity, level)
+            assert np.isclose(
+                thresholds[credible_level_key(level)], expected, rtol=1e-12
+            )
+
+
+def test_level_below_densest_tile_has_no_threshold():
+    uniq, probdensity = _skymap(np.random.default_rng(1), 10)
+    assert credible_thresholds(uniq, probdensity, [1e-12]) == {"1e-12": None}
+    assert credible_thresholds([], [], [0.9]) == {"0.9": None}
+
+
+def test_level_keys():
+    assert credible_level_key(0.9) == credible_level_key(90 * 0.01) == "0.9"
+    assert credible_level_key(0.68) == "0.68"
+    assert credible_level_key(1) == "1"
+
+
+class _Session:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+
+    def scalar(self, statement):
+        self.calls += 1
+        return self.results.pop(0)
+
+
+def test_stored_then_memoized(monkeypatch):
+    monkeypatch.setattr(
+        localization_tiles, "_memoized_thresholds", localization_tiles.OrderedDict()
+    )
+
+    session = _Session([{"0.9": 0.25}])
+    assert min_probdensity(session, 1, 0.9) == 0.25
+    assert min_probdensity(session, 1, 90 * 0.01) == 0.25
+    assert session.calls == 1
+
+    # not stored: computed from the tiles, once
+    session = _Session([{"0.9": 0.25}, 0.5])
+    assert min_probdensity(session, 1, 0.8) == 0.5
+    assert min_probdensity(session, 1, 0.8) == 0.5
+    assert session.calls == 2
+
+    # no tiles yet: not memoized
+    session = _Session([None, None, None, 0.125])
+    assert min_probdensity(session, 2, 0.9) is None
+    assert min_probdensity(session, 2, 0.9) == 0.125
+    assert session.calls == 4
+
+
+def test_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(
+        localization_tiles, "_memoized_thresholds", localization_tiles.OrderedDict()
+    )
+    monkeypatch.setattr(localization_tiles, "MAX_MEMOIZED_THRESHOLDS", 2)
+    for localization_id in range(3):
+        min_probdensity(_Session([{"0.9": 1.0}]), localization_id, 0.9)
+    assert list(localization_tiles._memoized_thresholds) == [(1, "0.9"), (2, "0.9")]
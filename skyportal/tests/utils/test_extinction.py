@@ -4,6 +4,10 @@ import pytest
 from skyportal.utils.extinction import (
     calculate_extinction,
     deredden_flux,
+    extinction,
+    extinction_by_filter,
+    extinction_coefficient,
+    get_ebv,
     get_extinction_coefficient,
 )
 
@@ -68,3 +72,30 @@ def test_invalid_flux_handling(flux_value):
 def test_no_extinction_for_invalid_filter():
     corrected_flux = deredden_flux(100.0, 180.0, 45.0, "invalid_filter", Rv=3.1)
     assert corrected_flux is None
+
+
+def test_extinction_coefficients_are_memoized():
+    extinction_coefficient.cache_clear()
+    coeff = get_extinction_coefficient("ztfg", Rv=3.1)
+    assert get_extinction_coefficient("ztfg", Rv=3.1, Ebv=2.0) == 2 * coeff
+    assert extinction_coefficient.cache_info().hits == 1
+    assert get_extinction_coefficient("ztfg", Rv=2.5) != coeff
+
+
+def test_vectorized_extinction_matches_scalar():
+    ra = np.array([0.0, 90.0, 180.0, 270.0])
+    dec = np.array([90.0, 0.0, 45.0, -30.0])
+    filters = np.array(["ztfg", "ztfr", "invalid_filter", "ztfg"])
+
+    ebv = get_ebv(ra, dec)
+    assert ebv.shape == (4,)
+    assert get_ebv(ra[1], dec[1]) == ebv[1]
+
+    values = extinction(ra, dec, filters)
+    assert np.isnan(values[2])
+    for i in [0, 1, 3]:
+        assert np.isclose(values[i], calculate_extinction(ra[i], dec[i], filters[i]))
+
+    by_filter = extinction_by_filter(90.0, 0.0, ["ztfg", "ztfr", "invalid_filter"])
+    assert by_filter["ztfr"] == calculate_extinction(90.0, 0.0, "ztfr")
+    assert by_filter["invalid_filter"] is None
@@ -0,0 +1,117 @@
+import csv
+import datetime
+import io
+
+import astropy.units as u
+import healpix_alchemy as ha
+import numpy as np
+import pandas as pd
+
+from skyportal.utils import galaxy_ingest
+from skyportal.utils.galaxy_ingest import (
+    COPY_COLUMNS,
+    IngestCheckpoint,
+    clean_galaxies,
+    encode_galaxies,
+    glade_galaxies,
+    load_galaxy_chunks,
+)
+
+
+def _catalog(n=5):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "name": [f"galaxy-{i}" for i in range(n)],
+            "ra": rng.uniform(0, 360, n),
+            "dec": rng.uniform(-90, 90, n),
+            "distmpc": rng.uniform(1, 100, n),
+            "mstar": [1e9, None, 2e10, None, 3e8][:n],
+        }
+    )
+
+
+def test_clean_drops_invalid_rows():
+    catalog = _catalog()
+    catalog.loc[0, "ra"] = 360
+    catalog.loc[1, "distmpc"] = -1
+    catalog.loc[2, "name"] = None
+    galaxies = clean_galaxies(catalog)
+    assert galaxies["name"].tolist() == ["galaxy-3", "galaxy-4"]
+    assert galaxies["redshift"].isna().all()
+    assert galaxies["mstar"].dtype == np.float64
+
+
+def test_glade_names_and_masses():
+    chunk = pd.DataFrame(
+        {"GLADE_no": ["1", "2"], "RA": [10.0, 20.0], "Dec": [5.0, -5.0]}
+    )
+    chunk["Mstar"] = [2.5, np.nan]
+    galaxies = glade_galaxies(chunk)
+    assert galaxies["name"].tolist() == ["GLADE-1", "GLADE-2"]
+    assert galaxies["mstar"].iloc[0] == 2.5e10
+    assert np.isnan(galaxies["mstar"].iloc[1])
+
+
+def test_encoded_rows_match_per_galaxy_values():
+    galaxies = clean_galaxies(_catalog())
+    created_at = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    rows = list(
+        csv.reader(io.StringIO(encode_galaxies(galaxies, 7, created_at).decode()))
+    )
+    assert len(rows) == len(galaxies)
+    for row, (_, galaxy) in zip(rows, galaxies.iterrows()):
+        row = dict(zip(COPY_COLUMNS, row))
+        assert row["name"] == galaxy["name"]
+        assert float(row["ra"]) == galaxy["ra"]
+        assert row["redshift"] == ""
+        if np.isnan(galaxy["mstar"]):
+            assert row["mstar"] == ""
+        else:
+            assert float(row["mstar"]) == galaxy["mstar"]
+        assert int(row["healpix"]) == ha.constants.HPX.lonlat_to_healpix(
+            galaxy["ra"] * u.deg, galaxy["dec"] * u.deg
+        )
+        assert row["catalog_id"] == "7"
+        assert row["created_at"] == row["modified"] == created_at.isoformat()
+
+
+class _Session:
+    def __init__(self, fail_on=()):
+        self.copied = []
+        self.fail_on = fail_on
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def test_resume_skips_loaded_chunks(tmp_path, monkeypatch):
+    def copy(session, data):
+        if len(session.copied) in session.fail_on:
+            session.fail_on = ()
+            raise RuntimeError("connection lost")
+        session.copied.append(data)
+
+    monkeypatch.setattr(galaxy_ingest, "copy_galaxies", copy)
+    chunks = [_catalog(), _catalog(3), _catalog(4)]
+    path = str(tmp_path / "checkpoint.json")
+
+    session = _Session(fail_on=(1,))
+    totals = load_galaxy_chunks(
+        session, chunks, clean_galaxies, 1, IngestCheckpoint(path), processes=1
+    )
+    assert totals == {"rows": 9, "blueshifted": 0, "failed": 1}
+    assert IngestCheckpoint(path).done == {0: 5, 2: 4}
+
+    session = _Session()
+    totals = load_galaxy_chunks(
+        session, chunks, clean_galaxies, 1, IngestCheckpoint(path), processes=1
+    )
+    assert totals["rows"] == 3
+    assert len(session.copied) == 1
+    # all chunks are loaded: the checkpoint is removed
+    assert not (tmp_path / "checkpoint.json").exists()
@@ -0,0 +1,36 @@
+from skyportal.utils.gcn_crossmatch import merge_crossmatches
+
+EVENT_1 = "2019-04-25 08:18:05"
+EVENT_2 = "2019-08-14 21:10:39"
+OTHER = "2017-08-17 12:41:04"
+
+
+def test_replace_keeps_only_matches():
+    assert merge_crossmatches([OTHER], [EVENT_1], [EVENT_1, EVENT_2], True) == [EVENT_1]
+    assert merge_crossmatches(None, [], [EVENT_1], True) == []
+
+
+def test_merge_updates_only_crossmatched_events():
+    crossmatched = [EVENT_1, EVENT_2]
+    assert merge_crossmatches([OTHER, EVENT_2], [EVENT_1], crossmatched) == [
+        OTHER,
+        EVENT_1,
+    ]
+    # existing entries are compared whatever their datetime format
+    assert merge_crossmatches(["2019-08-14T21:10:39"], [], crossmatched) == []
+    assert merge_crossmatches([OTHER], [], crossmatched) == [OTHER]
+
+
+def test_merge_leaves_missing_crossmatches_unset():
+    assert merge_crossmatches(None, [], [EVENT_1]) is None
+    assert merge_crossmatches(None, [EVENT_1], [EVENT_1]) == [EVENT_1]
+
+
+def test_merge_keeps_fractional_seconds():
+    event = "2019-04-25 08:18:18.002909"
+    # an entry of another event within the same second is kept
+    assert merge_crossmatches(["2019-04-25 08:18:18"], [event], [event]) == [
+        "2019-04-25 08:18:18",
+        event,
+    ]
+    assert merge_crossmatches(["2019-04-25T08:18:18.002909"], [], [event]) == []
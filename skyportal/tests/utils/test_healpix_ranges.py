@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from mocpy import MOC
+
+from skyportal.utils.healpix_ranges import NPIX, HealpixRangeSet, uniq_to_ranges
+from skyportal.utils.observation_plan import combine_healpix_tuples
+
+
+def _random_ranges(rng, n, span=200):
+    lower = rng.integers(0, span, n)
+    upper = lower + rng.integers(0, 30, n)
+    return list(zip(lower.tolist(), upper.tolist()))
+
+
+def _pixels(ranges):
+    return {p for lower, upper in ranges for p in range(lower, upper)}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_combine_healpix_tuples(seed):
+    ranges = _random_ranges(np.random.default_rng(seed), 40)
+    expected = combine_healpix_tuples(list(ranges))
+    merged = HealpixRangeSet.from_ranges(ranges)
+    assert merged == HealpixRangeSet.from_ranges(expected)
+    assert merged.npix == sum(upper - lower for lower, upper in expected)
+    # ranges only touching are merged too
+    assert all(
+        upper < lower for (_, upper), (lower, _) in zip(merged, list(merged)[1:])
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_set_operations(seed):
+    rng = np.random.default_rng(seed)
+    a, b = _random_ranges(rng, 15), _random_ranges(rng, 15)
+    set_a, set_b = HealpixRangeSet.from_ranges(a), HealpixRangeSet.from_ranges(b)
+    assert _pixels(set_a | set_b) == _pixels(a) | _pixels(b)
+    assert _pixels(set_a & set_b) == _pixels(a) & _pixels(b)
+    assert _pixels(set_a - set_b) == _pixels(a) - _pixels(b)
+
+    ipix = np.arange(-5, 240)
+    assert set(ipix[set_a.contains(ipix)].tolist()) == _pixels(a)
+
+    tiles = _random_ranges(rng, 50)
+    lower, upper = np.array(tiles).T
+    assert set_a.overlap_npix(lower, upper).tolist() == [
+        len(_pixels(a) & _pixels([tile])) for tile in tiles
+    ]
+
+
+def test_complement_and_area():
+    ranges = HealpixRangeSet.from_ranges([(0, 10), (NPIX - 5, NPIX)])
+    assert ranges.complement() == HealpixRangeSet([10], [NPIX - 5])
+    assert (ranges | ranges.complement()).area == pytest.approx(4 * np.pi)
+    assert len(HealpixRangeSet() & ranges) == 0
+
+
+def test_contains_keeps_shape():
+    ranges = HealpixRangeSet.from_ranges([(10, 20), (30, 40)])
+    assert ranges.contains(15) and not ranges.contains(25)
+    assert ranges.contains(np.int64(39)) and not ranges.contains(40)
+    np.testing.assert_array_equal(
+        ranges.contains([[9, 10], [35, 45]]), [[False, True], [True, False]]
+    )
+    assert ranges.contains([]).shape == (0,)
+
+
+def test_from_uniq_and_moc():
+    moc = MOC.from_string("3/1-3 4/70 5/300-303")
+    uniq = [4 * 4**3 + 1, 4 * 4**3 + 2, 4 * 4**3 + 3, 4 * 4**4 + 70]
+    uniq += [4 * 4**5 + i for i in range(300, 304)]
+    from_moc = HealpixRangeSet.from_moc(moc)
+    assert from_moc == HealpixRangeSet.from_uniq(uniq)
+    assert from_moc.npix == sum(hi - lo for lo, hi in zip(*uniq_to_ranges(uniq)))
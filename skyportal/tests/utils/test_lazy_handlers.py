@@ -0,0 +1,81 @@
+import sys
+import textwrap
+
+import pytest
+
+from skyportal.handlers.lazy import (
+    LazyHandler,
+    LazyHandlers,
+    lazy_handler,
+    resolve_handler,
+)
+
+
+@pytest.fixture
+def handler_package(tmp_path, monkeypatch):
+    package = tmp_path / "lazy_test_handlers"
+    package.mkdir()
+    (package / "__init__.py").write_text(
+        textwrap.dedent(
+            """
+            from skyportal.handlers.lazy import lazy_exports
+
+            __getattr__, __dir__, __all__ = lazy_exports(
+                __name__,
+                {".first": ["FirstHandler", "helper"], ".second": ["SecondHandler"]},
+            )
+            """
+        )
+    )
+    for name in ["first", "second"]:
+        (package / f"{name}.py").write_text(
+            textwrap.dedent(
+                f"""
+                import tornado.web
+
+                class {name.capitalize()}Handler(tornado.web.RequestHandler):
+                    pass
+
+                def helper():
+                    return "{name}"
+                """
+            )
+        )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazy_test_handlers"
+    for module in list(sys.modules):
+        if module.startswith("lazy_test_handlers"):
+            del sys.modules[module]
+
+
+def test_lazy_exports_import_submodules_on_first_access(handler_package):
+    package = __import__(handler_package)
+    assert package.__all__ == ["FirstHandler", "helper", "SecondHandler"]
+    assert f"{handler_package}.first" not in sys.modules
+
+    assert package.helper() == "first"
+    assert f"{handler_package}.first" in sys.modules
+    assert f"{handler_package}.second" not in sys.modules
+    assert package.FirstHandler.__module__ == f"{handler_package}.first"
+    assert "SecondHandler" in dir(package)
+
+    with pytest.raises(AttributeError):
+        package.ThirdHandler
+
+
+def test_lazy_handlers_are_resolved_on_first_request(handler_package):
+    handlers = LazyHandlers(handler_package)
+    placeholder = handlers.SecondHandler
+    assert issubclass(placeholder, LazyHandler)
+    assert placeholder is lazy_handler(handler_package, "SecondHandler")
+    # declaring the route doesn't import the handler
+    assert f"{handler_package}.second" not in sys.modules
+
+    handler = resolve_handler(placeholder)
+    assert handler.__name__ == "SecondHandler"
+    assert handler.__module__ == f"{handler_package}.second"
+    assert resolve_handler(handler) is handler
+
+    # typos are caught when the routes are declared
+    with pytest.raises(AttributeError):
+        handlers.SecondHandlr
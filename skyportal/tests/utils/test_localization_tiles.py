@@ -0,0 +1,70 @@
+import datetime
+import struct
+
+import numpy as np
+import pytest
+from healpix_alchemy.types import Tile
+
+from skyportal.utils.localization_tiles import (
+    PGCOPY_HEADER,
+    TILE_ROW_DTYPE,
+    encode_tiles,
+    uniq_to_ranges,
+)
+
+
+def _uniq(rng, n):
+    level = rng.integers(0, 30, n)
+    ipix = (rng.random(n) * 12 * 4.0**level).astype(np.int64)
+    return 4 * 4**level + ipix
+
+
+def test_ranges_match_tile_type():
+    uniq = _uniq(np.random.default_rng(0), 1000)
+    lower, upper = uniq_to_ranges(uniq)
+    tile = Tile()
+    for u, lo, hi in zip(uniq, lower, upper):
+        assert tile.process_bind_param(int(u), None) == f"[{lo},{hi})"
+
+
+def test_rows_follow_binary_copy_format():
+    dateobs = datetime.datetime(2024, 5, 1, 3, 4, 5, 678901)
+    created_at = datetime.datetime(2024, 5, 1, 4, 0, 0)
+    uniq = np.array([4, 1024, 4 * 4**29 + 5])
+    probdensity = np.array([0.5, 1e-3, 12.25])
+    rows = encode_tiles(42, dateobs, uniq, probdensity, created_at=created_at)
+    # 11-byte signature, then zero flags and header extension length
+    assert PGCOPY_HEADER == b"PGCOPY\n\xff\r\n\x00" + bytes(8)
+
+    data = rows.tobytes()
+    assert len(data) == len(uniq) * TILE_ROW_DTYPE.itemsize
+    # field count; id, probdensity, dateobs; int8range; created_at, modified
+    fmt = ">h" + "ii" + "id" + "iq" + "iBiqiq" + "iq" + "iq"
+    lower, upper = uniq_to_ranges(uniq)
+    epoch = datetime.datetime(2000, 1, 1)
+    us = datetime.timedelta(microseconds=1)
+    for i, row in enumerate(struct.iter_unpack(fmt, data)):
+        assert row == (
+            6,
+            4,
+            42,
+            8,
+            probdensity[i],
+            8,
+            (dateobs - epoch) // us,
+            25,
+            0x02,
+            8,
+            lower[i],
+            8,
+            upper[i],
+            8,
+            (created_at - epoch) // us,
+            8,
+            (created_at - epoch) // us,
+        )
+
+
+def test_shape_mismatch_rejected():
+    with pytest.raises(ValueError, match="different shapes"):
+        encode_tiles(1, datetime.datetime(2024, 1, 1), [4, 5], [0.1])
@@ -0,0 +1,64 @@
+import datetime
+from types import SimpleNamespace
+
+from skyportal.utils.notification_delivery import (
+    RateLimiter,
+    batches,
+    json_content,
+    rate_limiters,
+    retry_delay,
+)
+
+
+def test_retry_delay_backs_off_exponentially():
+    for attempts, delay in [(1, 10), (2, 20), (3, 40)]:
+        assert delay / 2 <= retry_delay(attempts, base=10, maximum=100) <= delay
+    assert 50 <= retry_delay(10, base=10, maximum=100) <= 100
+
+
+def test_rate_limiter_allows_bursts_then_rate():
+    now = [0.0]
+    limiter = RateLimiter(rate=0.5, burst=2, clock=lambda: now[0])
+    assert limiter.reserve("a") == 0
+    assert limiter.reserve("a") == 0
+    assert limiter.reserve("a") == 2
+    # the reservation above is already counted
+    assert limiter.reserve("a") == 4
+    # destinations are limited independently
+    assert limiter.reserve("b") == 0
+    now[0] = 10.0
+    assert limiter.reserve("a") == 0
+
+
+def test_rate_limiter_forgets_least_recent_destinations():
+    limiter = RateLimiter(rate=1, burst=1, clock=lambda: 0.0, max_destinations=2)
+    for destination in ["a", "b", "c"]:
+        limiter.reserve(destination)
+    assert limiter.reserve("a") == 0
+    assert limiter.reserve("c") == 1
+
+
+def test_rate_limiters_overrides():
+    limiters = rate_limiters({"slack": [2, 4], "email": None})
+    assert "frontend" not in limiters
+    assert "email" not in limiters
+    assert (limiters["slack"].rate, limiters["slack"].burst) == (2, 4)
+
+
+def test_batches_group_by_destination():
+    deliveries = [
+        SimpleNamespace(id=i, destination=destination)
+        for i, destination in enumerate("abaab")
+    ]
+    assert [[d.id for d in batch] for batch in batches(deliveries, 2)] == [
+        [0, 2],
+        [3],
+        [1, 4],
+    ]
+    assert len(batches(deliveries)) == 5
+
+
+def test_json_content_formats_like_messages():
+    content = {"time_since_dateobs": datetime.timedelta(hours=1), "tags": ["GW"]}
+    assert json_content(content) == {"time_since_dateobs": "1:00:00", "tags": ["GW"]}
+    assert json_content(None) is None
@@ -0,0 +1,58 @@
+"""serialize_many must give exactly what serializing point by point gives."""
+
+import random
+
+import pytest
+
+from baselayer.app.json_util import to_json
+from skyportal.handlers.api.photometry import serialize, serialize_many
+from skyportal.models import Instrument, Photometry
+
+
+def _points(n, seed=0):
+    rng = random.Random(seed)
+    instrument = Instrument(id=1, name="ZTF")
+    points = []
+    for i in range(n):
+        ref_flux, ref_fluxerr = None, None
+        if rng.random() < 0.2:
+            ref_flux, ref_fluxerr = rng.uniform(1, 100), rng.uniform(0.1, 2)
+        original_user_data = rng.choice(
+            [None, {}, {"limiting_mag": 20.5, "magsys": rng.choice(["ab", "vega"])}]
+        )
+        points.append(
+            Photometry(
+                id=i,
+                obj_id="ZTF21aaaaaaa",
+                instrument_id=1,
+                instrument=instrument,
+                filter=rng.choice(["ztfg", "ztfr", "ztfi", "swiftxrt"]),
+                mjd=59000 + i,
+                flux=rng.choice([float("nan"), -3.0, 0.0, rng.uniform(0.01, 1e5)]),
+                fluxerr=rng.choice([0.0, rng.uniform(0.01, 100)]),
+                ref_flux=ref_flux,
+                ref_fluxerr=ref_fluxerr,
+                origin=rng.choice([None, "fp"]),
+                original_user_data=original_user_data,
+            )
+        )
+    return points
+
+
+@pytest.mark.parametrize("format", ["plot", "mag", "flux", "both"])
+@pytest.mark.parametrize("outsys", ["ab", "vega"])
+@pytest.mark.parametrize("extinction_dict", [None, {"ztfg": 0.3, "ztfr": 0.2}])
+def test_serialize_many_matches_serialize(format, outsys, extinction_dict):
+    points = _points(200)
+    reference = [
+        serialize(p, outsys, format, extinction_dict=extinction_dict) for p in points
+    ]
+    columnar = serialize_many(points, outsys, format, extinction_dict=extinction_dict)
+    assert to_json(columnar) == to_json(reference)
+
+
+def test_serialize_many_format_errors_like_serialize():
+    points = _points(5)
+    assert serialize_many([], "ab", "mag") == []
+    with pytest.raises(ValueError, match="Invalid output format"):
+        serialize_many(points, "ab", "fluxes")
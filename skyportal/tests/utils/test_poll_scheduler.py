@@ -0,0 +1,74 @@
+import asyncio
+
+from skyportal.utils.poll_scheduler import (
+    MAX_POLL_INTERVAL,
+    MIN_POLL_INTERVAL,
+    PollScheduler,
+    poll_delay,
+)
+
+
+def test_poll_delay_follows_queue_position():
+    assert poll_delay() == MIN_POLL_INTERVAL
+    assert poll_delay(queue_position=0) == MIN_POLL_INTERVAL
+    assert poll_delay(queue_position=30) == 300
+    assert poll_delay(queue_position=10_000) == MAX_POLL_INTERVAL
+    # the queue position takes precedence over the time waited
+    assert poll_delay(queue_position=3, waiting=3000) == 30
+    assert poll_delay(waiting=3000) == 300
+
+
+def test_scheduler_polls_until_done_with_bounded_concurrency():
+    polls = []
+    in_flight = {"ATLAS": 0, "ZTF": 0}
+    max_in_flight = {"ATLAS": 0, "ZTF": 0}
+
+    async def poll(key):
+        facility = "ATLAS" if key < 10 else "ZTF"
+        in_flight[facility] += 1
+        max_in_flight[facility] = max(max_in_flight[facility], in_flight[facility])
+        await asyncio.sleep(0.01)
+        in_flight[facility] -= 1
+        polls.append(key)
+        # each request needs a second poll, shortly after the first
+        return 0.01 if polls.count(key) < 2 else None
+
+    async def run():
+        scheduler = PollScheduler(poll, {"ATLAS": 3}, default_concurrency=1)
+        runner = asyncio.ensure_future(scheduler.run())
+        for key in range(6):
+            scheduler.schedule(key, "ATLAS")
+        for key in range(10, 13):
+            scheduler.schedule(key, "ZTF")
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if scheduler.stats == {"scheduled": 0, "running": 0}:
+                break
+        runner.cancel()
+
+    asyncio.run(run())
+    assert sorted(polls) == sorted(2 * (list(range(6)) + list(range(10, 13))))
+    assert max_in_flight == {"ATLAS": 3, "ZTF": 1}
+
+
+def test_schedule_keeps_earliest_poll():
+    polled = []
+
+    async def poll(key):
+        polled.append((key, asyncio.get_running_loop().time()))
+
+    async def run():
+        scheduler = PollScheduler(poll)
+        runner = asyncio.ensure_future(scheduler.run())
+        start = asyncio.get_running_loop().time()
+        scheduler.schedule("a", "ATLAS", delay=60)
+        # a new submission wakes the scheduler up
+        scheduler.schedule("a", "ATLAS")
+        scheduler.schedule("a", "ATLAS", delay=30)
+        await asyncio.sleep(0.05)
+        runner.cancel()
+        return start
+
+    start = asyncio.run(run())
+    assert len(polled) == 1
+    assert polled[0][1] - start < 1
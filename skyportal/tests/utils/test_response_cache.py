@@ -0,0 +1,187 @@
+"""Unit tests for the shared GET response cache (skyportal.handlers.response_cache).
+
+The decorator is exercised on a minimal fake handler — mirroring the payload
+capture in ``BaseHandler.success`` — against a ``ValkeyCache`` whose client is
+an in-memory fake, so no Tornado server or Valkey is needed.
+"""
+
+import asyncio
+import fnmatch
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from skyportal.handlers import response_cache
+from skyportal.handlers.response_cache import (
+    cached_response,
+    endpoint_prefix,
+    groups_scope,
+    principal_scope,
+    response_key,
+    variant_hash,
+)
+from skyportal.utils.valkey_cache import ValkeyCache, _NoOpCache
+
+
+class _FakeRedis:
+    """Dict-backed stand-in for the redis.asyncio methods ValkeyCache uses."""
+
+    def __init__(self):
+        self.store = {}
+        self.expirations = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value.encode() if isinstance(value, str) else value
+        self.expirations[key] = ex
+        return True
+
+    async def unlink(self, key):
+        self.store.pop(key, None)
+        return 1
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.store):
+            if match is None or fnmatch.fnmatch(key, match):
+                yield key
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ValkeyCache(default_ttl=300)
+    cache._client = _FakeRedis()
+    monkeypatch.setattr(response_cache, "get_cache", lambda: cache)
+    return cache
+
+
+def _user(id, preferences=None):
+    return SimpleNamespace(id=id, username=f"user{id}", preferences=preferences)
+
+
+class FakeHandler:
+    calls = 0
+
+    def __init__(self, current_user, query=None, fail=False):
+        self.current_user = current_user
+        self.query = query or {}
+        self.fail = fail
+        self.status = 200
+        self.response = None
+
+    def get_query_argument(self, name, default=None):
+        return self.query.get(name, default)
+
+    def get_status(self):
+        return self.status
+
+    def success(self, data=None):
+        capture = getattr(self, "_response_cache_capture", None)
+        if capture is not None:
+            capture.append(data)
+        self.response = ("success", data)
+
+    def error(self, message):
+        self.status = 400
+        self.response = ("error", message)
+
+    @cached_response(
+        "test_endpoint", query_args=("teamID",), preferences=("sourceCounts",)
+    )
+    async def get(self):
+        type(self).calls += 1
+        if self.fail:
+            return self.error("boom")
+        return self.success(
+            data={"calls": type(self).calls, "team": self.get_query_argument("teamID")}
+        )
+
+
+@pytest.fixture(autouse=True)
+def _reset_calls():
+    FakeHandler.calls = 0
+
+
+def _get(handler):
+    asyncio.run(handler.get())
+    return handler.response
+
+
+def test_scopes_and_keys():
+    user = _user(1)
+    token = SimpleNamespace(id="abc")
+    assert principal_scope(user) == "u1"
+    assert principal_scope(token) == "tabc"
+    # Group membership order doesn't matter, membership does.
+    assert groups_scope([3, 1, 2]) == groups_scope([1, 2, 3])
+    assert groups_scope([1, 2]) != groups_scope([1, 2, 3])
+    assert variant_hash({"teamID": None}, {}) != variant_hash({"teamID": "1"}, {})
+    key = response_key("source_counts", "u1", "v")
+    assert key.startswith(endpoint_prefix("source_counts"))
+
+
+def test_miss_then_hit(cache):
+    first = _get(FakeHandler(_user(1)))
+    second = _get(FakeHandler(_user(1)))
+    assert first == second == ("success", {"calls": 1, "team": None})
+    assert FakeHandler.calls == 1
+    (key,) = cache._client.store
+    assert key.startswith("respcache:v1:test_endpoint:u1:")
+    assert json.loads(cache._client.store[key]) == {"calls": 1, "team": None}
+    # TTL falls back to cache.ttl.default for endpoints without their own.
+    assert cache._client.expirations[key] == response_cache.endpoint_ttl(
+        "test_endpoint"
+    )
+
+
+def test_entries_are_not_shared_across_scope_or_variant(cache):
+    _get(FakeHandler(_user(1)))
+    # Another user, another team view, changed preferences: all misses.
+    _get(FakeHandler(_user(2)))
+    _get(FakeHandler(_user(1), query={"teamID": "5"}))
+    _get(FakeHandler(_user(1, preferences={"sourceCounts": {"sinceDaysAgo": 2}})))
+    # A token never reads its owner's entry.
+    _get(FakeHandler(SimpleNamespace(id="tok", preferences=None)))
+    assert FakeHandler.calls == 5
+    # Unrelated preference sections don't change the key.
+    _get(FakeHandler(_user(1, preferences={"recentSources": {"maxNumSources": 3}})))
+    assert FakeHandler.calls == 5
+
+
+def test_errors_are_not_cached(cache):
+    assert _get(FakeHandler(_user(1), fail=True)) == ("error", "boom")
+    assert cache._client.store == {}
+    assert _get(FakeHandler(_user(1)))[0] == "success"
+    assert FakeHandler.calls == 2
+
+
+def test_disabled_cache_always_runs(monkeypatch):
+    monkeypatch.setattr(response_cache, "get_cache", lambda: _NoOpCache())
+    _get(FakeHandler(_user(1)))
+    _get(FakeHandler(_user(1)))
+    assert FakeHandler.calls == 2
+
+
+def test_invalid_scope_rejected():
+    with pytest.raises(ValueError, match="Invalid response cache scope"):
+        cached_response("x", scope="everyone")
+
+
+def test_commit_invalidates_endpoint_prefix(cache):
+    _get(FakeHandler(_user(1)))
+    _get(FakeHandler(_user(2)))
+    cache._client.store["respcache:v1:other_endpoint:u1:v"] = b"{}"
+
+    async def commit():
+        session = SimpleNamespace(info={"response_cache_stale": {"test_endpoint"}})
+        response_cache._invalidate_after_commit(session)
+        assert "response_cache_stale" not in session.info
+        await asyncio.gather(*response_cache._pending)
+
+    asyncio.run(commit())
+    assert list(cache._client.store) == ["respcache:v1:other_endpoint:u1:v"]
+    # The next request recomputes.
+    _get(FakeHandler(_user(1)))
+    assert FakeHandler.calls == 3
@@ -0,0 +1,42 @@
+import numpy as np
+
+from skyportal.models.spectrum import BinaryNumpyArray, NumpyArray
+
+
+def test_binary_numpy_array_round_trip():
+    values = np.array([4000.0, 4000.5, np.nan, np.inf, -1e-30])
+    column_type = BinaryNumpyArray()
+    stored = column_type.process_bind_param(values, None)
+    assert isinstance(stored, bytes)
+    assert len(stored) == 8 * len(values)
+
+    loaded = column_type.process_result_value(stored, None)
+    np.testing.assert_array_equal(loaded, values)
+    # same values as the array column type
+    array_type = NumpyArray()
+    np.testing.assert_array_equal(
+        loaded,
+        array_type.process_result_value(
+            array_type.process_bind_param(values, None), None
+        ),
+    )
+    # lists are accepted too
+    np.testing.assert_array_equal(
+        column_type.process_result_value(
+            column_type.process_bind_param(values.tolist(), None), None
+        ),
+        values,
+    )
+
+    assert column_type.process_bind_param(None, None) is None
+    assert column_type.process_result_value(None, None) is None
+    assert len(column_type.process_result_value(b"", None)) == 0
+
+
+def test_binary_numpy_array_float32():
+    column_type = BinaryNumpyArray(dtype="<f4")
+    stored = column_type.process_bind_param([1.5, 2.25], None)
+    assert len(stored) == 8
+    loaded = column_type.process_result_value(stored, None)
+    assert loaded.dtype == np.float32
+    np.testing.assert_array_equal(loaded, [1.5, 2.25])
@@ -0,0 +1,50 @@
+import datetime
+
+import numpy as np
+
+from skyportal.utils.spectrum_preview import (
+    invalidate_preview,
+    minmax_indices,
+    preview_cache,
+    preview_indices,
+)
+
+
+def test_minmax_indices_keep_extremes():
+    rng = np.random.default_rng(0)
+    fluxes = rng.normal(1, 0.01, 100_000)
+    fluxes[12_345] = 50  # a narrow emission line
+    fluxes[54_321] = -50  # and an absorption line
+    fluxes[1000:1100] = np.nan  # shorter than a bin
+
+    indices = minmax_indices(fluxes, 1000)
+    assert len(indices) <= 1000
+    assert np.all(np.diff(indices) > 0)
+    assert indices[0] == 0 and indices[-1] == len(fluxes) - 1
+    assert 12_345 in indices and 54_321 in indices
+    assert not np.isnan(fluxes[indices]).any()
+
+    np.testing.assert_array_equal(minmax_indices(fluxes[:500], 1000), np.arange(500))
+
+
+def test_minmax_indices_all_nan_bins():
+    fluxes = np.full(100, np.nan)
+    fluxes[:10] = np.arange(10)
+    indices = minmax_indices(fluxes, 10)
+    assert len(indices) <= 10
+    assert {0, 9, 99} <= set(indices)
+
+
+def test_preview_indices_cached_until_modified():
+    fluxes = np.arange(10_000.0)
+    modified = datetime.datetime(2026, 1, 1)
+    indices = preview_indices(-1, modified, fluxes)
+    # cached results are returned as long as the spectrum is not modified
+    assert preview_indices(-1, modified, -fluxes) is indices
+    later = modified + datetime.timedelta(seconds=1)
+    assert preview_indices(-1, later, fluxes) is not indices
+    # other sizes of previews are not cached
+    assert len(preview_indices(-1, later, fluxes, 100)) <= 100
+    assert len(preview_cache[-1][1]) == len(indices)
+    invalidate_preview(-1)
+    assert -1 not in preview_cache
@@ -0,0 +1,90 @@
+"""Unit tests for BaseHandler.stream_success, run on a minimal fake handler
+that records what would be written to the client."""
+
+import asyncio
+import json
+
+import pytest
+from tornado.iostream import StreamClosedError
+
+from skyportal.handlers.base import BaseHandler
+
+
+class FakeHandler:
+    stream_success = BaseHandler.stream_success
+
+    def __init__(self, close_after=None):
+        self.chunks = []
+        self.flushes = 0
+        self.headers = {}
+        self.status = None
+        self.close_after = close_after
+
+    def set_status(self, status):
+        self.status = status
+
+    def set_header(self, name, value):
+        self.headers[name] = value
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+
+    async def flush(self):
+        if self.close_after is not None and self.flushes >= self.close_after:
+            raise StreamClosedError()
+        self.flushes += 1
+
+    @property
+    def body(self):
+        return "".join(self.chunks)
+
+
+def _stream(handler, rows, **kwargs):
+    asyncio.run(handler.stream_success(rows, **kwargs))
+    return handler.body
+
+
+@pytest.mark.parametrize("n_rows", [0, 1, 5, 10, 11])
+def test_json_body_is_a_valid_array(n_rows):
+    rows = [{"id": i, "mjd": 59000.5 + i} for i in range(n_rows)]
+    handler = FakeHandler()
+    body = _stream(handler, iter(rows), batch_size=5)
+    assert json.loads(body) == rows
+    assert handler.status == 200
+    assert handler.headers["Content-Type"].startswith("application/json")
+    # One flush per batch, plus the final one.
+    assert handler.flushes == -(-n_rows // 5) + 1
+
+
+@pytest.mark.parametrize("n_rows", [0, 1, 7])
+def test_ndjson_body_has_one_document_per_line(n_rows):
+    rows = [{"id": i} for i in range(n_rows)]
+    handler = FakeHandler()
+    body = _stream(handler, (row for row in rows), format="ndjson", batch_size=3)
+    assert [json.loads(line) for line in body.splitlines()] == rows
+    assert body == "" or body.endswith("\n")
+    assert handler.headers["Content-Type"].startswith("application/x-ndjson")
+
+
+def test_serialize_is_applied_per_row():
+    body = _stream(FakeHandler(), range(4), serialize=lambda i: {"i": i * 2})
+    assert json.loads(body) == [{"i": 0}, {"i": 2}, {"i": 4}, {"i": 6}]
+
+
+def test_rows_are_consumed_lazily_and_stop_when_client_leaves():
+    consumed = []
+
+    def rows():
+        for i in range(100):
+            consumed.append(i)
+            yield {"id": i}
+
+    handler = FakeHandler(close_after=2)
+    _stream(handler, rows(), batch_size=10)
+    # The third batch fails to flush; nothing past it is read.
+    assert len(consumed) == 30
+
+
+def test_invalid_format_rejected():
+    with pytest.raises(ValueError, match="Invalid stream format"):
+        _stream(FakeHandler(), [], format="csv")
@@ -0,0 +1,108 @@
+import datetime
+import io
+import json
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from skyportal.utils.tables import (
+    records_to_table,
+    spectra_to_table,
+    table_bytes,
+)
+
+
+def _read(buf, format):
+    if format == "arrow":
+        return pa.ipc.open_stream(buf).read_all()
+    return pq.read_table(buf)
+
+
+def test_records_keep_types_and_nans():
+    created_at = datetime.datetime(2024, 5, 1, 12, 30)
+    records = [
+        {
+            "id": 1,
+            "mjd": 59000.5,
+            "mag": 18.2,
+            "filter": "ztfg",
+            "created_at": created_at,
+        },
+        {
+            "id": 2,
+            "mjd": 59001.5,
+            "mag": None,
+            "filter": "ztfr",
+            "created_at": created_at,
+        },
+        {"id": 3, "mjd": 59002.5, "mag": float("nan"), "extra": "x"},
+    ]
+    table = records_to_table(records, metadata={"magsys": "ab"})
+    assert table.column_names == ["id", "mjd", "mag", "filter", "created_at", "extra"]
+    assert table.schema.field("id").type == pa.int64()
+    assert table.schema.field("mjd").type == pa.float64()
+    assert pa.types.is_timestamp(table.schema.field("created_at").type)
+    assert table.schema.metadata == {b"magsys": b"ab"}
+    mag = table.column("mag").to_pylist()
+    assert mag[:2] == [18.2, None] and np.isnan(mag[2])
+    # Missing keys are nulls.
+    assert table.column("extra").to_pylist() == [None, None, "x"]
+
+
+def test_nested_and_mixed_values_become_json():
+    records = [
+        {"groups": [{"id": 1, "name": "Sitewide"}], "value": 1.0},
+        {"groups": [], "value": "n/a"},
+    ]
+    table = records_to_table(records)
+    assert table.schema.field("groups").type == pa.string()
+    assert json.loads(table.column("groups")[0].as_py()) == [
+        {"id": 1, "name": "Sitewide"}
+    ]
+    assert table.column("value").to_pylist() == ["1.0", '"n/a"']
+
+
+def test_spectra_arrays_are_list_columns():
+    spectra = [
+        {
+            "id": 1,
+            "wavelengths": np.linspace(4000, 9000, 5),
+            "fluxes": np.ones(5),
+            "errors": None,
+        },
+        {
+            "id": 2,
+            "wavelengths": [5000.0, 6000.0],
+            "fluxes": [2.0, 3.0],
+            "errors": [0.1, 0.2],
+        },
+    ]
+    table = spectra_to_table(spectra)
+    assert table.column_names == ["id", "wavelengths", "fluxes", "errors"]
+    assert table.schema.field("fluxes").type == pa.list_(pa.float64())
+    np.testing.assert_array_equal(
+        table.column("wavelengths")[0].values.to_numpy(), np.linspace(4000, 9000, 5)
+    )
+    assert table.column("errors").to_pylist() == [None, [0.1, 0.2]]
+
+
+@pytest.mark.parametrize("format", ["arrow", "parquet"])
+def test_round_trip(format):
+    table = spectra_to_table(
+        [{"id": 7, "wavelengths": [1.0, 2.0], "fluxes": [3.0, 4.0], "errors": None}],
+        metadata={"obj_id": "ZTF21aaaaaaa"},
+    )
+    buf = table_bytes(table, format)
+    assert isinstance(buf, io.BytesIO) and buf.tell() == 0
+    read = _read(buf, format)
+    assert read.equals(table)
+    assert read.schema.metadata[b"obj_id"] == b"ZTF21aaaaaaa"
+
+
+def test_empty_and_invalid():
+    assert records_to_table([]).num_rows == 0
+    assert spectra_to_table([]).num_rows == 0
+    with pytest.raises(ValueError, match="Invalid table format"):
+        table_bytes(records_to_table([]), "feather")
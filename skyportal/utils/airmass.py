@@ -0,0 +1,302 @@
+"""Vectorized altitudes and airmasses of many targets over a grid of times.
+
+Rather than transforming each target to the horizontal frame at each time, as
+astroplan does, the targets are transformed once to their apparent place (true
+equator and equinox) at the middle of the time grid, and their altitudes follow
+from the local apparent sidereal time with numpy, for all targets and times at
+once. The sidereal times (and the positions of the Sun) of a time grid, e.g. a
+night, are cached, since the same grid is used for many targets.
+
+Atmospheric refraction is ignored, as in astroplan by default, and so is the
+precession of the targets over the grid (about 0.1 arcsec per day away from
+the middle of the grid).
+"""
+
+import hashlib
+
+import numpy as np
+from astropy import units as u
+from astropy.coordinates import TETE, SkyCoord, get_sun
+from astropy.time import Time
+
+from .cache import MemoryCache
+
+# altitude of the Sun at the end of each twilight (degrees)
+TWILIGHT_SUN_ALTITUDES = {"civil": -6, "nautical": -12, "astronomical": -18}
+# resolution of the time grids of the nights
+NIGHT_RESOLUTION = 5 * u.minute
+
+# (longitude, time grid) -> local apparent sidereal times (radians)
+sidereal_time_cache = MemoryCache(max_items=256)
+# time grid -> apparent right ascensions and declinations of the Sun (radians)
+sun_position_cache = MemoryCache(max_items=64)
+
+
+def _time_grid(times):
+    """The times as an `astropy.time.Time`, of at least one dimension."""
+    times = times if isinstance(times, Time) else Time(times)
+    return times.reshape(1) if times.isscalar else times
+
+
+def _grid_key(times):
+    md5 = hashlib.md5(f"{times.scale}{times.shape}".encode())
+    md5.update(np.ascontiguousarray(times.jd1).tobytes())
+    md5.update(np.ascontiguousarray(times.jd2).tobytes())
+    return md5.hexdigest()
+
+
+def local_sidereal_time(times, longitude):
+    """
+    Local apparent sidereal times at a site, cached by site and time grid.
+
+    Parameters
+    ----------
+    times : `astropy.time.Time`
+        The times.
+    longitude : float
+        East longitude of the site (degrees).
+
+    Returns
+    -------
+    numpy.ndarray
+        The sidereal times (radians), read-only, with the shape of `times`.
+    """
+    times = _time_grid(times)
+    key = (float(longitude), _grid_key(times))
+    sidereal_time = sidereal_time_cache.get(key)
+    if sidereal_time is None:
+        sidereal_time = times.sidereal_time("apparent", longitude * u.deg).rad
+        sidereal_time.flags.writeable = False
+        sidereal_time_cache[key] = sidereal_time
+    return sidereal_time
+
+
+def apparent_coordinates(ra, dec, times):
+    """
+    Apparent right ascensions and declinations of targets, in a single
+    transform at the middle of a time grid.
+
+    Parameters
+    ----------
+    ra, dec : array-like
+        ICRS coordinates of the targets (degrees).
+    times : `astropy.time.Time`
+        The time grid.
+
+    Returns
+    -------
+    ra, dec : numpy.ndarray
+        Apparent coordinates (radians), with the shape of the inputs.
+    """
+    times = _time_grid(times).ravel()
+    coords = SkyCoord(
+        ra=np.asarray(ra, dtype=float) * u.deg,
+        dec=np.asarray(dec, dtype=float) * u.deg,
+    ).transform_to(TETE(obstime=times[len(times) // 2]))
+    return coords.ra.rad, coords.dec.rad
+
+
+def altitude(ra, dec, sidereal_time, latitude):
+    """
+    Altitudes from apparent coordinates and local sidereal times. The inputs
+    are broadcast against each other.
+
+    Parameters
+    ----------
+    ra, dec : array-like
+        Apparent coordinates (radians).
+    sidereal_time : array-like
+        Local apparent sidereal times (radians).
+    latitude : float
+        Latitude of the site (degrees).
+
+    Returns
+    -------
+    numpy.ndarray
+        The altitudes (degrees).
+    """
+    latitude = np.deg2rad(latitude)
+    sin_altitude = np.sin(dec) * np.sin(latitude) + np.cos(dec) * np.cos(
+        latitude
+    ) * np.cos(np.subtract(sidereal_time, ra))
+    return np.rad2deg(np.arcsin(np.clip(sin_altitude, -1, 1)))
+
+
+def altitude_grid(ra, dec, times, longitude, latitude):
+    """
+    Altitudes of targets at a site over a grid of times.
+
+    Parameters
+    ----------
+    ra, dec : array-like
+        ICRS coordinates of the N targets (degrees).
+    times : `astropy.time.Time`
+        The M times.
+    longitude, latitude : float
+        Coordinates of the site (degrees).
+
+    Returns
+    -------
+    numpy.ndarray
+        The altitudes (degrees), of shape (N, M).
+    """
+    times = _time_grid(times).ravel()
+    ra, dec = apparent_coordinates(np.ravel(ra), np.ravel(dec), times)
+    sidereal_time = local_sidereal_time(times, longitude)
+    return altitude(ra[:, np.newaxis], dec[:, np.newaxis], sidereal_time, latitude)
+
+
+def pickering_airmass(altitude, below_horizon=np.inf):
+    """
+    Airmass from altitude, using the Pickering (2002) interpolation of the
+    Rayleigh (molecular atmosphere) airmass.
+
+    The Pickering interpolation tends toward 38.7494 as the altitude
+    approaches zero.
+
+    Parameters
+    ----------
+    altitude : array-like
+        The altitudes (degrees).
+    below_horizon : scalar, Numeric
+        Airmass value to assign when an object is below the horizon.
+        An object is "below the horizon" when its altitude is less than
+        zero degrees.
+
+    Returns
+    -------
+    numpy.ndarray
+        The airmasses.
+    """
+    altitude = np.asarray(altitude, dtype=float)
+    above = altitude > 0
+    sinarg = np.zeros_like(altitude)
+    airmass = np.full_like(altitude, below_horizon)
+    sinarg[above] = altitude[above] + 244 / (165 + 47 * altitude[above] ** 1.1)
+    airmass[above] = 1.0 / np.sin(np.deg2rad(sinarg[above]))
+    return airmass
+
+
+def airmass_grid(ra, dec, times, longitude, latitude, below_horizon=np.inf):
+    """
+    Airmasses of targets at a site over a grid of times.
+
+    Parameters
+    ----------
+    ra, dec : array-like
+        ICRS coordinates of the N targets (degrees).
+    times : `astropy.time.Time`
+        The M times.
+    longitude, latitude : float
+        Coordinates of the site (degrees).
+    below_horizon : scalar, Numeric
+        Airmass value to assign when a target is below the horizon.
+
+    Returns
+    -------
+    numpy.ndarray
+        The airmasses, of shape (N, M).
+    """
+    return pickering_airmass(
+        altitude_grid(ra, dec, times, longitude, latitude), below_horizon
+    )
+
+
+def sun_altitude(times, longitude, latitude):
+    """
+    Altitudes of the Sun at a site. The positions of the Sun
+    are cached by time grid.
+
+    Parameters
+    ----------
+    times : `astropy.time.Time`
+        The times.
+    longitude, latitude : float
+        Coordinates of the site (degrees).
+
+    Returns
+    -------
+    numpy.ndarray
+        The altitudes (degrees), with the shape of `times`.
+    """
+    times = _time_grid(times)
+    key = _grid_key(times)
+    position = sun_position_cache.get(key)
+    if position is None:
+        sun = get_sun(times).transform_to(TETE(obstime=times))
+        position = (sun.ra.rad, sun.dec.rad)
+        sun_position_cache[key] = position
+    return altitude(*position, local_sidereal_time(times, longitude), latitude)
+
+
+def night_times(time, longitude, latitude, resolution=NIGHT_RESOLUTION):
+    """
+    Grid of times over the 24 hours centered on the solar midnight nearest to
+    a time. The grid is aligned on `resolution`, so that all the times of a
+    night give the same grid, and share its cached sidereal times.
+
+    Parameters
+    ----------
+    time : `astropy.time.Time`
+        A time in the night (or day) of interest.
+    longitude, latitude : float
+        Coordinates of the site (degrees).
+    resolution : `astropy.units.Quantity`
+        Interval between the times of the grid.
+
+    Returns
+    -------
+    `astropy.time.Time`
+        The times of the grid, in UTC.
+    """
+    step = resolution.to_value(u.day)
+    half_day = int(round(0.5 / step))
+    # times are counted in steps since MJD 0, so equal grids are identical
+    offsets = np.arange(-half_day, half_day + 1)
+    start = int(np.floor(Time(time).utc.mjd / step))
+    search = Time((start + offsets) * step, format="mjd", scale="utc")
+    midnight = start + offsets[np.argmin(sun_altitude(search, longitude, latitude))]
+    return Time((midnight + offsets) * step, format="mjd", scale="utc")
+
+
+def weighted_percentiles(values, weights, percentiles, max_elements=1_000_000):
+    """
+    Weighted percentiles of each column of a 2D array.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        The values, of shape (N, M).
+    weights : numpy.ndarray
+        The weights of the N rows.
+    percentiles : array-like
+        The P percentiles to compute, between 0 and 100.
+    max_elements : int
+        Maximum number of values sorted at once: the columns are processed
+        in chunks, to bound the memory used.
+
+    Returns
+    -------
+    numpy.ndarray
+        The percentiles of the columns, of shape (P, M).
+    """
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    quantiles = np.asarray(percentiles, dtype=float)[:, np.newaxis, np.newaxis] / 100
+    num_rows, num_columns = values.shape
+    chunk_size = max(1, max_elements // max(num_rows, 1))
+
+    result = np.empty((len(quantiles), num_columns))
+    for start in range(0, num_columns, chunk_size):
+        chunk = values[:, start : start + chunk_size]
+        order = np.argsort(chunk, axis=0)
+        cumulative = np.cumsum(weights[order], axis=0)
+        cumulative /= cumulative[-1]
+        # index of the first value with a cumulative weight above each quantile
+        indices = np.minimum((cumulative < quantiles).sum(axis=1), num_rows - 1)
+        result[:, start : start + chunk_size] = np.take_along_axis(
+            np.take_along_axis(chunk, order, axis=0)[np.newaxis],
+            indices[:, np.newaxis],
+            axis=1,
+        )[:, 0]
+    return result
@@ -0,0 +1,246 @@
+"""Process-wide lookup table of sncosmo bandpass constants.
+
+Serializing photometry needs, per point, the zero-point flux of the filter in
+the database and output magnitude systems; the config endpoint, the plots and
+the extinction code need effective wavelengths and colors. Each of those is a
+registry lookup in sncosmo, and zero-point fluxes integrate the magsys
+spectrum over the bandpass. They only change when a bandpass is registered,
+so :data:`BANDPASS_TABLE` computes each value once per process, on first use,
+and :func:`register_bandpass` drops the table when a custom bandpass is added.
+"""
+
+import threading
+
+import numpy as np
+import sncosmo
+from matplotlib import colormaps
+from matplotlib.colors import LinearSegmentedColormap, rgb2hex
+
+from baselayer.log import make_log
+
+log = make_log("bandpasses")
+
+cmap_ir = colormaps["autumn"]
+cmap_deep_ir = LinearSegmentedColormap.from_list(
+    "deep_ir", [(0.8, 0.2, 0), (0.6, 0.1, 0)]
+)
+
+
+def hex2rgb(hex):
+    """Convert hex color string to rgb tuple.
+
+    Parameters
+    ----------
+    hex : str
+        Hex color string.
+
+    Returns
+    -------
+    tuple
+        RGB tuple.
+    """
+
+    return tuple(int(hex[i : i + 2], 16) for i in (0, 2, 4))
+
+
+def _wavelength_to_hex(bandpass, wavelength):
+    if 0 < wavelength <= 1500:  # EUV
+        return "#4B0082"
+    elif 1500 < wavelength <= 2100:  # uvw2
+        return "#6A5ACD"
+    elif 2100 < wavelength <= 2400:  # uvm2
+        return "#9400D3"
+    elif 2400 < wavelength <= 3000:  # uvw1
+        return "#FF00FF"
+    elif 3000 < wavelength <= 4000:  # U, sdss u
+        return "#0000FF"
+    elif 4000 < wavelength <= 4800:  # B, sdss g
+        return "#02d193"
+    elif 4800 < wavelength <= 5000:  # ztfg
+        return "#008000"
+    elif 5000 < wavelength <= 6000:  # V
+        return "#9ACD32"
+    elif 6000 < wavelength <= 6400:  # sdssr
+        return "#ff6f00"
+    elif 6400 < wavelength <= 6600:  # ztfr
+        return "#FF0000"
+    elif 6400 < wavelength <= 7000:  # bessellr, atlaso
+        return "#c80000"
+    elif 7000 < wavelength <= 8000:  # sdss i
+        return "#FFA500"
+    elif 8000 < wavelength <= 9000:  # sdss z
+        return "#A52A2A"
+    elif 9000 < wavelength <= 10000:  # PS1 y
+        return "#B8860B"
+    elif 10000 < wavelength <= 13000:  # 2MASS J
+        return "#000000"
+    elif 13000 < wavelength <= 17000:  # 2MASS H
+        return "#9370D8"
+    elif 17000 < wavelength <= 1e5:  # mm to Radio
+        return rgb2hex(cmap_ir((5 - np.log10(wavelength)) / 0.77)[:3])
+    elif 1e5 < wavelength <= 3e5:  # JWST miri and miri-tophat
+        return rgb2hex(cmap_deep_ir((5.48 - np.log10(wavelength)) / 0.48)[:3])
+    log(
+        f"{bandpass} with effective wavelength {wavelength} is out of range for color maps, using black"
+    )
+    return "#000000"
+
+
+class BandpassTable:
+    """Memoized bandpass and magnitude-system constants.
+
+    Values are computed on first lookup and kept until :meth:`invalidate`.
+    Failed lookups are not cached, so they raise again on the next call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget every cached value (e.g. after registering a bandpass)."""
+        with self._lock:
+            self._bandpasses = {}
+            self._magsystems = {}
+            self._zpbandflux = {}
+            self._relzp = {}
+            self._wavelengths = {}
+            self._colors = {}
+
+    def bandpass(self, name, radius=None):
+        """The ``sncosmo.Bandpass`` registered as ``name``."""
+        key = (name, radius)
+        try:
+            return self._bandpasses[key]
+        except KeyError:
+            pass
+        args = {} if radius is None else {"radius": radius}
+        band = sncosmo.get_bandpass(name, **args)
+        self._bandpasses[key] = band
+        return band
+
+    def magsystem(self, name):
+        """The ``sncosmo.MagSystem`` registered as ``name``."""
+        try:
+            return self._magsystems[name]
+        except KeyError:
+            pass
+        magsys = sncosmo.get_magsystem(name)
+        self._magsystems[name] = magsys
+        return magsys
+
+    def zpbandflux(self, magsys, bandpass):
+        """Flux of the zero-point of ``magsys`` through ``bandpass``."""
+        key = (magsys, bandpass)
+        try:
+            return self._zpbandflux[key]
+        except KeyError:
+            pass
+        flux = self.magsystem(magsys).zpbandflux(bandpass)
+        self._zpbandflux[key] = flux
+        return flux
+
+    def relzp(self, magsys, bandpass):
+        """``2.5 * log10(zpbandflux)``: the difference of two of these is the
+        magnitude offset between two systems in ``bandpass``."""
+        key = (magsys, bandpass)
+        try:
+            return self._relzp[key]
+        except KeyError:
+            pass
+        relzp = 2.5 * np.log10(self.zpbandflux(magsys, bandpass))
+        self._relzp[key] = relzp
+        return relzp
+
+    def effective_wavelength(self, bandpass, radius=None):
+        """Effective wavelength of ``bandpass``, in Angstrom."""
+        key = (bandpass, radius)
+        try:
+            return self._wavelengths[key]
+        except KeyError:
+            pass
+        try:
+            band = self.bandpass(bandpass, radius=radius)
+        except ValueError as e:
+            raise ValueError(
+                f"Could not get bandpass for {bandpass} due to sncosmo error: {e}"
+            )
+        wavelength = float(band.wave_eff)
+        self._wavelengths[key] = wavelength
+        return wavelength
+
+    def color(self, bandpass, format="hex"):
+        """Plotting color of ``bandpass``, as a hex string or an rgb tuple."""
+        if format not in ["hex", "rgb"]:
+            self.effective_wavelength(bandpass)
+            raise ValueError(f"Invalid color format: {format}")
+        key = (bandpass, format)
+        try:
+            return self._colors[key]
+        except KeyError:
+            pass
+        color = _wavelength_to_hex(bandpass, self.effective_wavelength(bandpass))
+        if format == "rgb":
+            color = hex2rgb(color[1:])
+        self._colors[key] = color
+        return color
+
+    def table(self, bandpasses, magsystems):
+        """Zero-point fluxes of every bandpass in every magsys, as
+        ``{bandpass: {magsys: zpbandflux}}``; pairs that fail are left out."""
+        out = {}
+        for bandpass in bandpasses:
+            row = {}
+            for magsys in magsystems:
+                try:
+                    row[magsys] = self.zpbandflux(magsys, bandpass)
+                except Exception as e:
+                    log(f"No zero point for {bandpass} in {magsys}: {e}")
+            out[bandpass] = row
+        return out
+
+
+BANDPASS_TABLE = BandpassTable()
+
+
+def register_bandpass(band, **kwargs):
+    """Register ``band`` with sncosmo and drop the cached table, so lookups
+    see the new bandpass (or the new definition of a replaced one)."""
+    sncosmo.registry.register(band, **kwargs)
+    BANDPASS_TABLE.invalidate()
+
+
+def get_effective_wavelength(bandpass_name, radius=None):
+    """Get the effective wavelength of an sncosmo bandpass.
+
+    Parameters
+    ----------
+    bandpass_name : str
+        Name of the bandpass.
+    radius : float, optional
+        Radius to get the bandpass for. If None, the default bandpass is used.
+
+    Returns
+    -------
+    float
+        Effective wavelength of the bandpass.
+    """
+    return BANDPASS_TABLE.effective_wavelength(bandpass_name, radius=radius)
+
+
+def get_color(bandpass, format="hex"):
+    """Get a color for a bandpass, in hex or rgb format.
+
+    Parameters
+    ----------
+    bandpass : str
+        Name of the sncosmo bandpass.
+    format : str, optional
+        Format of the output color. Must be one of "hex" or "rgb".
+
+    Returns
+    -------
+    str or tuple
+        Color of the bandpass in the requested format
+    """
+    return BANDPASS_TABLE.color(bandpass, format)
@@ -1,7 +1,10 @@
 import hashlib
 import io
 import os
+import tempfile
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 
 import numpy as np
@@ -38,7 +41,27 @@ def dict_to_bytes(dictionary):
 
 
 class Cache:
-    def __init__(self, cache_dir, max_items=None, max_age=None):
+    """A bounded, file-backed cache shared by all processes using ``cache_dir``.
+
+    Each entry is one file, named after the hash of its key; ``cache[key]``
+    returns the file's path (or None) and refreshes its modification time, which
+    orders entries for eviction and measures their age.
+
+    Accesses never scan the directory: a per-process index of entry access
+    times and sizes decides evictions, and a full rescan of the directory (which
+    also picks up entries written by other processes) only runs every
+    ``rescan_interval`` seconds, in a background thread. Writes go to a
+    temporary file renamed into place, so readers never see a partial entry.
+    """
+
+    def __init__(
+        self,
+        cache_dir,
+        max_items=None,
+        max_age=None,
+        max_bytes=None,
+        rescan_interval=60,
+    ):
         """
         Parameters
         ----------
@@ -47,11 +70,17 @@ class Cache:
         max_items : int, optional
             Maximum number of items ever held in the cache.  If
             unspecified, then the cache size is only controlled by
-            `max_age`. If zero, caching will be disabled.
+            `max_age` and `max_bytes`. If zero, caching will be disabled.
         max_age : int, optional
             Maximum age (in seconds) of an item in the cache before it
             gets removed.  If unspecified, the cache size is only
-            controlled by `max_items`.
+            controlled by `max_items` and `max_bytes`.
+        max_bytes : int, optional
+            Maximum total size (in bytes) of the items in the cache. If
+            unspecified, the size on disk is not limited.
+        rescan_interval : int, optional
+            Seconds between two background rescans of the cache directory,
+            which expire old items and reconcile with other processes.
         """
         cache_dir = Path(cache_dir)
         if not cache_dir.is_dir():
@@ -60,12 +89,77 @@ class Cache:
         self._cache_dir = Path(cache_dir)
         self._max_items = max_items
         self._max_age = max_age
+        self._max_bytes = max_bytes
+        self._rescan_interval = rescan_interval
+
+        # path -> (last access time, size), least recently used first
+        self._index = None
+        self._total_bytes = 0
+        self._last_scan = 0.0
+        self._scanning = False
+        self._lock = threading.RLock()
 
     def _hash_filename(self, filename):
         m = hashlib.md5()
         m.update(filename.encode("utf-8"))
         return self._cache_dir / f"{m.hexdigest()}"
 
+    def _entries(self):
+        """(mtime, size, path) of every entry on disk (skips in-flight writes)."""
+        entries = []
+        with os.scandir(self._cache_dir) as it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:  # removed by another process
+                    continue
+                entries.append((st.st_mtime, st.st_size, Path(entry.path)))
+        return entries
+
+    def _ensure_index(self):
+        if self._index is None:
+            self.clean_cache()
+        elif time.time() - self._last_scan > self._rescan_interval:
+            self._rescan_in_background()
+
+    def _rescan_in_background(self):
+        with self._lock:
+            if self._scanning:
+                return
+            self._scanning = True
+            # claim the slot now so concurrent accesses don't start another scan
+            self._last_scan = time.time()
+        threading.Thread(target=self.clean_cache, daemon=True).start()
+
+    def _record(self, path, atime, size):
+        with self._lock:
+            old = self._index.pop(path, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._index[path] = (atime, size)
+            self._total_bytes += size
+
+    def _forget(self, path):
+        with self._lock:
+            old = self._index.pop(path, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+
+    def _evict(self):
+        """Drop least recently used entries until within max_items/max_bytes."""
+        evicted = []
+        with self._lock:
+            while self._index and (
+                (self._max_items is not None and len(self._index) > self._max_items)
+                or (self._max_bytes is not None and self._total_bytes > self._max_bytes)
+            ):
+                path, (_, size) = self._index.popitem(last=False)
+                self._total_bytes -= size
+                evicted.append(path)
+        self._remove(evicted)
+
     def __getitem__(self, name):
         """Return item from the cache.
 
@@ -73,7 +167,6 @@ class Cache:
         ----------
         name : str
         """
-        self.clean_cache()
         if name is None:
             return None
 
@@ -81,12 +174,27 @@ class Cache:
         if self._max_items == 0:
             return None
 
+        self._ensure_index()
         cache_file = self._hash_filename(name)
-        if not cache_file.exists():
+        try:
+            st = cache_file.stat()
+        except FileNotFoundError:
+            self._forget(cache_file)
+            return None
+
+        now = time.time()
+        if self._max_age is not None and now - st.st_mtime > self._max_age:
+            self._forget(cache_file)
+            self._remove([cache_file])
             return None
 
         log(f"hit [{name}]")
-        cache_file.touch()  # Make newest in cache
+        try:
+            os.utime(cache_file, (now, now))  # Make newest in cache
+        except FileNotFoundError:
+            self._forget(cache_file)
+            return None
+        self._record(cache_file, now, st.st_size)
 
         return cache_file
 
@@ -104,13 +212,25 @@ class Cache:
         if self._max_items == 0:
             return
 
+        self._ensure_index()
         fn = self._hash_filename(name)
-        with open(fn, "wb") as f:
-            f.write(data)
+        # Write under a hidden temporary name, then atomically move into place.
+        fd, tmp = tempfile.mkstemp(dir=self._cache_dir, prefix=f".{fn.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, fn)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
 
         log(f"save [{name}] to [{os.path.basename(fn)}]")
 
-        self.clean_cache()
+        self._record(fn, time.time(), len(data))
+        self._evict()
 
     def __delitem__(self, name):
         """Remove item from the cache.
@@ -124,6 +244,8 @@ class Cache:
             return
 
         fn = self._hash_filename(name)
+        if self._index is not None:
+            self._forget(fn)
 
         try:
             os.remove(fn)
@@ -131,7 +253,6 @@ class Cache:
             return
 
         log(f"cleanup [{os.path.basename(fn)}]")
-        self.clean_cache()
 
     def _remove(self, filenames):
         """Remove given items from the cache.
@@ -151,25 +272,84 @@ class Cache:
         # fmt: on
 
     def clean_cache(self):
-        # Remove stale cache files
-        cached_files = [
-            (f.stat().st_mtime, f.absolute()) for f in self._cache_dir.glob("*")
-        ]
-        cached_files = sorted(cached_files, key=lambda x: x[0], reverse=True)
+        """Rescan the cache directory: remove stale items, rebuild the index
+        from disk (picking up other processes' writes) and enforce the limits."""
+        try:
+            entries = sorted(self._entries(), key=lambda x: x[0])
+            now = time.time()
+
+            if self._max_age is not None:
+                self._remove(
+                    [
+                        path
+                        for (mtime, _, path) in entries
+                        if now - mtime > self._max_age
+                    ]
+                )
+                entries = [e for e in entries if now - e[0] <= self._max_age]
+
+            index = OrderedDict(
+                (path, (mtime, size)) for (mtime, size, path) in entries
+            )
+            with self._lock:
+                self._index = index
+                self._total_bytes = sum(size for (_, size, _) in entries)
+                self._last_scan = now
+            self._evict()
+        finally:
+            self._scanning = False
 
-        now = time.time()
+    def __len__(self):
+        with os.scandir(self._cache_dir) as it:
+            return sum(1 for entry in it if not entry.name.startswith("."))
+
+
+class MemoryCache:
+    """A bounded, thread-safe, in-process cache of Python objects.
+
+    Entries are evicted least recently used first. Values are stored as
+    given, so callers that hand them out should not let them be modified.
+    """
+
+    def __init__(self, max_items=32):
+        """
+        Parameters
+        ----------
+        max_items : int
+            Maximum number of items held in the cache. If zero, caching
+            will be disabled.
+        """
+        self._max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        if self._max_items <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_items:
+                self._items.popitem(last=False)
 
-        if self._max_age is not None:
-            removed_by_time = [
-                filename
-                for (mtime, filename) in cached_files
-                if (now - mtime) > self._max_age
-            ]
-            self._remove(removed_by_time)
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._items.pop(key, default)
 
-        if self._max_items is not None:
-            oldest = cached_files[self._max_items :]
-            self._remove([filename for (mtime, filename) in oldest])
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
 
     def __len__(self):
-        return len(list(self._cache_dir.glob("*")))
+        with self._lock:
+            return len(self._items)
@@ -7,6 +7,8 @@ from astropy.coordinates import SkyCoord
 from astropy.time import Time
 from scipy.optimize import fsolve
 
+from .airmass import airmass_grid
+
 # Rotation matrix for the conversion : x_galactic = R * x_equatorial (J2000)
 # http://adsabs.harvard.edu/abs/1989A&A...218..325M
 RGE = np.array(
@@ -184,30 +186,20 @@ def get_airmass(fields: list, time: np.ndarray, below_horizon=np.inf, **kwargs):
     """
 
     if "observer" in kwargs:
-        observer = kwargs["observer"]
+        location = kwargs["observer"].location
+        longitude, latitude = location.lon.deg, location.lat.deg
     elif "telescope" in kwargs:
-        observer = get_observer(kwargs["telescope"])
-
-    # the output shape should be targets x times
-    output_shape = (len(fields), len(time))
-    time = np.atleast_1d(time)
-    target = get_target(fields)
-    altitude = get_altitude(time, target, observer).to("degree").value
-    above = altitude > 0
-
-    # use Pickering (2002) interpolation to calculate the airmass
-    # The Pickering interpolation tends toward 38.7494 as the altitude
-    # approaches zero.
-    sinarg = np.zeros_like(altitude)
-    airmass = np.ones_like(altitude) * np.inf
-    sinarg[above] = altitude[above] + 244 / (165 + 47 * altitude[above] ** 1.1)
-    airmass[above] = 1.0 / np.sin(np.deg2rad(sinarg[above]))
-
-    # set objects below the horizon to an airmass of infinity
-    airmass[~above] = below_horizon
-    airmass = airmass.reshape(output_shape)
-
-    return airmass
+        longitude, latitude = kwargs["telescope"]["lon"], kwargs["telescope"]["lat"]
+
+    # the output shape is targets x times
+    return airmass_grid(
+        [field["ra"] for field in fields],
+        [field["dec"] for field in fields],
+        time,
+        longitude,
+        latitude,
+        below_horizon=below_horizon,
+    )
 
 
 def fix_sun_time_calculation_error(
@@ -0,0 +1,275 @@
+"""Columnar files of photometric series data, that can be memory-mapped.
+
+A file starts with a magic string and the length of a JSON header, which holds
+the number of rows, the name, dtype and offset of each column, and the series
+metadata. Each column follows as a contiguous array, aligned on
+``ALIGNMENT`` bytes, so it can be memory-mapped directly: reading a column,
+or a range of rows of it, only reads the pages that hold them.
+
+Columns that are not numeric (or boolean, or datetimes) must hold strings,
+which are stored as fixed-width strings; if some values are missing, a
+boolean mask of the missing values follows the column. The index of the
+dataframe is not stored, and the rows are sorted by MJD, so a range of MJD is
+found with a binary search.
+
+Arrow IPC (Feather) files could be memory-mapped as well, but the series are
+identified by the MD5 of their file, and the schema metadata that pyarrow
+writes from a dataframe records the pandas version: the same data would get
+a new hash after an upgrade of pandas or pyarrow. This layout only depends on
+the data and the series metadata.
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+COLUMNAR_EXTENSION = ".npc"
+MAGIC = b"SKYPSER1"
+ALIGNMENT = 64
+# size of the magic string and of the header length
+PREAMBLE_SIZE = len(MAGIC) + 8
+
+
+def _padding(size):
+    return b"\0" * (-size % ALIGNMENT)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value).__name__} to JSON")
+
+
+def _column_arrays(name, column):
+    """The array of a column, and the mask of its missing values
+    (None if there are none, or if the column is numeric)."""
+    array = np.asarray(column)
+    mask = None
+    if array.dtype.kind not in "biufcmM":
+        missing = np.asarray(pd.isna(column), dtype=bool)
+        if not all(isinstance(value, str) for value in array[~missing]):
+            raise ValueError(
+                f'Column "{name}" must hold numbers, booleans, datetimes or strings'
+            )
+        array = np.where(missing, "", array).astype(str)
+        if missing.any():
+            mask = np.ascontiguousarray(missing)
+    # store in a fixed byte order, so files are the same on all machines
+    if array.dtype.byteorder == ">":
+        array = array.astype(array.dtype.newbyteorder("<"))
+    return np.ascontiguousarray(array), mask
+
+
+def _column_values(array):
+    """The values of a (slice of a) column in memory, with None where the
+    values of a string column are missing."""
+    if isinstance(array, np.ma.MaskedArray):
+        values = array.data.astype(object)
+        values[array.mask] = None
+        return values
+    return np.array(array)
+
+
+def mjd_column(columns):
+    """Name of the MJD column ("mjd" or "mjds") among `columns`, or None."""
+    return next((c for c in ["mjd", "mjds"] if c in columns), None)
+
+
+def sort_by_mjd(df):
+    """
+    The rows of a dataframe in order of MJD (keeping the order of equal
+    MJDs), with a new index, as they are stored in a columnar file.
+
+    Returns the dataframe itself if it has no MJD column, or if its rows
+    are already sorted.
+    """
+    name = mjd_column(df.columns)
+    if name is None or df[name].is_monotonic_increasing:
+        return df
+    return df.sort_values(name, kind="stable", ignore_index=True)
+
+
+def dataframe_chunks(df, metadata=None):
+    """
+    Generate the content of the columnar file of a dataframe, chunk by chunk,
+    without copying the data of the columns.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The data to store. Its rows are stored sorted by MJD (see
+        `sort_by_mjd`).
+    metadata : dict, optional
+        Metadata to store in the header. Must be JSON-serializable.
+
+    Returns
+    -------
+    generator of bytes-like objects
+        The chunks of the file.
+    """
+    df = sort_by_mjd(df)
+    arrays = [(str(name), *_column_arrays(name, df[name])) for name in df.columns]
+
+    columns, offset = [], 0
+    for name, array, mask in arrays:
+        column = {"name": name, "dtype": array.dtype.str, "offset": offset}
+        offset += array.nbytes + len(_padding(array.nbytes))
+        if mask is not None:
+            column["mask_offset"] = offset
+            offset += mask.nbytes + len(_padding(mask.nbytes))
+        columns.append(column)
+
+    header = json.dumps(
+        {"rows": len(df.index), "columns": columns, "metadata": metadata or {}},
+        sort_keys=True,
+        default=_json_default,
+    ).encode()
+    header += b" " * (-(PREAMBLE_SIZE + len(header)) % ALIGNMENT)
+
+    yield MAGIC + np.uint64(len(header)).astype("<u8").tobytes() + header
+    for _, array, mask in arrays:
+        for data in [array] if mask is None else [array, mask]:
+            yield memoryview(data.view(np.uint8).reshape(-1))
+            yield _padding(data.nbytes)
+
+
+def hash_dataframe(df, metadata=None):
+    """MD5 hex digest of the columnar file of a dataframe, computed
+    without building the file in memory."""
+    md5 = hashlib.md5()
+    for chunk in dataframe_chunks(df, metadata):
+        md5.update(chunk)
+    return md5.hexdigest()
+
+
+def write_dataframe(filename, df, metadata=None):
+    """
+    Write a dataframe to a columnar file.
+
+    Parameters
+    ----------
+    filename : str
+        The file to write.
+    df : pandas.DataFrame
+        The data to store.
+    metadata : dict, optional
+        Metadata to store in the header.
+
+    Returns
+    -------
+    str
+        The MD5 hex digest of the file.
+    """
+    md5 = hashlib.md5()
+    with open(filename, "wb") as f:
+        for chunk in dataframe_chunks(df, metadata):
+            md5.update(chunk)
+            f.write(chunk)
+    return md5.hexdigest()
+
+
+def read_header(filename):
+    """
+    Read the header of a columnar file.
+
+    Returns
+    -------
+    header : dict
+        The number of rows, the columns and the metadata of the file.
+    data_offset : int
+        The offset of the first column in the file.
+    """
+    with open(filename, "rb") as f:
+        preamble = f.read(PREAMBLE_SIZE)
+        if len(preamble) != PREAMBLE_SIZE or not preamble.startswith(MAGIC):
+            raise ValueError(f"{filename} is not a columnar photometric series file")
+        header_size = int(np.frombuffer(preamble[len(MAGIC) :], dtype="<u8")[0])
+        header = json.loads(f.read(header_size))
+    return header, PREAMBLE_SIZE + header_size
+
+
+def load_columns(filename):
+    """
+    Memory-map the columns of a columnar file.
+
+    Returns
+    -------
+    columns : dict
+        Read-only arrays, by column name, backed by the file. String
+        columns with missing values are masked arrays, masking them.
+    metadata : dict
+        The metadata stored in the file.
+    """
+    header, data_offset = read_header(filename)
+    columns = {}
+    for column in header["columns"]:
+        dtype = np.dtype(column["dtype"])
+        if header["rows"] == 0 or dtype.itemsize == 0:
+            columns[column["name"]] = np.empty(header["rows"], dtype=dtype)
+            continue
+        array = np.memmap(
+            filename,
+            dtype=dtype,
+            mode="r",
+            offset=data_offset + column["offset"],
+            shape=(header["rows"],),
+        )
+        if "mask_offset" in column:
+            mask = np.memmap(
+                filename,
+                dtype=bool,
+                mode="r",
+                offset=data_offset + column["mask_offset"],
+                shape=(header["rows"],),
+            )
+            array = np.ma.MaskedArray(array, mask=mask)
+        columns[column["name"]] = array
+    return columns, header["metadata"]
+
+
+def mjd_slice(mjds, mjd_min=None, mjd_max=None):
+    """Slice of the rows with mjd_min <= mjd <= mjd_max, given sorted MJDs.
+    Only the pages of `mjds` visited by the binary search are read."""
+    start = 0 if mjd_min is None else int(np.searchsorted(mjds, mjd_min, "left"))
+    stop = (
+        len(mjds) if mjd_max is None else int(np.searchsorted(mjds, mjd_max, "right"))
+    )
+    return slice(start, stop)
+
+
+def load_dataframe(filename, mjd_min=None, mjd_max=None, columns=None):
+    """
+    Load the data of a columnar file into a dataframe.
+
+    Parameters
+    ----------
+    filename : str
+        The file to read.
+    mjd_min, mjd_max : float, optional
+        Only load the rows in this range of MJD (inclusive). Only the pages
+        holding these rows are read.
+    columns : list of str, optional
+        Only load these columns.
+
+    Returns
+    -------
+    data : pandas.DataFrame
+        The data, in memory.
+    metadata : dict
+        The metadata stored in the file.
+    """
+    arrays, metadata = load_columns(filename)
+    rows = slice(None)
+    if mjd_min is not None or mjd_max is not None:
+        name = mjd_column(arrays)
+        if name is None:
+            raise KeyError(f'Cannot find "mjd" or "mjds" in {filename}')
+        rows = mjd_slice(arrays[name], mjd_min, mjd_max)
+    if columns is not None:
+        arrays = {name: arrays[name] for name in columns}
+    data = pd.DataFrame(
+        {name: _column_values(array[rows]) for name, array in arrays.items()}
+    )
+    return data, metadata
@@ -1,19 +1,50 @@
+import functools
 import os
+import threading
 
 import astropy.units as u
 import dustmaps.sfd
 import numpy as np
-import sncosmo
 from astropy.coordinates import SkyCoord
 from dust_extinction.parameter_averages import G23
 from dustmaps.config import config
 
+from baselayer.app.env import load_env
 from baselayer.log import make_log
 
-config["data_dir"] = "/tmp"
+from .bandpasses import BANDPASS_TABLE
+
+_, cfg = load_env()
+
+config["data_dir"] = cfg.get("misc.dustmap_folder", "/tmp")
 log = make_log("extinction")
 
 
+@functools.lru_cache(maxsize=1024)
+def extinction_coefficient(filter_name, Rv=3.1):
+    """
+    Extinction coefficient A_λ/E(B-V) of a filter, memoized per (filter, Rv).
+
+    Parameters
+    ----------
+    filter_name : str
+        Filter name (e.g., 'ztfg', 'sdssg', 'bessellv', etc.)
+    Rv : float, optional
+        Rv parameter of the extinction model (default: 3.1)
+
+    Returns
+    -------
+    float
+        Extinction coefficient A_λ/E(B-V) in magnitudes
+    """
+    try:
+        wave_eff = BANDPASS_TABLE.effective_wavelength(filter_name)
+        ext = G23(Rv=Rv)
+        return float(-2.5 * np.log10(ext.extinguish(wave_eff * u.AA, Ebv=1.0)))
+    except Exception as e:
+        raise Exception(f"Filter '{filter_name}' not recognized: {e}")
+
+
 def get_extinction_coefficient(filter_name, Rv=3.1, Ebv=1.0):
     """
     Calculate the extinction coefficient for a given filter.
@@ -32,43 +63,144 @@ def get_extinction_coefficient(filter_name, Rv=3.1, Ebv=1.0):
     float
         Extinction coefficient A_λ/E(B-V) in magnitudes
     """
-    try:
-        bandpass = sncosmo.get_bandpass(filter_name)
-        wave_eff = bandpass.wave_eff
-        ext = G23(Rv=Rv)
-        extinction_coeff = -2.5 * np.log10(ext.extinguish(wave_eff * u.AA, Ebv=Ebv))
-        return extinction_coeff
-    except Exception as e:
-        raise Exception(f"Filter '{filter_name}' not recognized: {e}")
+    # the extinction in magnitudes is proportional to E(B-V)
+    return extinction_coefficient(filter_name, Rv) * Ebv
 
 
 class _ExtinctionCalculator:
-    """Internal class to handle SFD dust map queries efficiently."""
+    """Internal class to handle SFD dust map queries efficiently.
+
+    The SFD maps are loaded once, by the first query, and shared by all the
+    queries of the process."""
 
     def __init__(self):
         self._sfd_query = None
+        self._lock = threading.Lock()
 
     def _ensure_sfd_ready(self):
         """Ensure SFD dust map data and query are ready."""
-        if self._sfd_query is None:
-            path = dustmaps.sfd.data_dir()
-            path = os.path.join(path, "sfd")
-            if not os.path.exists(path):
-                log("No SFD data for dustmaps, downloading it")
-                dustmaps.sfd.fetch()
+        if self._sfd_query is not None:
+            return
+        with self._lock:
+            if self._sfd_query is None:
+                path = dustmaps.sfd.data_dir()
+                path = os.path.join(path, "sfd")
+                if not os.path.exists(path):
+                    log("No SFD data for dustmaps, downloading it")
+                    dustmaps.sfd.fetch()
 
-            self._sfd_query = dustmaps.sfd.SFDQuery()
+                self._sfd_query = dustmaps.sfd.SFDQuery()
 
-    def get_ebv(self, ra: float, dec: float) -> float:
-        """Get E(B-V) extinction value."""
+    def get_ebv_at(self, coords: SkyCoord) -> float | np.ndarray:
+        """Get E(B-V) extinction values at the given coordinates."""
         self._ensure_sfd_ready()
-        coords = SkyCoord(ra, dec, unit="deg")
         return self._sfd_query(coords)
 
+    def get_ebv(self, ra, dec) -> float | np.ndarray:
+        """Get E(B-V) extinction values, for scalar or array ra/dec in degrees."""
+        return self.get_ebv_at(SkyCoord(ra, dec, unit="deg"))
+
 
 _calculator = _ExtinctionCalculator()
 
 
+def get_ebv(ra, dec):
+    """
+    E(B-V) from the SFD dust maps.
+
+    Parameters
+    ----------
+    ra : float or array-like
+        Right ascension in degrees
+    dec : float or array-like
+        Declination in degrees
+
+    Returns
+    -------
+    float or numpy.ndarray
+        E(B-V) in magnitudes, for each coordinate
+    """
+    ebv = _calculator.get_ebv(ra, dec)
+    return float(ebv) if np.ndim(ebv) == 0 else np.asarray(ebv, dtype=float)
+
+
+def get_ebv_at(coords):
+    """E(B-V) from the SFD dust maps at the given `SkyCoord`(s)."""
+    ebv = _calculator.get_ebv_at(coords)
+    return float(ebv) if np.ndim(ebv) == 0 else np.asarray(ebv, dtype=float)
+
+
+def extinction(ra, dec, filters, Rv=3.1):
+    """
+    Extinction A_lambda for many coordinates and filters at once.
+
+    The E(B-V) of all the coordinates are looked up in a single query,
+    and the coefficient of each distinct filter is computed once.
+
+    Parameters
+    ----------
+    ra : float or array-like
+        Right ascension in degrees
+    dec : float or array-like
+        Declination in degrees
+    filters : str or array-like of str
+        Filter name(s), broadcast against the coordinates
+    Rv : float, optional
+        Total-to-selective extinction ratio (default: 3.1)
+
+    Returns
+    -------
+    numpy.ndarray
+        Extinction A_lambda in magnitudes,
+        NaN for the filters that are not supported
+    """
+    filters = np.asarray(filters)
+    names, inverse = np.unique(filters, return_inverse=True)
+    coefficients = np.full(len(names), np.nan)
+    for i, name in enumerate(names):
+        try:
+            coefficients[i] = extinction_coefficient(str(name), Rv)
+        except Exception as e:
+            log(f"Could not calculate extinction for {name}: {e}")
+    coefficients = coefficients[inverse].reshape(filters.shape)
+    return coefficients * get_ebv(ra, dec)
+
+
+def extinction_by_filter(ra, dec, filters, Rv=3.1):
+    """
+    Extinction A_lambda in each of the given filters, at one position.
+
+    Parameters
+    ----------
+    ra : float
+        Right ascension in degrees
+    dec : float
+        Declination in degrees
+    filters : iterable of str
+        Filter names
+    Rv : float, optional
+        Total-to-selective extinction ratio (default: 3.1)
+
+    Returns
+    -------
+    dict
+        Extinction in magnitudes by filter name,
+        or None for the filters that are not supported
+    """
+    filters = list(filters)
+    if not filters:
+        return {}
+    try:
+        values = extinction(ra, dec, filters, Rv)
+    except Exception as e:
+        log(f"Could not calculate extinction at ({ra}, {dec}): {e}")
+        return dict.fromkeys(filters)
+    return {
+        name: None if np.isnan(value) else float(value)
+        for name, value in zip(filters, values)
+    }
+
+
 def calculate_extinction(
     ra: float, dec: float, filter_name: str, Rv: float = 3.1
 ) -> float | None:
@@ -96,21 +228,7 @@ def calculate_extinction(
     >>> ext = calculate_extinction(180.0, 45.0, 'ztfg')
     >>> ext = calculate_extinction(12.5, -30.2, 'sdssg')
     """
-    try:
-        # Get extinction coefficient A_λ/E(B-V)
-        coeff = get_extinction_coefficient(filter_name, Rv=Rv, Ebv=1.0)
-
-        # Get E(B-V) from SFD dust maps
-        ebv = _calculator.get_ebv(ra, dec)
-
-        # Calculate A_λ = (A_λ/E(B-V)) * E(B-V)
-        extinction = coeff * ebv
-
-        return extinction
-
-    except Exception as e:
-        log(f"Could not calculate extinction for {filter_name}: {e}")
-        return None
+    return extinction_by_filter(ra, dec, [filter_name], Rv)[filter_name]
 
 
 def deredden_flux(
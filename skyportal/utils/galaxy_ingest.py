@@ -0,0 +1,389 @@
+"""Columnar bulk loading of galaxy catalogs.
+
+Catalogs such as GLADE+ have tens of millions of rows, so galaxies are never
+loaded as ORM objects: each chunk of a catalog is cleaned as a DataFrame, the
+HEALPix index of all of its galaxies is computed in a single call, and the
+chunk is encoded as CSV and written with COPY.
+
+Cleaning and encoding are CPU-bound, so the chunks of large catalogs are
+prepared in a pool of processes while the parent process copies finished
+chunks into the database, each in its own transaction. The indices of the
+chunks that were committed are recorded in a checkpoint file, so an
+interrupted load resumes where it stopped instead of duplicating galaxies.
+
+This module doesn't import the models, so that spawned workers stay light.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import StringIO
+
+import astropy.units as u
+import healpix_alchemy as ha
+import numpy as np
+import pandas as pd
+
+from baselayer.log import make_log
+
+from .naive_datetime import utcnow_naive
+
+log = make_log("galaxy_ingest")
+
+# Catalog columns of the galaxys table.
+GALAXY_COLUMNS = (
+    "name",
+    "alt_name",
+    "ra",
+    "dec",
+    "distmpc",
+    "distmpc_unc",
+    "redshift",
+    "redshift_error",
+    "sfr_fuv",
+    "sfr_w4",
+    "mstar",
+    "magb",
+    "magk",
+    "mag_fuv",
+    "mag_nuv",
+    "mag_w1",
+    "mag_w2",
+    "mag_w3",
+    "mag_w4",
+    "a",
+    "b2a",
+    "pa",
+    "btc",
+)
+STRING_COLUMNS = ("name", "alt_name")
+FLOAT_COLUMNS = tuple(c for c in GALAXY_COLUMNS if c not in STRING_COLUMNS)
+COPY_COLUMNS = GALAXY_COLUMNS + ("healpix", "catalog_id", "created_at", "modified")
+
+# Columns that can't be negative: rows where they are get dropped.
+POSITIVE_DEFINITE_COLUMNS = ("distmpc", "distmpc_unc", "redshift_error")
+
+GLADE_COLUMN_NAMES = (
+    "GLADE_no",
+    "PGC_no",
+    "GWGC_name",
+    "HyperLEDA_name",
+    "2MASS_name",
+    "WISExSCOS_name",
+    "SDSS-DR16Q_name",
+    "Object_type",
+    "RA",
+    "Dec",
+    "B",
+    "B_err",
+    "B_flag",
+    "B_Abs",
+    "J",
+    "J_err",
+    "H",
+    "H_err",
+    "K",
+    "K_err",
+    "W1",
+    "W1_err",
+    "W2",
+    "W2_err",
+    "W1_flag",
+    "B_J",
+    "B_J_err",
+    "z_helio",
+    "z_cmb",
+    "z_flag",
+    "v_err",
+    "z_err",
+    "d_L",
+    "d_L_err",
+    "dist",
+    "Mstar",
+    "Mstar_err",
+    "Mstar_flag",
+    "Merger_rate",
+    "Merger_rate_error",
+)
+GLADE_RENAME = {
+    "RA": "ra",
+    "Dec": "dec",
+    "Mstar": "mstar",
+    "K": "magk",
+    "B": "magb",
+    "z_helio": "redshift",
+    "z_err": "redshift_error",
+    "d_L": "distmpc",
+    "d_L_err": "distmpc_unc",
+}
+
+CHUNK_ROWS = 1_000_000
+
+
+def galaxy_healpix(ra, dec):
+    """HEALPix index (at the base level) of each galaxy."""
+    return np.asarray(
+        ha.constants.HPX.lonlat_to_healpix(
+            np.asarray(ra, dtype=np.float64) * u.deg,
+            np.asarray(dec, dtype=np.float64) * u.deg,
+        ),
+        dtype=np.int64,
+    )
+
+
+def clean_galaxies(frame):
+    """Select the catalog columns of a chunk and drop its invalid rows.
+
+    Missing columns are filled with nulls. Rows without a name or position,
+    outside of the sky, or with a negative distance, distance uncertainty or
+    redshift error are dropped.
+
+    Parameters
+    ----------
+    frame : pandas.DataFrame
+
+    Returns
+    -------
+    pandas.DataFrame
+        The GALAXY_COLUMNS, floats as float64 with NaN for nulls.
+    """
+    frame = frame.reindex(columns=list(GALAXY_COLUMNS))
+    for column in FLOAT_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype(np.float64)
+    keep = frame["name"].notna() & frame["ra"].notna() & frame["dec"].notna()
+    keep &= (frame["ra"] >= 0) & (frame["ra"] < 360)
+    keep &= (frame["dec"] >= -90) & (frame["dec"] <= 90)
+    for column in POSITIVE_DEFINITE_COLUMNS:
+        keep &= ~(frame[column] < 0)
+    return frame[keep]
+
+
+def glade_galaxies(frame):
+    """Clean a chunk of GLADE+ (see GLADE_COLUMN_NAMES)."""
+    frame = frame.rename(columns=GLADE_RENAME)
+    frame["name"] = "GLADE-" + frame["GLADE_no"].astype(str)
+    frame = clean_galaxies(frame)
+    # GLADE+ stellar masses are in units of 1e10 solar masses
+    frame["mstar"] *= 1e10
+    return frame
+
+
+def encode_galaxies(frame, catalog_id, created_at=None):
+    """Encode cleaned galaxies as CSV rows of COPY_COLUMNS.
+
+    Parameters
+    ----------
+    frame : pandas.DataFrame
+        Galaxies, as returned by `clean_galaxies`.
+    catalog_id : int
+        ID of their GalaxyCatalog.
+    created_at : datetime.datetime, optional
+        Creation time of the rows. Defaults to now.
+
+    Returns
+    -------
+    bytes
+        UTF-8 CSV, nulls as empty fields.
+    """
+    created_at = (created_at or utcnow_naive()).isoformat()
+    rows = frame.loc[:, list(GALAXY_COLUMNS)].copy()
+    for column in STRING_COLUMNS:
+        rows[column] = rows[column].map(str, na_action="ignore")
+    rows["healpix"] = galaxy_healpix(rows["ra"], rows["dec"])
+    rows["catalog_id"] = catalog_id
+    rows["created_at"] = created_at
+    rows["modified"] = created_at
+    output = StringIO()
+    rows.to_csv(output, index=False, header=False, na_rep="")
+    return output.getvalue().encode("utf8")
+
+
+def copy_galaxies(session, data):
+    """Write encoded galaxies with COPY, in the session's transaction."""
+    quoted_columns = ", ".join(f'"{c}"' for c in COPY_COLUMNS)
+    connection = session.connection().connection
+    with connection.cursor() as cursor:
+        with cursor.copy(
+            f"COPY galaxys ({quoted_columns}) FROM STDIN WITH (FORMAT csv, NULL '')"
+        ) as copy:
+            copy.write(data)
+
+
+def prepare_chunk(index, frame, clean, catalog_id):
+    """Clean and encode a chunk; run in the worker processes."""
+    frame = clean(frame)
+    return {
+        "index": index,
+        "rows": len(frame),
+        "blueshifted": int(np.sum(frame["redshift"] < 0)),
+        "data": encode_galaxies(frame, catalog_id),
+    }
+
+
+class IngestCheckpoint:
+    """Indices of the chunks of a catalog file already in the database.
+
+    Parameters
+    ----------
+    path : str, optional
+        JSON file to persist the indices to. Without it, they are only kept
+        in memory.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.done = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.done = {int(k): v for k, v in json.load(f).items()}
+
+    def __contains__(self, index):
+        return index in self.done
+
+    def mark(self, index, rows):
+        self.done[index] = rows
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.done, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.done = {}
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def load_galaxy_chunks(
+    session,
+    chunks,
+    clean,
+    catalog_id,
+    checkpoint=None,
+    processes=None,
+    label="galaxies",
+):
+    """Load chunks of a catalog, skipping those already loaded.
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+        Session to copy with; committed after each chunk.
+    chunks : iterable of pandas.DataFrame
+        The catalog, in a deterministic order of chunks.
+    clean : callable
+        Module-level function cleaning a chunk, like `clean_galaxies`.
+    catalog_id : int
+        ID of the GalaxyCatalog.
+    checkpoint : IngestCheckpoint, optional
+        Chunks already loaded; cleared once all of the chunks are.
+    processes : int, optional
+        Number of worker processes preparing chunks. Chunks are prepared in
+        this process if it is 1 or less.
+    label : str
+        Name of the load in the progress log.
+
+    Returns
+    -------
+    dict
+        Number of galaxies loaded ("rows"), of which with a negative redshift
+        ("blueshifted"), and of chunks that failed ("failed").
+    """
+    if checkpoint is None:
+        checkpoint = IngestCheckpoint()
+    if processes is None:
+        processes = min(4, os.cpu_count() or 1)
+    totals = {"rows": 0, "blueshifted": 0, "failed": 0}
+    start = time.perf_counter()
+
+    def commit(result):
+        try:
+            copy_galaxies(session, result["data"])
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            totals["failed"] += 1
+            log(f"{label} - chunk {result['index']}: Error: {e}")
+            return
+        checkpoint.mark(result["index"], result["rows"])
+        totals["rows"] += result["rows"]
+        totals["blueshifted"] += result["blueshifted"]
+        log(
+            f"{label} - chunk {result['index']}: added {result['rows']} galaxies "
+            f"({totals['rows']} total, "
+            f"{totals['rows'] / (time.perf_counter() - start):.0f} galaxies/s)"
+        )
+
+    pending = (
+        (index, frame) for index, frame in enumerate(chunks) if index not in checkpoint
+    )
+    if processes <= 1:
+        for index, frame in pending:
+            try:
+                result = prepare_chunk(index, frame, clean, catalog_id)
+            except Exception as e:
+                totals["failed"] += 1
+                log(f"{label} - chunk {index}: Error: {e}")
+                continue
+            commit(result)
+    else:
+        # spawn rather than fork: the parent may be running other threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(processes, mp_context=context) as pool:
+            futures = {}
+            # read ahead a bounded number of chunks, to bound memory use
+            for index, frame in pending:
+                futures[pool.submit(prepare_chunk, index, frame, clean, catalog_id)] = (
+                    index
+                )
+                if len(futures) >= 2 * processes:
+                    futures = _commit_finished(futures, commit, totals, label)
+            while futures:
+                futures = _commit_finished(futures, commit, totals, label)
+
+    if totals["failed"] == 0:
+        checkpoint.clear()
+    log(
+        f"{label} - added {totals['rows']} galaxies "
+        f"(including {totals['blueshifted']} with a negative redshift) in "
+        f"{time.perf_counter() - start:0.4f} seconds, "
+        f"{totals['failed']} chunk(s) failed"
+    )
+    return totals
+
+
+def _commit_finished(futures, commit, totals, label):
+    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+    for future in done:
+        index = futures.pop(future)
+        try:
+            result = future.result()
+        except Exception as e:
+            totals["failed"] += 1
+            log(f"{label} - chunk {index}: Error: {e}")
+            continue
+        commit(result)
+    return futures
+
+
+def read_glade(datafile, chunk_rows=CHUNK_ROWS):
+    """Read GLADE+ (a local path or URL) in chunks of rows."""
+    return pd.read_csv(
+        datafile,
+        sep=" ",
+        header=None,
+        names=list(GLADE_COLUMN_NAMES),
+        na_values=["null"],
+        dtype={"GLADE_no": str, "PGC_no": str, "GWGC_name": str},
+        chunksize=chunk_rows,
+    )
+
+
+def checkpoint_path(catalog_name, datafile):
+    """Checkpoint file of a catalog load."""
+    name = "".join(c if c.isalnum() else "_" for c in f"{catalog_name}_{datafile}")
+    return os.path.join("cache", "galaxy_ingest", f"{name[-200:]}.json")
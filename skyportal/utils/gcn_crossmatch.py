@@ -0,0 +1,195 @@
+"""Set-based crossmatch of objects against GCN event localizations.
+
+Crossmatching one object at a time costs a partition probe and a tile query
+per (object, event) pair. Here, the tile partition of every localization is
+resolved with one probe per monthly partition, each localization is then
+joined against all of the objects at once, and `Obj.gcn_crossmatch` is
+updated in bulk.
+"""
+
+from collections import defaultdict
+
+import arrow
+import sqlalchemy as sa
+from sqlalchemy.orm import joinedload
+
+from ..models import GcnEvent, LocalizationTile, Obj
+from .localization_tiles import in_credible_region, min_probdensity
+
+# Number of object IDs per tile query.
+OBJ_BATCH_SIZE = 10_000
+
+
+def localization_tile_classes(session, localizations):
+    """Tile class holding the tiles of each localization.
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+    localizations : iterable of (int, datetime.datetime)
+        Localization IDs and dateobs.
+
+    Returns
+    -------
+    dict
+        LocalizationTile partition class by localization ID: the monthly
+        partition of its dateobs if its tiles are there, the default one
+        otherwise.
+    """
+    default = LocalizationTile.partitions.get("def", LocalizationTile)
+    tile_classes = {}
+    by_partition = defaultdict(list)
+    for localization_id, dateobs in localizations:
+        tilecls = LocalizationTile.partitions.get(f"{dateobs.year}_{dateobs.month:02d}")
+        if tilecls is None:
+            tile_classes[localization_id] = default
+        else:
+            by_partition[tilecls].append(localization_id)
+
+    for tilecls, localization_ids in by_partition.items():
+        in_partition = set(
+            session.scalars(
+                sa.select(tilecls.localization_id)
+                .where(tilecls.localization_id.in_(localization_ids))
+                .distinct()
+            )
+        )
+        for localization_id in localization_ids:
+            tile_classes[localization_id] = (
+                tilecls if localization_id in in_partition else default
+            )
+    return tile_classes
+
+
+def objs_in_localization(
+    session, obj_ids, localization_id, tilecls, integrated_probability
+):
+    """IDs of the objects within a credible region of a localization."""
+    threshold = min_probdensity(
+        session, localization_id, integrated_probability, tilecls
+    )
+    if threshold is None:
+        return set()
+    obj_ids = list(obj_ids)
+    matches = set()
+    for i in range(0, len(obj_ids), OBJ_BATCH_SIZE):
+        matches.update(
+            session.scalars(
+                sa.select(Obj.id)
+                .where(
+                    Obj.id.in_(obj_ids[i : i + OBJ_BATCH_SIZE]),
+                    tilecls.localization_id == localization_id,
+                    in_credible_region(tilecls, threshold),
+                    tilecls.healpix.contains(Obj.healpix),
+                )
+                .distinct()
+            )
+        )
+    return matches
+
+
+def merge_crossmatches(existing, matches, crossmatched, replace=False):
+    """New value of an object's `gcn_crossmatch`.
+
+    Parameters
+    ----------
+    existing : list of str or None
+        Current crossmatches of the object.
+    matches : list of str
+        Dateobs of the crossmatched events the object is in.
+    crossmatched : list of str
+        Dateobs of all of the crossmatched events.
+    replace : bool
+        Whether to drop the existing crossmatches with other events, as
+        crossmatching a single object does. Otherwise only the entries of
+        the crossmatched events change.
+
+    Returns
+    -------
+    list of str or None
+    """
+    if replace:
+        return list(matches)
+    # entries are compared as datetimes, whatever their string format
+    crossmatched = {arrow.get(dateobs).naive for dateobs in crossmatched}
+    kept = [
+        dateobs
+        for dateobs in existing or []
+        if arrow.get(dateobs).naive not in crossmatched
+    ]
+    merged = kept + list(matches)
+    if len(merged) == 0 and existing is None:
+        return None
+    return merged
+
+
+def crossmatch_gcn_events(
+    session, user, obj_ids, event_ids, integrated_probability=0.95, replace=False
+):
+    """Crossmatch objects against the first localization of GCN events, and
+    update their `gcn_crossmatch` (without committing).
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+    user : baselayer.app.models.User
+        User the objects and events must be accessible to.
+    obj_ids : list of str
+        Object IDs.
+    event_ids : list of int
+        GCN event IDs.
+    integrated_probability : float
+        Credible level to crossmatch within.
+    replace : bool
+        See `merge_crossmatches`.
+
+    Returns
+    -------
+    list of str
+        IDs of the objects whose crossmatches changed.
+    """
+    objs = session.execute(
+        Obj.select(user, mode="update", columns=[Obj.id, Obj.gcn_crossmatch]).where(
+            Obj.id.in_(obj_ids)
+        )
+    ).all()
+    if len(objs) == 0:
+        raise ValueError(f"Cannot find objects with IDs {obj_ids}.")
+
+    events = session.scalars(
+        GcnEvent.select(user, options=[joinedload(GcnEvent.localizations)]).where(
+            GcnEvent.id.in_(event_ids)
+        )
+    ).unique()
+    order = {event_id: i for i, event_id in enumerate(event_ids)}
+    events = sorted(events, key=lambda event: order[event.id])
+    localizations = [
+        (event.localizations[0].id, event.dateobs)
+        for event in events
+        if len(event.localizations) > 0
+    ]
+    tile_classes = localization_tile_classes(session, localizations)
+
+    # full precision, as GcnEvent.dateobs is matched exactly when read back
+    crossmatched = [dateobs.isoformat(sep=" ") for _, dateobs in localizations]
+    matches = defaultdict(list)
+    for (localization_id, _), dateobs in zip(localizations, crossmatched):
+        for obj_id in objs_in_localization(
+            session,
+            [obj.id for obj in objs],
+            localization_id,
+            tile_classes[localization_id],
+            integrated_probability,
+        ):
+            matches[obj_id].append(dateobs)
+
+    updates = []
+    for obj in objs:
+        gcn_crossmatch = merge_crossmatches(
+            obj.gcn_crossmatch, matches[obj.id], crossmatched, replace=replace
+        )
+        if gcn_crossmatch != obj.gcn_crossmatch:
+            updates.append({"id": obj.id, "gcn_crossmatch": gcn_crossmatch})
+    if updates:
+        session.execute(sa.update(Obj), updates)
+    return [update["id"] for update in updates]
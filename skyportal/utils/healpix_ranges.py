@@ -0,0 +1,173 @@
+"""Sets of HEALPix pixels as sorted, disjoint ranges.
+
+Tiles are stored as half-open ranges [lower, upper) of nested pixel indices
+at the deepest HEALPix order, ``healpix_alchemy.constants.LEVEL`` -- the
+representation of the ``healpix`` int8range columns. A `HealpixRangeSet`
+keeps such ranges merged, sorted, and in NumPy arrays, so that set
+operations are O(n log n) and overlaps with many tiles are computed at once
+with ``searchsorted``.
+"""
+
+import numpy as np
+from astropy_healpix import uniq_to_level_ipix
+from healpix_alchemy.constants import LEVEL, PIXEL_AREA
+
+# Number of pixels at LEVEL.
+NPIX = 12 * 4 ** int(LEVEL)
+
+# (lower, upper, probdensity) rows of localization tiles.
+TILE_RANGES_DTYPE = np.dtype(
+    [("lower", np.int64), ("upper", np.int64), ("probdensity", np.float64)]
+)
+
+
+def uniq_to_ranges(uniq):
+    """Convert multi-order UNIQ pixel indices to [lower, upper) ranges of
+    nested pixels at LEVEL, as healpix_alchemy's Tile type does one value at
+    a time."""
+    level, ipix = uniq_to_level_ipix(np.asarray(uniq, dtype=np.int64))
+    shift = 2 * (LEVEL - np.asarray(level, dtype=np.int64))
+    ipix = np.asarray(ipix, dtype=np.int64)
+    return ipix << shift, (ipix + 1) << shift
+
+
+class HealpixRangeSet:
+    """A set of HEALPix pixels at LEVEL, as sorted disjoint ranges.
+
+    Adjacent and overlapping ranges are merged, so two sets covering the same
+    pixels compare equal.
+
+    Parameters
+    ----------
+    lower, upper : array-like of int
+        Lower (inclusive) and upper (exclusive) bounds of the ranges, in any
+        order and possibly overlapping.
+    """
+
+    __slots__ = ("lower", "upper")
+
+    def __init__(self, lower=(), upper=()):
+        lower = np.asarray(lower, dtype=np.int64).ravel()
+        upper = np.asarray(upper, dtype=np.int64).ravel()
+        if lower.shape != upper.shape:
+            raise ValueError(
+                f"lower and upper have different shapes: {lower.shape} != {upper.shape}"
+            )
+        keep = upper > lower
+        lower, upper = lower[keep], upper[keep]
+        if len(lower) == 0:
+            self.lower, self.upper = lower, upper
+            return
+        order = np.argsort(lower, kind="stable")
+        lower, upper = lower[order], upper[order]
+        reach = np.maximum.accumulate(upper)
+        # a range starts a new run unless an earlier one reaches it
+        starts = np.flatnonzero(np.r_[True, lower[1:] > reach[:-1]])
+        self.lower = lower[starts]
+        self.upper = reach[np.r_[starts[1:] - 1, len(lower) - 1]]
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        """Build from (lower, upper) pairs."""
+        ranges = np.asarray(list(ranges), dtype=np.int64).reshape(-1, 2)
+        return cls(ranges[:, 0], ranges[:, 1])
+
+    @classmethod
+    def from_uniq(cls, uniq):
+        """Build from multi-order UNIQ pixel indices."""
+        return cls(*uniq_to_ranges(uniq))
+
+    @classmethod
+    def from_moc(cls, moc):
+        """Build from a `mocpy.MOC`."""
+        ranges = np.asarray(moc.to_depth29_ranges, dtype=np.int64).reshape(-1, 2)
+        return cls(ranges[:, 0], ranges[:, 1])
+
+    def __len__(self):
+        return len(self.lower)
+
+    def __iter__(self):
+        return zip(self.lower.tolist(), self.upper.tolist())
+
+    def __eq__(self, other):
+        if not isinstance(other, HealpixRangeSet):
+            return NotImplemented
+        return np.array_equal(self.lower, other.lower) and np.array_equal(
+            self.upper, other.upper
+        )
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} ranges, {self.npix} pixels)"
+
+    @property
+    def npix(self):
+        """Number of pixels at LEVEL in the set."""
+        return int(np.sum(self.upper - self.lower))
+
+    @property
+    def area(self):
+        """Area of the set, in steradians."""
+        return self.npix * PIXEL_AREA
+
+    def union(self, other):
+        return HealpixRangeSet(
+            np.r_[self.lower, other.lower], np.r_[self.upper, other.upper]
+        )
+
+    def intersection(self, other):
+        # the ranges of self overlapping each range of other
+        first = np.searchsorted(self.upper, other.lower, side="right")
+        last = np.searchsorted(self.lower, other.upper, side="left")
+        counts = np.maximum(last - first, 0)
+        index = np.repeat(first - np.cumsum(np.r_[0, counts[:-1]]), counts)
+        index += np.arange(len(index))
+        other_index = np.repeat(np.arange(len(other)), counts)
+        return HealpixRangeSet(
+            np.maximum(self.lower[index], other.lower[other_index]),
+            np.minimum(self.upper[index], other.upper[other_index]),
+        )
+
+    def complement(self):
+        """The pixels of the sphere that are not in the set."""
+        return HealpixRangeSet(np.r_[0, self.upper], np.r_[self.lower, NPIX])
+
+    def difference(self, other):
+        return self.intersection(other.complement())
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def contains(self, ipix):
+        """Whether each pixel index at LEVEL is in the set (a boolean for
+        a single index, an array of the shape of `ipix` otherwise)."""
+        shape = np.shape(ipix)
+        ipix = np.atleast_1d(np.asarray(ipix, dtype=np.int64)).ravel()
+        i = np.searchsorted(self.upper, ipix, side="right")
+        inside = i < len(self)
+        inside[inside] &= self.lower[i[inside]] <= ipix[inside]
+        return inside.reshape(shape)[()]
+
+    def _npix_below(self, x):
+        # number of pixels of the set below each x
+        i = np.searchsorted(self.upper, x, side="right")
+        npix = np.r_[0, np.cumsum(self.upper - self.lower)][i]
+        partial = i < len(self)
+        npix[partial] += np.maximum(x[partial] - self.lower[i[partial]], 0)
+        return npix
+
+    def overlap_npix(self, lower, upper):
+        """Number of pixels of the set within each range [lower, upper).
+
+        Parameters
+        ----------
+        lower, upper : array-like of int
+            Bounds of the ranges, e.g. localization tiles.
+
+        Returns
+        -------
+        numpy.ndarray of int
+        """
+        lower = np.asarray(lower, dtype=np.int64)
+        upper = np.asarray(upper, dtype=np.int64)
+        return np.maximum(self._npix_below(upper) - self._npix_below(lower), 0)
@@ -0,0 +1,359 @@
+"""Bulk loading of LocalizationTile rows, and their credible-region
+thresholds.
+
+A fine LVK skymap has hundreds of thousands of multi-order (UNIQ) pixels.
+Creating one ORM object per pixel makes the unit of work dominate the time
+between a GCN notice and a usable localization, so the tiles are instead
+encoded straight from the ``uniq``/``probdensity`` arrays into PostgreSQL's
+binary COPY format. Every row has the same width, so a whole batch is a single
+NumPy structured array.
+
+The rows are copied into the partitioned ``localizationtiles`` table itself:
+PostgreSQL routes them to the monthly partition of the localization's dateobs
+(or to the default one), and the ids come from the parent table's sequence,
+as they do for ORM inserts.
+
+The credible region at level L of a localization is the set of its tiles
+whose cumulative probability -- summing probdensity * area over tiles in
+order of decreasing probdensity -- is at most L; equivalently, the tiles with
+a probdensity at or above a threshold. The thresholds of the standard levels
+are computed from the arrays when the tiles are loaded and stored on the
+Localization, and those of other levels are computed with the window query
+once and then kept in memory, so queries filter on ``probdensity >=
+threshold`` instead of scanning every tile of the localization.
+"""
+
+import datetime
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import sqlalchemy as sa
+from healpix_alchemy.constants import PIXEL_AREA
+
+from ..models import Localization, LocalizationTile
+from .healpix_ranges import uniq_to_ranges
+from .naive_datetime import utcnow_naive
+
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + (0).to_bytes(4, "big") * 2
+PGCOPY_TRAILER = (-1).to_bytes(2, "big", signed=True)
+
+# Binary timestamps count microseconds since 2000-01-01.
+PG_EPOCH = datetime.datetime(2000, 1, 1)
+
+# Range flag for an inclusive lower bound; int8range tiles are [lower, upper).
+RANGE_LB_INC = 0x02
+
+COPY_COLUMNS = (
+    "localization_id",
+    "probdensity",
+    "dateobs",
+    "healpix",
+    "created_at",
+    "modified",
+)
+
+# One row of the COPY stream: the field count, then a byte length and value
+# per column. An int8range is its flags byte and the two length-prefixed
+# bounds.
+TILE_ROW_DTYPE = np.dtype(
+    [
+        ("nfields", ">i2"),
+        ("localization_id_len", ">i4"),
+        ("localization_id", ">i4"),
+        ("probdensity_len", ">i4"),
+        ("probdensity", ">f8"),
+        ("dateobs_len", ">i4"),
+        ("dateobs", ">i8"),
+        ("healpix_len", ">i4"),
+        ("healpix_flags", "u1"),
+        ("healpix_lower_len", ">i4"),
+        ("healpix_lower", ">i8"),
+        ("healpix_upper_len", ">i4"),
+        ("healpix_upper", ">i8"),
+        ("created_at_len", ">i4"),
+        ("created_at", ">i8"),
+        ("modified_len", ">i4"),
+        ("modified", ">i8"),
+    ]
+)
+
+COPY_BATCH_SIZE = 100_000
+
+# Credible levels whose thresholds are stored on each Localization.
+STANDARD_CREDIBLE_LEVELS = (0.5, 0.68, 0.9, 0.95, 0.99)
+
+# Thresholds of levels computed on demand, by (localization_id, level key).
+# A localization's tiles never change once loaded, so entries stay valid.
+MAX_MEMOIZED_THRESHOLDS = 4096
+_memoized_thresholds = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def pg_timestamp(value):
+    """Microseconds between 2000-01-01 and a naive UTC datetime."""
+    return (value - PG_EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def encode_tiles(localization_id, dateobs, uniq, probdensity, created_at=None):
+    """Encode tiles as the rows of a binary COPY stream (without the header
+    and trailer).
+
+    Parameters
+    ----------
+    localization_id : int
+        ID of the Localization the tiles belong to.
+    dateobs : datetime.datetime
+        The localization's dateobs, which picks the partition.
+    uniq : array-like of int
+        Multi-order UNIQ pixel indices.
+    probdensity : array-like of float
+        Probability density of each pixel.
+    created_at : datetime.datetime, optional
+        Value of the created_at and modified columns. Defaults to now.
+
+    Returns
+    -------
+    numpy.ndarray
+        A structured array of dtype `TILE_ROW_DTYPE`, one element per tile.
+    """
+    uniq = np.asarray(uniq, dtype=np.int64)
+    probdensity = np.asarray(probdensity, dtype=np.float64)
+    if uniq.shape != probdensity.shape:
+        raise ValueError(
+            f"uniq and probdensity have different shapes: {uniq.shape} and "
+            f"{probdensity.shape}"
+        )
+    if created_at is None:
+        created_at = utcnow_naive()
+
+    lower, upper = uniq_to_ranges(uniq)
+    rows = np.empty(len(uniq), dtype=TILE_ROW_DTYPE)
+    rows["nfields"] = len(COPY_COLUMNS)
+    rows["localization_id_len"] = 4
+    rows["localization_id"] = localization_id
+    rows["probdensity_len"] = 8
+    rows["probdensity"] = probdensity
+    rows["dateobs_len"] = 8
+    rows["dateobs"] = pg_timestamp(dateobs)
+    rows["healpix_len"] = 1 + 2 * (4 + 8)
+    rows["healpix_flags"] = RANGE_LB_INC
+    rows["healpix_lower_len"] = 8
+    rows["healpix_lower"] = lower
+    rows["healpix_upper_len"] = 8
+    rows["healpix_upper"] = upper
+    rows["created_at_len"] = 8
+    rows["created_at"] = pg_timestamp(created_at)
+    rows["modified_len"] = 8
+    rows["modified"] = rows["created_at"]
+    return rows
+
+
+def copy_localization_tiles(
+    session,
+    localization_id,
+    dateobs,
+    uniq,
+    probdensity,
+    batch_size=COPY_BATCH_SIZE,
+):
+    """Insert a localization's tiles with a single binary COPY.
+
+    The COPY runs on the session's connection, inside its transaction; the
+    caller commits.
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+        Session whose connection and transaction are used.
+    localization_id : int
+        ID of the Localization the tiles belong to.
+    dateobs : datetime.datetime
+        The localization's dateobs.
+    uniq : array-like of int
+        Multi-order UNIQ pixel indices.
+    probdensity : array-like of float
+        Probability density of each pixel.
+    batch_size : int
+        Number of rows encoded and sent at a time, to bound memory use.
+
+    Returns
+    -------
+    int
+        Number of tiles inserted.
+    """
+    uniq = np.asarray(uniq, dtype=np.int64)
+    probdensity = np.asarray(probdensity, dtype=np.float64)
+    created_at = utcnow_naive()
+
+    connection = session.connection().connection
+    quoted_columns = ", ".join(f'"{c}"' for c in COPY_COLUMNS)
+    copy_sql = (
+        f"COPY {LocalizationTile.__tablename__} ({quoted_columns}) FROM STDIN "
+        "WITH (FORMAT binary)"
+    )
+    with connection.cursor() as cursor:
+        with cursor.copy(copy_sql) as copy:
+            # In block mode psycopg sends the bytes as they are, so the
+            # stream carries its own header and trailer.
+            copy.write(PGCOPY_HEADER)
+            for start in range(0, len(uniq), batch_size):
+                rows = encode_tiles(
+                    localization_id,
+                    dateobs,
+                    uniq[start : start + batch_size],
+                    probdensity[start : start + batch_size],
+                    created_at=created_at,
+                )
+                copy.write(rows.tobytes())
+            copy.write(PGCOPY_TRAILER)
+    return len(uniq)
+
+
+def credible_level_key(level):
+    """Key of a credible level in `Localization.credible_thresholds`: levels
+    that only differ by rounding (0.9 and 90 * 0.01) share a key."""
+    return f"{float(level):g}"
+
+
+def credible_thresholds(uniq, probdensity, levels=STANDARD_CREDIBLE_LEVELS):
+    """Minimum probability density of the tiles in each credible region.
+
+    Mirrors the cumulative-probability window query the tile queries used:
+    tiles with equal probdensity share the running sum through the last of
+    them, and a level that even the densest tiles exceed has no threshold.
+
+    Parameters
+    ----------
+    uniq : array-like of int
+        Multi-order UNIQ pixel indices.
+    probdensity : array-like of float
+        Probability density of each pixel.
+    levels : iterable of float
+        Credible levels, between 0 and 1.
+
+    Returns
+    -------
+    dict
+        Threshold (or None) by `credible_level_key`.
+    """
+    probdensity = np.asarray(probdensity, dtype=np.float64)
+    lower, upper = uniq_to_ranges(uniq)
+    length = (upper - lower).astype(np.float64)
+
+    order = np.argsort(-probdensity, kind="stable")
+    probdensity = probdensity[order]
+    # same association as probdensity * healpix.area in SQL, where the
+    # area of a tile is its length times PIXEL_AREA
+    cum_prob = np.cumsum(probdensity * (length[order] * PIXEL_AREA))
+    if len(cum_prob) > 0:
+        group_ends = np.flatnonzero(np.r_[probdensity[1:] != probdensity[:-1], True])
+        cum_prob = cum_prob[np.repeat(group_ends, np.diff(np.r_[-1, group_ends]))]
+
+    thresholds = {}
+    for level in levels:
+        n_tiles = np.searchsorted(cum_prob, level, side="right")
+        thresholds[credible_level_key(level)] = (
+            float(probdensity[n_tiles - 1]) if n_tiles > 0 else None
+        )
+    return thresholds
+
+
+def threshold_statement(localization_id, level, tilecls=LocalizationTile):
+    """The window query computing a threshold from the tiles."""
+    cum_prob = (
+        sa.func.sum(tilecls.probdensity * tilecls.healpix.area)
+        .over(order_by=tilecls.probdensity.desc())
+        .label("cum_prob")
+    )
+    tiles = (
+        sa.select(tilecls.probdensity, cum_prob).where(
+            tilecls.localization_id == localization_id
+        )
+    ).subquery()
+    return sa.select(sa.func.min(tiles.c.probdensity)).where(
+        tiles.c.cum_prob <= float(level)
+    )
+
+
+def _memoized(localization_id, key):
+    with _memo_lock:
+        if (localization_id, key) in _memoized_thresholds:
+            _memoized_thresholds.move_to_end((localization_id, key))
+            return True, _memoized_thresholds[(localization_id, key)]
+    return False, None
+
+
+def _memoize(localization_id, key, threshold):
+    # A missing threshold can mean the tiles aren't loaded yet: don't keep it.
+    if threshold is None:
+        return
+    with _memo_lock:
+        _memoized_thresholds[(localization_id, key)] = threshold
+        _memoized_thresholds.move_to_end((localization_id, key))
+        while len(_memoized_thresholds) > MAX_MEMOIZED_THRESHOLDS:
+            _memoized_thresholds.popitem(last=False)
+
+
+def _stored_statement(localization_id):
+    return sa.select(Localization.credible_thresholds).where(
+        Localization.id == localization_id
+    )
+
+
+def min_probdensity(session, localization_id, level, tilecls=LocalizationTile):
+    """Threshold of a localization's credible region at ``level``: the memoized
+    one, else the stored one, else computed from the tiles.
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+    localization_id : int
+    level : float
+        Credible level, between 0 and 1.
+    tilecls : type
+        LocalizationTile, or the partition holding the localization's tiles.
+
+    Returns
+    -------
+    float or None
+        None when the region has no tiles.
+    """
+    key = credible_level_key(level)
+    found, threshold = _memoized(localization_id, key)
+    if found:
+        return threshold
+    stored = session.scalar(_stored_statement(localization_id)) or {}
+    if key in stored:
+        threshold = stored[key]
+    else:
+        threshold = session.scalar(threshold_statement(localization_id, level, tilecls))
+    _memoize(localization_id, key, threshold)
+    return threshold
+
+
+async def min_probdensity_async(
+    session, localization_id, level, tilecls=LocalizationTile
+):
+    """`min_probdensity` for an AsyncSession."""
+    key = credible_level_key(level)
+    found, threshold = _memoized(localization_id, key)
+    if found:
+        return threshold
+    stored = await session.scalar(_stored_statement(localization_id)) or {}
+    if key in stored:
+        threshold = stored[key]
+    else:
+        threshold = await session.scalar(
+            threshold_statement(localization_id, level, tilecls)
+        )
+    _memoize(localization_id, key, threshold)
+    return threshold
+
+
+def in_credible_region(tilecls, threshold):
+    """Clause selecting the tiles of a credible region from its threshold
+    (no tiles when there is none)."""
+    if threshold is None:
+        return sa.false()
+    return tilecls.probdensity >= threshold
@@ -0,0 +1,376 @@
+"""Durable delivery of user notifications.
+
+The notification queue stores each notification it has to send as one
+NotificationDelivery row per channel, and commits it before answering, so
+pending notifications survive restarts. Per-channel workers claim pending
+rows with ``SELECT ... FOR UPDATE SKIP LOCKED``: concurrent workers, in one
+or several processes, never claim the same row, and a slow channel never
+holds up the others. Failed sends are retried with exponential backoff, and
+claims that were never completed (e.g. the process died mid-send) are
+released after CLAIM_TIMEOUT.
+"""
+
+import json
+import random
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+import sqlalchemy as sa
+from sqlalchemy.orm import joinedload
+
+from ..models import NotificationDelivery, UserNotification
+from .naive_datetime import utcnow_naive
+
+CHANNELS = ("frontend", "email", "slack", "sms", "phone", "whatsapp")
+
+# Attempts after which a delivery is marked as failed.
+MAX_ATTEMPTS = 6
+# Delay before the first retry, doubled for each further one (seconds).
+RETRY_BASE_DELAY = 15
+RETRY_MAX_DELAY = 3600
+# Time after which a delivery claimed but not completed is retried (seconds).
+CLAIM_TIMEOUT = 600
+# Time sent and failed deliveries are kept for, for the metrics (seconds).
+RETENTION = 7 * 24 * 3600
+
+# Per-destination rate limits, as (sends per second, burst).
+RATE_LIMITS = {
+    "frontend": None,
+    "email": (0.2, 5),
+    # Slack webhooks accept about one message per second
+    "slack": (1.0, 1),
+    "sms": (0.2, 3),
+    "phone": (1 / 60, 1),
+    "whatsapp": (0.2, 3),
+}
+
+# Maximum number of notifications to a destination sent at once: merged into
+# a single email or Slack message, or a single frontend refresh.
+MAX_BATCH_SIZE = {"frontend": 100, "email": 20, "slack": 10}
+
+
+def retry_delay(attempts, base=RETRY_BASE_DELAY, maximum=RETRY_MAX_DELAY):
+    """Delay before retrying a delivery that failed `attempts` times, in
+    seconds: exponential, capped at `maximum`, with jitter so that a burst
+    of failures doesn't retry in lockstep."""
+    delay = min(maximum, base * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.5, 1)
+
+
+class RateLimiter:
+    """Token buckets limiting the rate of sends to each destination.
+
+    Parameters
+    ----------
+    rate : float
+        Sends per second allowed to a destination.
+    burst : int
+        Number of sends allowed at once to an idle destination.
+    clock : callable
+        Monotonic time, in seconds.
+    max_destinations : int
+        Number of destinations to keep buckets for; the least recently used
+        ones are dropped, which only makes them idle again.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, max_destinations=10_000):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.max_destinations = max_destinations
+        self._buckets = OrderedDict()
+
+    def reserve(self, destination, n=1):
+        """Reserve `n` sends to a destination.
+
+        Returns
+        -------
+        float
+            Seconds to wait before sending.
+        """
+        now = self.clock()
+        tokens, last = self._buckets.pop(destination, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate) - n
+        self._buckets[destination] = (tokens, now)
+        while len(self._buckets) > self.max_destinations:
+            self._buckets.popitem(last=False)
+        return max(0.0, -tokens / self.rate)
+
+
+def rate_limiters(rate_limits=None):
+    """A RateLimiter per rate limited channel."""
+    rate_limits = {**RATE_LIMITS, **(rate_limits or {})}
+    return {
+        channel: RateLimiter(*limit)
+        for channel, limit in rate_limits.items()
+        if limit is not None
+    }
+
+
+def batches(deliveries, max_size=1):
+    """Group deliveries by destination, in order of first appearance, in
+    batches of at most `max_size`."""
+    by_destination = OrderedDict()
+    for delivery in deliveries:
+        by_destination.setdefault(delivery.destination, []).append(delivery)
+    return [
+        group[i : i + max_size]
+        for group in by_destination.values()
+        for i in range(0, len(group), max_size)
+    ]
+
+
+def json_content(content):
+    """Notification content as JSON values; timedeltas and other non-JSON
+    values are stored as they are formatted in messages."""
+    if content is None:
+        return None
+    return json.loads(json.dumps(content, default=str))
+
+
+def enqueue_deliveries(session, notification_id, destinations, content=None):
+    """Queue the deliveries of a notification (without committing).
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+    notification_id : int
+        ID of the UserNotification.
+    destinations : dict
+        Destination by channel.
+    content : dict, optional
+        Content of the notification.
+
+    Returns
+    -------
+    list of NotificationDelivery
+    """
+    now = utcnow_naive()
+    content = json_content(content)
+    deliveries = [
+        NotificationDelivery(
+            notification_id=notification_id,
+            channel=channel,
+            destination=str(destination),
+            content=content,
+            status="pending",
+            attempts=0,
+            next_attempt_at=now,
+        )
+        for channel, destination in destinations.items()
+    ]
+    session.add_all(deliveries)
+    return deliveries
+
+
+def claim_deliveries(session, channel, limit):
+    """Claim the pending deliveries of a channel that are due, oldest first.
+
+    The claimed rows stay locked until the session commits, which the caller
+    does once it has read them.
+
+    Returns
+    -------
+    list of NotificationDelivery
+        The claimed deliveries, with their notification and user loaded.
+    """
+    now = utcnow_naive()
+    ids = session.scalars(
+        sa.select(NotificationDelivery.id)
+        .where(
+            NotificationDelivery.status == "pending",
+            NotificationDelivery.channel == channel,
+            NotificationDelivery.next_attempt_at <= now,
+        )
+        .order_by(NotificationDelivery.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if len(ids) == 0:
+        session.rollback()
+        return []
+    session.execute(
+        sa.update(NotificationDelivery)
+        .where(NotificationDelivery.id.in_(ids))
+        .values(
+            status="sending",
+            claimed_at=now,
+            attempts=NotificationDelivery.attempts + 1,
+        )
+    )
+    return (
+        session.scalars(
+            sa.select(NotificationDelivery)
+            .where(NotificationDelivery.id.in_(ids))
+            .options(
+                joinedload(NotificationDelivery.notification).joinedload(
+                    UserNotification.user
+                )
+            )
+            .order_by(NotificationDelivery.next_attempt_at)
+            .execution_options(populate_existing=True)
+        )
+        .unique()
+        .all()
+    )
+
+
+def complete_deliveries(session, ids):
+    """Mark deliveries as sent (without committing)."""
+    session.execute(
+        sa.update(NotificationDelivery)
+        .where(NotificationDelivery.id.in_(ids))
+        .values(status="sent", sent_at=utcnow_naive(), error=None)
+    )
+
+
+def fail_delivery(session, delivery, error, max_attempts=MAX_ATTEMPTS):
+    """Schedule the retry of a delivery that failed, or mark it as failed
+    after `max_attempts` (without committing).
+
+    Returns
+    -------
+    bool
+        Whether the delivery will be retried.
+    """
+    retry = delivery.attempts < max_attempts
+    values = {"error": str(error)[:1000]}
+    if retry:
+        values["status"] = "pending"
+        values["next_attempt_at"] = utcnow_naive() + timedelta(
+            seconds=retry_delay(delivery.attempts)
+        )
+    else:
+        values["status"] = "failed"
+    session.execute(
+        sa.update(NotificationDelivery)
+        .where(NotificationDelivery.id == delivery.id)
+        .values(**values)
+    )
+    return retry
+
+
+def defer_deliveries(session, ids, delay):
+    """Put claimed deliveries back in the queue, to be sent in `delay`
+    seconds, without counting an attempt (without committing)."""
+    session.execute(
+        sa.update(NotificationDelivery)
+        .where(NotificationDelivery.id.in_(ids))
+        .values(
+            status="pending",
+            next_attempt_at=utcnow_naive() + timedelta(seconds=delay),
+            attempts=NotificationDelivery.attempts - 1,
+        )
+    )
+
+
+def release_stale_claims(session, timeout=CLAIM_TIMEOUT):
+    """Make deliveries claimed more than `timeout` seconds ago pending
+    again, and commit.
+
+    Returns
+    -------
+    int
+        Number of deliveries released.
+    """
+    result = session.execute(
+        sa.update(NotificationDelivery)
+        .where(
+            NotificationDelivery.status == "sending",
+            NotificationDelivery.claimed_at
+            < utcnow_naive() - timedelta(seconds=timeout),
+        )
+        .values(status="pending", next_attempt_at=utcnow_naive())
+    )
+    session.commit()
+    return result.rowcount
+
+
+def prune_deliveries(session, retention=RETENTION):
+    """Delete the sent and failed deliveries older than `retention` seconds,
+    and commit."""
+    session.execute(
+        sa.delete(NotificationDelivery).where(
+            NotificationDelivery.status.in_(["sent", "failed"]),
+            NotificationDelivery.modified
+            < utcnow_naive() - timedelta(seconds=retention),
+        )
+    )
+    session.commit()
+
+
+def queue_metrics(session, window=3600):
+    """Depth and latency of the queue.
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+    window : float
+        Time over which latencies and failures are measured, in seconds.
+
+    Returns
+    -------
+    dict
+        By channel: the number of "pending" and "sending" deliveries, the
+        age of the oldest pending one ("oldest_pending_age", in seconds),
+        and, over the window, the number of deliveries "sent" and "failed"
+        and the median and 95th percentile of the time from queueing to
+        sending ("latency_p50" and "latency_p95", in seconds).
+    """
+    now = utcnow_naive()
+    since = now - timedelta(seconds=window)
+    metrics = {channel: _empty_metrics() for channel in CHANNELS}
+
+    queued = session.execute(
+        sa.select(
+            NotificationDelivery.channel,
+            NotificationDelivery.status,
+            sa.func.count(),
+            sa.func.min(NotificationDelivery.created_at),
+        )
+        .where(NotificationDelivery.status.in_(["pending", "sending"]))
+        .group_by(NotificationDelivery.channel, NotificationDelivery.status)
+    ).all()
+    for channel, status, count, oldest in queued:
+        channel_metrics = metrics.setdefault(channel, _empty_metrics())
+        channel_metrics[status] = count
+        if status == "pending":
+            channel_metrics["oldest_pending_age"] = (now - oldest).total_seconds()
+
+    latency = sa.extract(
+        "epoch", NotificationDelivery.sent_at - NotificationDelivery.created_at
+    )
+    done = session.execute(
+        sa.select(
+            NotificationDelivery.channel,
+            NotificationDelivery.status,
+            sa.func.count(),
+            sa.func.percentile_cont(0.5).within_group(latency),
+            sa.func.percentile_cont(0.95).within_group(latency),
+        )
+        .where(
+            NotificationDelivery.status.in_(["sent", "failed"]),
+            NotificationDelivery.modified >= since,
+        )
+        .group_by(NotificationDelivery.channel, NotificationDelivery.status)
+    ).all()
+    for channel, status, count, p50, p95 in done:
+        channel_metrics = metrics.setdefault(channel, _empty_metrics())
+        channel_metrics[status] = count
+        if status == "sent":
+            channel_metrics["latency_p50"] = None if p50 is None else float(p50)
+            channel_metrics["latency_p95"] = None if p95 is None else float(p95)
+    return metrics
+
+
+def _empty_metrics():
+    return {
+        "pending": 0,
+        "sending": 0,
+        "oldest_pending_age": None,
+        "sent": 0,
+        "failed": 0,
+        "latency_p50": None,
+        "latency_p95": None,
+    }
@@ -21,6 +21,8 @@ from baselayer.log import make_log
 
 from ..handlers.api.galaxy import get_galaxies
 from .cache import Cache, array_to_bytes
+from .healpix_ranges import TILE_RANGES_DTYPE, HealpixRangeSet
+from .localization_tiles import in_credible_region, min_probdensity
 
 log = make_log("api/observation_plan")
 
@@ -42,6 +44,8 @@ def combine_healpix_tuples(input_tiles):
     """
     Combine (adjacent?) healpix tiles, given as tuples of (lower,upper).
     Returns a list of tuples that do not overlap.
+
+    Quadratic; use utils.healpix_ranges.HealpixRangeSet instead.
     """
 
     # set upper bound to make sure this algorithm isn't crazy expensive
@@ -188,14 +192,15 @@ def generate_observation_plan_statistics(
             + statistics["total_time"]
         )
 
-        # get the localization tiles as python objects
+        # get the localization tiles as (lower, upper, probdensity) rows
         if stats_method == "python":
             t0 = time.time()
-            localization_tiles = session.scalars(
-                sa.select(localizationtilescls)
-                .where(localizationtilescls.localization_id == request.localization_id)
-                .order_by(localizationtilescls.probdensity.desc())
-                .distinct()
+            localization_tiles = session.execute(
+                sa.select(
+                    localizationtilescls.healpix.lower,
+                    localizationtilescls.healpix.upper,
+                    localizationtilescls.probdensity,
+                ).where(localizationtilescls.localization_id == request.localization_id)
             ).all()
             if stats_logging:
                 log(
@@ -204,10 +209,13 @@ def generate_observation_plan_statistics(
                     f"{request.localization_id} retrieved in {time.time() - t0:.2f}s. ",
                 )
 
-            # get the instrument field tiles as python objects
+            # get the instrument field tiles as (lower, upper) ranges
             t0 = time.time()
-            instrument_field_tiles = session.scalars(
-                sa.select(InstrumentFieldTile)
+            instrument_field_tiles = session.execute(
+                sa.select(
+                    InstrumentFieldTile.healpix.lower,
+                    InstrumentFieldTile.healpix.upper,
+                )
                 .where(
                     InstrumentField.instrument_id == plan.instrument_id,
                     InstrumentFieldTile.instrument_field_id == InstrumentField.id,
@@ -224,48 +232,18 @@ def generate_observation_plan_statistics(
                 )
 
             # calculate the area and integrated probability directly:
+            # the pixels of the union of the fields within each tile
             t0 = time.time()
-            intarea = 0  # total area covered by instrument field tiles
-            intprob = 0  # total probability covered by instrument field tiles
-            field_lower_bounds = np.array(
-                [f.healpix.lower for f in instrument_field_tiles]
+            fields = HealpixRangeSet.from_ranges(instrument_field_tiles)
+            tiles = np.array(
+                [tuple(t) for t in localization_tiles], dtype=TILE_RANGES_DTYPE
             )
-            field_upper_bounds = np.array(
-                [f.healpix.upper for f in instrument_field_tiles]
+            overlap = fields.overlap_npix(tiles["lower"], tiles["upper"])
+            intarea = float(np.sum(overlap)) * ha.constants.PIXEL_AREA
+            intprob = (
+                float(np.sum(tiles["probdensity"] * overlap)) * ha.constants.PIXEL_AREA
             )
 
-            for i, t in enumerate(localization_tiles):
-                # has True values where tile t has any overlap with one of the fields
-                overlap_array = np.logical_and(
-                    t.healpix.lower <= field_upper_bounds,
-                    t.healpix.upper >= field_lower_bounds,
-                )
-
-                # only add area/prob if there's any overlap
-                overlap = 0
-                if np.any(overlap_array):
-                    lower_upper = zip(
-                        field_lower_bounds[overlap_array],
-                        field_upper_bounds[overlap_array],
-                    )
-                    # tuples of (lower, upper) for all fields that overlap with tile t
-                    new_fields = [(l, u) for (l, u) in lower_upper]
-
-                    # combine any overlapping fields
-                    output_fields = combine_healpix_tuples(new_fields)
-
-                    # get the area of the combined fields that overlaps with tile t
-                    for lower, upper in output_fields:
-                        mx = np.minimum(t.healpix.upper, upper)
-                        mn = np.maximum(t.healpix.lower, lower)
-                        overlap += mx - mn
-
-                intarea += overlap
-                intprob += t.probdensity * overlap
-
-            intarea *= ha.constants.PIXEL_AREA
-            intprob *= ha.constants.PIXEL_AREA
-
             if stats_logging:
                 log(
                     "STATS: ",
@@ -651,28 +629,14 @@ def generate_plan(
 
         start = time.time()
 
-        cum_prob = (
-            sa.func.sum(
-                localizationtilescls.probdensity * localizationtilescls.healpix.area
-            )
-            .over(order_by=localizationtilescls.probdensity.desc())
-            .label("cum_prob")
-        )
-        localizationtile_subquery = (
-            sa.select(localizationtilescls.probdensity, cum_prob).filter(
-                localizationtilescls.localization_id == request.localization.id
-            )
-        ).subquery()
-
         # convert to 0-1
         integrated_probability = request.payload["integrated_probability"] * 0.01
-        min_probdensity = (
-            sa.select(
-                sa.func.min(localizationtile_subquery.columns.probdensity)
-            ).filter(
-                localizationtile_subquery.columns.cum_prob <= integrated_probability
-            )
-        ).scalar_subquery()
+        threshold = min_probdensity(
+            session,
+            request.localization.id,
+            integrated_probability,
+            localizationtilescls,
+        )
 
         if params["tilesType"] == "galaxy":
             if "galaxy_sorting" not in request.payload:
@@ -762,7 +726,7 @@ def generate_plan(
                         field_tiles_query = sa.select(InstrumentField.field_id).where(
                             localizationtilescls.localization_id
                             == request.localization.id,
-                            localizationtilescls.probdensity >= min_probdensity,
+                            in_credible_region(localizationtilescls, threshold),
                             InstrumentFieldTile.instrument_id == request.instrument.id,
                             InstrumentFieldTile.instrument_field_id
                             == InstrumentField.id,
@@ -0,0 +1,139 @@
+"""Scheduling of the status polls of requests submitted to remote services.
+
+Each request is polled on its own schedule, which the poll itself sets from
+the state the service reports (e.g. its position in the service's queue),
+and the polls of the requests to each service run concurrently, up to a
+per-service limit.
+"""
+
+import asyncio
+import heapq
+import itertools
+
+# Bounds of the delay between two polls of a request (seconds).
+MIN_POLL_INTERVAL = 15
+MAX_POLL_INTERVAL = 600
+# Delay per request ahead of a request in a service's queue (seconds).
+SECONDS_PER_QUEUE_POSITION = 10
+# Delay between polls, as a fraction of the time a request has waited.
+WAITING_POLL_FRACTION = 0.1
+
+
+def poll_delay(
+    queue_position=None,
+    waiting=None,
+    minimum=MIN_POLL_INTERVAL,
+    maximum=MAX_POLL_INTERVAL,
+):
+    """Delay before polling a request that isn't done yet.
+
+    Parameters
+    ----------
+    queue_position : int, optional
+        Position of the request in the service's queue, if it reports it.
+        Requests far back in the queue are polled less often.
+    waiting : float, optional
+        Time the request has waited so far (seconds), used when the service
+        doesn't report a queue position: requests that are slow to complete
+        are polled less often.
+    minimum, maximum : float
+        Bounds of the delay (seconds).
+
+    Returns
+    -------
+    float
+        Delay in seconds.
+    """
+    if queue_position is not None:
+        delay = queue_position * SECONDS_PER_QUEUE_POSITION
+    elif waiting is not None:
+        delay = waiting * WAITING_POLL_FRACTION
+    else:
+        delay = minimum
+    return float(min(max(delay, minimum), maximum))
+
+
+class PollScheduler:
+    """Run the polls of requests when they're due.
+
+    Parameters
+    ----------
+    poll : coroutine function
+        Polls a request, given its key. Returns the delay before polling it
+        again (seconds), or None if it's done.
+    concurrency : dict, optional
+        Maximum number of concurrent polls, by group (e.g. facility).
+    default_concurrency : int
+        Maximum number of concurrent polls of the other groups.
+    """
+
+    def __init__(self, poll, concurrency=None, default_concurrency=2):
+        self.poll = poll
+        self.concurrency = concurrency or {}
+        self.default_concurrency = default_concurrency
+        self._due = []
+        self._counter = itertools.count()
+        self._scheduled = {}
+        self._running = set()
+        self._semaphores = {}
+        self._tasks = set()
+        self._wakeup = asyncio.Event()
+
+    def __contains__(self, key):
+        return key in self._scheduled or key in self._running
+
+    @property
+    def stats(self):
+        return {"scheduled": len(self._scheduled), "running": len(self._running)}
+
+    def schedule(self, key, group, delay=0):
+        """Poll a request in `delay` seconds, or earlier if it's already
+        scheduled earlier. Requests being polled are left to reschedule
+        themselves."""
+        if key in self._running:
+            return
+        due = asyncio.get_running_loop().time() + delay
+        if key in self._scheduled and self._scheduled[key] <= due:
+            return
+        self._scheduled[key] = due
+        heapq.heappush(self._due, (due, next(self._counter), key, group))
+        self._wakeup.set()
+
+    def _semaphore(self, group):
+        if group not in self._semaphores:
+            self._semaphores[group] = asyncio.Semaphore(
+                self.concurrency.get(group, self.default_concurrency)
+            )
+        return self._semaphores[group]
+
+    async def _run_poll(self, key, group):
+        delay = None
+        try:
+            async with self._semaphore(group):
+                delay = await self.poll(key)
+        finally:
+            self._running.discard(key)
+        if delay is not None:
+            self.schedule(key, group, delay)
+
+    async def run(self):
+        """Start the polls as they're due, forever."""
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            now = loop.time()
+            while self._due and self._due[0][0] <= now:
+                due, _, key, group = heapq.heappop(self._due)
+                if self._scheduled.get(key) != due:
+                    # rescheduled earlier since
+                    continue
+                del self._scheduled[key]
+                self._running.add(key)
+                task = loop.create_task(self._run_poll(key, group))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            timeout = self._due[0][0] - now if self._due else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
@@ -4,8 +4,10 @@ import time
 import requests
 
 from baselayer.app.env import load_env
+from baselayer.log import make_log
 
 env, cfg = load_env()
+log = make_log("services")
 
 REQUEST_TIMEOUT_SECONDS = cfg["health_monitor.request_timeout_seconds"]
 
@@ -54,3 +56,22 @@ def check_loaded(*args, **kwargs):
         return wrapper
 
     return decorator
+
+
+def post_facility_requests(request_ids, timeout=2):
+    """Have the facility queue poll new facility transaction requests right
+    away, rather than at its next sweep."""
+    facility_queue_url = (
+        f"http://{cfg['hosts.facility_queue']}:{cfg['ports.facility_queue']}"
+    )
+    try:
+        resp = requests.post(
+            facility_queue_url, json={"request_ids": request_ids}, timeout=timeout
+        )
+    except Exception as e:
+        log(f"Facility queue request failed for requests {request_ids}: {e}")
+        return False
+    if resp.status_code != 200:
+        log(f"Facility queue request failed for requests {request_ids}: {resp.content}")
+        return False
+    return True
@@ -0,0 +1,94 @@
+"""Downsampled previews of spectra, for plots.
+
+Spectra are downsampled by min/max binning: the pixels are split into
+consecutive bins, and the lowest and highest flux of each bin are kept (plus
+the first and last pixels), so narrow lines and spikes survive at any
+resolution. The pixels of the default previews are cached per spectrum.
+"""
+
+import numpy as np
+
+from .cache import MemoryCache
+
+PREVIEW_MAX_POINTS = 2000
+# the fewest points a preview can be asked for
+MIN_PREVIEW_POINTS = 10
+
+# spectrum ID -> (modified, indices of the pixels of the default preview)
+preview_cache = MemoryCache(max_items=1000)
+
+
+def minmax_indices(values, max_points):
+    """
+    Indices of at most `max_points` values, keeping the lowest and the
+    highest value of consecutive bins of values, in order.
+
+    Parameters
+    ----------
+    values : array-like
+        The values to downsample, e.g. the fluxes of a spectrum.
+    max_points : int
+        The maximum number of indices to return (at least 4).
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted indices of the selected values. NaNs are only
+        selected in bins that have no other values.
+    """
+    values = np.asarray(values, dtype=float)
+    num_values = len(values)
+    if num_values <= max_points:
+        return np.arange(num_values)
+
+    # two values per bin, plus the first and last value
+    num_bins = (max_points - 2) // 2
+    bin_size = -(-num_values // num_bins)
+    num_bins = -(-num_values // bin_size)
+    padded = np.full(num_bins * bin_size, np.nan)
+    padded[:num_values] = values
+    padded = padded.reshape(num_bins, bin_size)
+
+    offsets = np.arange(num_bins) * bin_size
+    nan = np.isnan(padded)
+    lowest = np.argmin(np.where(nan, np.inf, padded), axis=1) + offsets
+    highest = np.argmax(np.where(nan, -np.inf, padded), axis=1) + offsets
+
+    indices = np.unique(np.concatenate([[0, num_values - 1], lowest, highest]))
+    return indices[indices < num_values]
+
+
+def preview_indices(spectrum_id, modified, fluxes, max_points=PREVIEW_MAX_POINTS):
+    """
+    Indices of the pixels in the preview of a spectrum. Those of the
+    default preview (PREVIEW_MAX_POINTS) are cached until the spectrum
+    is modified; the others are computed on each call.
+
+    Parameters
+    ----------
+    spectrum_id : int
+        ID of the spectrum.
+    modified : datetime.datetime
+        Time the spectrum was last modified.
+    fluxes : array-like
+        Fluxes of the spectrum.
+    max_points : int
+        The maximum number of pixels in the preview.
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted indices of the pixels in the preview.
+    """
+    if max_points != PREVIEW_MAX_POINTS:
+        return minmax_indices(fluxes, max_points)
+    cached = preview_cache.get(spectrum_id)
+    if cached is None or cached[0] != modified:
+        cached = (modified, minmax_indices(fluxes, max_points))
+        preview_cache[spectrum_id] = cached
+    return cached[1]
+
+
+def invalidate_preview(spectrum_id):
+    """Drop the cached previews of a spectrum, e.g. when it is updated."""
+    preview_cache.pop(spectrum_id)
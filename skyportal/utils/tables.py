@@ -0,0 +1,144 @@
+"""Apache Arrow IPC and Parquet encoding of photometry and spectra results.
+
+Light-curve and spectrum fitting pipelines spend most of their time parsing
+JSON floats out of the API responses. The handlers can instead return the
+same records as a typed, columnar table: numeric columns keep their dtype (and
+NaNs), spectra arrays become list columns built straight from the NumPy
+buffers, and nested values (groups, annotations, owner, ...) are carried as
+JSON strings.
+"""
+
+import io
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from baselayer.app.json_util import to_json
+
+# Binary output formats of the photometry and spectra GET endpoints, with the
+# Content-Type they are sent as.
+TABLE_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Spectrum columns that hold one array per spectrum.
+SPECTRUM_ARRAY_COLUMNS = ("wavelengths", "fluxes", "errors")
+
+
+def _column(values):
+    """Arrow array of one column of records, falling back to JSON strings for
+    nested or mixed-type values."""
+    if not any(isinstance(v, dict | list | tuple) for v in values):
+        try:
+            return pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            pass
+    return pa.array([None if v is None else to_json(v) for v in values], pa.string())
+
+
+def records_to_table(records, metadata=None):
+    """Build a table from a list of dicts, one row per dict.
+
+    Parameters
+    ----------
+    records : list of dict
+        The serialized rows. Columns are the union of the keys, in order of
+        first appearance; rows without a key get a null.
+    metadata : dict, optional
+        Key/value pairs stored in the table schema (e.g. the magnitude
+        system of the photometry).
+
+    Returns
+    -------
+    pyarrow.Table
+    """
+    columns = {}
+    for record in records:
+        for key in record:
+            columns.setdefault(key, None)
+    table = pa.table(
+        {key: _column([record.get(key) for record in records]) for key in columns}
+    )
+    if metadata:
+        table = table.replace_schema_metadata(
+            {str(k): str(v) for k, v in metadata.items()}
+        )
+    return table
+
+
+def _list_column(arrays):
+    """A list<double> column from a sequence of 1d arrays (or None), with a
+    single copy into the values buffer."""
+    arrays = [None if a is None else np.asarray(a, dtype=np.float64) for a in arrays]
+    lengths = np.array([0 if a is None else len(a) for a in arrays], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int32)
+    values = (
+        np.concatenate([a for a in arrays if a is not None])
+        if any(a is not None for a in arrays)
+        else np.array([], dtype=np.float64)
+    )
+    mask = np.array([a is None for a in arrays], dtype=bool)
+    return pa.ListArray.from_arrays(
+        pa.array(offsets), pa.array(values), mask=pa.array(mask)
+    )
+
+
+def spectra_to_table(spectra, metadata=None):
+    """Build a table with one row per spectrum from a list of spectrum dicts.
+
+    The wavelengths, fluxes and errors become list<double> columns; every
+    other key is converted as in `records_to_table`.
+
+    Parameters
+    ----------
+    spectra : list of dict
+        Serialized spectra (e.g. ``Spectrum.to_dict()``).
+    metadata : dict, optional
+        Key/value pairs stored in the table schema.
+
+    Returns
+    -------
+    pyarrow.Table
+    """
+    table = records_to_table(
+        [
+            {k: v for k, v in spectrum.items() if k not in SPECTRUM_ARRAY_COLUMNS}
+            for spectrum in spectra
+        ],
+        metadata=metadata,
+    )
+    for name in SPECTRUM_ARRAY_COLUMNS:
+        table = table.append_column(
+            name, _list_column([spectrum.get(name) for spectrum in spectra])
+        )
+    return table
+
+
+def table_bytes(table, format):
+    """Encode ``table`` as an Arrow IPC stream or a Parquet file.
+
+    Parameters
+    ----------
+    table : pyarrow.Table
+    format : str
+        One of `TABLE_FORMATS`.
+
+    Returns
+    -------
+    io.BytesIO
+        The encoded table, rewound to the start.
+    """
+    if format not in TABLE_FORMATS:
+        raise ValueError(
+            f"Invalid table format {format}, must be one of {list(TABLE_FORMATS)}"
+        )
+    buf = io.BytesIO()
+    if format == "arrow":
+        with pa.ipc.new_stream(buf, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, buf)
+    buf.seek(0)
+    return buf
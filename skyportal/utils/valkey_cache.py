@@ -36,6 +36,8 @@ class ValkeyCache:
     miss / no-op) so a Valkey outage degrades gracefully to the un-cached path.
     """
 
+    enabled = True
+
     def __init__(self, host="localhost", port=6379, db=0, default_ttl=300):
         self._url = f"redis://{host}:{port}/{db}"
         self._default_ttl = default_ttl
@@ -120,6 +122,8 @@ class ValkeyCache:
 class _NoOpCache:
     """Stand-in used when caching is disabled, so callers never branch."""
 
+    enabled = False
+
     async def get(self, key):
         return None
 
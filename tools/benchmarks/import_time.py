@@ -0,0 +1,112 @@
+"""Benchmark the import time of the app server (or of any module).
+
+Imports each module in a fresh interpreter with ``python -X importtime``, and
+reports the median wall time of the imports, and the modules that took the
+longest to import (cumulative time, including the modules they import).
+With --resolve-handlers, also imports all the handlers of the app server
+routes, as on start when they aren't imported lazily (server.lazy_handlers).
+
+Run from the root of the repository, so the configuration is found. With
+--json, the results are printed as JSON, for CI to track; with --max-seconds,
+the exit code is 1 if an import takes longer.
+
+Usage: python tools/benchmarks/import_time.py [--module M ...] [--repeat N] [--top N]
+           [--resolve-handlers] [--json] [--max-seconds S]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_MODULES = ["skyportal.app_server", "skyportal.handlers.api.gcn"]
+
+RESOLVE_HANDLERS = """
+from skyportal.app_server import skyportal_handlers
+from skyportal.handlers.lazy import resolve_handler
+for _, handler, *_ in skyportal_handlers:
+    resolve_handler(handler)
+"""
+
+
+def parse_importtime(output):
+    """Cumulative import times (seconds) of the modules, from the output of
+    ``python -X importtime``, and the total of the top-level imports."""
+    cumulative, total = {}, 0
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        seconds = int(cumulative_us) / 1e6
+        cumulative[name.strip()] = max(cumulative.get(name.strip(), 0), seconds)
+        # top-level imports are not indented (beyond the separator's space)
+        if not name[1:].startswith(" "):
+            total += seconds
+    return cumulative, total
+
+
+def time_import(code, repeat):
+    """Wall times of running `code` in fresh interpreters, and the
+    import times of the last run."""
+    wall_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+        )
+        wall_times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(f"{code!r} failed:\n{result.stderr[-2000:]}")
+    return wall_times, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", action="append", dest="modules")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--resolve-handlers", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--max-seconds", type=float)
+    args = parser.parse_args()
+
+    benchmarks = {
+        module: f"import {module}" for module in args.modules or DEFAULT_MODULES
+    }
+    if args.resolve_handlers:
+        benchmarks["all handlers"] = RESOLVE_HANDLERS
+
+    results = {}
+    for name, code in benchmarks.items():
+        wall_times, (cumulative, total) = time_import(code, args.repeat)
+        slowest = sorted(cumulative.items(), key=lambda item: -item[1])[: args.top]
+        results[name] = {
+            "median_seconds": statistics.median(wall_times),
+            "import_seconds": total,
+            "slowest_modules": dict(slowest),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, result in results.items():
+            print(
+                f"{name}: {result['median_seconds']:.2f} s "
+                f"(median of {args.repeat}), "
+                f"{result['import_seconds']:.2f} s importing"
+            )
+            for module, seconds in result["slowest_modules"].items():
+                print(f"  {seconds:8.3f} s  {module}")
+
+    if args.max_seconds is not None and any(
+        result["median_seconds"] > args.max_seconds for result in results.values()
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark LocalizationTile loading: ORM objects vs binary COPY.
+
+Reads a skymap as multi-order (UNIQ) pixels -- by default the LALInference map
+in data/; pass a BAYESTAR multi-order FITS file or URL with --skymap for a
+realistic fine LVK map -- creates a throwaway GcnEvent and Localization, loads
+the tiles both ways in transactions that are rolled back, checks that both
+paths write the same rows, and reports the time of each.
+
+Needs the database from config.yaml, with at least one user.
+
+Usage: PYTHONPATH=. python tools/benchmarks/localization_tiles.py \
+    [--skymap PATH_OR_URL] [--repeat N]
+"""
+
+import argparse
+import datetime
+import timeit
+
+import ligo.skymap.io
+import numpy as np
+import sqlalchemy as sa
+
+from baselayer.app.env import load_env
+from baselayer.app.models import DBSession, User, init_db
+from skyportal.models import GcnEvent, Localization, LocalizationTile
+from skyportal.utils.localization_tiles import copy_localization_tiles
+
+# In a monthly partition, like a real event.
+DATEOBS = datetime.datetime(2025, 6, 15, 12, 0, 0)
+
+
+def read_skymap(path):
+    skymap = ligo.skymap.io.read_sky_map(path, moc=True)
+    return (
+        np.asarray(skymap["UNIQ"], dtype=np.int64),
+        np.asarray(skymap["PROBDENSITY"], dtype=np.float64),
+    )
+
+
+def load_orm(session, localization, uniq, probdensity):
+    session.add_all(
+        [
+            LocalizationTile(
+                localization_id=localization.id,
+                healpix=int(u),
+                probdensity=float(p),
+                dateobs=localization.dateobs,
+            )
+            for u, p in zip(uniq, probdensity)
+        ]
+    )
+    session.flush()
+
+
+def load_copy(session, localization, uniq, probdensity):
+    copy_localization_tiles(
+        session, localization.id, localization.dateobs, uniq, probdensity
+    )
+
+
+def tile_rows(session, localization):
+    return session.execute(
+        sa.select(
+            sa.func.lower(LocalizationTile.healpix),
+            sa.func.upper(LocalizationTile.healpix),
+            LocalizationTile.probdensity,
+            LocalizationTile.dateobs,
+        )
+        .where(LocalizationTile.localization_id == localization.id)
+        .order_by(sa.func.lower(LocalizationTile.healpix))
+    ).all()
+
+
+def run(load, uniq, probdensity, check=False):
+    """Load the tiles of a new localization, then roll everything back."""
+    session = DBSession()
+    try:
+        user = session.scalars(sa.select(User).order_by(User.id)).first()
+        event = GcnEvent(dateobs=DATEOBS, sent_by_id=user.id)
+        localization = Localization(
+            dateobs=DATEOBS,
+            localization_name="benchmark",
+            sent_by_id=user.id,
+            uniq=uniq.tolist(),
+            probdensity=probdensity.tolist(),
+        )
+        session.add_all([event, localization])
+        session.flush()
+        elapsed = timeit.timeit(
+            lambda: load(session, localization, uniq, probdensity), number=1
+        )
+        rows = tile_rows(session, localization) if check else None
+    finally:
+        session.rollback()
+    return elapsed, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skymap", default="data/LALInference.v1.fits.gz")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    _, cfg = load_env()
+    init_db(**cfg["database"])
+
+    uniq, probdensity = read_skymap(args.skymap)
+
+    _, orm_rows = run(load_orm, uniq, probdensity, check=True)
+    _, copy_rows = run(load_copy, uniq, probdensity, check=True)
+    assert orm_rows == copy_rows, "ORM and COPY paths wrote different tiles"
+
+    timings = {
+        name: min(run(load, uniq, probdensity)[0] for _ in range(args.repeat))
+        for name, load in (("ORM", load_orm), ("COPY", load_copy))
+    }
+    print(
+        f"{len(uniq)} tiles: ORM {timings['ORM']:.2f} s, "
+        f"COPY {timings['COPY']:.2f} s "
+        f"({timings['ORM'] / timings['COPY']:.1f}x), rows identical"
+    )
+
+
+if __name__ == "__main__":
+    main()
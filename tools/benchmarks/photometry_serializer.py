@@ -0,0 +1,77 @@
+"""Benchmark photometry serialization: serialize() per point vs serialize_many().
+
+Builds a synthetic forced-photometry-sized light curve (50k points by default;
+three ZTF bands, a mix of detections, non-detections and points uploaded with a
+limiting magnitude) as transient Photometry rows, checks that both paths give
+the same JSON, and reports the time per light curve for each output format.
+
+Usage: python tools/benchmarks/photometry_serializer.py [--points N] [--repeat N]
+"""
+
+import argparse
+import random
+import timeit
+
+from baselayer.app.json_util import to_json
+from skyportal.handlers.api.photometry import serialize, serialize_many
+from skyportal.models import Instrument, Photometry
+
+
+def light_curve(rng, n_points):
+    instrument = Instrument(id=1, name="ZTF")
+    points = []
+    for i in range(n_points):
+        flux = rng.choice([rng.uniform(-50, 5000), float("nan")])
+        original_user_data = None
+        if rng.random() < 0.1:
+            original_user_data = {"limiting_mag": rng.uniform(19, 21), "magsys": "ab"}
+        points.append(
+            Photometry(
+                id=i,
+                obj_id="ZTF21aaaaaaa",
+                instrument_id=1,
+                instrument=instrument,
+                filter=rng.choice(["ztfg", "ztfr", "ztfi"]),
+                mjd=59000 + i / 100,
+                flux=flux,
+                fluxerr=rng.uniform(5, 50),
+                ra=rng.uniform(0, 1),
+                dec=rng.uniform(0, 1),
+                origin="fp",
+                original_user_data=original_user_data,
+            )
+        )
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    points = light_curve(random.Random(42), args.points)
+    for format in ("plot", "mag", "flux", "both"):
+        for outsys in ("ab", "vega"):
+            reference = [serialize(p, outsys, format) for p in points]
+            columnar = serialize_many(points, outsys, format)
+            assert to_json(reference) == to_json(columnar), (
+                f"{format}/{outsys}: outputs differ"
+            )
+
+        timings = {}
+        for name, run in (
+            ("per point", lambda: [serialize(p, "ab", format) for p in points]),
+            ("columnar", lambda: serialize_many(points, "ab", format)),
+        ):
+            timings[name] = timeit.timeit(run, number=args.repeat) / args.repeat
+        print(
+            f"format={format}, {args.points} points: "
+            f"per point {timings['per point']:.2f} s, "
+            f"columnar {timings['columnar']:.2f} s "
+            f"({timings['per point'] / timings['columnar']:.1f}x), outputs identical"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark spectrum array columns: NumpyArray (float8[]) vs BinaryNumpyArray (bytea).
+
+Builds synthetic spectra (10^5 pixels by default, as from IFU or echelle
+instruments), and times the conversions each column type does when spectra
+are written (value to bind parameter) and read (driver value to array). The
+driver's own decoding of a float8[] into a list of floats, which a bytea
+column doesn't need either, is not included. Also checks that both types
+give back the same values.
+
+Usage: python tools/benchmarks/spectrum_arrays.py [--pixels N] [--spectra N] [--repeat N]
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from skyportal.models.spectrum import BinaryNumpyArray, NumpyArray
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pixels", type=int, default=100_000)
+    parser.add_argument("--spectra", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    spectra = [rng.normal(1e-16, 1e-17, args.pixels) for _ in range(args.spectra)]
+    spectra[0][::1000] = np.nan
+
+    timings = {}
+    for name, column_type in (
+        ("float8[]", NumpyArray()),
+        ("bytea", BinaryNumpyArray()),
+    ):
+        stored = [column_type.process_bind_param(s, None) for s in spectra]
+        for spectrum, value in zip(spectra, stored):
+            np.testing.assert_array_equal(
+                column_type.process_result_value(value, None), spectrum
+            )
+
+        write = timeit.timeit(
+            lambda: [column_type.process_bind_param(s, None) for s in spectra],
+            number=args.repeat,
+        )
+        read = timeit.timeit(
+            lambda: [column_type.process_result_value(v, None) for v in stored],
+            number=args.repeat,
+        )
+        timings[name] = (write / args.repeat, read / args.repeat)
+        print(
+            f"{name}: {args.spectra} spectra of {args.pixels} pixels: "
+            f"write {timings[name][0] * 1e3:.1f} ms, read {timings[name][1] * 1e3:.1f} ms"
+        )
+
+    print(
+        f"bytea speedup: write {timings['float8[]'][0] / timings['bytea'][0]:.0f}x, "
+        f"read {timings['float8[]'][1] / timings['bytea'][1]:.0f}x, values identical"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Convert the data files of all photometric series to the format set by
+`photometric_series_format` in the config ("hdf5" or "columnar").
+
+Each file is rewritten in the new format, the series' filename and hash are
+updated, and the old file is removed once the change is committed. Columnar
+files store the rows sorted by MJD, so the data of series whose rows were not
+sorted is reordered.
+"""
+
+import os
+
+import sqlalchemy as sa
+
+from baselayer.app.env import load_env
+from baselayer.app.models import init_db
+from skyportal.models import DBSession, PhotometricSeries
+from skyportal.models.photometric_series import STORAGE_FORMAT
+
+env, cfg = load_env()
+
+init_db(**cfg["database"])
+
+if __name__ == "__main__":
+    print(f"Converting photometric series data files to {STORAGE_FORMAT}")
+    page, total_processed, total_converted = 0, 0, 0
+    while True:
+        with DBSession() as session:
+            try:
+                ids: list[int] = session.scalars(
+                    sa.select(PhotometricSeries.id)
+                    .order_by(PhotometricSeries.id)
+                    .distinct()
+                    .offset(page * 1000)
+                    .limit(1000)
+                ).all()
+            except Exception as e:
+                print(f"Error fetching photometric series: {e}")
+                break
+            if not ids:
+                break
+            for id in ids:
+                try:
+                    phot_series = session.scalar(
+                        sa.select(PhotometricSeries).where(PhotometricSeries.id == id)
+                    )
+
+                    # if no photometric series exists, skip
+                    if not phot_series:
+                        print(
+                            f"Warning - No photometric series found for id {id}, skipping."
+                        )
+                        continue
+
+                    if phot_series.is_columnar == (STORAGE_FORMAT == "columnar"):
+                        continue
+
+                    prev_filename = phot_series.filename
+                    full_name, _ = phot_series.make_full_name()
+                except Exception as e:
+                    print(f"Error processing photometric series {id}: {e}")
+                    session.rollback()
+                    continue
+
+                try:
+                    # read the data from the old file, and write it in the new format
+                    phot_series.load_data()
+                    phot_series.save_data(temp=True)
+                    session.commit()
+                except Exception as e:
+                    print(f"Error converting photometric series {id}: {e}")
+                    session.rollback()
+                    # make sure not to leave files behind
+                    if os.path.isfile(full_name + ".tmp"):
+                        os.remove(full_name + ".tmp")
+                    continue
+
+                phot_series.move_temp_data()
+                if os.path.isfile(prev_filename):
+                    os.remove(prev_filename)
+                total_converted += 1
+
+        page += 1
+        total_processed += len(ids)
+        print(
+            f"Processed page {page} (total={total_processed}, converted={total_converted})"
+        )
+
+    print(f"Total processed: {total_processed}, converted: {total_converted}")